@@ -0,0 +1,79 @@
+"""add_keyset_pagination_indexes
+
+Revision ID: a3f1c9d2e8b4
+Revises: 0c6ed652bf16
+Create Date: 2026-10-19 09:12:44.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3f1c9d2e8b4'
+down_revision: Union[str, None] = '0c6ed652bf16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite indexes backing keyset pagination"""
+
+    # alert_history: (tenant_id, triggered_at, id) remplace (tenant_id, triggered_at)
+    op.create_index(
+        'idx_alert_history_tenant_date_id',
+        'alert_history',
+        ['tenant_id', 'triggered_at', 'id'],
+        unique=False
+    )
+    op.drop_index('idx_alert_history_tenant_date', table_name='alert_history')
+
+    op.create_index(
+        'idx_alert_history_alert_date_id',
+        'alert_history',
+        ['alert_id', 'triggered_at', 'id'],
+        unique=False
+    )
+    op.drop_index('idx_alert_history_alert', table_name='alert_history')
+
+    # admin_audit_logs: liste globale et filtrée par admin
+    op.create_index(
+        'idx_audit_created_id',
+        'admin_audit_logs',
+        ['created_at', 'id'],
+        unique=False
+    )
+    op.create_index(
+        'idx_audit_admin_created_id',
+        'admin_audit_logs',
+        ['admin_user_id', 'created_at', 'id'],
+        unique=False
+    )
+
+    op.execute('ANALYZE alert_history')
+    op.execute('ANALYZE admin_audit_logs')
+
+
+def downgrade() -> None:
+    """Restore offset-era indexes"""
+
+    op.drop_index('idx_audit_admin_created_id', table_name='admin_audit_logs')
+    op.drop_index('idx_audit_created_id', table_name='admin_audit_logs')
+
+    op.create_index(
+        'idx_alert_history_alert',
+        'alert_history',
+        ['alert_id', 'triggered_at'],
+        unique=False
+    )
+    op.drop_index('idx_alert_history_alert_date_id', table_name='alert_history')
+
+    op.create_index(
+        'idx_alert_history_tenant_date',
+        'alert_history',
+        ['tenant_id', 'triggered_at'],
+        unique=False
+    )
+    op.drop_index('idx_alert_history_tenant_date_id', table_name='alert_history')
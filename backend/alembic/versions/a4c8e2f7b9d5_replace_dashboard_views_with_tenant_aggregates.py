@@ -0,0 +1,216 @@
+"""replace_dashboard_views_with_tenant_aggregates
+
+Revision ID: a4c8e2f7b9d5
+Revises: f2d6b9e4c8a3
+Create Date: 2026-10-19 19:04:51.826093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f7b9d5'
+down_revision: Union[str, None] = 'f2d6b9e4c8a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Écritures qui rendent les agrégats d'un tenant obsolètes
+WATCHED_TABLES = ['products', 'sales']
+
+STOCK_HEALTH_VIEW = """
+    CREATE MATERIALIZED VIEW mv_dashboard_stock_health AS
+    SELECT
+        p.tenant_id,
+        COUNT(DISTINCT p.id) as total_products,
+        COUNT(DISTINCT CASE WHEN p.current_stock = 0 THEN p.id END) as rupture_count,
+        COUNT(DISTINCT CASE WHEN p.current_stock > 0 AND p.current_stock <= p.min_stock THEN p.id END) as low_stock_count,
+        SUM(p.current_stock * p.purchase_price) as total_stock_value
+    FROM products p
+    WHERE p.is_active = TRUE
+    GROUP BY p.tenant_id;
+"""
+
+SALES_PERFORMANCE_VIEW = """
+    CREATE MATERIALIZED VIEW mv_dashboard_sales_performance AS
+    SELECT
+        s.tenant_id,
+        DATE_TRUNC('day', s.sale_date) as sale_day,
+        COUNT(*) as transactions_count,
+        SUM(s.total_amount) as daily_revenue,
+        SUM(s.quantity) as total_units_sold
+    FROM sales s
+    WHERE s.sale_date >= CURRENT_DATE - INTERVAL '90 days'
+    GROUP BY s.tenant_id, DATE_TRUNC('day', s.sale_date);
+"""
+
+
+def upgrade() -> None:
+    """Per-tenant dashboard aggregates refreshed only for tenants with new writes"""
+
+    op.create_table('dashboard_stock_health',
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('total_products', sa.BigInteger(), nullable=False),
+    sa.Column('rupture_count', sa.BigInteger(), nullable=False),
+    sa.Column('low_stock_count', sa.BigInteger(), nullable=False),
+    sa.Column('total_stock_value', sa.Numeric(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('tenant_id')
+    )
+    op.create_table('dashboard_sales_performance',
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('sale_day', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('transactions_count', sa.BigInteger(), nullable=False),
+    sa.Column('daily_revenue', sa.Numeric(), nullable=True),
+    sa.Column('total_units_sold', sa.Numeric(), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id', 'sale_day')
+    )
+    op.create_table('dashboard_dirty_tenants',
+    sa.Column('id', sa.BigInteger(), sa.Identity(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('dirtied_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_dashboard_dirty_tenants_tenant', 'dashboard_dirty_tenants', ['tenant_id'], unique=False)
+
+    # Journal des écritures: une ligne par tenant et par instruction (pas
+    # de clé unique, donc aucun verrou partagé entre transactions concurrentes)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fn_mark_dashboard_dirty()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                INSERT INTO dashboard_dirty_tenants (tenant_id)
+                SELECT DISTINCT tenant_id FROM new_rows;
+            ELSIF TG_OP = 'DELETE' THEN
+                INSERT INTO dashboard_dirty_tenants (tenant_id)
+                SELECT DISTINCT tenant_id FROM old_rows;
+            ELSIF TG_TABLE_NAME = 'products' THEN
+                -- Seuls stock, seuils, prix et statut alimentent les agrégats
+                -- (pas les métriques de ventes mises à jour par trigger)
+                INSERT INTO dashboard_dirty_tenants (tenant_id)
+                SELECT DISTINCT unnest(ARRAY[n.tenant_id, o.tenant_id])
+                FROM new_rows n
+                JOIN old_rows o ON o.id = n.id
+                WHERE (n.tenant_id, n.current_stock, n.min_stock, n.purchase_price, n.is_active)
+                    IS DISTINCT FROM (o.tenant_id, o.current_stock, o.min_stock, o.purchase_price, o.is_active);
+            ELSE
+                INSERT INTO dashboard_dirty_tenants (tenant_id)
+                SELECT tenant_id FROM new_rows
+                UNION
+                SELECT tenant_id FROM old_rows;
+            END IF;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Une table de transition par trigger: un trigger par événement
+    for table in WATCHED_TABLES:
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_dashboard_dirty_insert
+            AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION fn_mark_dashboard_dirty();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_dashboard_dirty_update
+            AFTER UPDATE ON {table}
+            REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION fn_mark_dashboard_dirty();
+        """)
+        op.execute(f"""
+            CREATE TRIGGER trg_{table}_dashboard_dirty_delete
+            AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT
+            EXECUTE FUNCTION fn_mark_dashboard_dirty();
+        """)
+
+    # Recalcul des agrégats d'un tenant (mêmes définitions que les anciennes vues)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fn_refresh_dashboard_aggregates(
+            p_tenant_id UUID
+        ) RETURNS VOID AS $$
+        BEGIN
+            -- Un seul recalcul à la fois par tenant
+            PERFORM pg_advisory_xact_lock(hashtext('dashboard_aggregates'), hashtext(p_tenant_id::text));
+
+            -- Marques consommées avant le recalcul: une écriture validée
+            -- ensuite laisse sa propre marque pour le passage suivant
+            DELETE FROM dashboard_dirty_tenants WHERE tenant_id = p_tenant_id;
+
+            DELETE FROM dashboard_stock_health WHERE tenant_id = p_tenant_id;
+            INSERT INTO dashboard_stock_health (
+                tenant_id, total_products, rupture_count, low_stock_count, total_stock_value
+            )
+            SELECT
+                p.tenant_id,
+                COUNT(DISTINCT p.id),
+                COUNT(DISTINCT CASE WHEN p.current_stock = 0 THEN p.id END),
+                COUNT(DISTINCT CASE WHEN p.current_stock > 0 AND p.current_stock <= p.min_stock THEN p.id END),
+                SUM(p.current_stock * p.purchase_price)
+            FROM products p
+            WHERE p.tenant_id = p_tenant_id
+                AND p.is_active = TRUE
+            GROUP BY p.tenant_id;
+
+            DELETE FROM dashboard_sales_performance WHERE tenant_id = p_tenant_id;
+            INSERT INTO dashboard_sales_performance (
+                tenant_id, sale_day, transactions_count, daily_revenue, total_units_sold
+            )
+            SELECT
+                s.tenant_id,
+                DATE_TRUNC('day', s.sale_date),
+                COUNT(*),
+                SUM(s.total_amount),
+                SUM(s.quantity)
+            FROM sales s
+            WHERE s.tenant_id = p_tenant_id
+                AND s.sale_date >= CURRENT_DATE - INTERVAL '90 days'
+            GROUP BY s.tenant_id, DATE_TRUNC('day', s.sale_date);
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Remplissage initial puis suppression des vues
+    op.execute("SELECT fn_refresh_dashboard_aggregates(id) FROM tenants;")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_dashboard_sales_performance;")
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_dashboard_stock_health;")
+
+
+def downgrade() -> None:
+    """Restore global dashboard materialized views"""
+
+    op.execute(STOCK_HEALTH_VIEW)
+    op.execute("""
+        CREATE UNIQUE INDEX idx_mv_stock_health_tenant
+        ON mv_dashboard_stock_health (tenant_id);
+    """)
+    op.create_index(
+        'idx_mv_dashboard_stock_health_tenant',
+        'mv_dashboard_stock_health',
+        ['tenant_id'],
+        unique=False
+    )
+    op.execute(SALES_PERFORMANCE_VIEW)
+    op.execute("""
+        CREATE UNIQUE INDEX idx_mv_sales_perf_tenant_day
+        ON mv_dashboard_sales_performance (tenant_id, sale_day);
+    """)
+
+    op.execute("DROP FUNCTION IF EXISTS fn_refresh_dashboard_aggregates(UUID);")
+    for table in WATCHED_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_{table}_dashboard_dirty_{event} ON {table};")
+    op.execute("DROP FUNCTION IF EXISTS fn_mark_dashboard_dirty();")
+
+    op.drop_index('idx_dashboard_dirty_tenants_tenant', table_name='dashboard_dirty_tenants')
+    op.drop_table('dashboard_dirty_tenants')
+    op.drop_table('dashboard_sales_performance')
+    op.drop_table('dashboard_stock_health')
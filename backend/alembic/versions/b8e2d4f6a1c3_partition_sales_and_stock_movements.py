@@ -0,0 +1,156 @@
+"""partition_sales_and_stock_movements
+
+Revision ID: b8e2d4f6a1c3
+Revises: a3f1c9d2e8b4
+Create Date: 2026-10-19 14:03:51.907364
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2d4f6a1c3'
+down_revision: Union[str, None] = 'a3f1c9d2e8b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Table -> (colonne de partitionnement, index secondaires)
+TABLES = {
+    'sales': ('sale_date', {
+        'idx_sales_tenant_date': ['tenant_id', 'sale_date'],
+        'idx_sales_product_date': ['product_id', 'sale_date'],
+        'idx_sales_tenant_date_product': ['tenant_id', 'sale_date', 'product_id'],
+        'ix_sales_tenant_id': ['tenant_id'],
+    }),
+    'stock_movements': ('movement_date', {
+        'idx_stock_movements_tenant_date': ['tenant_id', 'movement_date'],
+        'idx_stock_movements_product_date': ['product_id', 'movement_date'],
+        'ix_stock_movements_tenant_id': ['tenant_id'],
+    }),
+}
+
+# Partitions créées d'avance au-delà du mois courant (la tâche périodique prend le relais)
+MONTHS_AHEAD = 3
+
+SALES_PERFORMANCE_VIEW = """
+    CREATE MATERIALIZED VIEW mv_dashboard_sales_performance AS
+    SELECT
+        s.tenant_id,
+        DATE_TRUNC('day', s.sale_date) as sale_day,
+        COUNT(*) as transactions_count,
+        SUM(s.total_amount) as daily_revenue,
+        SUM(s.quantity) as total_units_sold
+    FROM sales s
+    WHERE s.sale_date >= CURRENT_DATE - INTERVAL '90 days'
+    GROUP BY s.tenant_id, DATE_TRUNC('day', s.sale_date);
+"""
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _drop_sales_view() -> None:
+    # Seule vue dépendant de sales: recréée à l'identique sur la nouvelle table
+    op.execute("DROP MATERIALIZED VIEW IF EXISTS mv_dashboard_sales_performance")
+
+
+def _create_sales_view() -> None:
+    op.execute(SALES_PERFORMANCE_VIEW)
+    op.execute("""
+        CREATE UNIQUE INDEX idx_mv_sales_perf_tenant_day
+        ON mv_dashboard_sales_performance (tenant_id, sale_day);
+    """)
+
+
+def _rename_legacy(table: str, indexes) -> str:
+    """Renommer la table existante et libérer les noms d'index / contrainte"""
+    legacy = f'{table}_legacy'
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey')
+    for name in indexes:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    return legacy
+
+
+def _create_foreign_keys(table: str) -> None:
+    """Clés étrangères (communes aux deux formes de la table)"""
+    op.execute(f"""
+        ALTER TABLE {table}
+            ADD CONSTRAINT {table}_product_id_fkey FOREIGN KEY (product_id)
+                REFERENCES products (id) ON DELETE CASCADE,
+            ADD CONSTRAINT {table}_tenant_id_fkey FOREIGN KEY (tenant_id)
+                REFERENCES tenants (id) ON DELETE CASCADE
+    """)
+
+
+def upgrade() -> None:
+    """Convert sales and stock_movements to monthly range partitions"""
+    conn = op.get_bind()
+    _drop_sales_view()
+
+    for table, (column, indexes) in TABLES.items():
+        legacy = _rename_legacy(table, indexes)
+
+        # Mêmes colonnes, types, NOT NULL et défauts que la table existante
+        op.execute(f"""
+            CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE ({column})
+        """)
+        # La clé primaire d'une table partitionnée doit contenir la colonne de partitionnement
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id, {column})')
+        _create_foreign_keys(table)
+
+        # Un mois par partition, du plus ancien mois présent jusqu'à MONTHS_AHEAD
+        oldest = conn.execute(sa.text(
+            f"SELECT date_trunc('month', MIN({column}) AT TIME ZONE 'UTC') FROM {legacy}"
+        )).scalar()
+        today = date.today()
+        month = date(oldest.year, oldest.month, 1) if oldest else date(today.year, today.month, 1)
+        last = _add_months(today, MONTHS_AHEAD)
+        while month <= last:
+            following = _add_months(month, 1)
+            op.execute(
+                f"CREATE TABLE {table}_y{month.year:04d}m{month.month:02d} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{following.isoformat()} 00:00:00+00')"
+            )
+            month = following
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+        # Copie puis index (plus rapide que de maintenir les index pendant la copie)
+        op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns, unique=False)
+
+        op.execute(f'DROP TABLE {legacy}')
+        op.execute(f'ANALYZE {table}')
+
+    _create_sales_view()
+
+
+def downgrade() -> None:
+    """Convert sales and stock_movements back to plain tables"""
+    _drop_sales_view()
+
+    for table, (column, indexes) in TABLES.items():
+        legacy = _rename_legacy(table, indexes)
+
+        op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY (id)')
+        _create_foreign_keys(table)
+
+        op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+        for name, columns in indexes.items():
+            op.create_index(name, table, columns, unique=False)
+
+        # Supprime aussi toutes les partitions
+        op.execute(f'DROP TABLE {legacy}')
+        op.execute(f'ANALYZE {table}')
+
+    _create_sales_view()
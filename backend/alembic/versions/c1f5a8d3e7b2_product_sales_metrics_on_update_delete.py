@@ -0,0 +1,98 @@
+"""product_sales_metrics_on_update_delete
+
+Revision ID: c1f5a8d3e7b2
+Revises: a4c8e2f7b9d5
+Create Date: 2026-10-19 21:42:13.604817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1f5a8d3e7b2'
+down_revision: Union[str, None] = 'a4c8e2f7b9d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Keep per-product sales metrics exact on sales UPDATE and DELETE"""
+
+    # Retrait des anciennes lignes (table de transition old_sales): les
+    # compteurs sont diminués de ce que l'insertion avait ajouté. La
+    # dernière vente n'est relue (idx_sales_product_date) que si une ligne
+    # retirée pouvait être celle-ci.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fn_sales_remove_product_metrics()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- Même ordre de verrouillage que fn_sales_update_product_metrics
+            PERFORM 1 FROM products
+            WHERE id IN (SELECT product_id FROM old_sales)
+            ORDER BY id
+            FOR UPDATE;
+
+            UPDATE products p SET
+                last_sale_at = CASE
+                    WHEN o.last_sale_at >= p.last_sale_at THEN
+                        (SELECT MAX(s.sale_date) FROM sales s WHERE s.product_id = p.id)
+                    ELSE p.last_sale_at
+                END,
+                qty_30d = p.qty_30d - o.qty_30d,
+                qty_90d = p.qty_90d - o.qty_90d,
+                revenue_30d = p.revenue_30d - o.revenue_30d
+            FROM (
+                SELECT
+                    product_id,
+                    MAX(sale_date) as last_sale_at,
+                    COALESCE(SUM(quantity) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days'), 0) as qty_30d,
+                    COALESCE(SUM(quantity) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '90 days'), 0) as qty_90d,
+                    COALESCE(SUM(total_amount) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days'), 0) as revenue_30d
+                FROM old_sales
+                GROUP BY product_id
+            ) o
+            WHERE p.id = o.product_id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Une table de transition par trigger et par événement (contrainte
+    # PostgreSQL): un UPDATE retire les anciennes lignes puis ajoute les
+    # nouvelles avec la fonction d'insertion existante. L'ordre des deux
+    # triggers est indifférent: les compteurs sont additifs et la dernière
+    # vente relue inclut déjà les nouvelles lignes.
+    op.execute("""
+        CREATE TRIGGER trg_sales_product_metrics_update_old
+        AFTER UPDATE ON sales
+        REFERENCING OLD TABLE AS old_sales
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION fn_sales_remove_product_metrics();
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_sales_product_metrics_update_new
+        AFTER UPDATE ON sales
+        REFERENCING NEW TABLE AS new_sales
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION fn_sales_update_product_metrics();
+    """)
+    op.execute("""
+        CREATE TRIGGER trg_sales_product_metrics_delete
+        AFTER DELETE ON sales
+        REFERENCING OLD TABLE AS old_sales
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION fn_sales_remove_product_metrics();
+    """)
+
+
+def downgrade() -> None:
+    """Back to insert-only sales metrics triggers"""
+
+    op.execute("DROP TRIGGER IF EXISTS trg_sales_product_metrics_delete ON sales;")
+    op.execute("DROP TRIGGER IF EXISTS trg_sales_product_metrics_update_new ON sales;")
+    op.execute("DROP TRIGGER IF EXISTS trg_sales_product_metrics_update_old ON sales;")
+    op.execute("DROP FUNCTION IF EXISTS fn_sales_remove_product_metrics();")
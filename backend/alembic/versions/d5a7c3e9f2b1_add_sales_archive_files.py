@@ -0,0 +1,45 @@
+"""add_sales_archive_files
+
+Revision ID: d5a7c3e9f2b1
+Revises: b8e2d4f6a1c3
+Create Date: 2026-10-19 16:27:08.415530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a7c3e9f2b1'
+down_revision: Union[str, None] = 'b8e2d4f6a1c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Create catalog of sales archived to Parquet"""
+    op.create_table('sales_archive_files',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('uri', sa.String(length=1024), nullable=False),
+    sa.Column('row_count', sa.Integer(), nullable=False),
+    sa.Column('size_bytes', sa.BigInteger(), nullable=False),
+    sa.Column('tenant_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['tenant_id'], ['tenants.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sales_archive_files_tenant_month', 'sales_archive_files', ['tenant_id', 'month'], unique=True)
+    op.create_index('idx_sales_archive_files_month', 'sales_archive_files', ['month'], unique=False)
+    op.create_index(op.f('ix_sales_archive_files_tenant_id'), 'sales_archive_files', ['tenant_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Drop sales archive catalog (Parquet files are left untouched)"""
+    op.drop_index(op.f('ix_sales_archive_files_tenant_id'), table_name='sales_archive_files')
+    op.drop_index('idx_sales_archive_files_month', table_name='sales_archive_files')
+    op.drop_index('idx_sales_archive_files_tenant_month', table_name='sales_archive_files')
+    op.drop_table('sales_archive_files')
@@ -0,0 +1,36 @@
+"""add_sales_tenant_updated_index
+
+Revision ID: e9c4b2a7d1f6
+Revises: d5a7c3e9f2b1
+Create Date: 2026-10-19 17:42:19.630184
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9c4b2a7d1f6'
+down_revision: Union[str, None] = 'd5a7c3e9f2b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Index sales modified since a given time (incremental analytics snapshots)"""
+
+    # Créé sur la table partitionnée: propagé à toutes les partitions
+    op.create_index(
+        'idx_sales_tenant_updated',
+        'sales',
+        ['tenant_id', 'updated_at'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Drop incremental snapshot index"""
+
+    op.drop_index('idx_sales_tenant_updated', table_name='sales')
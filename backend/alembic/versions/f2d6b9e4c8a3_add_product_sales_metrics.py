@@ -0,0 +1,162 @@
+"""add_product_sales_metrics
+
+Revision ID: f2d6b9e4c8a3
+Revises: e9c4b2a7d1f6
+Create Date: 2026-10-19 18:26:07.318542
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2d6b9e4c8a3'
+down_revision: Union[str, None] = 'e9c4b2a7d1f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Per-product sales metrics maintained on insert, with a correction function"""
+
+    op.add_column('products', sa.Column('last_sale_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('products', sa.Column('qty_30d', sa.Numeric(15, 3), server_default='0', nullable=False))
+    op.add_column('products', sa.Column('qty_90d', sa.Numeric(15, 3), server_default='0', nullable=False))
+    op.add_column('products', sa.Column('revenue_30d', sa.Numeric(15, 2), server_default='0', nullable=False))
+
+    # Produits dormants: recherche par tenant et date de dernière vente
+    op.create_index(
+        'idx_products_tenant_last_sale',
+        'products',
+        ['tenant_id', 'last_sale_at'],
+        unique=False
+    )
+
+    # Trigger niveau instruction: une seule mise à jour par produit et par
+    # INSERT multi-lignes ou COPY (imports), à partir de la table de transition
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fn_sales_update_product_metrics()
+        RETURNS TRIGGER AS $$
+        BEGIN
+            -- Verrous pris dans l'ordre des id: pas d'interblocage entre imports concurrents
+            PERFORM 1 FROM products
+            WHERE id IN (SELECT product_id FROM new_sales)
+            ORDER BY id
+            FOR UPDATE;
+
+            UPDATE products p SET
+                last_sale_at = GREATEST(p.last_sale_at, n.last_sale_at),
+                qty_30d = p.qty_30d + n.qty_30d,
+                qty_90d = p.qty_90d + n.qty_90d,
+                revenue_30d = p.revenue_30d + n.revenue_30d
+            FROM (
+                SELECT
+                    product_id,
+                    MAX(sale_date) as last_sale_at,
+                    COALESCE(SUM(quantity) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days'), 0) as qty_30d,
+                    COALESCE(SUM(quantity) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '90 days'), 0) as qty_90d,
+                    COALESCE(SUM(total_amount) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days'), 0) as revenue_30d
+                FROM new_sales
+                GROUP BY product_id
+            ) n
+            WHERE p.id = n.product_id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Sur la table partitionnée: la table de transition contient les lignes de toutes les partitions
+    op.execute("""
+        CREATE TRIGGER trg_sales_product_metrics
+        AFTER INSERT ON sales
+        REFERENCING NEW TABLE AS new_sales
+        FOR EACH STATEMENT
+        EXECUTE FUNCTION fn_sales_update_product_metrics();
+    """)
+
+    # Recalcul exact: fenêtres glissantes (un jour de plus chaque nuit),
+    # ventes modifiées ou supprimées. Ne réécrit que les produits qui changent.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION fn_refresh_product_sales_metrics(
+            p_tenant_id UUID DEFAULT NULL
+        ) RETURNS INT AS $$
+        DECLARE
+            updated_count INT;
+        BEGIN
+            WITH recent AS (
+                SELECT
+                    product_id,
+                    MAX(sale_date) as last_sale_at,
+                    SUM(quantity) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days') as qty_30d,
+                    SUM(quantity) as qty_90d,
+                    SUM(total_amount) FILTER (WHERE sale_date >= CURRENT_DATE - INTERVAL '30 days') as revenue_30d
+                FROM sales
+                WHERE sale_date >= CURRENT_DATE - INTERVAL '90 days'
+                    AND (p_tenant_id IS NULL OR tenant_id = p_tenant_id)
+                GROUP BY product_id
+            ),
+            metrics AS (
+                SELECT
+                    p.id,
+                    CASE
+                        WHEN r.last_sale_at IS NOT NULL THEN r.last_sale_at
+                        -- Plus de vente récente alors qu'il en avait une: vente supprimée
+                        WHEN p.last_sale_at >= CURRENT_DATE - INTERVAL '90 days' THEN
+                            (SELECT MAX(s.sale_date) FROM sales s WHERE s.product_id = p.id)
+                        ELSE p.last_sale_at
+                    END as last_sale_at,
+                    COALESCE(r.qty_30d, 0) as qty_30d,
+                    COALESCE(r.qty_90d, 0) as qty_90d,
+                    COALESCE(r.revenue_30d, 0) as revenue_30d
+                FROM products p
+                LEFT JOIN recent r ON r.product_id = p.id
+                WHERE p_tenant_id IS NULL OR p.tenant_id = p_tenant_id
+            )
+            UPDATE products p SET
+                last_sale_at = m.last_sale_at,
+                qty_30d = m.qty_30d,
+                qty_90d = m.qty_90d,
+                revenue_30d = m.revenue_30d
+            FROM metrics m
+            WHERE p.id = m.id
+                AND (
+                    p.last_sale_at IS DISTINCT FROM m.last_sale_at
+                    OR p.qty_30d <> m.qty_30d
+                    OR p.qty_90d <> m.qty_90d
+                    OR p.revenue_30d <> m.revenue_30d
+                );
+
+            GET DIAGNOSTICS updated_count = ROW_COUNT;
+            RETURN updated_count;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    # Initialisation: dernière vente sur tout l'historique, puis fenêtres
+    op.execute("""
+        UPDATE products p SET last_sale_at = s.last_sale_at
+        FROM (
+            SELECT product_id, MAX(sale_date) as last_sale_at
+            FROM sales
+            GROUP BY product_id
+        ) s
+        WHERE p.id = s.product_id;
+    """)
+    op.execute("SELECT fn_refresh_product_sales_metrics();")
+
+
+def downgrade() -> None:
+    """Drop per-product sales metrics"""
+
+    op.execute("DROP FUNCTION IF EXISTS fn_refresh_product_sales_metrics(UUID);")
+    op.execute("DROP TRIGGER IF EXISTS trg_sales_product_metrics ON sales;")
+    op.execute("DROP FUNCTION IF EXISTS fn_sales_update_product_metrics();")
+
+    op.drop_index('idx_products_tenant_last_sale', table_name='products')
+    op.drop_column('products', 'revenue_30d')
+    op.drop_column('products', 'qty_90d')
+    op.drop_column('products', 'qty_30d')
+    op.drop_column('products', 'last_sale_at')
@@ -4,11 +4,11 @@ Dependances communes pour les routes API.
 from typing import Generator
 from uuid import UUID
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
-from app.core import security, tenant_context
+from app.core import auth_cache, tenant_context
 from app.db.session import get_db
 from app.models.user import User
 
@@ -17,12 +17,14 @@ security_scheme = HTTPBearer()
 
 
 async def get_current_user_id(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme)
 ) -> tuple[UUID, UUID]:
     """
     Extrait l'user_id et tenant_id depuis le token JWT.
 
     Args:
+        request: Requete courante (tenant expose aux metriques)
         credentials: Credentials HTTP Bearer
 
     Returns:
@@ -32,7 +34,7 @@ async def get_current_user_id(
         HTTPException: Si le token est invalide
     """
     token = credentials.credentials
-    payload = security.verify_token(token, "access")
+    payload = auth_cache.verify_access_token(token)
 
     if not payload:
         raise HTTPException(
@@ -53,6 +55,7 @@ async def get_current_user_id(
 
     # Definir le tenant courant dans le contexte
     tenant_context.set_current_tenant(UUID(tenant_id))
+    request.state.tenant_id = UUID(tenant_id)
 
     return UUID(user_id), UUID(tenant_id)
 
@@ -74,18 +77,20 @@ async def get_current_tenant_id(
 
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security_scheme),
     db: Session = Depends(get_db)
 ) -> User:
     """
     Dependency pour extraire l'utilisateur courant depuis le JWT.
 
-    - Verifie le token JWT
+    - Verifie le token JWT (cache jusqu'a expiration du token)
     - Extrait user_id et tenant_id
     - Set le tenant_id dans le contexte
-    - Recupere et retourne l'utilisateur
+    - Recupere et retourne l'utilisateur (cache de quelques secondes)
 
     Args:
+        request: Requete courante (tenant expose aux metriques)
         credentials: Credentials HTTP Bearer contenant le token JWT
         db: Session de base de donnees
 
@@ -96,7 +101,7 @@ async def get_current_user(
         HTTPException: Si le token est invalide ou l'utilisateur n'existe pas
     """
     token = credentials.credentials
-    payload = security.verify_token(token, "access")
+    payload = auth_cache.verify_access_token(token)
 
     if not payload:
         raise HTTPException(
@@ -117,9 +122,10 @@ async def get_current_user(
 
     # Set tenant context pour la requete courante
     tenant_context.set_current_tenant(UUID(tenant_id))
+    request.state.tenant_id = UUID(tenant_id)
 
-    # Recuperer l'utilisateur
-    user = db.query(User).filter(User.id == user_id).first()
+    # Recuperer l'utilisateur (cache court, invalide via Redis)
+    user = auth_cache.get_user(db, UUID(user_id))
 
     if not user:
         raise HTTPException(
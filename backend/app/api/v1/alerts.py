@@ -5,7 +5,7 @@ import logging
 from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_tenant_id, get_db
@@ -19,6 +19,7 @@ from app.schemas.alert import (
     AlertHistoryFilters
 )
 from app.services.alert_service import AlertService
+from app.utils.pagination import InvalidCursorError, paginate_keyset
 
 logger = logging.getLogger(__name__)
 
@@ -309,28 +310,40 @@ async def toggle_alert(
 
 @router.get("/history/", response_model=List[AlertHistoryRead])
 async def get_alert_history(
+    response: Response,
     tenant_id: UUID = Depends(get_current_tenant_id),
     db: Session = Depends(get_db),
     alert_id: Optional[UUID] = Query(None, description="Filtrer par alerte spécifique"),
     alert_type: Optional[str] = Query(None, description="Filtrer par type d'alerte"),
     severity: Optional[str] = Query(None, description="Filtrer par sévérité"),
     limit: int = Query(50, ge=1, le=500, description="Nombre maximum de résultats"),
-    offset: int = Query(0, ge=0, description="Pagination offset")
+    cursor: Optional[str] = Query(None, description="Curseur de page (header X-Next-Cursor)"),
+    offset: int = Query(0, ge=0, deprecated=True, description="Pagination offset (remplacé par cursor)")
 ):
     """
     Récupérer l'historique des déclenchements d'alertes.
 
+    Pagination par curseur sur (triggered_at, id): le curseur de la page
+    suivante est renvoyé dans le header `X-Next-Cursor` (absent sur la
+    dernière page). Le paramètre `offset` reste accepté pour les anciens
+    clients mais son coût croît avec la profondeur de page.
+
     Args:
+        response: Réponse HTTP (pour le header X-Next-Cursor)
         tenant_id: UUID du tenant (extrait du JWT)
         db: Session database
         alert_id: Filtrer par alerte spécifique (optionnel)
         alert_type: Filtrer par type (optionnel)
         severity: Filtrer par sévérité (optionnel)
         limit: Nombre de résultats max
-        offset: Offset pour pagination
+        cursor: Curseur opaque de la page précédente (optionnel)
+        offset: Offset pour pagination (déprécié)
 
     Returns:
         Liste des déclenchements d'alertes
+
+    Raises:
+        HTTPException 400: Si le curseur est invalide
     """
     logger.info(f"Fetching alert history for tenant {tenant_id}")
 
@@ -346,10 +359,29 @@ async def get_alert_history(
     if severity:
         query = query.filter(AlertHistory.severity == severity)
 
-    # Tri par date décroissante et pagination
-    history = query.order_by(
-        AlertHistory.triggered_at.desc()
-    ).limit(limit).offset(offset).all()
+    if offset and not cursor:
+        # Ancien mode offset/limit (conservé pour compatibilité)
+        history = query.order_by(
+            AlertHistory.triggered_at.desc(),
+            AlertHistory.id.desc()
+        ).limit(limit).offset(offset).all()
+    else:
+        try:
+            history, next_cursor = paginate_keyset(
+                query,
+                AlertHistory.triggered_at,
+                AlertHistory.id,
+                limit=limit,
+                cursor=cursor
+            )
+        except InvalidCursorError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
+
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
     logger.info(f"Found {len(history)} history entries for tenant {tenant_id}")
     return history
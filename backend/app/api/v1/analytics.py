@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.api.deps import get_current_tenant_id
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.services.analytics_service import AnalyticsService
 from app.schemas.analytics import (
     ProductAnalysisResponse,
@@ -31,7 +31,7 @@ router = APIRouter()
 async def get_sales_evolution(
     days: int = Query(30, ge=1, le=365, description="Nombre de jours à analyser"),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer l'évolution quotidienne des ventes."""
     service = AnalyticsService(db)
@@ -65,7 +65,7 @@ async def get_top_products(
         description="Critère de tri"
     ),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer le top des produits."""
     service = AnalyticsService(db)
@@ -99,7 +99,7 @@ async def get_top_products(
 async def get_category_performance(
     days: int = Query(30, ge=1, le=365, description="Période d'analyse en jours"),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer la performance par catégorie."""
     service = AnalyticsService(db)
@@ -127,7 +127,7 @@ async def get_category_performance(
 async def get_abc_classification(
     days: int = Query(90, ge=30, le=365, description="Période d'analyse en jours"),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer la classification ABC des produits."""
     service = AnalyticsService(db)
@@ -163,7 +163,7 @@ async def get_abc_classification(
 async def get_product_analysis(
     product_id: UUID,
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer l'analyse détaillée d'un produit."""
     service = AnalyticsService(db)
@@ -2,17 +2,20 @@
 Router API pour l'authentification.
 Endpoints: login, refresh token, get current user.
 """
+from uuid import UUID
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
+from app.core.auth_cache import invalidate_user
 from app.core.security import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     create_temp_token,
     verify_token,
-    get_password_hash
+    get_password_hash_async
 )
 from app.models.user import User
 from app.schemas.auth import (
@@ -54,7 +57,7 @@ async def login(
     user = db.query(User).filter(User.email == login_data.email).first()
 
     # Verifier que l'utilisateur existe et que le mot de passe est correct
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user or not await verify_password_async(login_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -238,7 +241,7 @@ async def change_password_first_login(
         )
 
     # Récupérer l'utilisateur
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.query(User).filter(User.id == UUID(user_id)).first()
 
     if not user or not user.is_active:
         raise HTTPException(
@@ -254,7 +257,7 @@ async def change_password_first_login(
         )
 
     # Vérifier l'ancien mot de passe
-    if not verify_password(password_data.old_password, user.hashed_password):
+    if not await verify_password_async(password_data.old_password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect old password"
@@ -269,12 +272,15 @@ async def change_password_first_login(
         )
 
     # Mettre à jour le mot de passe
-    user.hashed_password = get_password_hash(password_data.new_password)
+    user.hashed_password = await get_password_hash_async(password_data.new_password)
     user.must_change_password = False
 
     db.commit()
     db.refresh(user)
 
+    # Les autres processus API ne doivent plus servir l'ancien utilisateur
+    invalidate_user(user.id)
+
     # Générer des tokens normaux
     access_token = create_access_token(
         subject=str(user.id),
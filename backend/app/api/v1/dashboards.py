@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_user
+from app.db.session import get_read_db
 from app.services.dashboard_service import DashboardService
 from app.schemas.dashboard import DashboardOverviewResponse
 from app.models.user import User
@@ -15,7 +16,7 @@ router = APIRouter(prefix="/dashboards", tags=["dashboards"])
 @router.get("/overview", response_model=DashboardOverviewResponse)
 async def get_dashboard_overview(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Dashboard Vue d'Ensemble.
@@ -41,13 +42,14 @@ async def refresh_dashboard_views(
     db: Session = Depends(get_db)
 ):
     """
-    Rafraichir les vues materialisees du dashboard.
+    Rafraichir les agregats du dashboard du tenant.
 
-    Utile apres avoir ajoute/modifie beaucoup de donnees.
+    Utile apres avoir ajoute/modifie beaucoup de donnees (sinon recalcules
+    par la tache periodique).
 
     **Requiert**: Token JWT valide
 
     **Returns**: Status du rafraichissement
     """
     service = DashboardService(db)
-    return service.refresh_views()
+    return service.refresh_views(current_user.tenant_id)
@@ -11,6 +11,7 @@ from uuid import UUID
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Request, status, UploadFile, File
 from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_active_admin, get_db
@@ -26,7 +27,6 @@ from app.schemas.onboarding import (
     ImportStatusResponse,
 )
 from app.services.onboarding_service import OnboardingService
-from app.services.template_service import TemplateService
 
 logger = logging.getLogger(__name__)
 
@@ -113,7 +113,9 @@ async def create_users(
         ip_address = request.client.host if request.client else None
         user_agent = request.headers.get("user-agent")
 
-        users = service.create_users(
+        # Hors event loop: hashing bcrypt + écritures SQL
+        users = await run_in_threadpool(
+            service.create_users,
             tenant_id=data.tenant_id,
             users_data=data.users,
             admin_user_id=current_admin.id,
@@ -168,6 +170,9 @@ async def generate_template(
     **Returns:**
     - Fichier Excel (.xlsx) en téléchargement
     """
+    # Import local: openpyxl n'est chargé qu'à la première génération
+    from app.services.template_service import TemplateService
+
     try:
         service = TemplateService(db)
 
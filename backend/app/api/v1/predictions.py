@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 from uuid import UUID
 
 from app.api.deps import get_current_tenant_id
-from app.db.session import get_db
+from app.db.session import get_read_db
 from app.services.prediction_service import PredictionService
 from app.schemas.prediction import (
     RupturesPrevuesResponse,
@@ -38,7 +38,7 @@ async def get_ruptures_prevues(
         description="Horizon de prédiction en jours"
     ),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer la liste des ruptures de stock prévues."""
     service = PredictionService(db)
@@ -76,7 +76,7 @@ async def get_recommandations_achat(
         description="Horizon de prédiction en jours"
     ),
     tenant_id: UUID = Depends(get_current_tenant_id),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Récupérer les recommandations d'achat groupées par fournisseur."""
     service = PredictionService(db)
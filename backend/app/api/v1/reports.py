@@ -1,22 +1,193 @@
 """
 Router API pour la génération de rapports.
+
+Les rapports sont générés par les workers de la queue `reports`
+(POST /reports/jobs puis polling). Les anciens endpoints GET restent
+synchrones pour les clients existants: sur un cache miss ils lancent le
+même job et attendent son résultat (REPORTS_SYNC_WAIT_SECONDS), sans
+générer le fichier dans le processus API.
 """
-from fastapi import APIRouter, Depends, Query
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
-from datetime import datetime, timedelta
+import logging
+from uuid import UUID, uuid4
 
-from app.api.deps import get_db, get_current_user
-from app.services.report_service import ReportService
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Optional
+
+from app.api.deps import get_current_user
+from app.config import settings
+from app.core.metrics import record_cache_access
+from app.db.session import get_read_db
+from app.services.report_artifact_service import ReportArtifactService, iter_report_file, month_bounds
+from app.schemas.report import ReportJobCreate, ReportJobResponse
 from app.models.user import User
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+# Tenant propriétaire de chaque job (Redis), gardé aussi longtemps que les résultats Celery
+REPORT_JOB_OWNER_TTL_SECONDS = 24 * 3600
+
+# Message renvoyé au client quand un job échoue (le détail reste dans les logs)
+REPORT_JOB_FAILED_MESSAGE = "La génération du rapport a échoué"
+
+
+async def _artifact_response(artifact: Dict[str, Any], filename: str) -> StreamingResponse:
+    """
+    Streamer un rapport depuis le cache d'artefacts.
+
+    Ouverture du fichier et lecture des blocs dans le pool de threads.
+
+    Args:
+        artifact: Métadonnées renvoyées par ReportArtifactService
+        filename: Nom de fichier proposé au client
+
+    Returns:
+        StreamingResponse du fichier
+    """
+    headers = {"Content-Disposition": f"attachment; filename={filename}"}
+    if "cache_hit" in artifact:
+        headers["X-Report-Cache"] = "HIT" if artifact["cache_hit"] else "MISS"
+
+    fileobj = await run_in_threadpool(open, artifact["path"], "rb")
+    return StreamingResponse(
+        iter_report_file(fileobj),
+        media_type=artifact["media_type"],
+        headers=headers
+    )
+
+
+def _download_url(artifact_key: str) -> str:
+    """URL de téléchargement d'un artefact."""
+    return f"{settings.API_V1_PREFIX}/reports/artifacts/{artifact_key}"
+
+
+def _job_owner_key(job_id: str) -> str:
+    return f"report_job:{job_id}:tenant"
+
+
+def _dispatch_report_job(
+    tenant_id: UUID,
+    report_type: str,
+    start_dt: Optional[datetime],
+    end_dt: Optional[datetime]
+) -> str:
+    """
+    Lancer la génération d'un rapport sur la queue `reports`.
+
+    Le tenant est enregistré sous l'ID du job avant l'envoi: seul ce
+    tenant peut ensuite en lire le statut. Appels Redis bloquants: à
+    appeler via run_in_threadpool depuis les handlers async.
+
+    Args:
+        tenant_id: UUID du tenant
+        report_type: Type de rapport
+        start_dt: Début de période (optionnel)
+        end_dt: Fin de période (optionnel)
+
+    Returns:
+        ID du job Celery
+    """
+    from app.core.redis_client import get_redis
+    from app.tasks.report_tasks import build_report_artifact
+
+    job_id = str(uuid4())
+    get_redis().set(_job_owner_key(job_id), str(tenant_id), ex=REPORT_JOB_OWNER_TTL_SECONDS)
+
+    build_report_artifact.apply_async(
+        args=(
+            str(tenant_id),
+            report_type,
+            start_dt.isoformat() if start_dt else None,
+            end_dt.isoformat() if end_dt else None
+        ),
+        task_id=job_id
+    )
+    return job_id
+
+
+def _job_belongs_to(job_id: str, tenant_id: UUID) -> bool:
+    """Indiquer si un job de rapport a été lancé par le tenant (lecture Redis bloquante)."""
+    from app.core.redis_client import get_redis
+
+    owner = get_redis().get(_job_owner_key(job_id))
+    return owner is not None and owner.decode() == str(tenant_id)
+
+
+async def _serve_report(
+    db: Session,
+    tenant_id: UUID,
+    report_type: str,
+    filename: str,
+    start_dt: Optional[datetime] = None,
+    end_dt: Optional[datetime] = None
+):
+    """
+    Servir un rapport pour les anciens endpoints GET.
+
+    Cache hit: fichier streamé directement. Cache miss: job lancé sur la
+    queue `reports` et attendu au plus REPORTS_SYNC_WAIT_SECONDS (thread
+    du pool, event loop libre); au-delà, réponse 202 avec le job_id à
+    interroger via GET /reports/jobs/{job_id}.
+
+    Args:
+        db: Session (lecture)
+        tenant_id: UUID du tenant
+        report_type: Type de rapport
+        filename: Nom de fichier proposé au client
+        start_dt: Début de période (optionnel)
+        end_dt: Fin de période (optionnel)
+
+    Returns:
+        StreamingResponse du fichier, ou JSONResponse 202 si le job n'a pas fini
+    """
+    from celery.exceptions import TimeoutError as CeleryTimeoutError
+    from celery.result import AsyncResult
+    from app.tasks.celery_app import celery_app
+
+    service = ReportArtifactService(db)
+    resolved = await run_in_threadpool(service.resolve, tenant_id, report_type, start_dt, end_dt)
+
+    cached = await run_in_threadpool(service.get_cached, tenant_id, resolved["key"])
+    record_cache_access("report_artifact", cached is not None)
+    if cached is not None:
+        return await _artifact_response({**cached, "cache_hit": True}, filename)
+
+    job_id = await run_in_threadpool(_dispatch_report_job, tenant_id, report_type, start_dt, end_dt)
+    result = AsyncResult(job_id, app=celery_app)
+
+    try:
+        await run_in_threadpool(result.get, timeout=settings.REPORTS_SYNC_WAIT_SECONDS, propagate=False)
+    except CeleryTimeoutError:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=ReportJobResponse(job_id=job_id, status="pending").model_dump()
+        )
+
+    artifact = None
+    if result.state == "SUCCESS":
+        artifact = await run_in_threadpool(
+            service.get_cached, tenant_id, (result.result or {}).get("artifact_key", "")
+        )
+
+    if artifact is None:
+        logger.error(f"Report job {job_id} ({report_type}) failed for tenant {tenant_id}: {result.info!r}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=REPORT_JOB_FAILED_MESSAGE
+        )
+
+    return await _artifact_response({**artifact, "cache_hit": False}, filename)
+
 
 @router.get("/inventory/excel")
 async def generate_inventory_report_excel(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Générer rapport Inventaire Stock (Excel).
@@ -27,23 +198,21 @@ async def generate_inventory_report_excel(
     - Valorisation par produit
     - Total valorisation
 
+    Servi depuis le cache tant que le catalogue n'a pas changé; sinon
+    généré par un worker `reports` (202 + job_id si trop long).
+
+    Le fichier est envoyé par blocs une fois complet: un .xlsx est une
+    archive zip, qui ne peut pas être émise ligne par ligne. La génération
+    streamée borne la mémoire, pas le délai avant le premier octet.
+
     **Requiert**: Token JWT valide
 
     **Returns**: Fichier Excel téléchargeable
     """
-    service = ReportService(db)
-    excel_file = service.generate_inventory_report(current_user.tenant_id)
-
     # Nom de fichier avec date
     filename = f"inventaire_stock_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
 
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
-    )
+    return await _serve_report(db, current_user.tenant_id, "inventory_excel", filename)
 
 
 @router.get("/sales-analysis/excel")
@@ -51,7 +220,7 @@ async def generate_sales_analysis_report_excel(
     start_date: str = Query(..., description="Date de début (YYYY-MM-DD)"),
     end_date: str = Query(..., description="Date de fin (YYYY-MM-DD)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Générer rapport Analyse Ventes (Excel multi-onglets).
@@ -74,22 +243,11 @@ async def generate_sales_analysis_report_excel(
     start_dt = datetime.strptime(start_date, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date, "%Y-%m-%d")
 
-    service = ReportService(db)
-    excel_file = service.generate_sales_analysis_report(
-        current_user.tenant_id,
-        start_dt,
-        end_dt
-    )
-
     # Nom de fichier avec période
     filename = f"analyse_ventes_{start_date}_au_{end_date}.xlsx"
 
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+    return await _serve_report(
+        db, current_user.tenant_id, "sales_analysis_excel", filename, start_dt, end_dt
     )
 
 
@@ -98,7 +256,7 @@ async def generate_monthly_sales_report(
     year: int = Query(..., description="Année"),
     month: int = Query(..., ge=1, le=12, description="Mois (1-12)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Générer rapport Analyse Ventes Mensuel (Excel).
@@ -120,13 +278,6 @@ async def generate_monthly_sales_report(
     else:
         end_dt = datetime(year, month + 1, 1) - timedelta(days=1)
 
-    service = ReportService(db)
-    excel_file = service.generate_sales_analysis_report(
-        current_user.tenant_id,
-        start_dt,
-        end_dt
-    )
-
     # Nom de fichier
     month_names = [
         "janvier", "fevrier", "mars", "avril", "mai", "juin",
@@ -134,12 +285,8 @@ async def generate_monthly_sales_report(
     ]
     filename = f"analyse_ventes_{month_names[month-1]}_{year}.xlsx"
 
-    return StreamingResponse(
-        excel_file,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+    return await _serve_report(
+        db, current_user.tenant_id, "sales_analysis_excel", filename, start_dt, end_dt
     )
 
 
@@ -148,7 +295,7 @@ async def generate_monthly_summary_pdf(
     year: int = Query(..., description="Année"),
     month: int = Query(..., ge=1, le=12, description="Mois (1-12)"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Générer Synthèse Mensuelle (PDF).
@@ -160,6 +307,8 @@ async def generate_monthly_summary_pdf(
     - Alertes stock (ruptures et stock faible)
     - Footer avec pagination
 
+    Un mois clôturé n'est généré qu'une fois puis servi depuis le cache.
+
     **Requiert**: Token JWT valide
 
     **Paramètres**:
@@ -168,12 +317,7 @@ async def generate_monthly_summary_pdf(
 
     **Returns**: Fichier PDF téléchargeable
     """
-    service = ReportService(db)
-    pdf_file = service.generate_monthly_summary_pdf(
-        current_user.tenant_id,
-        month,
-        year
-    )
+    start_dt, end_dt = month_bounds(year, month)
 
     # Nom de fichier
     month_names = [
@@ -182,10 +326,127 @@ async def generate_monthly_summary_pdf(
     ]
     filename = f"synthese_mensuelle_{month_names[month-1]}_{year}.pdf"
 
-    return StreamingResponse(
-        pdf_file,
-        media_type="application/pdf",
-        headers={
-            "Content-Disposition": f"attachment; filename={filename}"
-        }
+    return await _serve_report(
+        db, current_user.tenant_id, "monthly_summary_pdf", filename, start_dt, end_dt
     )
+
+
+@router.post("/jobs", response_model=ReportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_report_job(
+    data: ReportJobCreate,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Demander la génération d'un rapport en arrière-plan.
+
+    Si le rapport existe déjà dans le cache (mêmes données, même période),
+    il est immédiatement disponible (`status=ready`, sans job). Sinon une
+    tâche Celery est lancée sur la queue `reports` et son ID est renvoyé.
+
+    **Requiert**: Token JWT valide
+
+    **Returns**: job_id à interroger via GET /reports/jobs/{job_id}
+    """
+    start_dt: Optional[datetime] = None
+    end_dt: Optional[datetime] = None
+    if data.report_type == "sales_analysis_excel":
+        start_dt = datetime.combine(data.start_date, time.min)
+        end_dt = datetime.combine(data.end_date, time.min)
+    elif data.report_type == "monthly_summary_pdf":
+        start_dt, end_dt = month_bounds(data.year, data.month)
+
+    service = ReportArtifactService(db)
+    resolved = await run_in_threadpool(
+        service.resolve,
+        current_user.tenant_id,
+        data.report_type,
+        start_dt,
+        end_dt
+    )
+
+    if await run_in_threadpool(service.get_cached, current_user.tenant_id, resolved["key"]):
+        return ReportJobResponse(
+            status="ready",
+            artifact_key=resolved["key"],
+            download_url=_download_url(resolved["key"])
+        )
+
+    job_id = await run_in_threadpool(
+        _dispatch_report_job, current_user.tenant_id, data.report_type, start_dt, end_dt
+    )
+
+    return ReportJobResponse(job_id=job_id, status="pending")
+
+
+@router.get("/jobs/{job_id}", response_model=ReportJobResponse)
+async def get_report_job(
+    job_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Récupérer le statut d'un job de rapport.
+
+    Utilisé pour polling frontend. Quand le statut est `ready`,
+    `download_url` pointe vers le fichier généré.
+
+    **Requiert**: Token JWT valide (le job doit avoir été lancé par le tenant)
+
+    **Returns**: Statut du job (pending, running, ready, failed)
+    """
+    from celery.result import AsyncResult
+    from app.tasks.celery_app import celery_app
+
+    if not await run_in_threadpool(_job_belongs_to, job_id, current_user.tenant_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report job {job_id} not found"
+        )
+
+    result = AsyncResult(job_id, app=celery_app)
+    # Lecture Redis du backend Celery; le résultat d'un job terminé reste en cache
+    state = await run_in_threadpool(getattr, result, "state")
+
+    if state == "SUCCESS":
+        payload = result.result or {}
+        return ReportJobResponse(
+            job_id=job_id,
+            status="ready",
+            artifact_key=payload["artifact_key"],
+            download_url=_download_url(payload["artifact_key"])
+        )
+
+    if state == "FAILURE":
+        logger.error(f"Report job {job_id} failed for tenant {current_user.tenant_id}: {result.info!r}")
+        return ReportJobResponse(job_id=job_id, status="failed", error=REPORT_JOB_FAILED_MESSAGE)
+
+    if state == "STARTED":
+        return ReportJobResponse(job_id=job_id, status="running")
+
+    return ReportJobResponse(job_id=job_id, status="pending")
+
+
+@router.get("/artifacts/{artifact_key}")
+async def download_report_artifact(
+    artifact_key: str,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Télécharger un rapport généré en arrière-plan.
+
+    **Requiert**: Token JWT valide (le rapport doit appartenir au tenant)
+
+    **Returns**: Fichier Excel ou PDF
+    """
+    service = ReportArtifactService(db)
+    artifact = await run_in_threadpool(service.get_cached, current_user.tenant_id, artifact_key)
+
+    if artifact is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Report {artifact_key} not found"
+        )
+
+    filename = f"{artifact['report_type']}_{artifact['period']}.{artifact['extension']}"
+    return await _artifact_response(artifact, filename)
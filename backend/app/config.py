@@ -22,12 +22,48 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_TOKEN_CACHE_SIZE: int = 10000  # Jetons vérifiés gardés en mémoire par processus (0 = désactivé)
+    AUTH_USER_CACHE_SIZE: int = 10000  # Utilisateurs gardés en mémoire par processus (0 = désactivé)
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30  # Durée max d'un utilisateur en cache sans invalidation
+    PASSWORD_HASH_WORKERS: int = 0  # Threads bcrypt par processus (0 = min(4, nb CPU))
 
     # Database
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10  # Connexions gardées par processus et par base (le worker io fixe la sienne)
+    DB_MAX_OVERFLOW: int = 20  # Connexions supplémentaires temporaires par processus et par base
+    DATABASE_REPLICA_URLS: str = ""  # Réplicas en lecture, séparées par des virgules (vide = primaire seule)
+    REPLICA_MAX_LAG_SECONDS: int = 30  # Réplica écartée au-delà de ce retard de rejeu
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: int = 5  # Retard mesuré au plus une fois par intervalle et processus
+    PREPARED_STATEMENTS_ENABLED: bool = True  # PREPARE des requêtes fréquentes (False derrière PgBouncer en mode transaction)
+    PARTITION_MONTHS_AHEAD: int = 3  # Partitions mensuelles (sales, stock_movements) créées d'avance
+    SALES_ARCHIVE_ENABLED: bool = False  # Archiver les ventes anciennes en Parquet (tâche mensuelle)
+    SALES_ARCHIVE_AFTER_MONTHS: int = 24  # Mois de ventes conservés en base
+    SALES_ARCHIVE_URI: str = "archives/sales"  # Dossier local ou s3://bucket/prefix des fichiers Parquet
+
+    # Dashboards
+    DASHBOARD_OVERVIEW_SINGLE_QUERY: bool = True  # Vue d'ensemble en une requête (un aller-retour)
+
+    # Analytics (instantané en colonnes des gros tenants)
+    ANALYTICS_STORE_ENABLED: bool = False  # Servir les analyses depuis l'instantané Parquet/DuckDB
+    ANALYTICS_STORE_DIR: str = "analytics_store"  # Dossier local partagé API/workers
+    ANALYTICS_STORE_MIN_PRODUCTS: int = 5000  # Tenants dotés d'un instantané (nombre de produits)
+    ANALYTICS_STORE_MONTHS: int = 13  # Mois de ventes couverts (mois courant inclus)
+    ANALYTICS_STORE_MAX_STALENESS_SECONDS: int = 1800  # Au-delà, retour à PostgreSQL
+    ANALYTICS_STORE_FULL_REFRESH_HOURS: int = 24  # Reconstruction complète (suppressions, fenêtre)
+    ANALYTICS_STORE_THREADS: int = 2  # Threads DuckDB par requête analytique
 
     # Redis
     REDIS_URL: str
+    PERIODIC_TASK_LOCKS_ENABLED: bool = True  # Une seule exécution à la fois par tâche périodique
+    PERIODIC_TASK_LOCK_TTL_SECONDS: int = 60  # Bail du verrou, renouvelé tous les tiers (heartbeat)
+
+    # Celery workers (profils par queue, voir app/tasks/worker_profiles.py)
+    CELERY_IO_CONCURRENCY: int = 200  # Greenlets du worker alertes / notifications (pool gevent)
+    CELERY_IO_PREFETCH_MULTIPLIER: int = 4  # Messages réservés par greenlet
+    CELERY_IO_DB_POOL_SIZE: int = 50  # Connexions PostgreSQL du worker io (plafonnées à CELERY_IO_CONCURRENCY)
+    CELERY_CPU_CONCURRENCY: int = 0  # Processus du worker rapports / imports (0 = nombre de cœurs)
+    CELERY_CPU_MAX_MEMORY_PER_CHILD_MB: int = 512  # Processus recyclé après sa tâche au-delà de ce RSS
+    CELERY_MAINTENANCE_CONCURRENCY: int = 2  # Processus du worker maintenance (SQL lourd)
 
     # CORS
     CORS_ORIGINS: str = "http://localhost:5173,http://localhost:3000"
@@ -37,20 +73,45 @@ class Settings(BaseSettings):
     SMTP_PORT: int = 587
     SMTP_USER: str = ""
     SMTP_PASSWORD: str = ""
+    SMTP_USE_TLS: bool = True  # STARTTLS (désactivé pour le faux SMTP des tests de charge)
     FROM_EMAIL: str = "noreply@digiboost.sn"
 
     # WhatsApp (Twilio)
     TWILIO_ACCOUNT_SID: str = ""
     TWILIO_AUTH_TOKEN: str = ""
     TWILIO_WHATSAPP_FROM: str = "whatsapp:+14155238886"  # Twilio sandbox par défaut
+    TWILIO_API_BASE_URL: str = ""  # Surcharge de https://api.twilio.com (faux Twilio local)
     WHATSAPP_ENABLED: bool = True
 
     # Monitoring
     SENTRY_DSN: str = ""
+    QUERY_STATS_ENABLED: bool = True  # Compter les requêtes SQL par requête HTTP / tâche Celery
+    N_PLUS_ONE_THRESHOLD: int = 10  # Même requête répétée N fois dans une unité = N+1 signalé
+    SLOW_QUERY_THRESHOLD_MS: int = 500  # Requêtes SQL plus lentes capturées (0 = désactivé)
+    SLOW_QUERY_LOG_DIR: str = "logs/slow_queries"  # Fichiers JSON Lines (un par processus)
+    SLOW_QUERY_LOG_MAX_BYTES: int = 10 * 1024 * 1024  # Rotation au-delà de cette taille
+    SLOW_QUERY_LOG_BACKUPS: int = 5  # Fichiers rotatifs conservés par processus
+    SLOW_QUERY_EXPLAIN: bool = False  # Rejouer les SELECT lents sous EXPLAIN (ANALYZE, BUFFERS)
+    SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: int = 600  # Un EXPLAIN max par empreinte et intervalle
+    METRICS_ENABLED: bool = True  # Exposer GET /metrics (format Prometheus)
+    METRICS_TOKEN: str = ""  # Jeton Bearer du scraper Prometheus (vide = réseaux internes uniquement)
+    METRICS_ALLOWED_NETWORKS: str = "127.0.0.0/8,::1/128,10.0.0.0/8,172.16.0.0/12,192.168.0.0/16"  # Clients admis sans jeton
+    CELERY_METRICS_PORT: int = 0  # Port HTTP des métriques des workers Celery (0 = désactivé)
+    TENANT_SIZE_MEDIUM_PRODUCTS: int = 500  # Seuil produits classe "medium" (métriques)
+    TENANT_SIZE_LARGE_PRODUCTS: int = 5000  # Seuil produits classe "large" (métriques)
 
     # Reports
     REPORTS_DIR: str = "reports"  # Dossier stockage rapports
     REPORTS_RETENTION_DAYS: int = 90  # Durée conservation (jours)
+    REPORTS_ARTIFACTS_DIR: str = "reports/artifacts"  # Cache des rapports générés (partagé API/workers)
+    REPORTS_CLOSED_ARTIFACTS_RETENTION_DAYS: int = 365  # Rapports de mois clôturés supprimés après ce délai sans accès
+    REPORTS_SYNC_WAIT_SECONDS: int = 120  # Attente max des anciens endpoints GET avant de renvoyer le job (202)
+    CHART_CACHE_SIZE: int = 256  # Graphiques PNG gardés en mémoire par processus (0 = désactivé)
+    MONTHLY_REPORTS_MAX_CONCURRENCY: int = 8  # Rapports mensuels générés en parallèle (tous workers)
+    MONTHLY_REPORTS_SLOT_TIMEOUT: int = 300  # Créneau libéré d'office après (secondes)
+    MONTHLY_REPORTS_SLOT_WAIT_SECONDS: int = 15  # Délai avant nouvelle tentative si aucun créneau
+    MONTHLY_REPORTS_MAX_RETRIES: int = 3  # Nouvelles tentatives par tenant en cas d'erreur
+    MONTHLY_REPORTS_RETRY_BACKOFF: int = 60  # Backoff initial (secondes), doublé à chaque échec
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -63,6 +124,16 @@ class Settings(BaseSettings):
         """Retourne la liste des origines CORS autorisées."""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
 
+    @property
+    def metrics_allowed_networks_list(self) -> List[str]:
+        """Retourne les réseaux autorisés à lire /metrics sans jeton."""
+        return [net.strip() for net in self.METRICS_ALLOWED_NETWORKS.split(",") if net.strip()]
+
+    @property
+    def database_replica_urls_list(self) -> List[str]:
+        """Retourne les URLs des réplicas en lecture."""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
 
 # Instance globale des settings
 settings = Settings()
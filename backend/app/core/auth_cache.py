@@ -0,0 +1,172 @@
+"""
+Caches d'authentification en mémoire (par processus).
+
+- Jetons vérifiés: un JWT déjà décodé n'est plus re-vérifié jusqu'à son `exp`.
+- Utilisateurs: instantané des colonnes de User gardé quelques secondes,
+  ce qui évite la requête `SELECT ... FROM users` à chaque appel API.
+  Le hash du mot de passe n'est jamais mis en cache (chargé à la demande).
+
+Quand un utilisateur est désactivé, change de rôle ou de mot de passe,
+`invalidate_user` publie son ID sur un canal Redis: chaque processus API
+abonné retire l'entrée de son cache local. Si Redis est indisponible,
+le TTL court du cache utilisateur borne la durée de l'incohérence.
+"""
+import hashlib
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.config import settings
+from app.core import security
+from app.models.user import User
+from app.utils.cache import ExpiringLRUCache
+
+logger = logging.getLogger(__name__)
+
+# Canal Redis des invalidations (IDs utilisateur)
+INVALIDATION_CHANNEL = "auth:user-invalidated"
+
+token_cache: ExpiringLRUCache[Dict[str, Any]] = ExpiringLRUCache(settings.AUTH_TOKEN_CACHE_SIZE, name="auth_token")
+user_cache: ExpiringLRUCache[Dict[str, Any]] = ExpiringLRUCache(settings.AUTH_USER_CACHE_SIZE, name="auth_user")
+
+# Colonnes exclues de l'instantané (rechargées depuis la base si lues)
+USER_SNAPSHOT_EXCLUDED = frozenset({"hashed_password"})
+
+_subscriber_lock = threading.Lock()
+_subscriber_started = False
+
+
+def verify_access_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Vérifier un token d'accès, avec cache jusqu'à son expiration.
+
+    Args:
+        token: JWT reçu dans l'en-tête Authorization
+
+    Returns:
+        Payload du token si valide, None sinon
+    """
+    # Empreinte plutôt que le jeton lui-même comme clé
+    key = hashlib.sha256(token.encode()).hexdigest()
+
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = security.verify_token(token, "access")
+    if payload and isinstance(payload.get("exp"), (int, float)):
+        token_cache.set(key, payload, float(payload["exp"]))
+
+    return payload
+
+
+def get_user(db: Session, user_id: UUID) -> Optional[User]:
+    """
+    Récupérer un utilisateur, depuis le cache si possible.
+
+    Sur un hit, l'instantané est rattaché à la session via
+    `merge(load=False)`: l'objet se comporte comme un User chargé
+    (relations et colonnes exclues chargées à la demande) sans requête SQL.
+
+    Args:
+        db: Session de base de donnees
+        user_id: ID de l'utilisateur
+
+    Returns:
+        User ou None s'il n'existe pas
+    """
+    _ensure_subscriber()
+
+    snapshot = user_cache.get(user_id)
+    if snapshot is not None:
+        cached = User(**snapshot)
+        make_transient_to_detached(cached)
+        return db.merge(cached, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None:
+        user_cache.set(
+            user_id,
+            {
+                attr.key: getattr(user, attr.key)
+                for attr in User.__mapper__.column_attrs
+                if attr.key not in USER_SNAPSHOT_EXCLUDED
+            },
+            time.time() + settings.AUTH_USER_CACHE_TTL_SECONDS,
+        )
+
+    return user
+
+
+def evict_user(user_id: UUID) -> None:
+    """Retirer un utilisateur du cache local de ce processus."""
+    user_cache.pop(user_id)
+
+
+def invalidate_user(user_id: UUID) -> None:
+    """
+    Invalider un utilisateur dans tous les processus API.
+
+    À appeler après commit quand un utilisateur est désactivé, supprimé,
+    change de rôle ou de mot de passe.
+
+    Args:
+        user_id: ID de l'utilisateur modifié
+    """
+    from app.core.redis_client import get_redis
+
+    evict_user(user_id)
+    try:
+        get_redis().publish(INVALIDATION_CHANNEL, str(user_id))
+    except Exception as e:
+        logger.warning(f"Invalidation Redis impossible pour user {user_id}: {e}")
+
+
+def _handle_invalidation(message: Dict[str, Any]) -> None:
+    """Traiter un message d'invalidation reçu du canal Redis."""
+    try:
+        evict_user(UUID(message["data"].decode()))
+    except (ValueError, AttributeError, KeyError):
+        logger.warning(f"Message d'invalidation ignoré: {message!r}")
+
+
+def _handle_subscriber_error(error: Exception, pubsub, thread) -> None:
+    """Journaliser une erreur du thread d'écoute sans l'arrêter (reconnexion au tour suivant)."""
+    logger.warning(f"Ecoute des invalidations auth interrompue: {error}")
+    time.sleep(1.0)
+
+
+def _ensure_subscriber() -> None:
+    """
+    Démarrer (une fois par processus) l'écoute des invalidations.
+
+    Lancé au premier usage du cache pour ne pas ouvrir de connexion
+    pub/sub dans les workers et scripts qui n'authentifient personne.
+    """
+    global _subscriber_started
+
+    if _subscriber_started or settings.AUTH_USER_CACHE_TTL_SECONDS <= 0:
+        return
+
+    with _subscriber_lock:
+        if _subscriber_started:
+            return
+        _subscriber_started = True
+
+        from app.core.redis_client import get_redis
+
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{INVALIDATION_CHANNEL: _handle_invalidation})
+            pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=_handle_subscriber_error
+            )
+        except Exception as e:
+            # Sans abonnement, les entrées expirent quand même après le TTL
+            logger.warning(f"Abonnement aux invalidations auth impossible: {e}")
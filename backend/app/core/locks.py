@@ -0,0 +1,323 @@
+"""
+Primitives de coordination distribuées basées sur Redis.
+
+Utilisées par les tâches Celery qui s'exécutent sur plusieurs workers
+et doivent partager une limite globale, ou ne pas se chevaucher.
+"""
+import functools
+import logging
+import threading
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from app.config import settings
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+
+class RedisSemaphore:
+    """
+    Sémaphore à compteur partagé entre workers.
+
+    Chaque détenteur est une entrée d'un sorted set (score = date
+    d'acquisition). Les entrées plus anciennes que `timeout` sont
+    considérées comme abandonnées (worker tué) et purgées à chaque
+    acquisition: un crash ne bloque donc pas un créneau indéfiniment.
+    """
+
+    def __init__(self, name: str, limit: int, timeout: int):
+        """
+        Initialiser le sémaphore.
+
+        Args:
+            name: Nom logique (préfixé par "semaphore:")
+            limit: Nombre maximum de détenteurs simultanés
+            timeout: Durée (secondes) après laquelle un créneau est libéré d'office
+        """
+        self.key = f"semaphore:{name}"
+        self.limit = limit
+        self.timeout = timeout
+
+    def acquire(self) -> Optional[str]:
+        """
+        Tenter de prendre un créneau sans attendre.
+
+        Returns:
+            Jeton à rendre via release(), ou None si la limite est atteinte
+        """
+        client = get_redis()
+        token = uuid.uuid4().hex
+        now = time.time()
+
+        pipe = client.pipeline()
+        pipe.zremrangebyscore(self.key, 0, now - self.timeout)
+        pipe.zadd(self.key, {token: now})
+        pipe.zrank(self.key, token)
+        pipe.expire(self.key, self.timeout)
+        _, _, rank, _ = pipe.execute()
+
+        if rank is not None and rank < self.limit:
+            return token
+
+        client.zrem(self.key, token)
+        return None
+
+    def release(self, token: Optional[str]) -> None:
+        """
+        Rendre un créneau.
+
+        Args:
+            token: Jeton renvoyé par acquire() (None ignoré)
+        """
+        if token is None:
+            return
+        try:
+            get_redis().zrem(self.key, token)
+        except Exception as e:
+            # Le créneau expirera de lui-même après `timeout`
+            logger.warning(f"Failed to release semaphore {self.key}: {str(e)}")
+
+
+# Prolonger le bail seulement s'il appartient encore au détenteur
+_RENEW_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Supprimer le bail seulement s'il appartient encore au détenteur
+_RELEASE_LEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+# Intervalle entre deux tentatives quand on accepte d'attendre le verrou
+LEASE_POLL_INTERVAL = 0.1
+
+# Bail de la tâche single_instance en cours d'exécution
+_current_lease: ContextVar[Optional["RedisLease"]] = ContextVar("current_lease", default=None)
+
+
+class LeaseLost(Exception):
+    """Le bail a expiré (ou a été repris) pendant le travail de son détenteur"""
+
+
+class RedisLease:
+    """
+    Verrou exclusif à bail (lease), renouvelé par heartbeat.
+
+    Le bail est court (`ttl`) et prolongé en tâche de fond tous les
+    `heartbeat_interval` tant que le détenteur travaille: un worker tué
+    libère le verrou au bout de `ttl`, sans borner la durée du travail.
+    Si un renouvellement constate que le bail a été perdu (expiré puis
+    repris par un autre), `lost` passe à True.
+
+    Sous un worker gevent, le thread de heartbeat devient un greenlet:
+    un long passage CPU ou non coopératif l'affame et le bail peut
+    expirer. Le détenteur appelle donc `check()` entre deux unités de
+    travail (un tenant): renouvellement en retard fait sur place, arrêt
+    (LeaseLost) si le bail est perdu.
+    """
+
+    def __init__(self, name: str, ttl: float, heartbeat_interval: Optional[float] = None):
+        """
+        Initialiser le verrou.
+
+        Args:
+            name: Nom logique (préfixé par "lease:")
+            ttl: Durée du bail (secondes)
+            heartbeat_interval: Période de renouvellement (défaut: ttl / 3)
+        """
+        self.key = f"lease:{name}"
+        self.ttl = ttl
+        self.heartbeat_interval = heartbeat_interval or ttl / 3
+        self.token: Optional[str] = None
+        self.lost = False
+        self._renewed_at = 0.0
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    def acquire(self, blocking_timeout: float = 0) -> bool:
+        """
+        Prendre le verrou.
+
+        Args:
+            blocking_timeout: Attente maximale (secondes) si le verrou est pris (0 = aucune)
+
+        Returns:
+            True si le verrou est obtenu (heartbeat démarré)
+        """
+        client = get_redis()
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + blocking_timeout
+
+        while not client.set(self.key, token, nx=True, px=int(self.ttl * 1000)):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(LEASE_POLL_INTERVAL, remaining))
+
+        self.token = token
+        self.lost = False
+        self._renewed_at = time.monotonic()
+        self._stop.clear()
+        self._heartbeat = threading.Thread(
+            target=self._renew_loop,
+            name=f"heartbeat-{self.key}",
+            daemon=True
+        )
+        self._heartbeat.start()
+        return True
+
+    def _renew(self) -> bool:
+        """
+        Prolonger le bail (compare-and-set sur le jeton).
+
+        Returns:
+            False si le bail est perdu
+        """
+        renewed_at = time.monotonic()
+        try:
+            renewed = get_redis().eval(
+                _RENEW_LEASE_SCRIPT, 1, self.key, self.token, int(self.ttl * 1000)
+            )
+        except Exception as e:
+            # Erreur passagère: le bail reste valable jusqu'à son expiration
+            logger.warning(f"Failed to renew lease {self.key}: {str(e)}")
+            if time.monotonic() - self._renewed_at >= self.ttl:
+                self.lost = True
+                logger.error(f"Lease {self.key} lost: not renewed within {self.ttl}s")
+            return not self.lost
+
+        if not renewed:
+            self.lost = True
+            logger.error(f"Lease {self.key} lost: expired before renewal")
+            return False
+
+        self._renewed_at = renewed_at
+        return True
+
+    def _renew_loop(self) -> None:
+        while not self._stop.wait(self.heartbeat_interval):
+            if not self._renew():
+                return
+
+    def check(self) -> None:
+        """
+        Vérifier que le bail est toujours détenu, le renouveler s'il est en retard.
+
+        Raises:
+            LeaseLost: Si le bail est perdu
+        """
+        if not self.lost and time.monotonic() - self._renewed_at >= self.heartbeat_interval:
+            self._renew()
+        if self.lost:
+            raise LeaseLost(f"Lease {self.key} lost")
+
+    def release(self) -> None:
+        """Arrêter le heartbeat et rendre le verrou s'il est encore détenu."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+
+        token, self.token = self.token, None
+        if token is None:
+            return
+        try:
+            get_redis().eval(_RELEASE_LEASE_SCRIPT, 1, self.key, token)
+        except Exception as e:
+            # Le bail expirera de lui-même après `ttl`
+            logger.warning(f"Failed to release lease {self.key}: {str(e)}")
+
+
+def current_lease() -> Optional[RedisLease]:
+    """Bail de la tâche single_instance en cours (None hors tâche ou sans verrou)."""
+    return _current_lease.get()
+
+
+def check_lease() -> None:
+    """
+    Point d'arrêt d'une tâche single_instance, entre deux unités de travail.
+
+    Sans effet hors d'une tâche verrouillée.
+
+    Raises:
+        LeaseLost: Si le bail de la tâche est perdu
+    """
+    lease = _current_lease.get()
+    if lease is not None:
+        lease.check()
+
+
+def single_instance(name: str, blocking_timeout: float = 0) -> Callable:
+    """
+    Décorateur de tâche périodique: une seule exécution à la fois.
+
+    Si une exécution précédente tient encore le verrou (durée supérieure
+    à l'intervalle Beat), la nouvelle est abandonnée sans rien faire.
+    Redis injoignable: la tâche s'exécute sans verrou (le broker étant
+    le même Redis, ce cas reste transitoire).
+
+    La tâche appelle check_lease() entre deux tenants: si le bail est
+    perdu, une autre exécution a pu démarrer et celle-ci s'arrête là
+    (LeaseLost, résultat {"aborted": True}).
+
+    À placer sous @shared_task:
+
+        @shared_task(name='app.tasks.dashboard_tasks.refresh_dashboard_views')
+        @single_instance('refresh_dashboard_views')
+        def refresh_dashboard_views(): ...
+
+    Args:
+        name: Nom du verrou (et label des métriques)
+        blocking_timeout: Attente maximale du verrou avant abandon (secondes)
+
+    Returns:
+        Décorateur
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not settings.PERIODIC_TASK_LOCKS_ENABLED:
+                return func(*args, **kwargs)
+
+            from app.core.metrics import PERIODIC_TASK_LOCK, PERIODIC_TASK_LOCK_WAIT
+
+            lease = RedisLease(f"task:{name}", ttl=settings.PERIODIC_TASK_LOCK_TTL_SECONDS)
+            start = time.perf_counter()
+            try:
+                acquired = lease.acquire(blocking_timeout)
+            except Exception as e:
+                logger.warning(f"Lock for {name} unavailable, running unlocked: {str(e)}")
+                PERIODIC_TASK_LOCK.labels(name, "error").inc()
+                return func(*args, **kwargs)
+            finally:
+                PERIODIC_TASK_LOCK_WAIT.labels(name).observe(time.perf_counter() - start)
+
+            if not acquired:
+                logger.info(f"⏭️ {name} already running elsewhere, skipping")
+                PERIODIC_TASK_LOCK.labels(name, "skipped").inc()
+                return {"skipped": True, "reason": "already_running"}
+
+            PERIODIC_TASK_LOCK.labels(name, "acquired").inc()
+            context = _current_lease.set(lease)
+            try:
+                return func(*args, **kwargs)
+            except LeaseLost:
+                logger.error(f"🛑 {name} stopped: lock lost, another run may have started")
+                return {"aborted": True, "reason": "lease_lost"}
+            finally:
+                _current_lease.reset(context)
+                lease.release()
+                if lease.lost:
+                    PERIODIC_TASK_LOCK.labels(name, "lost").inc()
+
+        return wrapper
+    return decorator
@@ -0,0 +1,159 @@
+"""
+Métriques Prometheus de l'application.
+
+Toutes les métriques sont déclarées ici pour éviter les doublons
+d'enregistrement dans le registre global de prometheus_client.
+Elles sont exposées par GET /metrics (API) et par le serveur HTTP
+des workers Celery (CELERY_METRICS_PORT).
+"""
+import os
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+# Nombre de requêtes SQL par requête HTTP / tâche Celery
+DB_QUERIES_PER_UNIT = Histogram(
+    "digiboost_db_queries_per_unit",
+    "Requêtes SQL exécutées par requête HTTP ou tâche Celery",
+    ["kind", "name"],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+
+# Temps cumulé passé en base par requête HTTP / tâche Celery
+DB_TIME_PER_UNIT = Histogram(
+    "digiboost_db_time_seconds_per_unit",
+    "Temps SQL cumulé (secondes) par requête HTTP ou tâche Celery",
+    ["kind", "name"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Requêtes répétées au-delà du seuil N+1
+DB_REPEATED_STATEMENTS = Counter(
+    "digiboost_db_repeated_statements_total",
+    "Requêtes SQL répétées au-delà de N_PLUS_ONE_THRESHOLD dans une même unité",
+    ["kind", "name"],
+)
+
+# Lectures routées vers une réplica ou, à défaut, la primaire
+DB_READ_ROUTING = Counter(
+    "digiboost_db_read_routing_total",
+    "Sessions de lecture ouvertes, par cible (replica / primary)",
+    ["target"],
+)
+
+# Verrous des tâches périodiques: acquired, skipped (déjà en cours), lost, error
+PERIODIC_TASK_LOCK = Counter(
+    "digiboost_periodic_task_lock_total",
+    "Tentatives de prise du verrou des tâches périodiques, par résultat",
+    ["task", "result"],
+)
+
+# Attente avant obtention (ou abandon) du verrou d'une tâche périodique
+PERIODIC_TASK_LOCK_WAIT = Histogram(
+    "digiboost_periodic_task_lock_wait_seconds",
+    "Attente du verrou d'une tâche périodique (secondes)",
+    ["task"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30),
+)
+
+# Latence des requêtes HTTP par route et classe de taille du tenant
+HTTP_REQUEST_DURATION = Histogram(
+    "digiboost_http_request_duration_seconds",
+    "Durée des requêtes HTTP (secondes)",
+    ["method", "route", "status", "tenant_size"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+# Durée des tâches Celery par queue
+CELERY_TASK_DURATION = Histogram(
+    "digiboost_celery_task_duration_seconds",
+    "Durée d'exécution des tâches Celery (secondes)",
+    ["queue", "task", "state"],
+    buckets=(0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 120, 300),
+)
+
+# Accès aux caches applicatifs (ratio de hit = hit / (hit + miss))
+CACHE_REQUESTS = Counter(
+    "digiboost_cache_requests_total",
+    "Lectures des caches applicatifs",
+    ["cache", "result"],
+)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """
+    Compter une lecture de cache.
+
+    Args:
+        cache: Nom du cache (auth_token, auth_user, chart, report_artifact, ...)
+        hit: True si la valeur était en cache
+    """
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+_pool_collector_registered = False
+
+
+class DatabasePoolCollector:
+    """
+    Jauges du pool de connexions SQLAlchemy, lues à chaque scrape.
+
+    Permet de voir l'épuisement du pool (checked_out proche de
+    pool_size + max_overflow) avant que les requêtes n'expirent. Un pool
+    par engine: primaire (database="primary") et chaque réplica
+    (database="host:port/base").
+    """
+
+    def __init__(self, engines):
+        self.engines = engines
+
+    def collect(self):
+        pid = str(os.getpid())
+        pools = [("primary", self.engines.primary.pool)]
+        pools += [(replica.name, replica.engine.pool) for replica in self.engines.replicas]
+
+        gauges = {
+            state: GaugeMetricFamily(
+                f"digiboost_db_pool_{state}",
+                f"Pool SQLAlchemy: {state}",
+                labels=["pid", "database"],
+            )
+            for state in ("size", "checked_out", "checked_in", "overflow")
+        }
+        for database, pool in pools:
+            gauges["size"].add_metric([pid, database], pool.size())
+            gauges["checked_out"].add_metric([pid, database], pool.checkedout())
+            gauges["checked_in"].add_metric([pid, database], pool.checkedin())
+            gauges["overflow"].add_metric([pid, database], pool.overflow())
+        yield from gauges.values()
+
+
+def build_registry(engines=None) -> CollectorRegistry:
+    """
+    Construire le registre à exposer.
+
+    Avec plusieurs processus (workers uvicorn, prefork Celery),
+    PROMETHEUS_MULTIPROC_DIR doit pointer vers un dossier partagé et vidé
+    au démarrage: les métriques de tous les processus y sont agrégées.
+    Les jauges du pool restent celles du processus qui répond (label pid).
+
+    Args:
+        engines: EngineRegistry dont exposer les pools (None = pas de jauges pool)
+
+    Returns:
+        CollectorRegistry prêt à sérialiser
+    """
+    global _pool_collector_registered
+
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if engines is not None:
+            registry.register(DatabasePoolCollector(engines))
+        return registry
+
+    if engines is not None and not _pool_collector_registered:
+        REGISTRY.register(DatabasePoolCollector(engines))
+        _pool_collector_registered = True
+
+    return REGISTRY
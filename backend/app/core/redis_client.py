@@ -0,0 +1,27 @@
+"""
+Client Redis partagé (cache, verrous, compteurs).
+
+Une seule instance par processus: le pool de connexions de redis-py est
+thread-safe et réutilisé par l'API comme par les workers Celery.
+"""
+from functools import lru_cache
+
+import redis
+
+from app.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_redis() -> redis.Redis:
+    """
+    Retourner le client Redis du processus.
+
+    Returns:
+        Client redis-py connecté à settings.REDIS_URL
+    """
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=5,
+        socket_connect_timeout=5,
+        health_check_interval=30,
+    )
@@ -1,8 +1,12 @@
 """
 Gestion de la sécurité: JWT, hashing de mots de passe.
 """
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 from uuid import UUID
 
 from jose import JWTError, jwt
@@ -16,6 +20,10 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # Algorithme JWT
 ALGORITHM = "HS256"
 
+# Pool dédié au hashing bcrypt (créé au premier usage)
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+
 
 def create_access_token(
     subject: str,
@@ -139,6 +147,79 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Retourner le pool de threads dédié à bcrypt.
+
+    bcrypt libère le GIL pendant le calcul: les threads du pool hashent
+    en parallèle sans bloquer l'event loop. Le pool est borné
+    (PASSWORD_HASH_WORKERS) pour qu'une rafale de logins ne sature pas
+    le CPU ni le pool de threads partagé de FastAPI.
+
+    Returns:
+        ThreadPoolExecutor du processus
+    """
+    global _hash_executor
+
+    if _hash_executor is None:
+        with _hash_executor_lock:
+            if _hash_executor is None:
+                workers = settings.PASSWORD_HASH_WORKERS or min(4, os.cpu_count() or 1)
+                _hash_executor = ThreadPoolExecutor(
+                    max_workers=workers,
+                    thread_name_prefix="password-hash"
+                )
+
+    return _hash_executor
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Vérifie un mot de passe hors de l'event loop (pool bcrypt).
+
+    Args:
+        plain_password: Mot de passe en clair
+        hashed_password: Hash du mot de passe
+
+    Returns:
+        True si le mot de passe correspond, False sinon
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), verify_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """
+    Génère le hash d'un mot de passe hors de l'event loop (pool bcrypt).
+
+    Args:
+        password: Mot de passe en clair
+
+    Returns:
+        Hash du mot de passe
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), get_password_hash, password)
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hashe plusieurs mots de passe en parallèle (création d'users en lot).
+
+    Args:
+        passwords: Mots de passe en clair
+
+    Returns:
+        Hashs dans le même ordre
+    """
+    if len(passwords) <= 1:
+        return [get_password_hash(password) for password in passwords]
+
+    return list(get_hash_executor().map(get_password_hash, passwords))
+
+
 def create_temp_token(subject: str, tenant_id: UUID) -> str:
     """
     Crée un token JWT temporaire pour changement de mot de passe.
@@ -0,0 +1,107 @@
+"""
+Classe de taille des tenants (small / medium / large).
+
+Sert à découper les métriques de latence: un tenant à 20 000 produits
+n'a pas les mêmes temps de réponse qu'une boutique à 50 références.
+"""
+import asyncio
+import time
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import func
+
+from app.config import settings
+from app.utils.cache import ExpiringLRUCache
+
+# Classe recalculée au plus une fois par heure et par processus
+TENANT_SIZE_TTL_SECONDS = 3600
+
+_size_cache: ExpiringLRUCache[str] = ExpiringLRUCache(10000)
+
+# Calculs en cours (un seul par tenant), manipulés depuis l'event loop uniquement
+_pending: Dict[UUID, asyncio.Future] = {}
+
+
+def classify(product_count: int) -> str:
+    """
+    Classer un tenant selon son nombre de produits.
+
+    Args:
+        product_count: Nombre de produits du tenant
+
+    Returns:
+        "small", "medium" ou "large"
+    """
+    if product_count >= settings.TENANT_SIZE_LARGE_PRODUCTS:
+        return "large"
+    if product_count >= settings.TENANT_SIZE_MEDIUM_PRODUCTS:
+        return "medium"
+    return "small"
+
+
+def get_tenant_size_class(tenant_id: Optional[UUID]) -> str:
+    """
+    Retourner la classe de taille d'un tenant (avec cache).
+
+    Appel bloquant sur un miss (une requête COUNT): à appeler hors
+    event loop.
+
+    Args:
+        tenant_id: ID du tenant (None pour une requête anonyme)
+
+    Returns:
+        Classe de taille, "none" sans tenant
+    """
+    from app.db.session import SessionLocal
+    from app.models.product import Product
+
+    if tenant_id is None:
+        return "none"
+
+    size_class = _size_cache.get(tenant_id)
+    if size_class is not None:
+        return size_class
+
+    db = SessionLocal()
+    try:
+        count = db.query(func.count(Product.id)).filter(Product.tenant_id == tenant_id).scalar()
+    finally:
+        db.close()
+
+    size_class = classify(count or 0)
+    _size_cache.set(tenant_id, size_class, time.time() + TENANT_SIZE_TTL_SECONDS)
+    return size_class
+
+
+def get_cached_tenant_size_class(tenant_id: Optional[UUID]) -> Optional[str]:
+    """Classe de taille si déjà connue (sans accès base), None sinon."""
+    if tenant_id is None:
+        return "none"
+    return _size_cache.get(tenant_id)
+
+
+def refresh_tenant_size_class(tenant_id: UUID) -> None:
+    """
+    Calculer la classe d'un tenant en arrière-plan (thread du pool).
+
+    À appeler depuis l'event loop sur un miss de get_cached_tenant_size_class:
+    tant qu'un calcul est en cours pour ce tenant, les requêtes suivantes
+    n'en lancent pas d'autre.
+
+    Args:
+        tenant_id: ID du tenant
+    """
+    if tenant_id in _pending:
+        return
+
+    future = asyncio.get_running_loop().run_in_executor(None, get_tenant_size_class, tenant_id)
+    _pending[tenant_id] = future
+
+    def _done(f: asyncio.Future) -> None:
+        _pending.pop(tenant_id, None)
+        # Erreur (base indisponible...) consommée: nouvel essai à la requête suivante
+        if not f.cancelled():
+            f.exception()
+
+    future.add_done_callback(_done)
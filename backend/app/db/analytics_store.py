@@ -0,0 +1,374 @@
+"""
+Instantané analytique en colonnes (Parquet + DuckDB) des gros tenants.
+
+Les analyses (performance catégories, ABC, top produits, rapport
+d'analyse des ventes) agrègent des centaines de milliers de ventes: sur
+les plus gros tenants, ces GROUP BY concurrencent les écritures de la
+base principale. Un instantané par tenant est donc maintenu dans
+ANALYTICS_STORE_DIR (dossier partagé API / workers):
+
+    <tenant_id>/manifest.json
+    <tenant_id>/products.parquet      (réécrit à chaque rafraîchissement)
+    <tenant_id>/categories.parquet    (idem)
+    <tenant_id>/sales/<AAAA-MM>.parquet
+
+Rafraîchissement incrémental (tâche `refresh_analytics_snapshots`):
+seuls les mois contenant des ventes modifiées depuis le dernier passage
+(`updated_at`, index idx_sales_tenant_updated) sont réécrits. Une
+reconstruction complète tous les ANALYTICS_STORE_FULL_REFRESH_HOURS
+prend en compte les suppressions et fait glisser la fenêtre de mois.
+
+Lecture: `Snapshot.execute()` exécute le SQL existant (text() sur
+`sales`, `products`, `categories`) dans DuckDB embarqué, sur des vues
+portant ces noms. Les requêtes restent donc écrites une seule fois.
+Les données ont au plus ANALYTICS_STORE_MAX_STALENESS_SECONDS de retard;
+au-delà, ou si la période dépasse la fenêtre couverte, l'appelant
+revient à PostgreSQL.
+
+pyarrow et duckdb sont importés à la demande.
+"""
+import json
+import logging
+import os
+import re
+import time
+from collections import namedtuple
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.partitioning import add_months, month_start
+from app.utils.cache import ExpiringLRUCache
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+# Marge de relecture des ventes modifiées: updated_at vaut l'heure de début
+# de la transaction d'écriture, qui peut être validée après notre passage
+REFRESH_OVERLAP = timedelta(minutes=10)
+
+# Lignes lues par lot lors de l'export
+SNAPSHOT_FETCH_BATCH_SIZE = 20000
+
+# Manifest relu au plus toutes les 10 secondes par processus
+MANIFEST_TTL_SECONDS = 10
+
+# Colonnes exportées, dans l'ordre des schémas (dates naïves en UTC)
+SNAPSHOT_QUERIES = {
+    "sales": """
+        SELECT id::text AS id, product_id::text AS product_id,
+               sale_date AT TIME ZONE 'UTC' AS sale_date,
+               quantity, unit_price, total_amount, status, tenant_id::text AS tenant_id
+        FROM sales
+        WHERE tenant_id = :tenant_id AND sale_date >= :start AND sale_date < :end
+    """,
+    "products": """
+        SELECT id::text AS id, code, name, unit, current_stock, min_stock, max_stock,
+               category_id::text AS category_id, is_active, tenant_id::text AS tenant_id
+        FROM products
+        WHERE tenant_id = :tenant_id
+    """,
+    "categories": """
+        SELECT id::text AS id, name, tenant_id::text AS tenant_id
+        FROM categories
+        WHERE tenant_id = :tenant_id
+    """,
+}
+
+# Paramètres SQLAlchemy (:name) -> DuckDB ($name), sans toucher aux casts ::type
+_BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+_manifest_cache: ExpiringLRUCache["Snapshot"] = ExpiringLRUCache(1000, name="analytics_snapshot")
+
+
+def snapshot_schema(table: str) -> "pa.Schema":
+    """Schéma Parquet d'une table de l'instantané."""
+    import pyarrow as pa
+
+    quantity = pa.decimal128(15, 3)
+    amount = pa.decimal128(15, 2)
+    schemas = {
+        "sales": [
+            ("id", pa.string()),
+            ("product_id", pa.string()),
+            ("sale_date", pa.timestamp("us")),
+            ("quantity", quantity),
+            ("unit_price", amount),
+            ("total_amount", amount),
+            ("status", pa.string()),
+            ("tenant_id", pa.string()),
+        ],
+        "products": [
+            ("id", pa.string()),
+            ("code", pa.string()),
+            ("name", pa.string()),
+            ("unit", pa.string()),
+            ("current_stock", quantity),
+            ("min_stock", quantity),
+            ("max_stock", quantity),
+            ("category_id", pa.string()),
+            ("is_active", pa.bool_()),
+            ("tenant_id", pa.string()),
+        ],
+        "categories": [
+            ("id", pa.string()),
+            ("name", pa.string()),
+            ("tenant_id", pa.string()),
+        ],
+    }
+    return pa.schema(schemas[table])
+
+
+def tenant_dir(tenant_id: UUID) -> str:
+    return os.path.join(os.path.abspath(settings.ANALYTICS_STORE_DIR), str(tenant_id))
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _month_key(month: date) -> str:
+    return f"{month.year:04d}-{month.month:02d}"
+
+
+@dataclass
+class Snapshot:
+    """Instantané d'un tenant (contenu de manifest.json)"""
+    tenant_id: str
+    coverage_start: date  # Premier mois couvert
+    refreshed_at: datetime  # Heure (UTC, base) des données les plus récentes
+    full_refreshed_at: datetime
+    months: List[str] = field(default_factory=list)  # Mois présents (AAAA-MM)
+    version: int = MANIFEST_VERSION
+
+    @property
+    def path(self) -> str:
+        return tenant_dir(self.tenant_id)
+
+    def is_fresh(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.utcnow()
+        return (now - self.refreshed_at).total_seconds() <= settings.ANALYTICS_STORE_MAX_STALENESS_SECONDS
+
+    def covers(self, start: datetime) -> bool:
+        return start.date() >= self.coverage_start
+
+    def execute(self, query: Any, params: Dict[str, Any]) -> List[tuple]:
+        """
+        Exécuter une requête SQL (text() SQLAlchemy ou chaîne) sur l'instantané.
+
+        Les tables `sales`, `products` et `categories` sont des vues sur les
+        fichiers Parquet du tenant.
+
+        Returns:
+            Lignes (namedtuple: accès par attribut comme un Row SQLAlchemy)
+        """
+        import duckdb
+        import pyarrow as pa
+
+        sql = _BIND_PARAM.sub(r"$\1", str(query))
+        used = set(_BIND_PARAM.findall(str(query)))
+
+        connection = duckdb.connect(config={"threads": settings.ANALYTICS_STORE_THREADS})
+        try:
+            # Un mois peut disparaître (sortie de fenêtre) pendant la durée de vie du manifest en cache
+            sales_files = [
+                path for path in (os.path.join(self.path, "sales", f"{month}.parquet") for month in self.months)
+                if os.path.exists(path)
+            ]
+            # Vues: pas de paramètres liés dans un CREATE VIEW, chemins littéraux
+            if sales_files:
+                files = ", ".join(_literal(path) for path in sales_files)
+                connection.execute(f"CREATE VIEW sales AS SELECT * FROM read_parquet([{files}])")
+            else:
+                empty_sales = pa.Table.from_batches([], schema=snapshot_schema("sales"))
+                connection.register("sales", empty_sales)
+            for table in ("products", "categories"):
+                path = _literal(os.path.join(self.path, f"{table}.parquet"))
+                connection.execute(f"CREATE VIEW {table} AS SELECT * FROM read_parquet({path})")
+
+            cursor = connection.execute(sql, {k: v for k, v in params.items() if k in used})
+            Row = namedtuple("Row", [column[0] for column in cursor.description], rename=True)
+            return [Row(*values) for values in cursor.fetchall()]
+        finally:
+            connection.close()
+
+
+def _manifest_path(tenant_id: UUID) -> str:
+    return os.path.join(tenant_dir(tenant_id), "manifest.json")
+
+
+def read_manifest(tenant_id: UUID) -> Optional[Snapshot]:
+    """Lire le manifest d'un tenant (None si absent ou d'une autre version)."""
+    try:
+        with open(_manifest_path(tenant_id), encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+
+    if data.get("version") != MANIFEST_VERSION:
+        return None
+    return Snapshot(
+        tenant_id=data["tenant_id"],
+        coverage_start=date.fromisoformat(data["coverage_start"]),
+        refreshed_at=datetime.fromisoformat(data["refreshed_at"]),
+        full_refreshed_at=datetime.fromisoformat(data["full_refreshed_at"]),
+        months=data["months"],
+    )
+
+
+def _write_manifest(snapshot: Snapshot) -> None:
+    data = asdict(snapshot)
+    for key in ("coverage_start", "refreshed_at", "full_refreshed_at"):
+        data[key] = data[key].isoformat()
+    path = _manifest_path(snapshot.tenant_id)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+    _manifest_cache.pop(str(snapshot.tenant_id))
+
+
+def usable_snapshot(tenant_id: UUID, start: datetime) -> Optional[Snapshot]:
+    """
+    Instantané utilisable pour une analyse démarrant à `start`.
+
+    Returns:
+        Snapshot si le backend est activé, l'instantané frais et la
+        période couverte; None pour interroger PostgreSQL
+    """
+    if not settings.ANALYTICS_STORE_ENABLED:
+        return None
+
+    key = str(tenant_id)
+    snapshot = _manifest_cache.get(key)
+    if snapshot is None:
+        snapshot = read_manifest(tenant_id)
+        if snapshot is None:
+            return None
+        _manifest_cache.set(key, snapshot, time.time() + MANIFEST_TTL_SECONDS)
+
+    if not snapshot.is_fresh() or not snapshot.covers(start):
+        return None
+    return snapshot
+
+
+def _write_table(db: Session, table: str, path: str, params: Dict[str, Any]) -> int:
+    """Exporter une requête de SNAPSHOT_QUERIES vers un fichier Parquet (remplacement atomique)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = snapshot_schema(table)
+    result = db.execute(
+        text(SNAPSHOT_QUERIES[table]), params,
+        execution_options={"yield_per": SNAPSHOT_FETCH_BATCH_SIZE}
+    )
+
+    rows = 0
+    tmp = f"{path}.tmp"
+    with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        for batch in result.partitions():
+            writer.write_table(pa.Table.from_pylist([row._asdict() for row in batch], schema=schema))
+            rows += len(batch)
+    os.replace(tmp, path)
+    return rows
+
+
+def _iter_months(start: date, end: date) -> Iterator[date]:
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = add_months(month, 1)
+
+
+def refresh_snapshot(db: Session, tenant_id: UUID, full: bool = False) -> Dict[str, Any]:
+    """
+    Rafraîchir l'instantané d'un tenant.
+
+    Args:
+        db: Session (lecture seule)
+        tenant_id: ID du tenant
+        full: Forcer une reconstruction complète
+
+    Returns:
+        Dict avec le type de rafraîchissement et les mois réécrits
+    """
+    # Heure de la base: sert de repère aux prochains passages incrémentaux
+    started_at = db.execute(text("SELECT (now() AT TIME ZONE 'UTC')")).scalar()
+    today = started_at.date()
+    coverage_start = add_months(month_start(today), -(settings.ANALYTICS_STORE_MONTHS - 1))
+
+    previous = read_manifest(tenant_id)
+    full = full or previous is None or previous.coverage_start != coverage_start or (
+        started_at - previous.full_refreshed_at >= timedelta(hours=settings.ANALYTICS_STORE_FULL_REFRESH_HOURS)
+    )
+
+    if full:
+        dirty = list(_iter_months(coverage_start, today))
+    else:
+        dirty = [
+            month_start(value) for (value,) in db.execute(text("""
+                SELECT DISTINCT date_trunc('month', sale_date AT TIME ZONE 'UTC')
+                FROM sales
+                WHERE tenant_id = :tenant_id
+                    AND updated_at >= :since
+                    AND sale_date >= :coverage_start
+            """), {
+                "tenant_id": str(tenant_id),
+                "since": previous.refreshed_at - REFRESH_OVERLAP,
+                "coverage_start": coverage_start,
+            })
+        ]
+
+    base = tenant_dir(tenant_id)
+    os.makedirs(os.path.join(base, "sales"), exist_ok=True)
+    params = {"tenant_id": str(tenant_id)}
+
+    months = set() if full else set(previous.months)
+    rows = 0
+    for month in dirty:
+        key = _month_key(month)
+        path = os.path.join(base, "sales", f"{key}.parquet")
+        written = _write_table(db, "sales", path, {
+            **params,
+            "start": datetime.combine(month, datetime.min.time()),
+            "end": datetime.combine(add_months(month, 1), datetime.min.time()),
+        })
+        rows += written
+        if written:
+            months.add(key)
+        else:
+            months.discard(key)
+            os.remove(path)
+
+    for table in ("products", "categories"):
+        _write_table(db, table, os.path.join(base, f"{table}.parquet"), params)
+
+    snapshot = Snapshot(
+        tenant_id=str(tenant_id),
+        coverage_start=coverage_start,
+        refreshed_at=started_at,
+        full_refreshed_at=started_at if full else previous.full_refreshed_at,
+        months=sorted(months),
+    )
+    _write_manifest(snapshot)
+
+    # Mois sortis de la fenêtre (ou vidés): fichiers plus référencés par le manifest
+    for name in os.listdir(os.path.join(base, "sales")):
+        if name.endswith(".parquet") and name[:-len(".parquet")] not in months:
+            os.remove(os.path.join(base, "sales", name))
+
+    return {
+        "tenant_id": str(tenant_id),
+        "full": full,
+        "months_rewritten": [_month_key(month) for month in dirty],
+        "sales_rows_written": rows,
+    }
@@ -0,0 +1,196 @@
+"""
+Partitionnement mensuel des tables de faits (sales, stock_movements).
+
+Chaque table est partitionnée par intervalle sur sa colonne de date:
+une partition par mois calendaire UTC (`sales_y2026m01`) plus une
+partition DEFAULT qui reçoit les lignes hors des mois créés (import
+d'historique ancien, date erronée dans le futur). Les requêtes filtrées
+sur la date ne lisent que les partitions concernées (partition pruning),
+et un mois ancien se détache puis s'archive sans DELETE massif.
+
+Les partitions futures sont créées à l'avance par la tâche
+`app.tasks.partition_tasks.ensure_future_partitions`.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+logger = logging.getLogger(__name__)
+
+# Table partitionnée -> colonne de partitionnement
+PARTITIONED_TABLES = {
+    "sales": "sale_date",
+    "stock_movements": "movement_date",
+}
+
+_PARTITION_NAME = re.compile(r"^(?P<parent>[a-z_]+?)_(?:y(?P<year>\d{4})m(?P<month>\d{2})|default)$")
+
+
+@dataclass
+class Partition:
+    """Partition mensuelle existante"""
+    name: str
+    month: Optional[date]  # None pour la partition DEFAULT
+    rows_estimate: int
+
+
+def month_start(value: date) -> date:
+    """Premier jour du mois de `value`."""
+    return date(value.year, value.month, 1)
+
+
+def add_months(value: date, months: int) -> date:
+    """Premier jour du mois situé `months` mois après celui de `value`."""
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    """Nom de la partition d'un mois (ex: sales_y2026m01)."""
+    return f"{table}_y{month.year:04d}m{month.month:02d}"
+
+
+def default_partition_name(table: str) -> str:
+    return f"{table}_default"
+
+
+def parent_table(relation: str) -> str:
+    """
+    Table parente d'une partition (nom inchangé pour une table ordinaire).
+
+    Utile pour lire un plan EXPLAIN, qui nomme les partitions parcourues.
+    """
+    match = _PARTITION_NAME.match(relation)
+    if match and match.group("parent") in PARTITIONED_TABLES:
+        return match.group("parent")
+    return relation
+
+
+def _bound(month: date) -> str:
+    # Bornes en UTC explicite: indépendantes du TimeZone de la session
+    return f"{month.isoformat()} 00:00:00+00"
+
+
+def create_month_partition(conn: Connection, table: str, month: date) -> bool:
+    """
+    Créer la partition d'un mois si elle n'existe pas.
+
+    Les lignes du mois déjà tombées dans la partition DEFAULT y sont
+    déplacées: PostgreSQL refuse sinon de créer la partition.
+
+    Args:
+        conn: Connexion (dans une transaction)
+        table: Table partitionnée (clé de PARTITIONED_TABLES)
+        month: Mois à créer (n'importe quel jour du mois)
+
+    Returns:
+        True si la partition a été créée
+    """
+    column = PARTITIONED_TABLES[table]
+    month = month_start(month)
+    name = partition_name(table, month)
+
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return False
+
+    lower, upper = _bound(month), _bound(add_months(month, 1))
+    default = default_partition_name(table)
+    in_range = f"{column} >= '{lower}' AND {column} < '{upper}'"
+
+    has_default = conn.execute(text("SELECT to_regclass(:name)"), {"name": default}).scalar() is not None
+    stray = has_default and conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {default} WHERE {in_range})")).scalar()
+
+    if not stray:
+        conn.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {table} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+    else:
+        # Table autonome remplie puis attachée (la contrainte CHECK évite le scan de validation)
+        conn.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        conn.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK ({in_range})"))
+        moved = conn.execute(text(f"""
+            WITH moved AS (DELETE FROM {default} WHERE {in_range} RETURNING *)
+            INSERT INTO {name} SELECT * FROM moved
+        """)).rowcount
+        conn.execute(text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{lower}') TO ('{upper}')"
+        ))
+        conn.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds"))
+        logger.info(f"{moved} ligne(s) déplacée(s) de {default} vers {name}")
+
+    logger.info(f"Partition {name} créée")
+    return True
+
+
+def ensure_partitions(conn: Connection, table: str, start: date, end: date) -> List[str]:
+    """
+    Garantir une partition pour chaque mois de [start, end].
+
+    Returns:
+        Noms des partitions créées
+    """
+    created = []
+    month = month_start(start)
+    while month <= end:
+        if create_month_partition(conn, table, month):
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_future_partitions(conn: Connection, months_ahead: int, today: Optional[date] = None) -> List[str]:
+    """
+    Créer les partitions du mois courant et des `months_ahead` suivants, pour toutes les tables.
+
+    Returns:
+        Noms des partitions créées
+    """
+    today = today or datetime.utcnow().date()
+    created = []
+    for table in PARTITIONED_TABLES:
+        created += ensure_partitions(conn, table, today, add_months(today, months_ahead))
+    return created
+
+
+def list_partitions(conn: Connection, table: str) -> List[Partition]:
+    """Partitions d'une table, triées par mois (DEFAULT en dernier)."""
+    rows = conn.execute(text("""
+        SELECT c.relname, c.reltuples::bigint
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST(:table AS regclass)
+    """), {"table": table}).fetchall()
+
+    partitions = []
+    for name, reltuples in rows:
+        match = _PARTITION_NAME.match(name)
+        month = None
+        if match and match.group("year"):
+            month = date(int(match.group("year")), int(match.group("month")), 1)
+        partitions.append(Partition(name=name, month=month, rows_estimate=max(reltuples, 0)))
+
+    return sorted(partitions, key=lambda p: (p.month is None, p.month or date.min))
+
+
+def detach_partition(conn: Connection, table: str, month: date) -> Optional[str]:
+    """
+    Détacher la partition d'un mois (la table reste, hors de `table`).
+
+    La partition détachée peut ensuite être exportée puis supprimée
+    (DROP TABLE) sans DELETE sur la table principale.
+
+    Returns:
+        Nom de la table détachée, None si le mois n'a pas de partition
+    """
+    name = partition_name(table, month_start(month))
+    if conn.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is None:
+        return None
+
+    conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+    logger.info(f"Partition {name} détachée de {table}")
+    return name
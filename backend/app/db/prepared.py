@@ -0,0 +1,125 @@
+"""
+Requêtes préparées côté serveur pour les requêtes SQL les plus fréquentes.
+
+Les dashboards, analyses et alertes envoient les mêmes requêtes text()
+des milliers de fois par minute: PostgreSQL les ré-analyse et les
+re-planifie à chaque fois. Une `PreparedQuery` est préparée (PREPARE)
+une fois par connexion physique, à sa première utilisation, puis
+exécutée par EXECUTE. Les noms déjà préparés sont mémorisés dans
+`connection.info`, attaché à la connexion DBAPI du pool: il suit la
+connexion entre deux checkouts et disparaît avec elle (invalidation,
+recyclage), comme la préparation côté serveur.
+
+PREPARE type les paramètres une fois pour toutes, d'après leur contexte:
+le SQL préparé les type explicitement (CAST(:tenant_id AS uuid),
+CAST(:limit AS integer)...) pour éviter « could not determine data type
+of parameter $n » et les comparaisons sur un type inattendu.
+
+Le driver (psycopg2) n'a pas de cache de requêtes préparées: PREPARE /
+EXECUTE en SQL donne le même résultat sans changer de driver.
+
+Repli sur l'exécution classique:
+- PREPARED_STATEMENTS_ENABLED=False (ex: PgBouncer en mode transaction,
+  où les connexions serveur changent d'une transaction à l'autre)
+- base autre que PostgreSQL
+- pendant `include_archived_sales`: une requête préparée reste liée à
+  public.sales et ignorerait la table temporaire qui le masque
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Result
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Clé de connection.info: noms des requêtes préparées sur la connexion
+PREPARED_INFO_KEY = "prepared_statements"
+
+# Clé de session.info: requêtes à exécuter sans préparation (ventes masquées)
+UNPREPARED_INFO_KEY = "unprepared"
+
+# Paramètres nommés SQLAlchemy (:name), hors casts ::type
+_BIND_PARAM = re.compile(r"(?<![:\w]):(\w+)")
+
+_registry: Dict[str, "PreparedQuery"] = {}
+
+
+class PreparedQuery:
+    """Requête text() préparée une fois par connexion"""
+
+    def __init__(self, name: str, sql: str):
+        """
+        Args:
+            name: Nom de l'instruction préparée (unique)
+            sql: Requête avec paramètres nommés (:tenant_id)
+        """
+        self.name = name
+        self.sql = sql
+        self.text = text(sql)
+
+        # Un paramètre = une position ($1, $2...), même s'il apparaît plusieurs fois
+        self.params: List[str] = list(dict.fromkeys(_BIND_PARAM.findall(sql)))
+        positions = {param: index + 1 for index, param in enumerate(self.params)}
+        body = _BIND_PARAM.sub(lambda m: f"${positions[m.group(1)]}", sql)
+
+        self.prepare_text = text(f"PREPARE {name} AS {body}")
+        arguments = f"({', '.join(':' + param for param in self.params)})" if self.params else ""
+        self.execute_text = text(f"EXECUTE {name}{arguments}")
+
+    def __str__(self) -> str:
+        return self.sql
+
+    def execute(self, db: Session, params: Dict[str, Any]) -> Result:
+        """
+        Exécuter la requête (préparée si possible).
+
+        Args:
+            db: Session
+            params: Valeurs des paramètres nommés
+
+        Returns:
+            Result SQLAlchemy (mêmes colonnes que la requête d'origine)
+        """
+        if (
+            not settings.PREPARED_STATEMENTS_ENABLED
+            or db.info.get(UNPREPARED_INFO_KEY)
+            or db.get_bind().dialect.name != "postgresql"
+        ):
+            return db.execute(self.text, params)
+
+        connection = db.connection()
+        prepared = connection.info.setdefault(PREPARED_INFO_KEY, set())
+        if self.name not in prepared:
+            # PREPARE n'est pas transactionnel: survit au rollback de la transaction courante
+            connection.execute(self.prepare_text)
+            prepared.add(self.name)
+
+        return connection.execute(self.execute_text, {param: params[param] for param in self.params})
+
+
+def prepared_query(name: str, sql: str) -> PreparedQuery:
+    """
+    Déclarer (ou retrouver) une requête préparée.
+
+    Idempotent pour un même couple (nom, SQL): utilisable pour des variantes
+    construites à la volée (un nom par variante).
+
+    Raises:
+        ValueError: Si le nom est déjà pris par une autre requête
+    """
+    query = _registry.get(name)
+    if query is None:
+        query = _registry[name] = PreparedQuery(name, sql)
+    elif query.sql != sql:
+        raise ValueError(f"Requête préparée {name} déjà déclarée avec un autre SQL")
+    return query
+
+
+def get_prepared_query(name: str) -> Optional[PreparedQuery]:
+    """Requête préparée déclarée sous ce nom (None si inconnue)."""
+    return _registry.get(name)
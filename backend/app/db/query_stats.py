@@ -0,0 +1,177 @@
+"""
+Instrumentation SQL par requête HTTP et par tâche Celery.
+
+Des hooks d'engine SQLAlchemy comptent les requêtes et le temps passé en
+base pour l'unité de travail courante (portée par une ContextVar), et
+regroupent les requêtes par empreinte: une même requête répétée N fois
+dans une seule unité de travail signale une boucle N+1.
+"""
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar("query_stats", default=None)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]*)\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """
+    Normaliser une requête SQL pour regrouper ses exécutions.
+
+    Les littéraux, les listes IN (...) et les espaces sont remplacés:
+    `WHERE id = 12` et `WHERE id = 13` ont la même empreinte.
+
+    Args:
+        statement: Requête SQL telle qu'envoyée au driver
+
+    Returns:
+        Requête normalisée
+    """
+    normalized = _STRING_LITERAL.sub("?", statement)
+    normalized = _IN_LIST.sub("IN (?)", normalized)
+    normalized = _NUMBER_LITERAL.sub("?", normalized)
+    return _WHITESPACE.sub(" ", normalized).strip()
+
+
+@dataclass
+class QueryStats:
+    """Compteurs SQL d'une unité de travail (requête HTTP ou tâche Celery)."""
+
+    kind: str
+    name: str
+    count: int = 0
+    duration: float = 0.0
+    fingerprints: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        """Enregistrer une requête exécutée."""
+        self.count += 1
+        self.duration += elapsed
+        self.fingerprints[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Requêtes exécutées au moins `threshold` fois (suspicion de N+1).
+
+        Returns:
+            Liste (empreinte, nombre d'exécutions), la plus répétée en premier
+        """
+        return [(fp, n) for fp, n in self.fingerprints.most_common() if n >= threshold]
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Retourner les compteurs de l'unité de travail courante (ou None)."""
+    return _current_stats.get()
+
+
+def start_tracking(kind: str, name: str) -> Token:
+    """
+    Démarrer le comptage pour une unité de travail.
+
+    Args:
+        kind: "request" ou "task"
+        name: Route (gabarit) ou nom de la tâche
+
+    Returns:
+        Jeton à passer à finish_tracking
+    """
+    return _current_stats.set(QueryStats(kind=kind, name=name))
+
+
+def finish_tracking(token: Token, name: Optional[str] = None) -> Optional[QueryStats]:
+    """
+    Terminer le comptage: publier les métriques et signaler les N+1.
+
+    Args:
+        token: Jeton renvoyé par start_tracking
+        name: Nom définitif de l'unité (ex: route résolue après routage)
+
+    Returns:
+        Compteurs de l'unité de travail terminée
+    """
+    from app.core import metrics
+
+    stats = _current_stats.get()
+    _current_stats.reset(token)
+    if stats is None:
+        return None
+    if name is not None:
+        stats.name = name
+
+    metrics.DB_QUERIES_PER_UNIT.labels(stats.kind, stats.name).observe(stats.count)
+    metrics.DB_TIME_PER_UNIT.labels(stats.kind, stats.name).observe(stats.duration)
+
+    repeated = stats.repeated(settings.N_PLUS_ONE_THRESHOLD)
+    if repeated:
+        metrics.DB_REPEATED_STATEMENTS.labels(stats.kind, stats.name).inc(len(repeated))
+        for statement, n in repeated:
+            logger.warning(
+                f"N+1 probable dans {stats.kind} {stats.name}: "
+                f"{n} exécutions de: {statement[:300]}"
+            )
+
+    return stats
+
+
+@contextmanager
+def track_queries(kind: str, name: str) -> Iterator[QueryStats]:
+    """
+    Context manager équivalent à start_tracking / finish_tracking.
+
+    Example:
+        with track_queries("task", "refresh_dashboard_views") as stats:
+            ...
+    """
+    token = start_tracking(kind, name)
+    try:
+        yield _current_stats.get()
+    finally:
+        finish_tracking(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info["query_start_time"] = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info.pop("query_start_time")
+
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+    if settings.SLOW_QUERY_THRESHOLD_MS and elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        from app.db.slow_queries import record_slow_query
+
+        unit = f"{stats.kind} {stats.name}" if stats is not None else None
+        record_slow_query(conn, statement, parameters, executemany, fingerprint(statement), elapsed, unit)
+
+
+def install_query_instrumentation(engine: Engine) -> None:
+    """
+    Brancher les hooks de comptage sur un engine.
+
+    Sans unité de travail en cours (scripts, shell), les hooks ne
+    comptent rien mais capturent toujours les requêtes lentes.
+
+    Args:
+        engine: Engine SQLAlchemy à instrumenter
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,114 @@
+"""
+Registre des engines: base primaire et réplicas en lecture.
+
+Les lectures lourdes (dashboards, analyses, rapports, prédictions) sont
+envoyées sur une réplica (streaming replication) pour ne pas concurrencer
+les écritures. Garde de retard: une réplica dont le rejeu a plus de
+REPLICA_MAX_LAG_SECONDS de retard, ou injoignable, est écartée jusqu'à la
+mesure suivante; sans réplica disponible, la lecture va sur la primaire.
+"""
+import itertools
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Retard de rejeu (secondes): nul si tout le WAL reçu est rejoué (primaire
+# inactive), 0 aussi sur une instance qui n'est pas en recovery
+REPLICA_LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+
+@dataclass
+class ReplicaState:
+    """Dernière mesure connue d'une réplica"""
+    engine: Engine
+    lag_seconds: Optional[float] = None  # None: injoignable ou jamais mesurée
+    checked_at: float = 0.0
+
+    @property
+    def name(self) -> str:
+        url = self.engine.url
+        return f"{url.host}:{url.port or 5432}/{url.database}"
+
+
+class EngineRegistry:
+    """
+    Primaire + réplicas, avec choix de l'engine de lecture.
+
+    Le retard d'une réplica est mesuré au plus une fois par
+    `check_interval` et par processus, par le premier thread qui la
+    demande (les autres utilisent la mesure précédente).
+    """
+
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: List[Engine],
+        max_lag_seconds: float,
+        check_interval: float
+    ):
+        self.primary = primary
+        self.replicas = [ReplicaState(engine) for engine in replicas]
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._round_robin = itertools.count()
+        self._check_lock = threading.Lock()
+
+    def _measure(self, replica: ReplicaState) -> None:
+        previous = replica.lag_seconds
+        try:
+            with replica.engine.connect() as conn:
+                replica.lag_seconds = float(conn.execute(REPLICA_LAG_QUERY).scalar())
+        except Exception as e:
+            replica.lag_seconds = None
+            if previous is not None:
+                logger.warning(f"Réplica {replica.name} injoignable: {str(e)}")
+        replica.checked_at = time.monotonic()
+
+        if replica.lag_seconds is not None and replica.lag_seconds > self.max_lag_seconds:
+            logger.warning(f"Réplica {replica.name} écartée: {replica.lag_seconds:.1f}s de retard")
+
+    def _is_usable(self, replica: ReplicaState) -> bool:
+        if time.monotonic() - replica.checked_at >= self.check_interval:
+            # Une seule mesure à la fois: les autres threads gardent la précédente
+            if self._check_lock.acquire(blocking=False):
+                try:
+                    self._measure(replica)
+                finally:
+                    self._check_lock.release()
+        return replica.lag_seconds is not None and replica.lag_seconds <= self.max_lag_seconds
+
+    def read_engine(self) -> Engine:
+        """
+        Engine pour une lecture tolérant un léger retard.
+
+        Returns:
+            Réplica utilisable (tourniquet), sinon la primaire
+        """
+        from app.core.metrics import DB_READ_ROUTING
+
+        if self.replicas:
+            start = next(self._round_robin)
+            for offset in range(len(self.replicas)):
+                replica = self.replicas[(start + offset) % len(self.replicas)]
+                if self._is_usable(replica):
+                    DB_READ_ROUTING.labels("replica").inc()
+                    return replica.engine
+
+        DB_READ_ROUTING.labels("primary").inc()
+        return self.primary
+
+    def is_replica(self, engine: Engine) -> bool:
+        return engine is not self.primary
@@ -0,0 +1,299 @@
+"""
+Stockage et lecture des ventes archivées (Parquet).
+
+Les mois de ventes plus anciens que SALES_ARCHIVE_AFTER_MONTHS sont
+exportés dans un fichier Parquet par tenant et par mois
+(`<SALES_ARCHIVE_URI>/<tenant_id>/<AAAA-MM>.parquet`, disque local ou
+s3://), puis leur partition est supprimée de la base.
+
+Lecture transparente: `include_archived_sales()` crée, pour la durée
+d'un bloc, une table temporaire `sales` qui masque la table réelle
+(pg_temp est prioritaire dans le search_path) et contient les ventes
+du tenant sur la période, chaudes et archivées. Les requêtes existantes
+(SQL texte ou ORM sur `sales`) s'exécutent donc sans modification.
+Réservé aux traitements en lecture seule bornés à un tenant et une
+période (rapports, analyses). Une session de lecture sur réplica est
+basculée sur la primaire le temps du bloc.
+
+Un mois n'est archivé qu'avant la limite de rétention (archive_cutoff):
+la limite des mois archivés est mise en cache par processus, mais relue
+dans le catalogue pour toute période qui commence avant cette limite, ce
+qui couvre un archivage fait par un autre processus il y a moins de
+ARCHIVE_BOUNDARY_TTL_SECONDS.
+
+pyarrow et duckdb sont importés à la demande: ils ne sont chargés que
+par les processus qui archivent ou lisent réellement des archives.
+"""
+import io
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.partitioning import add_months, month_start
+from app.db.prepared import UNPREPARED_INFO_KEY
+from app.db.session import primary_session
+from app.utils.cache import ExpiringLRUCache
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from pyarrow.fs import FileSystem
+
+logger = logging.getLogger(__name__)
+
+# Colonnes archivées (ordre de la table sales)
+ARCHIVE_COLUMNS = [
+    "id", "product_id", "sale_date", "quantity", "unit_price", "total_amount",
+    "order_number", "customer_name", "status", "tenant_id", "created_at", "updated_at",
+]
+
+# Limite des mois archivés relue au plus toutes les 60 secondes par processus
+ARCHIVE_BOUNDARY_TTL_SECONDS = 60
+
+# Aucun mois archivé (valeur mise en cache: None signifie "absent du cache")
+_NO_ARCHIVE = date.min
+
+_boundary_cache: ExpiringLRUCache[date] = ExpiringLRUCache(1, name="sales_archive_boundary")
+
+
+def archive_schema() -> "pa.Schema":
+    """Schéma Parquet des ventes archivées."""
+    import pyarrow as pa
+
+    timestamp = pa.timestamp("us", tz="UTC")
+    return pa.schema([
+        ("id", pa.string()),
+        ("product_id", pa.string()),
+        ("sale_date", timestamp),
+        ("quantity", pa.decimal128(15, 3)),
+        ("unit_price", pa.decimal128(15, 2)),
+        ("total_amount", pa.decimal128(15, 2)),
+        ("order_number", pa.string()),
+        ("customer_name", pa.string()),
+        ("status", pa.string()),
+        ("tenant_id", pa.string()),
+        ("created_at", timestamp),
+        ("updated_at", timestamp),
+    ])
+
+
+def _filesystem(root: str) -> Tuple["FileSystem", str]:
+    """Système de fichiers pyarrow et chemin de base pour une URI (locale ou s3://)."""
+    from pyarrow import fs
+
+    if "://" in root:
+        return fs.FileSystem.from_uri(root)
+    return fs.LocalFileSystem(), os.path.abspath(root)
+
+
+def archive_uri(tenant_id: UUID, month: date, root: Optional[str] = None) -> str:
+    """URI du fichier Parquet d'un tenant pour un mois."""
+    root = (root or settings.SALES_ARCHIVE_URI).rstrip("/")
+    if "://" not in root:
+        root = os.path.abspath(root)
+    return f"{root}/{tenant_id}/{month.year:04d}-{month.month:02d}.parquet"
+
+
+def write_archive(rows: Iterator[List[dict]], tenant_id: UUID, month: date) -> Tuple[str, int, int]:
+    """
+    Écrire les ventes d'un tenant pour un mois dans un fichier Parquet (zstd).
+
+    Args:
+        rows: Lots de lignes (dicts ARCHIVE_COLUMNS, UUID déjà en texte)
+        tenant_id: ID du tenant
+        month: Mois archivé
+
+    Returns:
+        (uri, nombre de lignes, taille en octets)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    uri = archive_uri(tenant_id, month)
+    filesystem, path = _filesystem(uri)
+    filesystem.create_dir(os.path.dirname(path), recursive=True)
+
+    schema = archive_schema()
+    row_count = 0
+    with pq.ParquetWriter(path, schema, filesystem=filesystem, compression="zstd") as writer:
+        for batch in rows:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            row_count += len(batch)
+
+    # Relecture des métadonnées: le fichier est complet et lisible avant de supprimer la source
+    with filesystem.open_input_file(path) as f:
+        written = pq.ParquetFile(f).metadata.num_rows
+    if written != row_count:
+        raise RuntimeError(f"Archive {uri} incomplète: {written} lignes au lieu de {row_count}")
+
+    return uri, row_count, filesystem.get_file_info(path).size
+
+
+def archive_cutoff(today: Optional[date] = None) -> date:
+    """
+    Premier mois conservé en base (limite de rétention).
+
+    Returns:
+        Les mois strictement antérieurs sont archivables
+    """
+    today = today or datetime.utcnow().date()
+    return add_months(month_start(today), -settings.SALES_ARCHIVE_AFTER_MONTHS)
+
+
+def archive_boundary(db: Session, fresh: bool = False) -> Optional[date]:
+    """
+    Fin de la zone archivée: premier jour du mois suivant le dernier mois archivé.
+
+    Args:
+        db: Session
+        fresh: Relire le catalogue sans passer par le cache du processus
+
+    Returns:
+        Date limite (les ventes antérieures sont en Parquet), None si rien n'est archivé
+    """
+    boundary = None if fresh else _boundary_cache.get("boundary")
+    if boundary is None:
+        last_month = db.execute(text("SELECT MAX(month) FROM sales_archive_files")).scalar()
+        boundary = add_months(last_month, 1) if last_month else _NO_ARCHIVE
+        _boundary_cache.set("boundary", boundary, time.time() + ARCHIVE_BOUNDARY_TTL_SECONDS)
+
+    return None if boundary == _NO_ARCHIVE else boundary
+
+
+def invalidate_archive_boundary() -> None:
+    """Oublier la limite en cache (après un archivage dans ce processus)."""
+    _boundary_cache.clear()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # Une date naïve est interprétée en UTC (fuseau de la base et du Sénégal)
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def read_archived_sales(uris: List[str], start: datetime, end: datetime) -> "pa.Table":
+    """
+    Lire les ventes archivées d'une période avec DuckDB (embarqué).
+
+    Args:
+        uris: Fichiers Parquet à lire
+        start: Début de période (inclus)
+        end: Fin de période (incluse)
+
+    Returns:
+        Table Arrow (colonnes ARCHIVE_COLUMNS)
+    """
+    import duckdb
+
+    connection = duckdb.connect()
+    try:
+        if any(uri.startswith("s3://") for uri in uris):
+            connection.execute("INSTALL httpfs")
+            connection.execute("LOAD httpfs")
+            connection.execute("CREATE SECRET (TYPE S3, PROVIDER CREDENTIAL_CHAIN)")
+
+        return connection.execute(
+            f"SELECT {', '.join(ARCHIVE_COLUMNS)} FROM read_parquet(?) "
+            "WHERE sale_date >= ? AND sale_date <= ?",
+            [uris, _as_utc(start), _as_utc(end)]
+        ).fetch_arrow_table()
+    finally:
+        connection.close()
+
+
+@contextmanager
+def include_archived_sales(db: Session, tenant_id: UUID, start: datetime, end: datetime) -> Iterator[bool]:
+    """
+    Rendre les ventes archivées visibles sous le nom `sales` pendant le bloc.
+
+    Sans effet si la période ne touche aucun mois archivé (aucune requête
+    supplémentaire pour une période postérieure à la limite de rétention).
+
+    La table temporaire vit dans la transaction courante (ON COMMIT DROP):
+    elle ne peut pas rester sur une connexion rendue au pool. Un commit de
+    la session dans le bloc lève donc RuntimeError au lieu de faire
+    silencieusement disparaître la table.
+
+    Args:
+        db: Session utilisée par les requêtes du bloc
+        tenant_id: Tenant concerné (seules ses ventes sont visibles)
+        start: Début de période
+        end: Fin de période
+
+    Yields:
+        True si des archives sont lues
+    """
+    start_day = _as_utc(start).date()
+    boundary = archive_boundary(db, fresh=start_day < archive_cutoff())
+    if boundary is None or start_day >= boundary:
+        yield False
+        return
+
+    import pyarrow.csv as pacsv
+
+    # Table temporaire impossible sur une réplica (lecture seule)
+    with primary_session(db):
+        uris = [
+            uri for (uri,) in db.execute(text("""
+                SELECT uri FROM sales_archive_files
+                WHERE tenant_id = :tenant_id
+                    AND month >= date_trunc('month', CAST(:start AS timestamptz))::date
+                    AND month <= :end
+                ORDER BY month
+            """), {"tenant_id": str(tenant_id), "start": _as_utc(start), "end": _as_utc(end).date()})
+        ]
+
+        db.execute(text("""
+            CREATE TEMP TABLE sales ON COMMIT DROP AS
+            SELECT * FROM public.sales
+            WHERE tenant_id = :tenant_id AND sale_date >= :start AND sale_date <= :end
+        """), {"tenant_id": str(tenant_id), "start": _as_utc(start), "end": _as_utc(end)})
+        event.listen(db, "before_commit", _forbid_commit)
+
+        try:
+            if uris:
+                archived = read_archived_sales(uris, start, end)
+                buffer = io.BytesIO()
+                pacsv.write_csv(archived, buffer, pacsv.WriteOptions(include_header=False))
+                buffer.seek(0)
+
+                cursor = db.connection().connection.cursor()
+                try:
+                    cursor.copy_expert(
+                        f"COPY pg_temp.sales ({', '.join(ARCHIVE_COLUMNS)}) FROM STDIN WITH (FORMAT csv)",
+                        buffer
+                    )
+                finally:
+                    cursor.close()
+                logger.info(f"{archived.num_rows} vente(s) archivée(s) chargée(s) pour le tenant {tenant_id}")
+
+            db.execute(text("ANALYZE pg_temp.sales"))
+
+            # Les requêtes préparées restent liées à public.sales: exécution classique
+            db.info[UNPREPARED_INFO_KEY] = True
+            yield True
+        finally:
+            db.info.pop(UNPREPARED_INFO_KEY, None)
+            event.remove(db, "before_commit", _forbid_commit)
+            try:
+                db.execute(text("DROP TABLE IF EXISTS pg_temp.sales"))
+            except Exception:
+                # Transaction en échec: le rollback de l'appelant annule aussi la création
+                pass
+
+
+def _forbid_commit(session: Session) -> None:
+    """Refuser un commit pendant include_archived_sales (la table temporaire disparaîtrait)."""
+    raise RuntimeError(
+        "commit interdit dans include_archived_sales: la table temporaire sales "
+        "(ON COMMIT DROP) disparaîtrait et les requêtes suivantes liraient public.sales"
+    )
+
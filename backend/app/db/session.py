@@ -1,18 +1,50 @@
 """
 Configuration de la session de base de données.
+
+Deux familles de sessions:
+- SessionLocal / get_db: base primaire (écritures, lectures devant voir
+  les dernières écritures)
+- read_session / get_read_db: lectures lourdes tolérant quelques secondes
+  de retard, servies par une réplica si DATABASE_REPLICA_URLS est défini
 """
+from contextlib import contextmanager
+from typing import Iterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, Session
 
 from app.config import settings
+from app.db.query_stats import install_query_instrumentation
+from app.db.replicas import EngineRegistry
+
+
+def _create_engine(url: str) -> Engine:
+    engine = create_engine(
+        url,
+        pool_pre_ping=True,  # Vérifier la connexion avant de l'utiliser
+        pool_size=settings.DB_POOL_SIZE,  # Taille du pool de connexions (par profil de worker)
+        max_overflow=settings.DB_MAX_OVERFLOW,  # Connexions supplémentaires autorisées
+        echo=settings.DEBUG,  # Logger les requêtes SQL en mode debug
+    )
+
+    # Compter requêtes SQL et temps en base par requête HTTP / tâche Celery,
+    # capturer les requêtes lentes
+    if settings.QUERY_STATS_ENABLED or settings.SLOW_QUERY_THRESHOLD_MS:
+        install_query_instrumentation(engine)
 
-# Créer le moteur de base de données
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,  # Vérifier la connexion avant de l'utiliser
-    pool_size=10,  # Taille du pool de connexions
-    max_overflow=20,  # Connexions supplémentaires autorisées
-    echo=settings.DEBUG,  # Logger les requêtes SQL en mode debug
+    return engine
+
+
+# Créer le moteur de base de données (primaire)
+engine = _create_engine(settings.DATABASE_URL)
+
+# Primaire + réplicas en lecture
+engines = EngineRegistry(
+    primary=engine,
+    replicas=[_create_engine(url) for url in settings.database_replica_urls_list],
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS
 )
 
 # Créer le SessionLocal
@@ -22,6 +54,59 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Sessions de lecture: engine choisi à l'ouverture
+ReadSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False
+)
+
+
+def read_session() -> Session:
+    """
+    Ouvrir une session de lecture (réplica à jour, sinon primaire).
+
+    À réserver aux traitements qui n'écrivent pas: une réplica refuse
+    toute écriture, y compris les tables temporaires (voir primary_session).
+
+    Returns:
+        Session (à fermer par l'appelant)
+    """
+    bind = engines.read_engine()
+    return ReadSessionLocal(bind=bind, info={"replica": engines.is_replica(bind)})
+
+
+@contextmanager
+def primary_session(db: Session) -> Iterator[Session]:
+    """
+    Basculer temporairement une session de lecture sur la primaire.
+
+    Pour les rares blocs qui écrivent (table temporaire des ventes
+    archivées). La transaction de lecture en cours est annulée (rollback,
+    pas close): les objets déjà chargés restent attachés à la session et
+    sont rechargés à la demande depuis la base liée. Les écritures non
+    validées du bloc sont annulées au retour sur la réplica.
+
+    Args:
+        db: Session (sans effet si elle est déjà sur la primaire)
+
+    Yields:
+        La même session, liée à la primaire pendant le bloc
+    """
+    if not db.info.get("replica"):
+        yield db
+        return
+
+    replica = db.bind
+    db.rollback()
+    db.bind = engine
+    db.info["replica"] = False
+    try:
+        yield db
+    finally:
+        db.rollback()
+        db.bind = replica
+        db.info["replica"] = True
+
 
 def get_db() -> Session:
     """
@@ -41,3 +126,19 @@ def get_db() -> Session:
         yield db
     finally:
         db.close()
+
+
+def get_read_db() -> Session:
+    """
+    Dependency pour une session de lecture (réplica si disponible).
+    Pour les endpoints en lecture seule: dashboards, analyses, rapports,
+    prédictions.
+
+    Yields:
+        Session de lecture
+    """
+    db = read_session()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,244 @@
+"""
+Capture des requêtes SQL lentes.
+
+Toute requête plus longue que SLOW_QUERY_THRESHOLD_MS est enregistrée
+(empreinte normalisée, forme des paramètres, tenant, méthode appelante
+et, en option, plan EXPLAIN (ANALYZE, BUFFERS)) dans des fichiers JSON
+Lines rotatifs, un par processus. `scripts/slow_queries.py` agrège ces
+fichiers et classe les empreintes par temps total.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.core.tenant_context import get_current_tenant
+
+logger = logging.getLogger(__name__)
+
+# Dossiers du code applicatif dont on cherche l'appelant (hors couche db)
+_CALLER_PACKAGES = ("app/services/", "app/api/", "app/tasks/", "scripts/")
+
+_EXPLAIN_SAVEPOINT = "slow_query_explain"
+
+# EXECUTE d'une requête préparée (app/db/prepared.py)
+_EXECUTE_PREPARED = re.compile(r"^\s*EXECUTE\s+(\w+)", re.IGNORECASE)
+
+_writer_lock = threading.Lock()
+_writer: Optional[logging.Logger] = None
+
+_explain_lock = threading.Lock()
+_last_explained: Dict[str, float] = {}
+
+
+def fingerprint_hash(fingerprint: str) -> str:
+    """Identifiant court et stable d'une empreinte (12 caractères hexadécimaux)."""
+    return hashlib.sha1(fingerprint.encode()).hexdigest()[:12]
+
+
+def parameters_shape(parameters: Any, executemany: bool = False) -> Any:
+    """
+    Décrire la forme des paramètres sans leurs valeurs.
+
+    Args:
+        parameters: Paramètres passés au driver (dict, tuple ou liste)
+        executemany: True pour un executemany (liste de jeux de paramètres)
+
+    Returns:
+        Structure JSON-compatible: noms et types, nombre de lignes
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameters[0] if parameters else None
+        return {"rows": len(parameters), "row": parameters_shape(first)}
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+def find_caller() -> Optional[str]:
+    """
+    Trouver la méthode applicative à l'origine de la requête.
+
+    Returns:
+        "module.fonction:ligne" du premier cadre hors SQLAlchemy / app.db
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename.replace(os.sep, "/")
+        if any(package in filename for package in _CALLER_PACKAGES):
+            module = frame.f_globals.get("__name__", "?")
+            return f"{module}.{frame.f_code.co_name}:{frame.f_lineno}"
+        frame = frame.f_back
+    return None
+
+
+def resolve_prepared(conn, statement: str) -> Optional[Tuple[str, str]]:
+    """
+    Retrouver le SQL d'origine d'un `EXECUTE nom(...)`.
+
+    Les paramètres de l'EXECUTE portent les mêmes noms que ceux de la
+    requête d'origine: le SQL compilé pour le driver se rejoue (EXPLAIN)
+    avec les mêmes paramètres.
+
+    Args:
+        conn: Connexion SQLAlchemy (dialecte du driver)
+        statement: Requête SQL envoyée au driver
+
+    Returns:
+        Tuple (nom de la requête préparée, SQL d'origine au format du driver),
+        None si ce n'est pas l'EXECUTE d'une requête déclarée
+    """
+    from app.db.prepared import get_prepared_query
+
+    match = _EXECUTE_PREPARED.match(statement)
+    if match is None:
+        return None
+
+    query = get_prepared_query(match.group(1))
+    if query is None:
+        return None
+
+    return query.name, str(query.text.compile(dialect=conn.dialect))
+
+
+def _get_writer() -> logging.Logger:
+    """Logger dédié écrivant dans le fichier rotatif de ce processus."""
+    global _writer
+
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                directory = Path(settings.SLOW_QUERY_LOG_DIR)
+                directory.mkdir(parents=True, exist_ok=True)
+
+                handler = RotatingFileHandler(
+                    directory / f"slow_queries-{os.getpid()}.jsonl",
+                    maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+                    backupCount=settings.SLOW_QUERY_LOG_BACKUPS,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(message)s"))
+
+                writer = logging.getLogger(f"{__name__}.store")
+                writer.propagate = False
+                writer.setLevel(logging.INFO)
+                writer.addHandler(handler)
+                _writer = writer
+
+    return _writer
+
+
+def _should_explain(fp_hash: str, statement: str) -> bool:
+    """EXPLAIN ANALYZE au plus une fois par empreinte et par intervalle (SELECT seulement)."""
+    if not settings.SLOW_QUERY_EXPLAIN:
+        return False
+    if not statement.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+        return False
+
+    now = time.time()
+    with _explain_lock:
+        last = _last_explained.get(fp_hash)
+        if last is not None and now - last < settings.SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+            return False
+        _last_explained[fp_hash] = now
+    return True
+
+
+def _explain(conn, statement: str, parameters: Any) -> Optional[Any]:
+    """
+    Rejouer la requête sous EXPLAIN (ANALYZE, BUFFERS) dans un savepoint.
+
+    Un curseur DBAPI distinct est utilisé pour ne pas écraser le résultat
+    en cours de lecture, et le savepoint protège la transaction de
+    l'appelant en cas d'erreur.
+    """
+    if conn.dialect.name != "postgresql":
+        return None
+
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(f"SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters)
+            plan = cursor.fetchone()[0]
+        finally:
+            cursor.execute(f"ROLLBACK TO SAVEPOINT {_EXPLAIN_SAVEPOINT}")
+        return plan
+    except Exception as e:
+        logger.warning(f"EXPLAIN impossible pour une requête lente: {e}")
+        return None
+    finally:
+        cursor.close()
+
+
+def record_slow_query(
+    conn,
+    statement: str,
+    parameters: Any,
+    executemany: bool,
+    fingerprint: str,
+    elapsed: float,
+    unit: Optional[str] = None,
+) -> None:
+    """
+    Enregistrer une requête lente dans le store rotatif.
+
+    Appelé par le hook after_cursor_execute; ne lève jamais d'exception
+    pour ne pas faire échouer la requête applicative. Un EXECUTE de
+    requête préparée est enregistré (empreinte, EXPLAIN) sous le SQL de
+    la requête d'origine, avec son nom dans `prepared`.
+
+    Args:
+        conn: Connexion SQLAlchemy ayant exécuté la requête
+        statement: Requête SQL envoyée au driver
+        parameters: Paramètres de la requête
+        executemany: True pour un executemany
+        fingerprint: Empreinte normalisée (query_stats.fingerprint)
+        elapsed: Durée d'exécution (secondes)
+        unit: Requête HTTP ou tâche Celery en cours (ex: "request GET /x")
+    """
+    try:
+        prepared_name = None
+        resolved = resolve_prepared(conn, statement)
+        if resolved is not None:
+            from app.db.query_stats import fingerprint as fingerprint_of
+
+            prepared_name, statement = resolved
+            fingerprint = fingerprint_of(statement)
+
+        fp_hash = fingerprint_hash(fingerprint)
+
+        tenant_id = get_current_tenant()
+        if tenant_id is None and isinstance(parameters, dict):
+            tenant_id = parameters.get("tenant_id")
+
+        record = {
+            "ts": datetime.utcnow().isoformat(),
+            "fingerprint_hash": fp_hash,
+            "fingerprint": fingerprint,
+            "duration_ms": round(elapsed * 1000, 2),
+            "params_shape": parameters_shape(parameters, executemany),
+            "tenant_id": str(tenant_id) if tenant_id else None,
+            "caller": find_caller(),
+            "unit": unit,
+            "prepared": prepared_name,
+            "pid": os.getpid(),
+        }
+
+        if not executemany and _should_explain(fp_hash, statement):
+            record["plan"] = _explain(conn, statement, parameters)
+
+        _get_writer().info(json.dumps(record, default=str))
+    except Exception as e:
+        logger.warning(f"Capture requête lente impossible: {e}")
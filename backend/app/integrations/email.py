@@ -22,6 +22,7 @@ class EmailService:
         self.smtp_user = settings.SMTP_USER
         self.smtp_password = settings.SMTP_PASSWORD
         self.from_email = settings.FROM_EMAIL
+        self.use_tls = settings.SMTP_USE_TLS
 
     def send_email_sync(
         self,
@@ -67,7 +68,8 @@ class EmailService:
 
             # Envoyer email
             with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                server.starttls()
+                if self.use_tls:
+                    server.starttls()
                 server.login(self.smtp_user, self.smtp_password)
                 server.send_message(msg)
 
@@ -26,6 +26,8 @@ class WhatsAppService:
                     settings.TWILIO_ACCOUNT_SID,
                     settings.TWILIO_AUTH_TOKEN
                 )
+                if settings.TWILIO_API_BASE_URL:
+                    self.client.api.base_url = settings.TWILIO_API_BASE_URL
                 logger.info("WhatsApp service initialized with Twilio")
             except Exception as e:
                 logger.error(f"Failed to initialize Twilio client: {str(e)}")
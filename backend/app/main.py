@@ -1,9 +1,13 @@
 """
 Point d'entree principal de l'application Digiboost PME.
 """
+import hmac
+import ipaddress
+import time
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
 from app.config import settings
@@ -28,6 +32,97 @@ class TenantContextMiddleware(BaseHTTPMiddleware):
             clear_current_tenant()
 
 
+class QueryStatsMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware pour compter les requetes SQL de chaque requete HTTP.
+    En mode debug, les compteurs sont renvoyes en en-tetes de reponse.
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        from app.db.query_stats import finish_tracking, start_tracking
+
+        token = start_tracking("request", request.method)
+        try:
+            response = await call_next(request)
+        finally:
+            stats = finish_tracking(token, _route_name(request))
+
+        if settings.DEBUG and stats is not None:
+            response.headers["X-DB-Query-Count"] = str(stats.count)
+            response.headers["X-DB-Time-Ms"] = f"{stats.duration * 1000:.1f}"
+            response.headers["X-DB-Repeated-Statements"] = str(
+                len(stats.repeated(settings.N_PLUS_ONE_THRESHOLD))
+            )
+
+        return response
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware pour mesurer la latence de chaque requete HTTP
+    (par route et classe de taille du tenant).
+    """
+
+    async def dispatch(self, request: Request, call_next):
+        from app.core.metrics import HTTP_REQUEST_DURATION
+        from app.core.tenant_size import get_cached_tenant_size_class, refresh_tenant_size_class
+
+        start = time.perf_counter()
+        status_code = 500
+        try:
+            response = await call_next(request)
+            status_code = response.status_code
+            return response
+        finally:
+            elapsed = time.perf_counter() - start
+
+            tenant_id = getattr(request.state, "tenant_id", None)
+            tenant_size = get_cached_tenant_size_class(tenant_id)
+            if tenant_size is None:
+                # Classe calculee en arriere-plan (un calcul a la fois par tenant)
+                tenant_size = "unknown"
+                refresh_tenant_size_class(tenant_id)
+
+            HTTP_REQUEST_DURATION.labels(
+                request.method, _route_path(request), str(status_code), tenant_size
+            ).observe(elapsed)
+
+
+def _metrics_allowed(request: Request) -> bool:
+    """
+    Verifier l'acces a /metrics: jeton Bearer METRICS_TOKEN, ou client
+    dans METRICS_ALLOWED_NETWORKS (adresse vue par uvicorn: derriere un
+    proxy, c'est celle du proxy, d'ou le jeton dans ce cas).
+    """
+    if settings.METRICS_TOKEN:
+        authorization = request.headers.get("authorization", "")
+        if hmac.compare_digest(authorization.encode(), f"Bearer {settings.METRICS_TOKEN}".encode()):
+            return True
+
+    if request.client is None:
+        return False
+    try:
+        client_ip = ipaddress.ip_address(request.client.host)
+    except ValueError:
+        return False
+
+    return any(
+        client_ip in ipaddress.ip_network(network, strict=False)
+        for network in settings.metrics_allowed_networks_list
+    )
+
+
+def _route_path(request: Request) -> str:
+    """Gabarit de la route (ex: /api/v1/alerts/{alert_id}) pour limiter la cardinalite."""
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def _route_name(request: Request) -> str:
+    """Methode et gabarit de la route (ex: GET /api/v1/alerts/{alert_id})."""
+    return f"{request.method} {_route_path(request)}"
+
+
 def create_application() -> FastAPI:
     """
     Factory pour creer l'application FastAPI.
@@ -51,11 +146,23 @@ def create_application() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor",  # Pagination par curseur
+            "X-DB-Query-Count", "X-DB-Time-Ms", "X-DB-Repeated-Statements",  # Debug SQL
+        ],
     )
 
     # Middleware tenant context
     app.add_middleware(TenantContextMiddleware)
 
+    # Compteurs SQL par requete
+    if settings.QUERY_STATS_ENABLED:
+        app.add_middleware(QueryStatsMiddleware)
+
+    # Latence par route
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+
     # Register custom error handlers
     register_error_handlers(app)
 
@@ -99,6 +206,22 @@ def create_application() -> FastAPI:
             }
         )
 
+    if settings.METRICS_ENABLED:
+        @app.get("/metrics", include_in_schema=False)
+        async def metrics(request: Request):
+            """Metriques Prometheus (latences, pool SQL, caches, requetes SQL), acces interne."""
+            from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+            from app.core.metrics import build_registry
+            from app.db.session import engines
+
+            if not _metrics_allowed(request):
+                return JSONResponse(status_code=404, content={"detail": "Not Found"})
+
+            return Response(
+                content=generate_latest(build_registry(engines)),
+                media_type=CONTENT_TYPE_LATEST
+            )
+
     return app
 
 
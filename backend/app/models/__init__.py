@@ -7,10 +7,12 @@ from app.models.alert_history import AlertHistory
 from app.models.audit_log import AdminAuditLog
 from app.models.base import TenantMixin, TimestampMixin
 from app.models.category import Category
+from app.models.dashboard import DashboardDirtyTenant, DashboardSalesPerformance, DashboardStockHealth
 from app.models.import_job import ImportJob
 from app.models.onboarding import OnboardingSession
 from app.models.product import Product
 from app.models.sale import Sale
+from app.models.sales_archive import SalesArchiveFile
 from app.models.site import Site
 from app.models.stock_movement import StockMovement
 from app.models.supplier import Supplier
@@ -28,9 +30,13 @@ __all__ = [
     "Supplier",
     "Product",
     "Sale",
+    "SalesArchiveFile",
     "StockMovement",
     "Alert",
     "AlertHistory",
+    "DashboardStockHealth",
+    "DashboardSalesPerformance",
+    "DashboardDirtyTenant",
     "OnboardingSession",
     "AdminAuditLog",
     "ImportJob",
@@ -34,8 +34,9 @@ class AlertHistory(Base, TenantMixin, TimestampMixin):
     alert = relationship("Alert", back_populates="history")
 
     __table_args__ = (
-        Index('idx_alert_history_tenant_date', 'tenant_id', 'triggered_at'),
-        Index('idx_alert_history_alert', 'alert_id', 'triggered_at'),
+        # Index keyset (triggered_at, id) pour la pagination par curseur
+        Index('idx_alert_history_tenant_date_id', 'tenant_id', 'triggered_at', 'id'),
+        Index('idx_alert_history_alert_date_id', 'alert_id', 'triggered_at', 'id'),
     )
 
     def __repr__(self) -> str:
@@ -2,7 +2,7 @@
 Modèle AdminAuditLog (logs d'audit pour actions admin critiques).
 """
 from datetime import datetime
-from sqlalchemy import BigInteger, Column, String, Text, TIMESTAMP
+from sqlalchemy import BigInteger, Column, Index, String, Text, TIMESTAMP
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 
 from app.db.base_class import Base
@@ -28,5 +28,11 @@ class AdminAuditLog(Base):
     user_agent = Column(Text, nullable=True)
     created_at = Column(TIMESTAMP, default=datetime.utcnow, nullable=False)
 
+    __table_args__ = (
+        # Index keyset (created_at, id) pour la pagination par curseur
+        Index('idx_audit_created_id', 'created_at', 'id'),
+        Index('idx_audit_admin_created_id', 'admin_user_id', 'created_at', 'id'),
+    )
+
     def __repr__(self) -> str:
         return f"<AdminAuditLog(id={self.id}, action={self.action_type}, entity={self.entity_type})>"
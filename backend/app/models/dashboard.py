@@ -0,0 +1,65 @@
+"""
+Modèles des agrégats du dashboard (un jeu de lignes par tenant).
+"""
+from sqlalchemy import BigInteger, Column, DateTime, Identity, Index, Numeric, func
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+
+
+class DashboardStockHealth(Base):
+    """
+    Modèle DashboardStockHealth - santé du stock d'un tenant.
+
+    Recalculé par fn_refresh_dashboard_aggregates pour les seuls tenants
+    présents dans le journal dashboard_dirty_tenants.
+    """
+
+    __tablename__ = "dashboard_stock_health"
+
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    total_products = Column(BigInteger, nullable=False)
+    rupture_count = Column(BigInteger, nullable=False)
+    low_stock_count = Column(BigInteger, nullable=False)
+    total_stock_value = Column(Numeric)
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<DashboardStockHealth(tenant_id={self.tenant_id}, products={self.total_products})>"
+
+
+class DashboardSalesPerformance(Base):
+    """Modèle DashboardSalesPerformance - ventes d'un tenant par jour (90 derniers jours)."""
+
+    __tablename__ = "dashboard_sales_performance"
+
+    tenant_id = Column(UUID(as_uuid=True), primary_key=True, nullable=False)
+    sale_day = Column(DateTime(timezone=True), primary_key=True, nullable=False)
+    transactions_count = Column(BigInteger, nullable=False)
+    daily_revenue = Column(Numeric)
+    total_units_sold = Column(Numeric)
+
+    def __repr__(self) -> str:
+        return f"<DashboardSalesPerformance(tenant_id={self.tenant_id}, sale_day={self.sale_day})>"
+
+
+class DashboardDirtyTenant(Base):
+    """
+    Modèle DashboardDirtyTenant - journal des écritures sur products / sales.
+
+    Alimenté par trigger (une ligne par tenant et par instruction), vidé
+    par le recalcul des agrégats du tenant.
+    """
+
+    __tablename__ = "dashboard_dirty_tenants"
+
+    id = Column(BigInteger, Identity(), primary_key=True)
+    tenant_id = Column(UUID(as_uuid=True), nullable=False)
+    dirtied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index('idx_dashboard_dirty_tenants_tenant', 'tenant_id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<DashboardDirtyTenant(tenant_id={self.tenant_id}, dirtied_at={self.dirtied_at})>"
@@ -2,7 +2,7 @@
 Modèle Product (produits en stock).
 """
 import uuid
-from sqlalchemy import Boolean, Column, ForeignKey, Index, Numeric, String, Text, UniqueConstraint
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Numeric, String, Text, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 
@@ -33,6 +33,13 @@ class Product(Base, TenantMixin, TimestampMixin):
     min_stock = Column(Numeric(15, 3))
     max_stock = Column(Numeric(15, 3))
 
+    # Métriques de ventes: tenues à jour par trigger (INSERT / UPDATE / DELETE
+    # sur sales), recalculées chaque nuit (fn_refresh_product_sales_metrics)
+    last_sale_at = Column(DateTime(timezone=True))
+    qty_30d = Column(Numeric(15, 3), server_default='0', nullable=False)
+    qty_90d = Column(Numeric(15, 3), server_default='0', nullable=False)
+    revenue_30d = Column(Numeric(15, 2), server_default='0', nullable=False)
+
     # Métadonnées
     description = Column(Text)
     barcode = Column(String(100))
@@ -49,6 +56,7 @@ class Product(Base, TenantMixin, TimestampMixin):
         UniqueConstraint('tenant_id', 'code', name='uq_product_tenant_code'),
         Index('idx_products_tenant_code', 'tenant_id', 'code'),
         Index('idx_products_tenant_active', 'tenant_id', 'is_active'),
+        Index('idx_products_tenant_last_sale', 'tenant_id', 'last_sale_at'),
     )
 
     def __repr__(self) -> str:
@@ -18,7 +18,8 @@ class Sale(Base, TenantMixin, TimestampMixin):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     product_id = Column(UUID(as_uuid=True), ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
 
-    sale_date = Column(DateTime(timezone=True), nullable=False)
+    # Colonne de partitionnement mensuel (fait partie de la clé primaire)
+    sale_date = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     quantity = Column(Numeric(15, 3), nullable=False)
     unit_price = Column(Numeric(15, 2), nullable=False)
     total_amount = Column(Numeric(15, 2), nullable=False)
@@ -35,6 +36,8 @@ class Sale(Base, TenantMixin, TimestampMixin):
     __table_args__ = (
         Index('idx_sales_tenant_date', 'tenant_id', 'sale_date'),
         Index('idx_sales_product_date', 'product_id', 'sale_date'),
+        Index('idx_sales_tenant_updated', 'tenant_id', 'updated_at'),  # Instantanés analytiques incrémentaux
+        {'postgresql_partition_by': 'RANGE (sale_date)'},
     )
 
     def __repr__(self) -> str:
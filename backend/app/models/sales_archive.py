@@ -0,0 +1,35 @@
+"""
+Modèle SalesArchiveFile (catalogue des ventes archivées en Parquet).
+"""
+import uuid
+from sqlalchemy import BigInteger, Column, Date, Index, Integer, String
+from sqlalchemy.dialects.postgresql import UUID
+
+from app.db.base_class import Base
+from app.models.base import TenantMixin, TimestampMixin
+
+
+class SalesArchiveFile(Base, TenantMixin, TimestampMixin):
+    """
+    Modèle SalesArchiveFile - un fichier Parquet par tenant et par mois archivé.
+
+    Les ventes d'un mois archivé ne sont plus dans la table sales: les
+    rapports et analyses qui couvrent ce mois lisent ces fichiers
+    (voir app.db.sales_archive).
+    """
+
+    __tablename__ = "sales_archive_files"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
+    month = Column(Date, nullable=False)  # Premier jour du mois archivé
+    uri = Column(String(1024), nullable=False)  # Chemin local ou s3://...
+    row_count = Column(Integer, nullable=False)
+    size_bytes = Column(BigInteger, nullable=False)
+
+    __table_args__ = (
+        Index('idx_sales_archive_files_tenant_month', 'tenant_id', 'month', unique=True),
+        Index('idx_sales_archive_files_month', 'month'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SalesArchiveFile(tenant_id={self.tenant_id}, month={self.month}, rows={self.row_count})>"
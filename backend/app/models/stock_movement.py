@@ -18,7 +18,8 @@ class StockMovement(Base, TenantMixin, TimestampMixin):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, nullable=False)
     product_id = Column(UUID(as_uuid=True), ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
 
-    movement_date = Column(DateTime(timezone=True), nullable=False)
+    # Colonne de partitionnement mensuel (fait partie de la clé primaire)
+    movement_date = Column(DateTime(timezone=True), primary_key=True, nullable=False)
     movement_type = Column(String(50), nullable=False)  # ENTRY, EXIT, ADJUSTMENT
     quantity = Column(Numeric(15, 3), nullable=False)
 
@@ -33,6 +34,7 @@ class StockMovement(Base, TenantMixin, TimestampMixin):
     __table_args__ = (
         Index('idx_stock_movements_tenant_date', 'tenant_id', 'movement_date'),
         Index('idx_stock_movements_product_date', 'product_id', 'movement_date'),
+        {'postgresql_partition_by': 'RANGE (movement_date)'},
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,40 @@
+"""
+Schémas Pydantic pour la génération asynchrone de rapports.
+"""
+from datetime import date
+from typing import Literal, Optional
+
+from pydantic import BaseModel, Field, model_validator
+
+
+ReportType = Literal["inventory_excel", "sales_analysis_excel", "monthly_summary_pdf"]
+
+
+class ReportJobCreate(BaseModel):
+    """Demande de génération d'un rapport en arrière-plan."""
+    report_type: ReportType = Field(..., description="Type de rapport")
+    start_date: Optional[date] = Field(None, description="Début de période (sales_analysis_excel)")
+    end_date: Optional[date] = Field(None, description="Fin de période (sales_analysis_excel)")
+    year: Optional[int] = Field(None, description="Année (monthly_summary_pdf)")
+    month: Optional[int] = Field(None, ge=1, le=12, description="Mois 1-12 (monthly_summary_pdf)")
+
+    @model_validator(mode='after')
+    def check_period(self):
+        """Vérifier que la période correspond au type de rapport."""
+        if self.report_type == "sales_analysis_excel":
+            if self.start_date is None or self.end_date is None:
+                raise ValueError("start_date et end_date sont requis pour sales_analysis_excel")
+            if self.start_date > self.end_date:
+                raise ValueError("start_date doit précéder end_date")
+        if self.report_type == "monthly_summary_pdf" and (self.year is None or self.month is None):
+            raise ValueError("year et month sont requis pour monthly_summary_pdf")
+        return self
+
+
+class ReportJobResponse(BaseModel):
+    """Statut d'un job de rapport."""
+    job_id: Optional[str] = Field(None, description="ID du job Celery (absent si servi depuis le cache)")
+    status: str = Field(..., description="pending, running, ready, failed")
+    artifact_key: Optional[str] = None
+    download_url: Optional[str] = None
+    error: Optional[str] = None
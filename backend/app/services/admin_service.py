@@ -8,13 +8,14 @@ Ce service fournit des fonctions utilitaires pour:
 """
 import logging
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Tuple
 from uuid import UUID
 
 from sqlalchemy.orm import Session
 
 from app.models.audit_log import AdminAuditLog
 from app.models.user import User
+from app.utils.pagination import paginate_keyset
 
 logger = logging.getLogger(__name__)
 
@@ -103,18 +104,26 @@ class AdminService:
         action_type: Optional[str] = None,
         entity_type: Optional[str] = None,
         limit: int = 100,
-    ) -> list[AdminAuditLog]:
+        cursor: Optional[str] = None,
+    ) -> Tuple[list[AdminAuditLog], Optional[str]]:
         """
         Récupérer les logs d'audit admin avec filtres optionnels.
 
+        Pagination par curseur sur (created_at, id), du plus récent au plus
+        ancien: chaque page coûte le même prix quelle que soit sa profondeur.
+
         Args:
             admin_user_id: Filtrer par admin
             action_type: Filtrer par type d'action
             entity_type: Filtrer par type d'entité
             limit: Nombre maximum de logs à retourner
+            cursor: Curseur opaque renvoyé par l'appel précédent
 
         Returns:
-            Liste de logs d'audit
+            Tuple (liste de logs d'audit, curseur de la page suivante ou None)
+
+        Raises:
+            InvalidCursorError: Si le curseur est invalide
         """
         query = self.db.query(AdminAuditLog)
 
@@ -127,7 +136,13 @@ class AdminService:
         if entity_type:
             query = query.filter(AdminAuditLog.entity_type == entity_type)
 
-        return query.order_by(AdminAuditLog.created_at.desc()).limit(limit).all()
+        return paginate_keyset(
+            query,
+            AdminAuditLog.created_at,
+            AdminAuditLog.id,
+            limit=limit,
+            cursor=cursor,
+        )
 
     def verify_tenant_exists(self, tenant_id: UUID) -> bool:
         """
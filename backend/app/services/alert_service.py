@@ -6,9 +6,10 @@ from datetime import datetime, timedelta
 from typing import Any, Dict, List
 from uuid import UUID
 
-from sqlalchemy import and_, text
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 
+from app.db.prepared import prepared_query
 from app.models.alert import Alert
 from app.models.alert_history import AlertHistory
 from app.models.product import Product
@@ -208,16 +209,16 @@ class AlertService:
         threshold = conditions.get("threshold", 90)  # Seuil par défaut 90%
 
         # Calculer taux de service sur les 7 derniers jours
-        query = text("""
+        query = prepared_query("alert_taux_service", """
             SELECT
                 COUNT(*) as total,
                 COUNT(CASE WHEN status = 'DELIVERED' THEN 1 END) as delivered
             FROM sales
-            WHERE tenant_id = :tenant_id
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
                 AND sale_date >= CURRENT_DATE - INTERVAL '7 days'
         """)
 
-        result = self.db.execute(query, {"tenant_id": alert.tenant_id}).first()
+        result = query.execute(self.db, {"tenant_id": str(alert.tenant_id)}).first()
 
         if not result or result.total == 0:
             return {"triggered": False, "products": []}
@@ -9,12 +9,15 @@ Ce service fournit des analyses avancées sur les produits, ventes et catégorie
 - Classification ABC des produits
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import text, func, and_
+from sqlalchemy import func, and_, literal_column
 from uuid import UUID
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
 
+from app.db.analytics_store import usable_snapshot
+from app.db.prepared import PreparedQuery, prepared_query
+from app.db.sales_archive import include_archived_sales
 from app.models.product import Product
 from app.models.sale import Sale
 from app.models.category import Category
@@ -26,6 +29,27 @@ class AnalyticsService:
     def __init__(self, db: Session):
         self.db = db
 
+    def _fetch_period(
+        self,
+        query: PreparedQuery,
+        params: Dict[str, Any],
+        tenant_id: UUID,
+        start_date: datetime
+    ) -> List[Any]:
+        """
+        Exécuter une requête d'analyse portant sur les ventes depuis `start_date`.
+
+        Servie par l'instantané en colonnes du tenant s'il existe et est
+        frais (gros tenants), sinon par PostgreSQL, mois archivés inclus.
+        """
+        snapshot = usable_snapshot(tenant_id, start_date)
+        if snapshot is not None:
+            return snapshot.execute(query, params)
+
+        # Période pouvant couvrir des mois archivés en Parquet
+        with include_archived_sales(self.db, tenant_id, start_date, datetime.utcnow()):
+            return query.execute(self.db, params).fetchall()
+
     def get_product_analysis(
         self,
         tenant_id: UUID,
@@ -49,24 +73,14 @@ class AnalyticsService:
         if not product:
             return None
 
-        # Ventes 30 derniers jours
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        sales_30d = self.db.query(
-            func.count(Sale.id).label('count'),
-            func.sum(Sale.quantity).label('total_quantity'),
-            func.sum(Sale.total_amount).label('total_revenue')
-        ).filter(
-            and_(
-                Sale.product_id == product_id,
-                Sale.sale_date >= thirty_days_ago
-            )
-        ).first()
-
-        # Ventes 90 derniers jours
-        ninety_days_ago = datetime.utcnow() - timedelta(days=90)
-        sales_90d = self.db.query(
-            func.count(Sale.id).label('count'),
-            func.sum(Sale.quantity).label('total_quantity')
+        # Quantités et CA: métriques tenues à jour sur le produit (fenêtres
+        # depuis CURRENT_DATE - 30/90 jours). Seul le nombre de transactions
+        # est compté, sur l'index (product_id, sale_date).
+        thirty_days_ago = literal_column("CURRENT_DATE - INTERVAL '30 days'")
+        ninety_days_ago = literal_column("CURRENT_DATE - INTERVAL '90 days'")
+        transactions = self.db.query(
+            func.count(Sale.id).filter(Sale.sale_date >= thirty_days_ago).label('count_30d'),
+            func.count(Sale.id).label('count_90d')
         ).filter(
             and_(
                 Sale.product_id == product_id,
@@ -75,8 +89,8 @@ class AnalyticsService:
         ).first()
 
         # Calcul métriques
-        avg_daily_sales_30d = float(sales_30d.total_quantity or 0) / 30
-        avg_daily_sales_90d = float(sales_90d.total_quantity or 0) / 90
+        avg_daily_sales_30d = float(product.qty_30d or 0) / 30
+        avg_daily_sales_90d = float(product.qty_90d or 0) / 90
 
         # Couverture stock (jours)
         coverage_days = None
@@ -106,14 +120,14 @@ class AnalyticsService:
             },
             "sales": {
                 "last_30_days": {
-                    "transactions": sales_30d.count or 0,
-                    "quantity": float(sales_30d.total_quantity or 0),
-                    "revenue": float(sales_30d.total_revenue or 0),
+                    "transactions": transactions.count_30d or 0,
+                    "quantity": float(product.qty_30d or 0),
+                    "revenue": float(product.revenue_30d or 0),
                     "avg_daily": round(avg_daily_sales_30d, 2)
                 },
                 "last_90_days": {
-                    "transactions": sales_90d.count or 0,
-                    "quantity": float(sales_90d.total_quantity or 0),
+                    "transactions": transactions.count_90d or 0,
+                    "quantity": float(product.qty_90d or 0),
                     "avg_daily": round(avg_daily_sales_90d, 2)
                 }
             },
@@ -159,23 +173,23 @@ class AnalyticsService:
         """
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        query = text("""
+        query = prepared_query("analytics_sales_evolution", """
             SELECT
                 DATE(sale_date) as date,
                 COUNT(*) as transactions,
                 SUM(total_amount) as revenue,
                 SUM(quantity) as units_sold
             FROM sales
-            WHERE tenant_id = :tenant_id
-                AND sale_date >= :start_date
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+                AND sale_date >= CAST(:start_date AS timestamp)
             GROUP BY DATE(sale_date)
             ORDER BY date ASC
         """)
 
-        results = self.db.execute(query, {
+        results = self._fetch_period(query, {
             "tenant_id": str(tenant_id),
             "start_date": start_date
-        }).fetchall()
+        }, tenant_id, start_date)
 
         return [
             {
@@ -205,13 +219,17 @@ class AnalyticsService:
         """
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        order_clause = {
+        order_clauses = {
             "revenue": "SUM(s.total_amount) DESC",
             "quantity": "SUM(s.quantity) DESC",
             "transactions": "COUNT(s.id) DESC"
-        }.get(order_by, "SUM(s.total_amount) DESC")
+        }
+        if order_by not in order_clauses:
+            order_by = "revenue"
+        order_clause = order_clauses[order_by]
 
-        query = text(f"""
+        # Une requête préparée par critère de tri
+        query = prepared_query(f"analytics_top_products_{order_by}", f"""
             SELECT
                 p.id,
                 p.code,
@@ -226,20 +244,20 @@ class AnalyticsService:
                 SUM(s.total_amount) as revenue,
                 AVG(s.unit_price) as avg_price
             FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= :start_date
+            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= CAST(:start_date AS timestamp)
             LEFT JOIN categories c ON p.category_id = c.id
-            WHERE p.tenant_id = :tenant_id
+            WHERE p.tenant_id = CAST(:tenant_id AS uuid)
                 AND s.id IS NOT NULL
             GROUP BY p.id, p.code, p.name, p.unit, p.current_stock, p.min_stock, p.max_stock, c.name
             ORDER BY {order_clause}
-            LIMIT :limit
+            LIMIT CAST(:limit AS integer)
         """)
 
-        results = self.db.execute(query, {
+        results = self._fetch_period(query, {
             "tenant_id": str(tenant_id),
             "start_date": start_date,
             "limit": limit
-        }).fetchall()
+        }, tenant_id, start_date)
 
         products_with_status = []
         for row in results:
@@ -309,7 +327,7 @@ class AnalyticsService:
         """
         start_date = datetime.utcnow() - timedelta(days=days)
 
-        query = text("""
+        query = prepared_query("analytics_category_performance", """
             SELECT
                 c.id,
                 c.name,
@@ -320,16 +338,16 @@ class AnalyticsService:
                 AVG(s.unit_price) as avg_price
             FROM categories c
             LEFT JOIN products p ON c.id = p.category_id
-            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= :start_date
-            WHERE c.tenant_id = :tenant_id
+            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= CAST(:start_date AS timestamp)
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
             GROUP BY c.id, c.name
             ORDER BY revenue DESC NULLS LAST
         """)
 
-        results = self.db.execute(query, {
+        results = self._fetch_period(query, {
             "tenant_id": str(tenant_id),
             "start_date": start_date
-        }).fetchall()
+        }, tenant_id, start_date)
 
         return [
             {
@@ -362,23 +380,23 @@ class AnalyticsService:
         start_date = datetime.utcnow() - timedelta(days=days)
 
         # Récupérer tous produits avec CA
-        query = text("""
+        query = prepared_query("analytics_abc_classification", """
             SELECT
                 p.id,
                 p.name,
                 COALESCE(SUM(s.total_amount), 0) as revenue
             FROM products p
-            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= :start_date
-            WHERE p.tenant_id = :tenant_id
+            LEFT JOIN sales s ON p.id = s.product_id AND s.sale_date >= CAST(:start_date AS timestamp)
+            WHERE p.tenant_id = CAST(:tenant_id AS uuid)
                 AND p.is_active = TRUE
             GROUP BY p.id, p.name
             ORDER BY revenue DESC
         """)
 
-        results = self.db.execute(query, {
+        results = self._fetch_period(query, {
             "tenant_id": str(tenant_id),
             "start_date": start_date
-        }).fetchall()
+        }, tenant_id, start_date)
 
         if not results:
             return {"A": [], "B": [], "C": []}
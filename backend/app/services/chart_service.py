@@ -0,0 +1,201 @@
+"""
+Service de rendu des graphiques des rapports PDF.
+
+Utilise l'API objet de matplotlib (Figure + canvas Agg) au lieu de
+pyplot: aucun état global n'est partagé, chaque thread possède ses
+propres figures réutilisées d'un rendu à l'autre. Les fonctions
+publiques prennent et renvoient des types simples (listes, bytes) et
+peuvent donc être appelées depuis un ThreadPoolExecutor comme depuis
+un ProcessPoolExecutor.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import date
+from io import BytesIO
+from typing import Dict, Optional, Sequence, Tuple
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.font_manager import FontProperties
+from matplotlib.ticker import FuncFormatter
+
+from app.config import settings
+from app.core.metrics import record_cache_access
+
+PRIMARY_COLOR = '#4F46E5'
+
+# Gabarits de figures (taille en pouces, résolution PNG)
+LINE_CHART_TEMPLATE: Dict[str, object] = {"figsize": (12, 6), "dpi": 150}
+
+# Polices partagées (immuables une fois créées)
+_LABEL_FONT = FontProperties(size=12)
+
+# Figures réutilisées, une série par thread (Figure n'est pas thread-safe)
+_thread_state = threading.local()
+
+
+class ChartCache:
+    """
+    Cache LRU des images rendues, partagé entre threads.
+
+    La clé est une empreinte des données et des options du graphique:
+    deux rapports avec la même série réutilisent le même PNG.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Initialiser le cache.
+
+        Args:
+            max_size: Nombre maximum d'images conservées (0 désactive le cache)
+        """
+        self.max_size = max_size
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Récupérer une image (et la marquer comme récente)."""
+        with self._lock:
+            png = self._items.get(key)
+            if png is not None:
+                self._items.move_to_end(key)
+        record_cache_access("chart", png is not None)
+        return png
+
+    def set(self, key: str, png: bytes) -> None:
+        """Enregistrer une image en évinçant la plus ancienne si besoin."""
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = png
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vider le cache."""
+        with self._lock:
+            self._items.clear()
+
+
+chart_cache = ChartCache(settings.CHART_CACHE_SIZE)
+
+
+def _format_amount(value, tick_number) -> str:
+    """Formater un montant de l'axe Y (K, M)."""
+    if value >= 1000000:
+        return f'{int(value/1000000)}M'
+    elif value >= 1000:
+        return f'{int(value/1000)}K'
+    return f'{int(value)}'
+
+
+def _get_figure(figsize: Tuple[float, float]) -> Figure:
+    """
+    Récupérer la figure du thread courant pour un gabarit donné.
+
+    La figure et son canvas Agg sont créés au premier appel puis
+    simplement vidés aux appels suivants.
+
+    Args:
+        figsize: Taille de la figure (pouces)
+
+    Returns:
+        Figure vide prête à dessiner
+    """
+    figures = getattr(_thread_state, "figures", None)
+    if figures is None:
+        figures = _thread_state.figures = {}
+
+    fig = figures.get(figsize)
+    if fig is None:
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        figures[figsize] = fig
+    else:
+        fig.clear()
+
+    return fig
+
+
+def _series_key(kind: str, labels: Sequence, values: Sequence[float], options: Dict) -> str:
+    """Empreinte d'une série et de ses options de rendu."""
+    payload = json.dumps(
+        [kind, [str(label) for label in labels], [float(v) for v in values], options],
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def render_line_chart(
+    dates: Sequence[date],
+    values: Sequence[float],
+    xlabel: str = 'Date',
+    ylabel: str = 'CA (FCFA)',
+    use_cache: bool = True,
+) -> bytes:
+    """
+    Rendre une courbe temporelle en PNG.
+
+    Args:
+        dates: Abscisses (dates)
+        values: Ordonnées (montants)
+        xlabel: Libellé de l'axe X
+        ylabel: Libellé de l'axe Y
+        use_cache: Réutiliser un rendu identique déjà en cache
+
+    Returns:
+        Image PNG (bytes)
+    """
+    key = None
+    if use_cache:
+        key = _series_key("line", dates, values, {"xlabel": xlabel, "ylabel": ylabel})
+        cached = chart_cache.get(key)
+        if cached is not None:
+            return cached
+
+    fig = _get_figure(LINE_CHART_TEMPLATE["figsize"])
+    ax = fig.add_subplot()
+
+    ax.plot(list(dates), list(values), marker='o', linewidth=2, color=PRIMARY_COLOR, markersize=6)
+    ax.set_xlabel(xlabel, fontproperties=_LABEL_FONT)
+    ax.set_ylabel(ylabel, fontproperties=_LABEL_FONT)
+    ax.grid(True, alpha=0.3)
+    ax.ticklabel_format(style='plain', axis='y')
+
+    # Formater axe Y
+    ax.yaxis.set_major_formatter(FuncFormatter(_format_amount))
+
+    # Rotation labels dates
+    fig.autofmt_xdate(rotation=45, ha='right')
+    fig.tight_layout()
+
+    img_buffer = BytesIO()
+    fig.savefig(img_buffer, format='png', dpi=LINE_CHART_TEMPLATE["dpi"], bbox_inches='tight')
+    png = img_buffer.getvalue()
+
+    if key is not None:
+        chart_cache.set(key, png)
+
+    return png
+
+
+def render_daily_revenue_chart(
+    dates: Sequence[date],
+    revenues: Sequence[float],
+    use_cache: bool = True,
+) -> bytes:
+    """
+    Rendre le graphique d'évolution du CA quotidien (synthèse mensuelle).
+
+    Args:
+        dates: Jours de la période
+        revenues: CA de chaque jour
+        use_cache: Réutiliser un rendu identique déjà en cache
+
+    Returns:
+        Image PNG (bytes)
+    """
+    return render_line_chart(dates, revenues, xlabel='Date', ylabel='CA (FCFA)', use_cache=use_cache)
@@ -4,9 +4,82 @@ Service pour les dashboards et KPIs.
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from uuid import UUID
-from typing import Dict, Any, List
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 from decimal import Decimal
+import json
+
+from app.config import settings
+from app.db.prepared import prepared_query
+
+
+# Vue d'ensemble en un seul aller-retour: les cinq blocs du dashboard
+# (mêmes requêtes que les méthodes _get_*) agrégés en un document JSON
+OVERVIEW_QUERY = """
+    WITH stock AS (
+        SELECT
+            total_products,
+            rupture_count,
+            low_stock_count,
+            total_stock_value
+        FROM dashboard_stock_health
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+    ),
+    performance AS (
+        SELECT
+            SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '7 days' THEN daily_revenue ELSE 0 END) as ca_7j,
+            SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '30 days' THEN daily_revenue ELSE 0 END) as ca_30j,
+            SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '7 days' THEN transactions_count ELSE 0 END) as ventes_7j,
+            SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '30 days' THEN transactions_count ELSE 0 END) as ventes_30j,
+            SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '14 days' AND sale_day < CURRENT_DATE - INTERVAL '7 days' THEN daily_revenue ELSE 0 END) as ca_7j_previous
+        FROM dashboard_sales_performance
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+    ),
+    top_products AS (
+        SELECT
+            p.id,
+            p.name,
+            p.code,
+            SUM(s.total_amount) as total_revenue,
+            SUM(s.quantity) as total_quantity
+        FROM sales s
+        JOIN products p ON s.product_id = p.id
+        WHERE s.tenant_id = CAST(:tenant_id AS uuid)
+            AND s.sale_date >= CURRENT_DATE - INTERVAL '30 days'
+        GROUP BY p.id, p.name, p.code
+        ORDER BY total_revenue DESC
+        LIMIT CAST(:limit AS integer)
+    ),
+    dormant_products AS (
+        SELECT
+            p.id,
+            p.name,
+            p.code,
+            p.current_stock,
+            p.purchase_price
+        FROM products p
+        WHERE p.tenant_id = CAST(:tenant_id AS uuid)
+            AND p.is_active = TRUE
+            AND p.current_stock > 0
+            AND (p.last_sale_at IS NULL OR p.last_sale_at < CURRENT_DATE - INTERVAL '30 days')
+        ORDER BY (p.current_stock * p.purchase_price) DESC
+        LIMIT CAST(:limit AS integer)
+    )
+    SELECT json_build_object(
+        'stock_health', (SELECT row_to_json(stock) FROM stock),
+        'sales_performance', (SELECT row_to_json(performance) FROM performance),
+        'top_products', (
+            SELECT COALESCE(json_agg(t ORDER BY t.total_revenue DESC), '[]'::json)
+            FROM top_products t
+        ),
+        'dormant_products', (
+            SELECT COALESCE(json_agg(d ORDER BY d.current_stock * d.purchase_price DESC), '[]'::json)
+            FROM dormant_products d
+        ),
+        'taux_service', fn_calc_taux_service(CAST(:tenant_id AS uuid), 30)
+    )::text as overview
+"""
 
 
 class DashboardService:
@@ -25,6 +98,9 @@ class DashboardService:
         Returns:
             Dict contenant toutes les donnees du dashboard
         """
+        if settings.DASHBOARD_OVERVIEW_SINGLE_QUERY:
+            return self._get_overview_single_query(tenant_id, limit=5)
+
         return {
             "stock_health": self._get_stock_health(tenant_id),
             "sales_performance": self._get_sales_performance(tenant_id),
@@ -36,9 +112,42 @@ class DashboardService:
             "generated_at": datetime.utcnow().isoformat()
         }
 
+    def _get_overview_single_query(self, tenant_id: UUID, limit: int = 5) -> Dict[str, Any]:
+        """
+        Vue d'ensemble en une seule requête (un aller-retour réseau).
+
+        Le document JSON est relu avec des Decimal (comme les lignes des
+        requêtes séparées): la mise en forme est partagée et la réponse
+        identique.
+
+        Args:
+            tenant_id: UUID du tenant
+            limit: Nombre de produits top / dormants
+
+        Returns:
+            Dict contenant toutes les donnees du dashboard
+        """
+        query = prepared_query("dashboard_overview", OVERVIEW_QUERY)
+        document = query.execute(self.db, {"tenant_id": str(tenant_id), "limit": limit}).scalar()
+        overview = json.loads(document, parse_float=Decimal)
+
+        def as_row(values: Optional[Dict[str, Any]]) -> Optional[SimpleNamespace]:
+            return SimpleNamespace(**values) if values is not None else None
+
+        return {
+            "stock_health": self._format_stock_health(as_row(overview["stock_health"])),
+            "sales_performance": self._format_sales_performance(as_row(overview["sales_performance"])),
+            "top_products": self._format_top_products([as_row(row) for row in overview["top_products"]]),
+            "dormant_products": self._format_dormant_products([as_row(row) for row in overview["dormant_products"]]),
+            "kpis": {
+                "taux_service": self._format_taux_service(overview["taux_service"])
+            },
+            "generated_at": datetime.utcnow().isoformat()
+        }
+
     def _get_stock_health(self, tenant_id: UUID) -> Dict[str, Any]:
         """
-        Sante stock depuis vue materialisee.
+        Sante stock depuis les agregats du tenant.
 
         Args:
             tenant_id: UUID du tenant
@@ -46,18 +155,20 @@ class DashboardService:
         Returns:
             Dict avec total_products, rupture_count, low_stock_count, etc.
         """
-        query = text("""
+        query = prepared_query("dashboard_stock_health", """
             SELECT
                 total_products,
                 rupture_count,
                 low_stock_count,
                 total_stock_value
-            FROM mv_dashboard_stock_health
-            WHERE tenant_id = :tenant_id
+            FROM dashboard_stock_health
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
         """)
 
-        result = self.db.execute(query, {"tenant_id": str(tenant_id)}).first()
+        result = query.execute(self.db, {"tenant_id": str(tenant_id)}).first()
+        return self._format_stock_health(result)
 
+    def _format_stock_health(self, result: Any) -> Dict[str, Any]:
         if not result:
             return {
                 "total_products": 0,
@@ -85,19 +196,21 @@ class DashboardService:
         Returns:
             Dict avec CA 7j, CA 30j, evolution, nombre ventes
         """
-        query = text("""
+        query = prepared_query("dashboard_sales_performance", """
             SELECT
                 SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '7 days' THEN daily_revenue ELSE 0 END) as ca_7j,
                 SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '30 days' THEN daily_revenue ELSE 0 END) as ca_30j,
                 SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '7 days' THEN transactions_count ELSE 0 END) as ventes_7j,
                 SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '30 days' THEN transactions_count ELSE 0 END) as ventes_30j,
                 SUM(CASE WHEN sale_day >= CURRENT_DATE - INTERVAL '14 days' AND sale_day < CURRENT_DATE - INTERVAL '7 days' THEN daily_revenue ELSE 0 END) as ca_7j_previous
-            FROM mv_dashboard_sales_performance
-            WHERE tenant_id = :tenant_id
+            FROM dashboard_sales_performance
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
         """)
 
-        result = self.db.execute(query, {"tenant_id": str(tenant_id)}).first()
+        result = query.execute(self.db, {"tenant_id": str(tenant_id)}).first()
+        return self._format_sales_performance(result)
 
+    def _format_sales_performance(self, result: Any) -> Dict[str, Any]:
         if not result:
             return {
                 "ca_7j": 0.0,
@@ -135,7 +248,7 @@ class DashboardService:
         Returns:
             Liste des top produits
         """
-        query = text("""
+        query = prepared_query("dashboard_top_products", """
             SELECT
                 p.id,
                 p.name,
@@ -144,18 +257,20 @@ class DashboardService:
                 SUM(s.quantity) as total_quantity
             FROM sales s
             JOIN products p ON s.product_id = p.id
-            WHERE s.tenant_id = :tenant_id
+            WHERE s.tenant_id = CAST(:tenant_id AS uuid)
                 AND s.sale_date >= CURRENT_DATE - INTERVAL '30 days'
             GROUP BY p.id, p.name, p.code
             ORDER BY total_revenue DESC
-            LIMIT :limit
+            LIMIT CAST(:limit AS integer)
         """)
 
-        results = self.db.execute(
-            query,
+        results = query.execute(
+            self.db,
             {"tenant_id": str(tenant_id), "limit": limit}
         ).fetchall()
+        return self._format_top_products(results)
 
+    def _format_top_products(self, results: List[Any]) -> List[Dict[str, Any]]:
         return [
             {
                 "product_id": str(row.id),
@@ -178,7 +293,7 @@ class DashboardService:
         Returns:
             Liste des produits dormants
         """
-        query = text("""
+        query = prepared_query("dashboard_dormant_products", """
             SELECT
                 p.id,
                 p.name,
@@ -186,23 +301,21 @@ class DashboardService:
                 p.current_stock,
                 p.purchase_price
             FROM products p
-            WHERE p.tenant_id = :tenant_id
+            WHERE p.tenant_id = CAST(:tenant_id AS uuid)
                 AND p.is_active = TRUE
                 AND p.current_stock > 0
-                AND NOT EXISTS (
-                    SELECT 1 FROM sales s
-                    WHERE s.product_id = p.id
-                        AND s.sale_date >= CURRENT_DATE - INTERVAL '30 days'
-                )
+                AND (p.last_sale_at IS NULL OR p.last_sale_at < CURRENT_DATE - INTERVAL '30 days')
             ORDER BY (p.current_stock * p.purchase_price) DESC
-            LIMIT :limit
+            LIMIT CAST(:limit AS integer)
         """)
 
-        results = self.db.execute(
-            query,
+        results = query.execute(
+            self.db,
             {"tenant_id": str(tenant_id), "limit": limit}
         ).fetchall()
+        return self._format_dormant_products(results)
 
+    def _format_dormant_products(self, results: List[Any]) -> List[Dict[str, Any]]:
         return [
             {
                 "product_id": str(row.id),
@@ -224,20 +337,55 @@ class DashboardService:
         Returns:
             Taux de service en pourcentage
         """
-        query = text("SELECT fn_calc_taux_service(:tenant_id, 30)")
-        result = self.db.execute(query, {"tenant_id": str(tenant_id)}).scalar()
+        query = prepared_query("dashboard_taux_service", "SELECT fn_calc_taux_service(CAST(:tenant_id AS uuid), 30)")
+        result = query.execute(self.db, {"tenant_id": str(tenant_id)}).scalar()
+        return self._format_taux_service(result)
+
+    def _format_taux_service(self, result: Any) -> float:
         return float(result or 100.0)
 
-    def refresh_views(self) -> Dict[str, str]:
+    def dirty_tenant_ids(self) -> List[UUID]:
         """
-        Rafraichir les vues materialisees.
+        Tenants ayant eu des ecritures products / sales depuis leur dernier recalcul.
+
+        Returns:
+            Liste des tenants a recalculer (vide: rien n'a change)
+        """
+        return [
+            tenant_id for (tenant_id,) in self.db.execute(
+                text("SELECT DISTINCT tenant_id FROM dashboard_dirty_tenants")
+            )
+        ]
+
+    def refresh_tenant_aggregates(self, tenant_id: UUID) -> None:
+        """
+        Recalculer les agregats d'un tenant et consommer ses marques du journal.
+
+        Le commit reste a la charge de l'appelant.
+        """
+        self.db.execute(
+            text("SELECT fn_refresh_dashboard_aggregates(:tenant_id)"),
+            {"tenant_id": str(tenant_id)}
+        )
+
+    def refresh_views(self, tenant_id: Optional[UUID] = None) -> Dict[str, str]:
+        """
+        Rafraichir les agregats du dashboard sans attendre la tache periodique.
+
+        Args:
+            tenant_id: Tenant a recalculer (defaut: tous les tenants)
 
         Returns:
             Dict avec statut du rafraichissement
         """
         try:
-            self.db.execute(text("REFRESH MATERIALIZED VIEW mv_dashboard_stock_health"))
-            self.db.execute(text("REFRESH MATERIALIZED VIEW mv_dashboard_sales_performance"))
+            if tenant_id is None:
+                tenant_ids = [t for (t,) in self.db.execute(text("SELECT id FROM tenants"))]
+            else:
+                tenant_ids = [tenant_id]
+
+            for refreshed_tenant_id in tenant_ids:
+                self.refresh_tenant_aggregates(refreshed_tenant_id)
             self.db.commit()
             return {"status": "success", "message": "Vues rafraichies"}
         except Exception as e:
@@ -5,13 +5,14 @@ Sprint 2: Validation complète de fichiers Excel avec Pandas.
 """
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from uuid import UUID
 
-import pandas as pd
-from openpyxl import load_workbook
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 from app.models.category import Category
 from app.models.product import Product
 from app.models.supplier import Supplier
@@ -53,6 +54,9 @@ class ImportService:
         Returns:
             Tuple (is_valid, report)
         """
+        import pandas as pd
+        from openpyxl import load_workbook
+
         errors = []
         warnings = []
         stats = {}
@@ -125,9 +129,11 @@ class ImportService:
             return False, self._generate_report(False, errors, warnings, stats)
 
     def _validate_products(
-        self, df: pd.DataFrame, tenant_id: UUID
+        self, df: "pd.DataFrame", tenant_id: UUID
     ) -> Tuple[List[Dict], List[Dict]]:
         """Valider données produits."""
+        import pandas as pd
+
         errors = []
         warnings = []
 
@@ -226,9 +232,11 @@ class ImportService:
         return errors, warnings
 
     def _validate_sales(
-        self, df_sales: pd.DataFrame, df_products: pd.DataFrame
+        self, df_sales: "pd.DataFrame", df_products: "pd.DataFrame"
     ) -> Tuple[List[Dict], List[Dict]]:
         """Valider données ventes."""
+        import pandas as pd
+
         errors = []
         warnings = []
 
@@ -6,10 +6,10 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from uuid import UUID
 
-from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 
+from app.core.security import hash_passwords
 from app.models.audit_log import AdminAuditLog
 from app.models.onboarding import OnboardingSession
 from app.models.site import Site
@@ -23,7 +23,6 @@ from app.schemas.onboarding import (
 )
 
 logger = logging.getLogger(__name__)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 class OnboardingService:
@@ -179,10 +178,11 @@ class OnboardingService:
 
         created_users = []
 
+        # Hasher les mots de passe par défaut en parallèle (pool bcrypt)
+        hashed_passwords = hash_passwords([u.default_password for u in users_data])
+
         try:
-            for user_data in users_data:
-                # Hasher le mot de passe par défaut
-                hashed_password = pwd_context.hash(user_data.default_password)
+            for user_data, hashed_password in zip(users_data, hashed_passwords):
 
                 # Créer user
                 user = User(
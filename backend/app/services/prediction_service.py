@@ -174,12 +174,19 @@ class PredictionService:
 
         Retourne une liste triée par urgence (date de rupture proche).
         """
-        # Récupérer tous produits actifs avec stock > 0
+        # Produits actifs avec stock > 0 pouvant tomber en rupture dans l'horizon.
+        # Préfiltre sur qty_30d (fenêtre depuis CURRENT_DATE - 30 jours, qui
+        # contient celle de predict_rupture_date): la moyenne par jour de vente
+        # vaut au plus qty_30d, donc un stock supérieur à horizon × qty_30d
+        # (ou aucune vente) ne peut pas donner de rupture retenue.
+        max_days = min(horizon_days, 30)
         products = self.db.query(Product).filter(
             and_(
                 Product.tenant_id == tenant_id,
                 Product.is_active == True,
-                Product.current_stock > 0
+                Product.current_stock > 0,
+                Product.qty_30d > 0,
+                Product.current_stock <= Product.qty_30d * max_days
             )
         ).all()
 
@@ -0,0 +1,441 @@
+"""
+Service de cache des rapports générés (artefacts adressés par contenu).
+
+Chaque rapport est rangé sous une clé dérivée de
+(tenant, type de rapport, période, version des données). Tant que les
+données sources ne changent pas, la même clé est recalculée et le fichier
+déjà produit est servi sans régénération. Les mois clôturés ont une
+version fixe: leurs rapports ne sont jamais reconstruits.
+"""
+import calendar
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.core.metrics import record_cache_access
+
+logger = logging.getLogger(__name__)
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+PDF_MEDIA_TYPE = "application/pdf"
+
+# Types de rapports pris en charge par le cache
+REPORT_TYPES: Dict[str, Dict[str, str]] = {
+    "inventory_excel": {"media_type": XLSX_MEDIA_TYPE, "extension": "xlsx"},
+    "sales_analysis_excel": {"media_type": XLSX_MEDIA_TYPE, "extension": "xlsx"},
+    "monthly_summary_pdf": {"media_type": PDF_MEDIA_TYPE, "extension": "pdf"},
+}
+
+# Version attribuée aux périodes clôturées (données figées)
+CLOSED_PERIOD_VERSION = "closed"
+
+ARTIFACT_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+# Taille des blocs envoyés au client lors du streaming
+REPORT_STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def iter_report_file(fileobj: IO[bytes], chunk_size: int = REPORT_STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Itérer un fichier de rapport par blocs puis le fermer.
+
+    À passer à StreamingResponse: le client reçoit le fichier par blocs de
+    taille fixe et le fichier temporaire est libéré en fin de transfert.
+
+    Args:
+        fileobj: Fichier généré (positionné au début)
+        chunk_size: Taille des blocs en octets
+
+    Yields:
+        Blocs d'octets du fichier
+    """
+    try:
+        while True:
+            chunk = fileobj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fileobj.close()
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """
+    Calculer le début et la fin (23:59:59) d'un mois.
+
+    Args:
+        year: Année
+        month: Mois (1-12)
+
+    Returns:
+        Tuple (début, fin) du mois
+    """
+    last_day = calendar.monthrange(year, month)[1]
+    return datetime(year, month, 1), datetime(year, month, last_day, 23, 59, 59)
+
+
+def is_closed_period(end_date: datetime, today: Optional[date] = None) -> bool:
+    """
+    Indiquer si une période se termine avant le mois en cours.
+
+    Args:
+        end_date: Fin de la période
+        today: Date de référence (défaut: aujourd'hui)
+
+    Returns:
+        True si la période appartient à un mois clôturé
+    """
+    today = today or date.today()
+    return end_date.date() < today.replace(day=1)
+
+
+def compute_artifact_key(
+    tenant_id: UUID,
+    report_type: str,
+    period: str,
+    data_version: str,
+) -> str:
+    """
+    Calculer la clé d'un artefact de rapport.
+
+    Args:
+        tenant_id: UUID du tenant
+        report_type: Type de rapport (clé de REPORT_TYPES)
+        period: Période normalisée (ex: "2025-09", "2025-09-01_2025-09-30")
+        data_version: Version des données sources
+
+    Returns:
+        Empreinte SHA-256 hexadécimale
+    """
+    raw = f"{tenant_id}|{report_type}|{period}|{data_version}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ReportArtifactStore:
+    """
+    Stockage local des rapports générés.
+
+    Chaque artefact est un couple de fichiers:
+    - `<clé>.<ext>`: le rapport
+    - `<clé>.json`: ses métadonnées (tenant, type, période, nom de fichier)
+
+    L'écriture passe par un fichier temporaire puis os.replace, ce qui
+    permet à l'API et aux workers de partager le même dossier sans lire
+    un fichier incomplet.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        """
+        Initialiser le stockage.
+
+        Args:
+            root: Dossier racine (défaut: settings.REPORTS_ARTIFACTS_DIR)
+        """
+        self.root = Path(root or settings.REPORTS_ARTIFACTS_DIR)
+
+    def _paths(self, key: str, extension: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.{extension}", self.root / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupérer les métadonnées d'un artefact existant.
+
+        Args:
+            key: Clé de l'artefact
+
+        Returns:
+            Métadonnées (avec le chemin du fichier) ou None si absent
+        """
+        if not ARTIFACT_KEY_PATTERN.match(key):
+            return None
+
+        meta_path = self.root / f"{key}.json"
+        if not meta_path.exists():
+            return None
+
+        try:
+            metadata = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            logger.warning(f"Unreadable report artifact metadata: {meta_path}")
+            return None
+
+        file_path, _ = self._paths(key, metadata["extension"])
+        if not file_path.exists():
+            return None
+
+        # Date de dernier accès = mtime des métadonnées (voir prune)
+        try:
+            os.utime(meta_path)
+        except OSError:
+            pass
+
+        metadata["path"] = str(file_path)
+        return metadata
+
+    def put(self, key: str, fileobj: IO[bytes], metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Enregistrer un artefact.
+
+        Args:
+            key: Clé de l'artefact
+            fileobj: Contenu du rapport (positionné au début)
+            metadata: Métadonnées (doit contenir "extension")
+
+        Returns:
+            Métadonnées enregistrées (avec le chemin du fichier)
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        file_path, meta_path = self._paths(key, metadata["extension"])
+
+        self._atomic_write(file_path, lambda f: shutil.copyfileobj(fileobj, f))
+        metadata = {**metadata, "key": key, "size_bytes": file_path.stat().st_size}
+        self._atomic_write(meta_path, lambda f: f.write(json.dumps(metadata).encode()))
+
+        logger.info(f"Report artifact stored: {file_path.name} ({metadata['size_bytes']} bytes)")
+        return {**metadata, "path": str(file_path)}
+
+    def _atomic_write(self, target: Path, write) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                write(f)
+            os.replace(tmp_path, target)
+        except Exception:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def prune(
+        self,
+        older_than: datetime,
+        immutable_unused_since: Optional[datetime] = None,
+    ) -> Tuple[int, int]:
+        """
+        Supprimer les artefacts expirés.
+
+        - Périodes non clôturées: créés avant `older_than`
+        - Mois clôturés: non lus depuis `immutable_unused_since` (date de
+          dernier accès = mtime des métadonnées, mise à jour par get);
+          conservés indéfiniment si None
+
+        Args:
+            older_than: Date limite de création (artefacts non figés)
+            immutable_unused_since: Date limite de dernier accès (artefacts figés)
+
+        Returns:
+            Tuple (nombre d'artefacts supprimés, octets libérés)
+        """
+        if not self.root.exists():
+            return 0, 0
+
+        deleted = 0
+        freed = 0
+        for meta_path in self.root.glob("*.json"):
+            try:
+                metadata = json.loads(meta_path.read_text())
+                if metadata.get("immutable"):
+                    if immutable_unused_since is None:
+                        continue
+                    last_access = datetime.fromtimestamp(meta_path.stat().st_mtime)
+                    if last_access >= immutable_unused_since:
+                        continue
+                elif datetime.fromisoformat(metadata["created_at"]) >= older_than:
+                    continue
+
+                file_path, _ = self._paths(meta_path.stem, metadata["extension"])
+                if file_path.exists():
+                    freed += file_path.stat().st_size
+                    file_path.unlink()
+                meta_path.unlink()
+                deleted += 1
+            except Exception as e:
+                logger.error(f"Failed to prune report artifact {meta_path}: {str(e)}")
+                continue
+
+        return deleted, freed
+
+
+class ReportArtifactService:
+    """
+    Service pour résoudre, construire et servir les rapports mis en cache.
+    """
+
+    def __init__(self, db: Session, store: Optional[ReportArtifactStore] = None):
+        self.db = db
+        self.store = store or ReportArtifactStore()
+
+    def resolve(
+        self,
+        tenant_id: UUID,
+        report_type: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Calculer la clé d'artefact d'une demande de rapport.
+
+        Args:
+            tenant_id: UUID du tenant
+            report_type: Type de rapport (clé de REPORT_TYPES)
+            start_date: Début de période (rapports de ventes)
+            end_date: Fin de période (rapports de ventes)
+
+        Returns:
+            Dict avec key, period, data_version, immutable
+
+        Raises:
+            ValueError: Si le type de rapport est inconnu ou la période manquante
+        """
+        if report_type not in REPORT_TYPES:
+            raise ValueError(f"Type de rapport inconnu: {report_type}")
+
+        if report_type == "inventory_excel":
+            period = "current"
+            immutable = False
+            data_version = self._products_version(tenant_id)
+        else:
+            if start_date is None or end_date is None:
+                raise ValueError("start_date et end_date sont requis pour ce rapport")
+
+            if report_type == "monthly_summary_pdf":
+                period = start_date.strftime("%Y-%m")
+            else:
+                period = f"{start_date.strftime('%Y-%m-%d')}_{end_date.strftime('%Y-%m-%d')}"
+
+            immutable = is_closed_period(end_date)
+            if immutable:
+                data_version = CLOSED_PERIOD_VERSION
+            else:
+                data_version = (
+                    f"{self._sales_version(tenant_id, start_date, end_date)}"
+                    f"/{self._products_version(tenant_id)}"
+                )
+
+        return {
+            "key": compute_artifact_key(tenant_id, report_type, period, data_version),
+            "period": period,
+            "data_version": data_version,
+            "immutable": immutable,
+        }
+
+    def get_cached(self, tenant_id: UUID, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Récupérer un artefact s'il existe et appartient au tenant.
+
+        Args:
+            tenant_id: UUID du tenant
+            key: Clé de l'artefact
+
+        Returns:
+            Métadonnées de l'artefact ou None
+        """
+        metadata = self.store.get(key)
+        if metadata is None or metadata.get("tenant_id") != str(tenant_id):
+            return None
+        return metadata
+
+    def get_or_build(
+        self,
+        tenant_id: UUID,
+        report_type: str,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Servir un rapport depuis le cache, ou le générer et l'enregistrer.
+
+        Args:
+            tenant_id: UUID du tenant
+            report_type: Type de rapport (clé de REPORT_TYPES)
+            start_date: Début de période (rapports de ventes)
+            end_date: Fin de période (rapports de ventes)
+
+        Returns:
+            Métadonnées de l'artefact (avec "path" et "cache_hit")
+        """
+        resolved = self.resolve(tenant_id, report_type, start_date, end_date)
+
+        cached = self.get_cached(tenant_id, resolved["key"])
+        record_cache_access("report_artifact", cached is not None)
+        if cached is not None:
+            logger.info(f"Report cache hit: {report_type} {resolved['period']} for tenant {tenant_id}")
+            return {**cached, "cache_hit": True}
+
+        logger.info(f"Report cache miss: {report_type} {resolved['period']} for tenant {tenant_id}")
+        fileobj = self._generate(tenant_id, report_type, start_date, end_date)
+        try:
+            metadata = self.store.put(resolved["key"], fileobj, {
+                "tenant_id": str(tenant_id),
+                "report_type": report_type,
+                "period": resolved["period"],
+                "data_version": resolved["data_version"],
+                "immutable": resolved["immutable"],
+                "media_type": REPORT_TYPES[report_type]["media_type"],
+                "extension": REPORT_TYPES[report_type]["extension"],
+                "created_at": datetime.now().isoformat(),
+            })
+        finally:
+            fileobj.close()
+
+        return {**metadata, "cache_hit": False}
+
+    def _generate(
+        self,
+        tenant_id: UUID,
+        report_type: str,
+        start_date: Optional[datetime],
+        end_date: Optional[datetime],
+    ) -> IO[bytes]:
+        # Import local: openpyxl, reportlab et matplotlib ne sont chargés
+        # qu'au premier rapport réellement généré (pas sur un hit du cache)
+        from app.services.report_service import ReportService
+
+        service = ReportService(self.db)
+        if report_type == "inventory_excel":
+            return service.generate_inventory_report(tenant_id)
+        if report_type == "sales_analysis_excel":
+            return service.generate_sales_analysis_report(tenant_id, start_date, end_date)
+        return service.generate_monthly_summary_pdf(tenant_id, start_date.month, start_date.year)
+
+    def _products_version(self, tenant_id: UUID) -> str:
+        """Version du catalogue: nombre de produits et dernière modification."""
+        row = self.db.execute(text("""
+            SELECT
+                COUNT(*) as product_count,
+                MAX(p.updated_at) as products_updated_at,
+                (SELECT MAX(c.updated_at) FROM categories c WHERE c.tenant_id = :tenant_id)
+                    as categories_updated_at
+            FROM products p
+            WHERE p.tenant_id = :tenant_id
+        """), {"tenant_id": str(tenant_id)}).first()
+
+        return f"p{row.product_count}:{row.products_updated_at}:{row.categories_updated_at}"
+
+    def _sales_version(self, tenant_id: UUID, start_date: datetime, end_date: datetime) -> str:
+        """Version des ventes d'une période: nombre de lignes et dernière modification."""
+        row = self.db.execute(text("""
+            SELECT
+                COUNT(*) as sale_count,
+                MAX(updated_at) as sales_updated_at
+            FROM sales
+            WHERE tenant_id = :tenant_id
+                AND sale_date >= :start_date
+                AND sale_date <= :end_date
+        """), {
+            "tenant_id": str(tenant_id),
+            "start_date": start_date,
+            "end_date": end_date
+        }).first()
+
+        return f"s{row.sale_count}:{row.sales_updated_at}"
@@ -4,14 +4,16 @@ Service pour la génération de rapports (Excel et PDF).
 from sqlalchemy.orm import Session
 from sqlalchemy import text, func
 from uuid import UUID
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterable, List, Optional, IO
 from datetime import datetime, timedelta
 from io import BytesIO
 import calendar
+import tempfile
 
 # Excel imports
 import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 from openpyxl.chart import BarChart, Reference, LineChart
 
 # PDF imports
@@ -22,10 +24,11 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 
-# Matplotlib imports
-import matplotlib
-matplotlib.use('Agg')  # Backend non-interactif pour serveur
-import matplotlib.pyplot as plt
+# Graphiques (matplotlib objet, sans pyplot)
+from app.services.chart_service import render_daily_revenue_chart
+
+from app.db.analytics_store import usable_snapshot
+from app.db.sales_archive import include_archived_sales
 
 # Models
 from app.models.product import Product
@@ -33,13 +36,117 @@ from app.models.sale import Sale
 from app.models.category import Category
 
 
+# Taille des lots lus via curseur serveur (yield_per)
+REPORT_FETCH_BATCH_SIZE = 1000
+
+# Au-delà de cette taille, le fichier Excel généré bascule de la RAM vers le disque
+REPORT_SPOOL_MAX_BYTES = 8 * 1024 * 1024
+
+
+def _build_named_styles() -> List[NamedStyle]:
+    """
+    Construire les styles nommés partagés des rapports Excel.
+
+    Un style nommé est enregistré une seule fois par classeur puis référencé
+    par chaque cellule, au lieu d'instancier Font/Border à chaque cellule.
+
+    Returns:
+        Liste de NamedStyle (nouvelles instances, une par classeur)
+    """
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+    def status_style(name: str, fill_color: str, font_color: str) -> NamedStyle:
+        return NamedStyle(
+            name=name,
+            font=Font(color=font_color, bold=True),
+            fill=PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid"),
+            border=border,
+        )
+
+    return [
+        NamedStyle(name="report_title", font=Font(size=16, bold=True)),
+        NamedStyle(name="report_section", font=Font(bold=True, size=12)),
+        NamedStyle(name="report_bold", font=Font(bold=True)),
+        NamedStyle(name="report_bold_fcfa", font=Font(bold=True), number_format='#,##0 "FCFA"'),
+        NamedStyle(
+            name="report_header",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid"),
+            alignment=Alignment(horizontal="center"),
+        ),
+        NamedStyle(
+            name="report_header_bordered",
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid"),
+            alignment=Alignment(horizontal="center"),
+            border=border,
+        ),
+        NamedStyle(name="report_amount", number_format='#,##0'),
+        NamedStyle(name="report_cell_bordered", border=border),
+        NamedStyle(name="report_total_bordered", font=Font(bold=True), border=border),
+        NamedStyle(
+            name="report_total_amount_bordered",
+            font=Font(bold=True),
+            number_format='#,##0',
+            border=border,
+        ),
+        status_style("report_status_rupture", "FEE2E2", "991B1B"),
+        status_style("report_status_faible", "FEF3C7", "92400E"),
+        status_style("report_status_alerte", "FED7AA", "9A3412"),
+    ]
+
+
+def _create_write_only_workbook() -> openpyxl.Workbook:
+    """
+    Créer un classeur openpyxl en mode write-only avec les styles partagés.
+
+    En write-only, les lignes sont sérialisées au fil de l'eau au lieu d'être
+    gardées en mémoire: la mémoire reste stable quel que soit le volume.
+
+    Returns:
+        Workbook write-only (sans feuille active)
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    for style in _build_named_styles():
+        wb.add_named_style(style)
+    return wb
+
+
+def _styled(ws, value: Any, style: str) -> WriteOnlyCell:
+    """Créer une cellule write-only portant un style nommé."""
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    return cell
+
+
+def _save_workbook(wb: openpyxl.Workbook) -> IO[bytes]:
+    """
+    Sauvegarder un classeur dans un fichier temporaire prêt à être streamé.
+
+    Le format .xlsx (zip, répertoire central en fin d'archive) impose
+    d'écrire le classeur en entier avant d'en envoyer le premier octet.
+
+    Args:
+        wb: Classeur à sauvegarder
+
+    Returns:
+        Fichier temporaire positionné au début (RAM puis disque au-delà
+        de REPORT_SPOOL_MAX_BYTES)
+    """
+    output = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_BYTES)
+    wb.save(output)
+    output.seek(0)
+    return output
+
+
 class ReportService:
     """Service pour générer les rapports automatisés."""
 
     def __init__(self, db: Session):
         self.db = db
 
-    def generate_inventory_report(self, tenant_id: UUID) -> BytesIO:
+    def generate_inventory_report(self, tenant_id: UUID) -> IO[bytes]:
         """
         Rapport Inventaire Stock (Excel).
 
@@ -53,20 +160,29 @@ class ReportService:
         - Statut
         - Valorisation
 
+        Les produits sont lus par lots via un curseur serveur et écrits en
+        mode write-only: la mémoire reste stable même pour 100k produits.
+        Seule la mémoire est bornée: le classeur (archive zip) est complet
+        dans le fichier temporaire avant l'envoi du premier bloc.
+
         Args:
             tenant_id: UUID du tenant
 
         Returns:
-            BytesIO: Fichier Excel en mémoire
+            Fichier Excel temporaire (à streamer avec report_artifact_service.iter_report_file)
         """
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Inventaire Stock"
+        wb = _create_write_only_workbook()
+        ws = wb.create_sheet("Inventaire Stock")
+
+        # Ajuster largeurs colonnes (avant toute écriture en write-only)
+        column_widths = [12, 30, 20, 12, 12, 12, 10, 15, 15, 18]
+        for i, width in enumerate(column_widths, start=1):
+            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
 
         # En-tête rapport
-        ws['A1'] = "RAPPORT INVENTAIRE STOCK"
-        ws['A1'].font = Font(size=16, bold=True)
-        ws['A2'] = f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}"
+        ws.append([_styled(ws, "RAPPORT INVENTAIRE STOCK", "report_title")])
+        ws.append([f"Date: {datetime.now().strftime('%d/%m/%Y %H:%M')}"])
+        ws.append([])
 
         # En-têtes colonnes
         headers = [
@@ -74,18 +190,30 @@ class ReportService:
             "Stock Min", "Stock Max", "Unité", "Statut",
             "Prix Achat", "Valorisation"
         ]
-
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=4, column=col, value=header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
-
-        # Données
-        products = self.db.query(Product).filter(
+        ws.append([_styled(ws, header, "report_header_bordered") for header in headers])
+
+        # Données: colonnes uniquement (pas d'entités ORM ni de lazy-load catégorie)
+        products = self.db.query(
+            Product.code,
+            Product.name,
+            Category.name.label("category_name"),
+            Product.current_stock,
+            Product.min_stock,
+            Product.max_stock,
+            Product.unit,
+            Product.purchase_price,
+        ).outerjoin(
+            Category, Product.category_id == Category.id
+        ).filter(
             Product.tenant_id == tenant_id,
             Product.is_active == True
-        ).order_by(Product.name).all()
+        ).order_by(Product.name).yield_per(REPORT_FETCH_BATCH_SIZE)
+
+        status_styles = {
+            "RUPTURE": "report_status_rupture",
+            "FAIBLE": "report_status_faible",
+            "ALERTE": "report_status_alerte",
+        }
 
         row = 5
         for product in products:
@@ -93,68 +221,36 @@ class ReportService:
             status = self._calculate_status(product)
             valorisation = product.current_stock * product.purchase_price
 
-            ws.cell(row, 1, product.code)
-            ws.cell(row, 2, product.name)
-            ws.cell(row, 3, product.category.name if product.category else "-")
-            ws.cell(row, 4, float(product.current_stock))
-            ws.cell(row, 5, float(product.min_stock or 0))
-            ws.cell(row, 6, float(product.max_stock or 0))
-            ws.cell(row, 7, product.unit)
-            ws.cell(row, 8, status)
-            ws.cell(row, 9, float(product.purchase_price))
-            ws.cell(row, 10, float(valorisation))
-
-            # Coloration statut
-            status_cell = ws.cell(row, 8)
-            if status == "RUPTURE":
-                status_cell.fill = PatternFill(start_color="FEE2E2", end_color="FEE2E2", fill_type="solid")
-                status_cell.font = Font(color="991B1B", bold=True)
-            elif status == "FAIBLE":
-                status_cell.fill = PatternFill(start_color="FEF3C7", end_color="FEF3C7", fill_type="solid")
-                status_cell.font = Font(color="92400E", bold=True)
-            elif status == "ALERTE":
-                status_cell.fill = PatternFill(start_color="FED7AA", end_color="FED7AA", fill_type="solid")
-                status_cell.font = Font(color="9A3412", bold=True)
-
+            ws.append([
+                _styled(ws, product.code, "report_cell_bordered"),
+                _styled(ws, product.name, "report_cell_bordered"),
+                _styled(ws, product.category_name or "-", "report_cell_bordered"),
+                _styled(ws, float(product.current_stock), "report_cell_bordered"),
+                _styled(ws, float(product.min_stock or 0), "report_cell_bordered"),
+                _styled(ws, float(product.max_stock or 0), "report_cell_bordered"),
+                _styled(ws, product.unit, "report_cell_bordered"),
+                _styled(ws, status, status_styles.get(status, "report_cell_bordered")),
+                _styled(ws, float(product.purchase_price), "report_cell_bordered"),
+                _styled(ws, float(valorisation), "report_cell_bordered"),
+            ])
             row += 1
 
-        # Totaux
+        # Ligne vide puis totaux (bordées comme le tableau)
+        ws.append([_styled(ws, None, "report_cell_bordered") for _ in headers])
         row += 1
-        ws.cell(row, 9, "TOTAL:")
-        ws.cell(row, 9).font = Font(bold=True)
-        ws.cell(row, 10, f"=SUM(J5:J{row-2})")
-        ws.cell(row, 10).font = Font(bold=True)
-        ws.cell(row, 10).number_format = '#,##0'
+        total_row = [_styled(ws, None, "report_cell_bordered") for _ in range(8)]
+        total_row.append(_styled(ws, "TOTAL:", "report_total_bordered"))
+        total_row.append(_styled(ws, f"=SUM(J5:J{row-2})", "report_total_amount_bordered"))
+        ws.append(total_row)
 
-        # Ajuster largeurs colonnes
-        column_widths = [12, 30, 20, 12, 12, 12, 10, 15, 15, 18]
-        for i, width in enumerate(column_widths, start=1):
-            ws.column_dimensions[openpyxl.utils.get_column_letter(i)].width = width
-
-        # Bordures
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-        for row_cells in ws[f'A4:J{row}']:
-            for cell in row_cells:
-                cell.border = thin_border
-
-        # Sauvegarder dans BytesIO
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        return output
+        return _save_workbook(wb)
 
     def generate_sales_analysis_report(
         self,
         tenant_id: UUID,
         start_date: datetime,
         end_date: datetime
-    ) -> BytesIO:
+    ) -> IO[bytes]:
         """
         Rapport Analyse Ventes (Excel multi-onglets).
 
@@ -164,69 +260,98 @@ class ReportService:
         3. Ventes par Catégorie
         4. Évolution Quotidienne
 
+        Les mois archivés en Parquet de la période sont inclus. Les gros
+        tenants sont servis par leur instantané en colonnes s'il est frais.
+
         Args:
             tenant_id: UUID du tenant
             start_date: Date de début
             end_date: Date de fin
 
         Returns:
-            BytesIO: Fichier Excel en mémoire
+            Fichier Excel temporaire (à streamer avec report_artifact_service.iter_report_file)
         """
-        wb = openpyxl.Workbook()
+        snapshot = usable_snapshot(tenant_id, start_date)
+        if snapshot is not None:
+            return self._build_sales_analysis_report(tenant_id, start_date, end_date, snapshot.execute)
 
-        # ONGLET 1: Synthèse
-        ws_summary = wb.active
-        ws_summary.title = "Synthèse"
+        def stream(query, params):
+            return self.db.execute(query, params, execution_options={"yield_per": REPORT_FETCH_BATCH_SIZE})
 
-        # Période
-        ws_summary['A1'] = "ANALYSE VENTES"
-        ws_summary['A1'].font = Font(size=16, bold=True)
-        ws_summary['A2'] = f"Période: {start_date.strftime('%d/%m/%Y')} au {end_date.strftime('%d/%m/%Y')}"
+        with include_archived_sales(self.db, tenant_id, start_date, end_date):
+            return self._build_sales_analysis_report(tenant_id, start_date, end_date, stream)
 
-        # KPIs
-        kpis = self.db.query(
-            func.count(Sale.id).label('transactions'),
-            func.sum(Sale.quantity).label('units'),
-            func.sum(Sale.total_amount).label('revenue')
-        ).filter(
-            Sale.tenant_id == tenant_id,
-            Sale.sale_date >= start_date,
-            Sale.sale_date <= end_date
-        ).first()
-
-        ws_summary['A4'] = "Indicateurs Clés"
-        ws_summary['A4'].font = Font(bold=True, size=12)
-
-        ws_summary['A6'] = "Nombre de transactions:"
-        ws_summary['B6'] = kpis.transactions or 0
-        ws_summary['B6'].font = Font(bold=True)
+    def _build_sales_analysis_report(
+        self,
+        tenant_id: UUID,
+        start_date: datetime,
+        end_date: datetime,
+        fetch: Callable[[Any, Dict[str, Any]], Iterable[Any]]
+    ) -> IO[bytes]:
+        wb = _create_write_only_workbook()
+        params = {
+            "tenant_id": str(tenant_id),
+            "start_date": start_date,
+            "end_date": end_date
+        }
 
-        ws_summary['A7'] = "Unités vendues:"
-        ws_summary['B7'] = float(kpis.units or 0)
-        ws_summary['B7'].font = Font(bold=True)
+        # ONGLET 1: Synthèse
+        ws_summary = wb.create_sheet("Synthèse")
 
-        ws_summary['A8'] = "Chiffre d'affaires:"
-        ws_summary['B8'] = float(kpis.revenue or 0)
-        ws_summary['B8'].font = Font(bold=True)
-        ws_summary['B8'].number_format = '#,##0 "FCFA"'
+        # KPIs
+        query_kpis = text("""
+            SELECT
+                COUNT(id) as transactions,
+                SUM(quantity) as units,
+                SUM(total_amount) as revenue
+            FROM sales
+            WHERE tenant_id = :tenant_id
+                AND sale_date >= :start_date
+                AND sale_date <= :end_date
+        """)
+        kpis = list(fetch(query_kpis, params))[0]
 
-        ws_summary['A9'] = "Panier moyen:"
         if kpis.transactions and kpis.transactions > 0:
-            ws_summary['B9'] = float(kpis.revenue or 0) / kpis.transactions
+            average_basket = float(kpis.revenue or 0) / kpis.transactions
         else:
-            ws_summary['B9'] = 0
-        ws_summary['B9'].font = Font(bold=True)
-        ws_summary['B9'].number_format = '#,##0 "FCFA"'
+            average_basket = 0
+
+        # Période
+        ws_summary.append([_styled(ws_summary, "ANALYSE VENTES", "report_title")])
+        ws_summary.append([f"Période: {start_date.strftime('%d/%m/%Y')} au {end_date.strftime('%d/%m/%Y')}"])
+        ws_summary.append([])
+        ws_summary.append([_styled(ws_summary, "Indicateurs Clés", "report_section")])
+        ws_summary.append([])
+        ws_summary.append([
+            "Nombre de transactions:",
+            _styled(ws_summary, kpis.transactions or 0, "report_bold")
+        ])
+        ws_summary.append([
+            "Unités vendues:",
+            _styled(ws_summary, float(kpis.units or 0), "report_bold")
+        ])
+        ws_summary.append([
+            "Chiffre d'affaires:",
+            _styled(ws_summary, float(kpis.revenue or 0), "report_bold_fcfa")
+        ])
+        ws_summary.append([
+            "Panier moyen:",
+            _styled(ws_summary, average_basket, "report_bold_fcfa")
+        ])
 
         # ONGLET 2: Ventes par Produit
         ws_products = wb.create_sheet("Ventes par Produit")
 
+        # Ajuster largeurs colonnes
+        ws_products.column_dimensions['A'].width = 12
+        ws_products.column_dimensions['B'].width = 30
+        ws_products.column_dimensions['C'].width = 20
+        ws_products.column_dimensions['D'].width = 12
+        ws_products.column_dimensions['E'].width = 18
+        ws_products.column_dimensions['F'].width = 15
+
         headers = ["Code", "Nom Produit", "Catégorie", "Quantité", "CA", "Transactions"]
-        for col, header in enumerate(headers, start=1):
-            cell = ws_products.cell(1, col, header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
+        ws_products.append([_styled(ws_products, header, "report_header") for header in headers])
 
         # Données ventes par produit
         query = text("""
@@ -248,38 +373,29 @@ class ReportService:
             ORDER BY SUM(s.total_amount) DESC
         """)
 
-        results = self.db.execute(query, {
-            "tenant_id": str(tenant_id),
-            "start_date": start_date,
-            "end_date": end_date
-        }).fetchall()
-
-        for row_idx, result in enumerate(results, start=2):
-            ws_products.cell(row_idx, 1, result.code)
-            ws_products.cell(row_idx, 2, result.name)
-            ws_products.cell(row_idx, 3, result.category or "-")
-            ws_products.cell(row_idx, 4, float(result.quantity))
-            ws_products.cell(row_idx, 5, float(result.revenue))
-            ws_products.cell(row_idx, 5).number_format = '#,##0'
-            ws_products.cell(row_idx, 6, result.transactions)
+        results = fetch(query, params)
 
-        # Ajuster largeurs colonnes
-        ws_products.column_dimensions['A'].width = 12
-        ws_products.column_dimensions['B'].width = 30
-        ws_products.column_dimensions['C'].width = 20
-        ws_products.column_dimensions['D'].width = 12
-        ws_products.column_dimensions['E'].width = 18
-        ws_products.column_dimensions['F'].width = 15
+        product_rows = 0
+        for result in results:
+            ws_products.append([
+                result.code,
+                result.name,
+                result.category or "-",
+                float(result.quantity),
+                _styled(ws_products, float(result.revenue), "report_amount"),
+                result.transactions,
+            ])
+            product_rows += 1
 
         # Graphique Top 10
-        if len(results) > 0:
+        if product_rows > 0:
             chart = BarChart()
             chart.title = "Top 10 Produits (CA)"
             chart.x_axis.title = "Produits"
             chart.y_axis.title = "CA (FCFA)"
 
-            data = Reference(ws_products, min_col=5, min_row=1, max_row=min(11, len(results)+1))
-            cats = Reference(ws_products, min_col=2, min_row=2, max_row=min(11, len(results)+1))
+            data = Reference(ws_products, min_col=5, min_row=1, max_row=min(11, product_rows+1))
+            cats = Reference(ws_products, min_col=2, min_row=2, max_row=min(11, product_rows+1))
 
             chart.add_data(data, titles_from_data=True)
             chart.set_categories(cats)
@@ -289,12 +405,15 @@ class ReportService:
         # ONGLET 3: Ventes par Catégorie
         ws_categories = wb.create_sheet("Ventes par Catégorie")
 
+        # Ajuster largeurs
+        ws_categories.column_dimensions['A'].width = 25
+        ws_categories.column_dimensions['B'].width = 12
+        ws_categories.column_dimensions['C'].width = 12
+        ws_categories.column_dimensions['D'].width = 18
+        ws_categories.column_dimensions['E'].width = 15
+
         headers_cat = ["Catégorie", "Produits", "Quantité", "CA", "Transactions"]
-        for col, header in enumerate(headers_cat, start=1):
-            cell = ws_categories.cell(1, col, header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
+        ws_categories.append([_styled(ws_categories, header, "report_header") for header in headers_cat])
 
         query_cat = text("""
             SELECT
@@ -313,36 +432,27 @@ class ReportService:
             ORDER BY SUM(s.total_amount) DESC
         """)
 
-        results_cat = self.db.execute(query_cat, {
-            "tenant_id": str(tenant_id),
-            "start_date": start_date,
-            "end_date": end_date
-        }).fetchall()
+        results_cat = fetch(query_cat, params)
 
-        for row_idx, result in enumerate(results_cat, start=2):
-            ws_categories.cell(row_idx, 1, result.category)
-            ws_categories.cell(row_idx, 2, result.product_count)
-            ws_categories.cell(row_idx, 3, float(result.quantity))
-            ws_categories.cell(row_idx, 4, float(result.revenue))
-            ws_categories.cell(row_idx, 4).number_format = '#,##0'
-            ws_categories.cell(row_idx, 5, result.transactions)
-
-        # Ajuster largeurs
-        ws_categories.column_dimensions['A'].width = 25
-        ws_categories.column_dimensions['B'].width = 12
-        ws_categories.column_dimensions['C'].width = 12
-        ws_categories.column_dimensions['D'].width = 18
-        ws_categories.column_dimensions['E'].width = 15
+        for result in results_cat:
+            ws_categories.append([
+                result.category,
+                result.product_count,
+                float(result.quantity),
+                _styled(ws_categories, float(result.revenue), "report_amount"),
+                result.transactions,
+            ])
 
         # ONGLET 4: Évolution Quotidienne
         ws_daily = wb.create_sheet("Évolution Quotidienne")
 
+        # Ajuster largeurs
+        ws_daily.column_dimensions['A'].width = 15
+        ws_daily.column_dimensions['B'].width = 15
+        ws_daily.column_dimensions['C'].width = 18
+
         headers_daily = ["Date", "Transactions", "CA"]
-        for col, header in enumerate(headers_daily, start=1):
-            cell = ws_daily.cell(1, col, header)
-            cell.font = Font(bold=True, color="FFFFFF")
-            cell.fill = PatternFill(start_color="4F46E5", end_color="4F46E5", fill_type="solid")
-            cell.alignment = Alignment(horizontal="center")
+        ws_daily.append([_styled(ws_daily, header, "report_header") for header in headers_daily])
 
         query_daily = text("""
             SELECT
@@ -357,51 +467,40 @@ class ReportService:
             ORDER BY DATE(sale_date)
         """)
 
-        results_daily = self.db.execute(query_daily, {
-            "tenant_id": str(tenant_id),
-            "start_date": start_date,
-            "end_date": end_date
-        }).fetchall()
+        results_daily = fetch(query_daily, params)
 
-        for row_idx, result in enumerate(results_daily, start=2):
-            ws_daily.cell(row_idx, 1, result.date.strftime('%d/%m/%Y'))
-            ws_daily.cell(row_idx, 2, result.transactions)
-            ws_daily.cell(row_idx, 3, float(result.revenue))
-            ws_daily.cell(row_idx, 3).number_format = '#,##0'
-
-        # Ajuster largeurs
-        ws_daily.column_dimensions['A'].width = 15
-        ws_daily.column_dimensions['B'].width = 15
-        ws_daily.column_dimensions['C'].width = 18
+        daily_rows = 0
+        for result in results_daily:
+            ws_daily.append([
+                result.date.strftime('%d/%m/%Y'),
+                result.transactions,
+                _styled(ws_daily, float(result.revenue), "report_amount"),
+            ])
+            daily_rows += 1
 
         # Graphique évolution
-        if len(results_daily) > 0:
+        if daily_rows > 0:
             chart = LineChart()
             chart.title = "Évolution du CA"
             chart.x_axis.title = "Date"
             chart.y_axis.title = "CA (FCFA)"
 
-            data = Reference(ws_daily, min_col=3, min_row=1, max_row=len(results_daily)+1)
-            cats = Reference(ws_daily, min_col=1, min_row=2, max_row=len(results_daily)+1)
+            data = Reference(ws_daily, min_col=3, min_row=1, max_row=daily_rows+1)
+            cats = Reference(ws_daily, min_col=1, min_row=2, max_row=daily_rows+1)
 
             chart.add_data(data, titles_from_data=True)
             chart.set_categories(cats)
 
             ws_daily.add_chart(chart, "E2")
 
-        # Sauvegarder
-        output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-
-        return output
+        return _save_workbook(wb)
 
     def _calculate_status(self, product: Product) -> str:
         """
         Calculer statut stock produit.
 
         Args:
-            product: Produit à analyser
+            product: Produit (ou ligne avec current_stock, min_stock, max_stock)
 
         Returns:
             str: Statut (RUPTURE, FAIBLE, ALERTE, SURSTOCK, NORMAL)
@@ -441,6 +540,14 @@ class ReportService:
         Returns:
             BytesIO: Fichier PDF en mémoire
         """
+        start_date = datetime(year, month, 1)
+        end_date = datetime(year, month, calendar.monthrange(year, month)[1], 23, 59, 59)
+
+        # Mois archivé en Parquet: lu de façon transparente
+        with include_archived_sales(self.db, tenant_id, start_date, end_date):
+            return self._build_monthly_summary_pdf(tenant_id, month, year)
+
+    def _build_monthly_summary_pdf(self, tenant_id: UUID, month: int, year: int) -> BytesIO:
         buffer = BytesIO()
         doc = SimpleDocTemplate(
             buffer,
@@ -595,37 +702,10 @@ class ReportService:
         }).fetchall()
 
         if daily_sales and len(daily_sales) > 0:
-            # Créer graphique matplotlib
-            fig, ax = plt.subplots(figsize=(12, 6))
+            # Créer graphique (rendu thread-safe, réutilisé si série identique)
             dates = [row.date for row in daily_sales]
             revenues = [float(row.revenue) for row in daily_sales]
-
-            ax.plot(dates, revenues, marker='o', linewidth=2, color='#4F46E5', markersize=6)
-            ax.set_xlabel('Date', fontsize=12)
-            ax.set_ylabel('CA (FCFA)', fontsize=12)
-            ax.grid(True, alpha=0.3)
-            ax.ticklabel_format(style='plain', axis='y')
-
-            # Formater axe Y
-            from matplotlib.ticker import FuncFormatter
-            def format_func(value, tick_number):
-                if value >= 1000000:
-                    return f'{int(value/1000000)}M'
-                elif value >= 1000:
-                    return f'{int(value/1000)}K'
-                return f'{int(value)}'
-
-            ax.yaxis.set_major_formatter(FuncFormatter(format_func))
-
-            # Rotation labels dates
-            plt.xticks(rotation=45, ha='right')
-
-            # Sauvegarder dans buffer
-            img_buffer = BytesIO()
-            plt.tight_layout()
-            plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-            img_buffer.seek(0)
-            plt.close()
+            img_buffer = BytesIO(render_daily_revenue_chart(dates, revenues))
 
             # Ajouter au PDF
             img = Image(img_buffer, width=16*cm, height=8*cm)
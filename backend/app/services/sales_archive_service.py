@@ -0,0 +1,144 @@
+"""
+Service d'archivage des ventes anciennes en Parquet.
+
+Un mois est archivé en bloc, partition par partition:
+1. export de la partition (un fichier Parquet par tenant)
+2. dans une seule transaction: verrou exclusif sur la partition,
+   contrôle des comptes, inscription au catalogue, DETACH puis DROP
+
+Si des ventes ont été ajoutées au mois entre l'export et le verrou,
+la transaction est annulée et le mois sera repris au prochain passage.
+"""
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.partitioning import list_partitions, month_start, partition_name
+from app.db.sales_archive import ARCHIVE_COLUMNS, archive_cutoff, invalidate_archive_boundary, write_archive
+from app.models.sales_archive import SalesArchiveFile
+
+logger = logging.getLogger(__name__)
+
+# Lignes lues par lot lors de l'export (mémoire bornée)
+ARCHIVE_FETCH_BATCH_SIZE = 20000
+
+
+class SalesArchiveService:
+    """Service d'archivage des partitions de ventes anciennes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def archive_cutoff(self, today: Optional[date] = None) -> date:
+        """
+        Premier mois conservé en base.
+
+        Returns:
+            Les mois strictement antérieurs sont archivables
+        """
+        return archive_cutoff(today)
+
+    def archivable_months(self, today: Optional[date] = None) -> List[date]:
+        """Mois dont la partition existe encore et précède la limite de rétention."""
+        cutoff = self.archive_cutoff(today)
+        partitions = list_partitions(self.db.connection(), "sales")
+        return [p.month for p in partitions if p.month is not None and p.month < cutoff]
+
+    def _export_rows(self, partition: str, tenant_id: str) -> Iterator[List[dict]]:
+        columns = ", ".join(
+            f"{column}::text AS {column}" if column in ("id", "product_id", "tenant_id") else column
+            for column in ARCHIVE_COLUMNS
+        )
+        result = self.db.execute(
+            text(f"SELECT {columns} FROM {partition} WHERE tenant_id = :tenant_id ORDER BY sale_date"),
+            {"tenant_id": tenant_id},
+            execution_options={"yield_per": ARCHIVE_FETCH_BATCH_SIZE}
+        )
+        for batch in result.partitions():
+            yield [row._asdict() for row in batch]
+
+    def archive_month(self, month: date) -> Dict[str, Any]:
+        """
+        Archiver toutes les ventes d'un mois puis supprimer sa partition.
+
+        Args:
+            month: Mois à archiver (n'importe quel jour du mois)
+
+        Returns:
+            Dict avec le nombre de tenants, de lignes et d'octets archivés
+
+        Raises:
+            RuntimeError: Si la partition a changé pendant l'export
+        """
+        month = month_start(month)
+        partition = partition_name("sales", month)
+
+        counts = {
+            str(tenant_id): count
+            for tenant_id, count in self.db.execute(
+                text(f"SELECT tenant_id, COUNT(*) FROM {partition} GROUP BY tenant_id")
+            )
+        }
+
+        files = []
+        for tenant_id in counts:
+            uri, row_count, size_bytes = write_archive(self._export_rows(partition, tenant_id), tenant_id, month)
+            files.append({
+                "tenant_id": tenant_id,
+                "month": month,
+                "uri": uri,
+                "row_count": row_count,
+                "size_bytes": size_bytes,
+            })
+        # Fin de la transaction de lecture avant de prendre le verrou exclusif
+        self.db.commit()
+
+        try:
+            self.db.execute(text(f"LOCK TABLE {partition} IN ACCESS EXCLUSIVE MODE"))
+            current = {
+                str(tenant_id): count
+                for tenant_id, count in self.db.execute(
+                    text(f"SELECT tenant_id, COUNT(*) FROM {partition} GROUP BY tenant_id")
+                )
+            }
+            exported = {f["tenant_id"]: f["row_count"] for f in files}
+            if current != exported:
+                raise RuntimeError(f"{partition} modifiée pendant l'export, archivage reporté")
+
+            if files:
+                statement = insert(SalesArchiveFile.__table__).values(files)
+                self.db.execute(statement.on_conflict_do_update(
+                    index_elements=["tenant_id", "month"],
+                    set_={
+                        "uri": statement.excluded.uri,
+                        "row_count": statement.excluded.row_count,
+                        "size_bytes": statement.excluded.size_bytes,
+                        "updated_at": datetime.utcnow(),
+                    }
+                ))
+
+            self.db.execute(text(f"ALTER TABLE sales DETACH PARTITION {partition}"))
+            self.db.execute(text(f"DROP TABLE {partition}"))
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        invalidate_archive_boundary()
+
+        summary = {
+            "month": month.isoformat(),
+            "tenants": len(files),
+            "rows": sum(f["row_count"] for f in files),
+            "bytes": sum(f["size_bytes"] for f in files),
+        }
+        logger.info(f"Mois {summary['month']} archivé: {summary['rows']} ventes, {summary['bytes']} octets")
+        return summary
+
+    def archive_due_months(self, today: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Archiver tous les mois au-delà de la rétention (du plus ancien au plus récent)."""
+        return [self.archive_month(month) for month in self.archivable_months(today)]
@@ -4,25 +4,53 @@ Module tasks - Celery tasks for Digiboost PME.
 from app.tasks.celery_app import celery_app
 from app.tasks.alert_tasks import (
     evaluate_all_tenants_alerts,
+    deliver_alert_notifications,
     test_whatsapp_connection,
 )
 from app.tasks.report_tasks import (
     generate_monthly_reports,
+    generate_tenant_monthly_report,
+    summarize_monthly_reports,
+    build_report_artifact,
     cleanup_old_reports,
 )
 from app.tasks.dashboard_tasks import (
     refresh_dashboard_views,
+    refresh_product_sales_metrics,
+)
+from app.tasks.partition_tasks import (
+    ensure_future_partitions,
+    archive_cold_sales,
+)
+from app.tasks.analytics_tasks import (
+    refresh_analytics_snapshots,
+    refresh_tenant_analytics_snapshot,
 )
 from app.tasks.onboarding import (
     import_tenant_data,
 )
+from app.tasks.worker_probes import (
+    io_probe,
+    cpu_probe,
+)
 
 __all__ = [
     "celery_app",
     "evaluate_all_tenants_alerts",
+    "deliver_alert_notifications",
     "test_whatsapp_connection",
     "generate_monthly_reports",
+    "generate_tenant_monthly_report",
+    "summarize_monthly_reports",
+    "build_report_artifact",
     "cleanup_old_reports",
     "refresh_dashboard_views",
+    "refresh_product_sales_metrics",
+    "ensure_future_partitions",
+    "archive_cold_sales",
+    "refresh_analytics_snapshots",
+    "refresh_tenant_analytics_snapshot",
     "import_tenant_data",
+    "io_probe",
+    "cpu_probe",
 ]
@@ -5,7 +5,9 @@ import asyncio
 import logging
 from celery import shared_task
 from sqlalchemy import and_
+from app.core.locks import check_lease, single_instance
 from app.db.session import SessionLocal
+from app.models.alert_history import AlertHistory
 from app.models.tenant import Tenant
 from app.services.alert_service import AlertService
 
@@ -13,6 +15,7 @@ logger = logging.getLogger(__name__)
 
 
 @shared_task(name='app.tasks.alert_tasks.evaluate_all_tenants_alerts')
+@single_instance('evaluate_all_tenants_alerts')
 def evaluate_all_tenants_alerts():
     """
     Tâche périodique: évaluer alertes de tous les tenants actifs.
@@ -31,19 +34,21 @@ def evaluate_all_tenants_alerts():
         logger.info(f"Found {len(tenants)} active tenant(s)")
 
         total_triggered = 0
-        total_sent = 0
+        total_queued = 0
 
         for tenant in tenants:
+            # Verrou perdu: une autre évaluation a pu démarrer, arrêt entre deux tenants
+            check_lease()
             try:
                 logger.info(f"Evaluating alerts for tenant: {tenant.name} ({tenant.id})")
                 result = asyncio.run(_evaluate_tenant_alerts(tenant.id, db))
 
                 total_triggered += result["triggered"]
-                total_sent += result["sent"]
+                total_queued += result["queued"]
 
                 logger.info(
                     f"Tenant {tenant.name}: {result['triggered']} triggered, "
-                    f"{result['sent']} sent"
+                    f"{result['queued']} notification(s) queued"
                 )
 
             except Exception as e:
@@ -55,13 +60,13 @@ def evaluate_all_tenants_alerts():
 
         logger.info(
             f"✅ Alert evaluation completed: {total_triggered} triggered, "
-            f"{total_sent} sent across {len(tenants)} tenant(s)"
+            f"{total_queued} notification(s) queued across {len(tenants)} tenant(s)"
         )
 
         return {
             "tenants_processed": len(tenants),
             "alerts_triggered": total_triggered,
-            "notifications_sent": total_sent
+            "notifications_queued": total_queued
         }
 
     except Exception as e:
@@ -73,21 +78,25 @@ def evaluate_all_tenants_alerts():
 
 async def _evaluate_tenant_alerts(tenant_id, db):
     """
-    Évaluer alertes d'un tenant et envoyer notifications.
+    Évaluer alertes d'un tenant et mettre en file leurs notifications.
+
+    L'envoi (Twilio, SMTP) est fait par deliver_alert_notifications sur
+    la queue `notifications` (worker gevent): l'évaluation n'attend pas
+    les fournisseurs.
 
     Args:
         tenant_id: UUID du tenant
         db: Session base de données
 
     Returns:
-        Dict avec triggered et sent count
+        Dict avec triggered et queued count
     """
     service = AlertService(db)
 
     # Évaluer toutes les alertes actives
     triggered_alerts = service.evaluate_all_alerts(tenant_id)
 
-    notifications_sent = 0
+    notifications_queued = 0
 
     for item in triggered_alerts:
         alert = item["alert"]
@@ -97,19 +106,19 @@ async def _evaluate_tenant_alerts(tenant_id, db):
             # Créer entrée historique
             history = service.create_history_entry(alert, result)
 
-            # Envoyer notifications (WhatsApp, Email, etc.)
-            service.send_alert_notifications(alert, result, history)
+            # Notifications (WhatsApp, Email, etc.) envoyées par le worker I/O
+            deliver_alert_notifications.delay(str(history.id))
 
-            notifications_sent += 1
+            notifications_queued += 1
 
             logger.info(
                 f"Alert {alert.name} processed: "
-                f"history={history.id}, sent_whatsapp={history.sent_whatsapp}"
+                f"history={history.id}, notifications queued"
             )
 
         except Exception as e:
             logger.error(
-                f"Failed to send notification for alert {alert.id}: {str(e)}",
+                f"Failed to queue notification for alert {alert.id}: {str(e)}",
                 exc_info=True
             )
             # Continue avec les autres alertes même si une échoue
@@ -117,10 +126,55 @@ async def _evaluate_tenant_alerts(tenant_id, db):
 
     return {
         "triggered": len(triggered_alerts),
-        "sent": notifications_sent
+        "queued": notifications_queued
     }
 
 
+@shared_task(name='app.tasks.alert_tasks.deliver_alert_notifications')
+def deliver_alert_notifications(history_id: str):
+    """
+    Envoyer les notifications d'une alerte déclenchée.
+    Routée sur la queue `notifications` (profil de worker I/O, pool gevent).
+
+    Args:
+        history_id: UUID de l'entrée d'historique (détails du déclenchement)
+
+    Returns:
+        Dict avec statut d'envoi
+    """
+    db = SessionLocal()
+    try:
+        history = db.query(AlertHistory).filter(AlertHistory.id == history_id).first()
+        if not history or not history.alert:
+            logger.warning(f"Alert history {history_id} not found, notification dropped")
+            return {"history_id": history_id, "status": "not_found"}
+
+        # Connexion rendue au pool pendant les appels réseau (Twilio, SMTP):
+        # les greenlets du worker I/O sont bien plus nombreux que les connexions
+        alert = history.alert
+        db.expire_on_commit = False
+        db.commit()
+
+        AlertService(db).send_alert_notifications(
+            alert,
+            {"details": history.details or {}},
+            history
+        )
+
+        return {
+            "history_id": history_id,
+            "status": "processed",
+            "sent_whatsapp": bool(history.sent_whatsapp)
+        }
+
+    except Exception as e:
+        logger.error(f"Error delivering notifications for history {history_id}: {str(e)}", exc_info=True)
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
 @shared_task(name='app.tasks.alert_tasks.test_whatsapp_connection')
 def test_whatsapp_connection():
     """
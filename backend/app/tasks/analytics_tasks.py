@@ -0,0 +1,97 @@
+"""
+Tâches Celery pour les instantanés analytiques en colonnes (gros tenants).
+"""
+import logging
+from uuid import UUID
+
+from celery import shared_task
+from sqlalchemy import func
+
+from app.config import settings
+from app.core.locks import single_instance
+from app.db.session import SessionLocal, read_session
+from app.models.product import Product
+from app.models.tenant import Tenant
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='app.tasks.analytics_tasks.refresh_analytics_snapshots')
+@single_instance('refresh_analytics_snapshots')
+def refresh_analytics_snapshots():
+    """
+    Rafraîchir les instantanés analytiques des gros tenants.
+    Exécutée toutes les 10 minutes par Celery Beat (sans effet si
+    ANALYTICS_STORE_ENABLED=False). Lance une sous-tâche par tenant
+    ayant au moins ANALYTICS_STORE_MIN_PRODUCTS produits.
+
+    Returns:
+        Dict avec le nombre de sous-tâches lancées
+    """
+    if not settings.ANALYTICS_STORE_ENABLED:
+        logger.info("Analytics store disabled, skipping")
+        return {"enabled": False}
+
+    db = SessionLocal()
+    try:
+        tenant_ids = [
+            str(tenant_id) for (tenant_id,) in
+            db.query(Product.tenant_id)
+            .join(Tenant, Tenant.id == Product.tenant_id)
+            .filter(Tenant.is_active == True)
+            .group_by(Product.tenant_id)
+            .having(func.count(Product.id) >= settings.ANALYTICS_STORE_MIN_PRODUCTS)
+            .all()
+        ]
+    finally:
+        db.close()
+
+    for tenant_id in tenant_ids:
+        refresh_tenant_analytics_snapshot.delay(tenant_id)
+
+    logger.info(f"📦 Analytics snapshot refresh dispatched for {len(tenant_ids)} tenant(s)")
+
+    return {
+        "enabled": True,
+        "tenants_dispatched": len(tenant_ids)
+    }
+
+
+@shared_task(
+    name='app.tasks.analytics_tasks.refresh_tenant_analytics_snapshot',
+    time_limit=1800,
+    soft_time_limit=1500,
+)
+def refresh_tenant_analytics_snapshot(tenant_id: str, full: bool = False):
+    """
+    Sous-tâche: rafraîchir l'instantané d'un tenant.
+
+    Incrémental (mois modifiés seulement) sauf à la première exécution
+    et toutes les ANALYTICS_STORE_FULL_REFRESH_HOURS. La limite de temps
+    est relevée pour la reconstruction complète des plus gros tenants.
+    Lu sur une réplica si disponible (retard borné très en deçà de la
+    marge de relecture REFRESH_OVERLAP).
+
+    Args:
+        tenant_id: UUID du tenant
+        full: Forcer une reconstruction complète
+
+    Returns:
+        Dict avec les mois réécrits
+    """
+    from app.db.analytics_store import refresh_snapshot
+
+    db = read_session()
+    try:
+        result = refresh_snapshot(db, UUID(tenant_id), full=full)
+        logger.info(
+            f"✅ Analytics snapshot of tenant {tenant_id} refreshed "
+            f"({'full' if result['full'] else 'incremental'}, {len(result['months_rewritten'])} month(s))"
+        )
+        return result
+
+    except Exception as e:
+        logger.error(f"Error refreshing analytics snapshot of tenant {tenant_id}: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
@@ -1,8 +1,12 @@
 """
 Configuration Celery pour Digiboost PME.
 """
+import sys
+import time
+
 from celery import Celery
 from celery.schedules import crontab
+from celery.signals import task_postrun, task_prerun, worker_ready
 from app.config import settings
 
 # Créer instance Celery
@@ -22,7 +26,7 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=300,  # 5 minutes max par tâche
     task_soft_time_limit=240,  # Warning à 4 minutes
-    worker_prefetch_multiplier=1,  # Exécuter 1 tâche à la fois
+    worker_prefetch_multiplier=1,  # Exécuter 1 tâche à la fois (surchargé par profil de worker)
     task_acks_late=True,  # Confirmer tâche après exécution (pas avant)
     task_reject_on_worker_lost=True,  # Rejeter si worker crash
 )
@@ -39,7 +43,7 @@ celery_app.conf.beat_schedule = {
         }
     },
 
-    # Rafraîchir vues matérialisées toutes les 10 minutes
+    # Recalculer les agrégats des dashboards modifiés toutes les 10 minutes
     'refresh-materialized-views-every-10-minutes': {
         'task': 'app.tasks.dashboard_tasks.refresh_dashboard_views',
         'schedule': 600.0,  # 10 minutes en secondes
@@ -49,6 +53,25 @@ celery_app.conf.beat_schedule = {
         }
     },
 
+    # Recalculer les métriques de ventes des produits juste après minuit (UTC)
+    'refresh-product-sales-metrics': {
+        'task': 'app.tasks.dashboard_tasks.refresh_product_sales_metrics',
+        'schedule': crontab(hour='0', minute='5'),
+        'options': {
+            'queue': 'maintenance'
+        }
+    },
+
+    # Rafraîchir les instantanés analytiques des gros tenants toutes les 10 minutes
+    'refresh-analytics-snapshots-every-10-minutes': {
+        'task': 'app.tasks.analytics_tasks.refresh_analytics_snapshots',
+        'schedule': 600.0,
+        'options': {
+            'queue': 'maintenance',
+            'expires': 120
+        }
+    },
+
     # Générer rapports mensuels le 1er de chaque mois à 08:00
     'generate-monthly-reports': {
         'task': 'app.tasks.report_tasks.generate_monthly_reports',
@@ -58,6 +81,24 @@ celery_app.conf.beat_schedule = {
         }
     },
 
+    # Créer les partitions mensuelles à venir tous les jours à 01:00
+    'ensure-future-partitions': {
+        'task': 'app.tasks.partition_tasks.ensure_future_partitions',
+        'schedule': crontab(hour='1', minute='0'),
+        'options': {
+            'queue': 'maintenance'
+        }
+    },
+
+    # Archiver les ventes anciennes en Parquet le 2 de chaque mois à 03:00
+    'archive-cold-sales': {
+        'task': 'app.tasks.partition_tasks.archive_cold_sales',
+        'schedule': crontab(day_of_month='2', hour='3', minute='0'),
+        'options': {
+            'queue': 'maintenance'
+        }
+    },
+
     # Nettoyer anciens rapports tous les jours à 02:00
     'cleanup-old-reports': {
         'task': 'app.tasks.report_tasks.cleanup_old_reports',
@@ -68,12 +109,83 @@ celery_app.conf.beat_schedule = {
     },
 }
 
-# Routes (queues)
+# Routes (queues), servies par les profils de app/tasks/worker_profiles.py
 celery_app.conf.task_routes = {
+    'app.tasks.alert_tasks.deliver_alert_notifications': {'queue': 'notifications'},
     'app.tasks.alert_tasks.*': {'queue': 'alerts'},
+    'app.tasks.analytics_tasks.*': {'queue': 'maintenance'},
     'app.tasks.dashboard_tasks.*': {'queue': 'maintenance'},
+    'app.tasks.partition_tasks.*': {'queue': 'maintenance'},
     'app.tasks.report_tasks.*': {'queue': 'reports'},
+    'app.tasks.onboarding.*': {'queue': 'imports'},
 }
 
+
+def _make_psycopg_cooperative() -> None:
+    """
+    Pool gevent (profil io): rendre psycopg2 coopératif.
+
+    Celery applique le monkey patching gevent avant de charger
+    l'application; sans ce correctif, chaque requête SQL bloquerait tous
+    les greenlets du worker.
+    """
+    if "gevent" not in sys.modules:
+        return
+
+    from gevent import monkey
+    if monkey.is_module_patched("socket"):
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+_make_psycopg_cooperative()
+
 # Auto-découvrir tâches dans modules
 celery_app.autodiscover_tasks(['app.tasks'])
+
+# Jetons de comptage SQL des tâches en cours (par task_id)
+_query_tracking_tokens = {}
+
+# Début d'exécution des tâches en cours (par task_id)
+_task_start_times = {}
+
+
+@task_prerun.connect
+def _start_task_query_stats(task_id=None, task=None, **kwargs):
+    """Démarrer le chronomètre et le comptage des requêtes SQL de la tâche."""
+    _task_start_times[task_id] = time.perf_counter()
+    if settings.QUERY_STATS_ENABLED:
+        from app.db.query_stats import start_tracking
+        _query_tracking_tokens[task_id] = start_tracking("task", task.name)
+
+
+@task_postrun.connect
+def _finish_task_query_stats(task_id=None, task=None, state=None, **kwargs):
+    """Publier durée et compteurs SQL de la tâche, signaler les N+1."""
+    start = _task_start_times.pop(task_id, None)
+    if start is not None and settings.METRICS_ENABLED:
+        from app.core.metrics import CELERY_TASK_DURATION
+        delivery_info = getattr(task.request, "delivery_info", None) or {}
+        queue = delivery_info.get("routing_key") or "default"
+        CELERY_TASK_DURATION.labels(queue, task.name, state or "UNKNOWN").observe(
+            time.perf_counter() - start
+        )
+
+    token = _query_tracking_tokens.pop(task_id, None)
+    if token is not None:
+        from app.db.query_stats import finish_tracking
+        finish_tracking(token)
+
+
+@worker_ready.connect
+def _start_metrics_server(**kwargs):
+    """
+    Exposer les métriques du worker sur CELERY_METRICS_PORT.
+
+    En pool prefork, PROMETHEUS_MULTIPROC_DIR doit être défini pour
+    agréger les métriques des processus enfants.
+    """
+    if settings.METRICS_ENABLED and settings.CELERY_METRICS_PORT:
+        from prometheus_client import start_http_server
+        from app.core.metrics import build_registry
+        start_http_server(settings.CELERY_METRICS_PORT, registry=build_registry())
@@ -4,63 +4,131 @@ Tâches Celery pour maintenance des dashboards.
 import logging
 from celery import shared_task
 from sqlalchemy import text
+from app.core.locks import check_lease, single_instance
 from app.db.session import SessionLocal
+from app.services.dashboard_service import DashboardService
 
 logger = logging.getLogger(__name__)
 
 
 @shared_task(name='app.tasks.dashboard_tasks.refresh_dashboard_views')
+@single_instance('refresh_dashboard_views')
 def refresh_dashboard_views():
     """
-    Rafraîchir vues matérialisées des dashboards.
+    Recalculer les agrégats des dashboards des tenants modifiés.
     Exécutée toutes les 10 minutes par Celery Beat.
 
+    Les triggers sur products et sales inscrivent chaque tenant écrit dans
+    dashboard_dirty_tenants: sans écriture depuis le dernier passage (la
+    nuit par exemple), la tâche ne fait rien. Une transaction par tenant.
+
     Returns:
-        Dict avec nombre de vues rafraîchies
+        Dict avec nombre de tenants recalculés
     """
-    logger.info("🔄 Refreshing materialized views for dashboards")
-
     db = SessionLocal()
     try:
-        # Liste des vues matérialisées à rafraîchir
-        views = [
-            'mv_dashboard_stock_health',
-            'mv_dashboard_sales_performance'
-        ]
+        service = DashboardService(db)
+        tenant_ids = service.dirty_tenant_ids()
+        # Lecture du journal terminée: pas de transaction ouverte pendant les recalculs
+        db.rollback()
+
+        if not tenant_ids:
+            logger.info("💤 No dashboard changes since last refresh, skipping")
+            return {
+                "tenants_dirty": 0,
+                "tenants_refreshed": 0,
+                "tenants_failed": 0
+            }
+
+        logger.info(f"🔄 Refreshing dashboard aggregates for {len(tenant_ids)} tenant(s)")
 
         refreshed_count = 0
 
-        for view in views:
+        for tenant_id in tenant_ids:
+            # Verrou perdu: un autre recalcul a pu démarrer, arrêt entre deux tenants
+            check_lease()
             try:
-                # Rafraîchir la vue (CONCURRENTLY permet l'accès en lecture pendant le refresh)
-                logger.info(f"Refreshing view: {view}")
-                db.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view}"))
+                service.refresh_tenant_aggregates(tenant_id)
                 db.commit()
-
                 refreshed_count += 1
-                logger.info(f"✅ View {view} refreshed successfully")
 
             except Exception as e:
-                logger.error(f"Failed to refresh view {view}: {str(e)}", exc_info=True)
+                logger.error(f"Failed to refresh dashboard aggregates for tenant {tenant_id}: {str(e)}", exc_info=True)
                 db.rollback()
-                # Continue avec les autres vues même si une échoue
+                # Continue avec les autres tenants (les marques du tenant en échec restent)
                 continue
 
-        logger.info(f"✅ Dashboard views refresh completed: {refreshed_count}/{len(views)}")
+        logger.info(f"✅ Dashboard aggregates refresh completed: {refreshed_count}/{len(tenant_ids)}")
 
         return {
-            "views_total": len(views),
-            "views_refreshed": refreshed_count,
-            "views_failed": len(views) - refreshed_count
+            "tenants_dirty": len(tenant_ids),
+            "tenants_refreshed": refreshed_count,
+            "tenants_failed": len(tenant_ids) - refreshed_count
         }
 
     except Exception as e:
-        logger.error(f"Fatal error refreshing views: {str(e)}", exc_info=True)
+        logger.error(f"Fatal error refreshing dashboard aggregates: {str(e)}", exc_info=True)
         raise
     finally:
         db.close()
 
 
+@shared_task(
+    name='app.tasks.dashboard_tasks.refresh_product_sales_metrics',
+    time_limit=1800,
+    soft_time_limit=1500,
+)
+@single_instance('refresh_product_sales_metrics')
+def refresh_product_sales_metrics():
+    """
+    Recalculer les métriques de ventes des produits (last_sale_at, qty_30d,
+    qty_90d, revenue_30d).
+
+    Les triggers sur sales suivent les insertions, modifications et
+    suppressions; seules les fenêtres glissantes (CURRENT_DATE - 30/90
+    jours) sont corrigées ici. Exécutée chaque nuit juste après
+    minuit UTC, les valeurs sont exactes pour toute la journée.
+    Une transaction par tenant pour limiter la durée des verrous.
+
+    Returns:
+        Dict avec nombre de tenants traités et de produits corrigés
+    """
+    logger.info("🔄 Refreshing product sales metrics")
+
+    db = SessionLocal()
+    try:
+        tenant_ids = [
+            tenant_id for (tenant_id,) in db.execute(text("SELECT id FROM tenants ORDER BY id"))
+        ]
+
+        products_updated = 0
+        failed = 0
+
+        for tenant_id in tenant_ids:
+            check_lease()
+            try:
+                products_updated += db.execute(
+                    text("SELECT fn_refresh_product_sales_metrics(:tenant_id)"),
+                    {"tenant_id": str(tenant_id)}
+                ).scalar() or 0
+                db.commit()
+            except Exception as e:
+                logger.error(f"Failed to refresh sales metrics for tenant {tenant_id}: {str(e)}", exc_info=True)
+                db.rollback()
+                failed += 1
+
+        logger.info(f"✅ Product sales metrics refreshed: {products_updated} product(s) corrected")
+
+        return {
+            "tenants_total": len(tenant_ids),
+            "tenants_failed": failed,
+            "products_updated": products_updated
+        }
+
+    finally:
+        db.close()
+
+
 @shared_task(name='app.tasks.dashboard_tasks.cleanup_old_alert_history')
 def cleanup_old_alert_history(days_to_keep: int = 90):
     """
@@ -5,12 +5,14 @@ Sprint 2: Import asynchrone de données Excel avec tracking de progression.
 """
 import logging
 from datetime import datetime
-from typing import Dict
+from typing import TYPE_CHECKING, Dict
 from uuid import UUID
 
-import pandas as pd
 from sqlalchemy.orm import Session
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 from app.db.session import SessionLocal
 from app.models.category import Category
 from app.models.import_job import ImportJob
@@ -19,7 +21,6 @@ from app.models.product import Product
 from app.models.sale import Sale
 from app.models.supplier import Supplier
 from app.models.tenant import Tenant
-from app.services.import_service import ImportService
 from app.tasks.celery_app import celery_app
 
 logger = logging.getLogger(__name__)
@@ -44,6 +45,9 @@ def import_tenant_data(self, import_job_id: str, file_path: str):
     Returns:
         Dict avec stats d'import
     """
+    import pandas as pd
+    from app.services.import_service import ImportService
+
     db: Session = SessionLocal()
 
     try:
@@ -126,8 +130,10 @@ def import_tenant_data(self, import_job_id: str, file_path: str):
         db.close()
 
 
-def _import_products(db: Session, df: pd.DataFrame, tenant_id: UUID) -> int:
+def _import_products(db: Session, df: "pd.DataFrame", tenant_id: UUID) -> int:
     """Importer produits en batch."""
+    import pandas as pd
+
     count = 0
     batch_size = 100
 
@@ -171,8 +177,10 @@ def _import_products(db: Session, df: pd.DataFrame, tenant_id: UUID) -> int:
     return count
 
 
-def _import_sales(db: Session, df: pd.DataFrame, tenant_id: UUID) -> int:
+def _import_sales(db: Session, df: "pd.DataFrame", tenant_id: UUID) -> int:
     """Importer ventes en batch."""
+    import pandas as pd
+
     count = 0
     batch_size = 1000
 
@@ -218,6 +226,8 @@ def _import_sales(db: Session, df: pd.DataFrame, tenant_id: UUID) -> int:
 
 def _ensure_categories(db: Session, names: list, tenant_id: UUID) -> Dict[str, UUID]:
     """Créer catégories manquantes et retourner mapping."""
+    import pandas as pd
+
     existing = db.query(Category).filter(Category.tenant_id == tenant_id).all()
     categories_map = {c.name: c.id for c in existing}
 
@@ -237,6 +247,8 @@ def _ensure_categories(db: Session, names: list, tenant_id: UUID) -> Dict[str, U
 
 def _ensure_suppliers(db: Session, names: list, tenant_id: UUID) -> Dict[str, UUID]:
     """Créer fournisseurs manquants et retourner mapping."""
+    import pandas as pd
+
     existing = db.query(Supplier).filter(Supplier.tenant_id == tenant_id).all()
     suppliers_map = {s.name: s.id for s in existing}
 
@@ -275,8 +287,8 @@ def _post_process(db: Session, tenant_id: UUID):
 
     db.commit()
 
-    # TODO Sprint 3: Refresh materialized views
-    # db.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY mv_dashboard_stock_health")
+    # Agrégats du dashboard: les imports sont inscrits au journal par trigger,
+    # recalculés au prochain passage de refresh_dashboard_views
 
 
 def _update_progress(db: Session, import_job: ImportJob, percent: int, message: str):
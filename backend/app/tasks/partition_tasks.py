@@ -0,0 +1,90 @@
+"""
+Tâches Celery pour la maintenance des partitions (sales, stock_movements).
+"""
+import logging
+from celery import shared_task
+from app.config import settings
+from app.core.locks import single_instance
+from app.db.session import engine
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='app.tasks.partition_tasks.ensure_future_partitions')
+@single_instance('ensure_future_partitions')
+def ensure_future_partitions(months_ahead: int = None):
+    """
+    Créer à l'avance les partitions mensuelles manquantes.
+    Exécutée tous les jours par Celery Beat: une ligne datée d'un mois
+    sans partition tomberait dans la partition DEFAULT (pas de pruning).
+
+    Args:
+        months_ahead: Mois créés au-delà du mois courant (défaut: PARTITION_MONTHS_AHEAD)
+
+    Returns:
+        Dict avec les partitions créées
+    """
+    from app.db.partitioning import ensure_future_partitions as ensure
+
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    logger.info(f"🗂️  Ensuring partitions up to {months_ahead} month(s) ahead")
+
+    try:
+        with engine.begin() as conn:
+            created = ensure(conn, months_ahead)
+
+        logger.info(f"✅ Partitions check completed: {len(created)} created")
+
+        return {
+            "months_ahead": months_ahead,
+            "partitions_created": created
+        }
+
+    except Exception as e:
+        logger.error(f"Error creating partitions: {str(e)}", exc_info=True)
+        raise
+
+
+@shared_task(name='app.tasks.partition_tasks.archive_cold_sales')
+@single_instance('archive_cold_sales')
+def archive_cold_sales():
+    """
+    Archiver en Parquet les mois de ventes au-delà de SALES_ARCHIVE_AFTER_MONTHS.
+    Exécutée chaque mois par Celery Beat (sans effet si SALES_ARCHIVE_ENABLED=False).
+
+    Returns:
+        Dict avec les mois archivés et les éventuels échecs
+    """
+    from app.db.session import SessionLocal
+    from app.services.sales_archive_service import SalesArchiveService
+
+    if not settings.SALES_ARCHIVE_ENABLED:
+        logger.info("Sales archival disabled, skipping")
+        return {"enabled": False}
+
+    logger.info(f"🧊 Archiving sales older than {settings.SALES_ARCHIVE_AFTER_MONTHS} month(s)")
+
+    db = SessionLocal()
+    try:
+        service = SalesArchiveService(db)
+        archived = []
+        failed = []
+
+        for month in service.archivable_months():
+            try:
+                archived.append(service.archive_month(month))
+            except Exception as e:
+                # Mois repris au prochain passage; les suivants restent en base
+                logger.error(f"Failed to archive sales of {month}: {str(e)}", exc_info=True)
+                failed.append(month.isoformat())
+                break
+
+        logger.info(f"✅ Sales archival completed: {len(archived)} month(s) archived")
+
+        return {
+            "enabled": True,
+            "archived": archived,
+            "failed": failed
+        }
+    finally:
+        db.close()
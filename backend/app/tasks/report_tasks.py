@@ -1,40 +1,63 @@
 """
 Tâches Celery pour la génération automatique de rapports.
 """
-from celery import shared_task
+from celery import chord, shared_task
 from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
 import os
 import logging
 from pathlib import Path
+from typing import Dict, List
+from uuid import UUID
 
-from app.db.session import SessionLocal
+from app.core.locks import RedisSemaphore, single_instance
+from app.core.redis_client import get_redis
+from app.db.session import SessionLocal, read_session
 from app.models.tenant import Tenant
 from app.models.user import User
-from app.services.report_service import ReportService
+from app.services.report_artifact_service import (
+    ReportArtifactService,
+    ReportArtifactStore,
+    month_bounds,
+)
 from app.integrations.email import EmailService
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+# Sémaphore global: nombre max de rapports mensuels générés simultanément
+_monthly_report_slots = RedisSemaphore(
+    "monthly_reports",
+    limit=settings.MONTHLY_REPORTS_MAX_CONCURRENCY,
+    timeout=settings.MONTHLY_REPORTS_SLOT_TIMEOUT
+)
+
+# Envois du rapport mensuel mémorisés (tenant, mois) pour ne pas renvoyer l'email sur un retry
+MONTHLY_REPORT_DELIVERY_TTL_SECONDS = 62 * 24 * 3600
+
+
+def _monthly_report_delivery_key(tenant_id: str, month: int, year: int) -> str:
+    return f"monthly_report:delivered:{tenant_id}:{year}-{month:02d}"
+
+
 @shared_task(name='app.tasks.report_tasks.generate_monthly_reports')
+@single_instance('generate_monthly_reports')
 def generate_monthly_reports():
     """
     Tâche périodique: Générer rapports mensuels pour tous les tenants.
 
     Exécutée le 1er de chaque mois à 08:00.
-    Génère le rapport PDF du mois précédent et l'envoie par email.
+    Lance une sous-tâche par tenant (queue `reports`) puis agrège les
+    résultats dans summarize_monthly_reports. Le temps total dépend du
+    nombre de workers, plus de la limite de 300s d'une seule tâche.
 
     Returns:
-        dict: Statistiques d'exécution
+        dict: Nombre de sous-tâches lancées et mois traité
     """
     logger.info("Starting monthly report generation")
 
     db = SessionLocal()
-    tenants_processed = 0
-    tenants_success = 0
-    tenants_failed = 0
 
     try:
         # Calculer mois précédent
@@ -48,60 +71,144 @@ def generate_monthly_reports():
 
         logger.info(f"Generating reports for {month:02d}/{year}")
 
-        # Récupérer tous les tenants actifs
-        tenants = db.query(Tenant).filter(Tenant.is_active == True).all()
-        tenants_processed = len(tenants)
+        # Récupérer tous les tenants actifs (ids uniquement)
+        tenant_ids = [
+            str(tenant_id) for (tenant_id,) in
+            db.query(Tenant.id).filter(Tenant.is_active == True).all()
+        ]
 
-        logger.info(f"Found {tenants_processed} active tenants")
+        logger.info(f"Found {len(tenant_ids)} active tenants")
 
-        for tenant in tenants:
-            try:
-                logger.info(f"Processing tenant {tenant.id} - {tenant.name}")
+        if not tenant_ids:
+            return summarize_monthly_reports([], month, year)
+
+        # Fan-out: une sous-tâche par tenant, résumé quand toutes ont fini
+        chord(
+            generate_tenant_monthly_report.s(tenant_id, month, year)
+            for tenant_id in tenant_ids
+        )(summarize_monthly_reports.s(month, year))
+
+        return {
+            "tenants_dispatched": len(tenant_ids),
+            "month": month,
+            "year": year
+        }
+
+    except Exception as e:
+        logger.error(f"Fatal error in monthly report generation: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
 
-                # Générer PDF
-                report_service = ReportService(db)
-                pdf = report_service.generate_monthly_summary_pdf(tenant.id, month, year)
 
-                # Créer dossier reports si n'existe pas
-                reports_dir = Path(settings.REPORTS_DIR)
-                reports_dir.mkdir(parents=True, exist_ok=True)
+@shared_task(
+    bind=True,
+    name='app.tasks.report_tasks.generate_tenant_monthly_report',
+    max_retries=None,
+)
+def generate_tenant_monthly_report(self, tenant_id: str, month: int, year: int, failures: int = 0):
+    """
+    Sous-tâche: générer et envoyer le rapport mensuel d'un tenant.
 
-                # Sauvegarder fichier
-                filename = f"synthese_{tenant.id}_{year}_{month:02d}.pdf"
-                filepath = reports_dir / filename
+    - Attend un créneau du sémaphore global avant de générer (les attentes
+      ne consomment pas le budget de retries)
+    - Réessaie avec backoff exponentiel en cas d'erreur, jusqu'à
+      MONTHLY_REPORTS_MAX_RETRIES, puis renvoie un statut "failed" pour
+      que le résumé soit tout de même produit
+    - N'envoie l'email qu'une fois par tenant et par mois: l'envoi est
+      mémorisé dans Redis et un retry (ou une redistribution du message)
+      survenu après l'envoi ne le répète pas
 
-                with open(filepath, "wb") as f:
-                    f.write(pdf.getvalue())
+    Args:
+        tenant_id: UUID du tenant
+        month: Mois du rapport
+        year: Année du rapport
+        failures: Nombre d'échecs déjà subis (géré par les retries)
 
-                logger.info(f"Report saved: {filepath} ({filepath.stat().st_size} bytes)")
+    Returns:
+        dict: Statut du tenant (success/failed)
+    """
+    delivery_key = _monthly_report_delivery_key(tenant_id, month, year)
+    if get_redis().exists(delivery_key):
+        logger.info(f"Monthly report {month:02d}/{year} already sent to tenant {tenant_id}, skipping")
+        return {"tenant_id": tenant_id, "status": "success", "attempts": failures + 1, "already_sent": True}
 
-                # Envoyer par email
-                _send_report_email(db, tenant, str(filepath), month, year)
+    slot = _monthly_report_slots.acquire()
+    if slot is None:
+        logger.debug(f"No monthly report slot for tenant {tenant_id}, retrying later")
+        raise self.retry(countdown=settings.MONTHLY_REPORTS_SLOT_WAIT_SECONDS)
 
-                tenants_success += 1
-                logger.info(f"Successfully processed tenant {tenant.id}")
+    db = read_session()
+    try:
+        tenant = db.query(Tenant).filter(Tenant.id == tenant_id).first()
+        if not tenant:
+            return {"tenant_id": tenant_id, "status": "skipped", "error": "Tenant introuvable"}
 
-            except Exception as e:
-                tenants_failed += 1
-                logger.error(f"Failed to generate report for tenant {tenant.id}: {str(e)}", exc_info=True)
-                continue
+        logger.info(f"Processing tenant {tenant.id} - {tenant.name}")
 
-        result = {
-            "tenants_processed": tenants_processed,
-            "tenants_success": tenants_success,
-            "tenants_failed": tenants_failed,
-            "month": month,
-            "year": year
-        }
+        # Générer PDF (ou le reprendre du cache: mois clôturé)
+        start_date, end_date = month_bounds(year, month)
+        artifact = ReportArtifactService(db).get_or_build(
+            tenant.id, "monthly_summary_pdf", start_date, end_date
+        )
+        filepath = Path(artifact["path"])
 
-        logger.info(f"Monthly report generation completed: {result}")
-        return result
+        logger.info(f"Report ready: {filepath} ({artifact['size_bytes']} bytes)")
+
+        # Envoyer par email, puis mémoriser l'envoi avant tout autre travail
+        _send_report_email(db, tenant, str(filepath), month, year)
+        get_redis().set(delivery_key, datetime.now().isoformat(), ex=MONTHLY_REPORT_DELIVERY_TTL_SECONDS)
+
+        logger.info(f"Successfully processed tenant {tenant.id}")
+        return {"tenant_id": tenant_id, "status": "success", "attempts": failures + 1}
 
     except Exception as e:
-        logger.error(f"Fatal error in monthly report generation: {str(e)}", exc_info=True)
-        raise
+        if failures >= settings.MONTHLY_REPORTS_MAX_RETRIES:
+            logger.error(f"Failed to generate report for tenant {tenant_id}: {str(e)}", exc_info=True)
+            return {
+                "tenant_id": tenant_id,
+                "status": "failed",
+                "attempts": failures + 1,
+                "error": str(e)
+            }
+
+        logger.warning(f"Report for tenant {tenant_id} failed (attempt {failures + 1}), retrying: {str(e)}")
+        raise self.retry(
+            exc=e,
+            kwargs={"failures": failures + 1},
+            countdown=settings.MONTHLY_REPORTS_RETRY_BACKOFF * (2 ** failures)
+        )
     finally:
         db.close()
+        _monthly_report_slots.release(slot)
+
+
+@shared_task(name='app.tasks.report_tasks.summarize_monthly_reports')
+def summarize_monthly_reports(results: List[Dict], month: int, year: int):
+    """
+    Callback du chord: agréger les résultats des sous-tâches par tenant.
+
+    Args:
+        results: Résultats de generate_tenant_monthly_report
+        month: Mois du rapport
+        year: Année du rapport
+
+    Returns:
+        dict: Statistiques d'exécution
+    """
+    failed = [r for r in results if r.get("status") == "failed"]
+
+    result = {
+        "tenants_processed": len(results),
+        "tenants_success": sum(1 for r in results if r.get("status") == "success"),
+        "tenants_failed": len(failed),
+        "failed_tenants": [r["tenant_id"] for r in failed],
+        "month": month,
+        "year": year
+    }
+
+    logger.info(f"Monthly report generation completed: {result}")
+    return result
 
 
 def _send_report_email(db: Session, tenant: Tenant, filepath: str, month: int, year: int):
@@ -189,12 +296,64 @@ def _send_report_email(db: Session, tenant: Tenant, filepath: str, month: int, y
         raise
 
 
+@shared_task(name='app.tasks.report_tasks.build_report_artifact')
+def build_report_artifact(
+    tenant_id: str,
+    report_type: str,
+    start_date: str = None,
+    end_date: str = None
+):
+    """
+    Tâche à la demande: générer un rapport et l'enregistrer dans le cache.
+
+    Déclenchée par POST /reports/jobs. Si un autre job a déjà produit le
+    même artefact entre-temps, il est repris tel quel.
+
+    Args:
+        tenant_id: UUID du tenant
+        report_type: Type de rapport (inventory_excel, sales_analysis_excel, monthly_summary_pdf)
+        start_date: Début de période (ISO, optionnel)
+        end_date: Fin de période (ISO, optionnel)
+
+    Returns:
+        dict: Clé et métadonnées de l'artefact
+    """
+    logger.info(f"Building report {report_type} for tenant {tenant_id}")
+
+    db = read_session()
+    try:
+        artifact = ReportArtifactService(db).get_or_build(
+            UUID(tenant_id),
+            report_type,
+            datetime.fromisoformat(start_date) if start_date else None,
+            datetime.fromisoformat(end_date) if end_date else None,
+        )
+
+        return {
+            "tenant_id": tenant_id,
+            "artifact_key": artifact["key"],
+            "report_type": report_type,
+            "period": artifact["period"],
+            "size_bytes": artifact["size_bytes"],
+            "cache_hit": artifact["cache_hit"],
+        }
+
+    except Exception as e:
+        logger.error(f"Error building report {report_type} for tenant {tenant_id}: {str(e)}", exc_info=True)
+        raise
+    finally:
+        db.close()
+
+
 @shared_task(name='app.tasks.report_tasks.cleanup_old_reports')
+@single_instance('cleanup_old_reports')
 def cleanup_old_reports():
     """
     Tâche périodique: Nettoyer les anciens rapports.
 
-    Supprime les rapports plus vieux que REPORTS_RETENTION_DAYS.
+    Supprime les rapports plus vieux que REPORTS_RETENTION_DAYS, les
+    artefacts en cache des périodes non clôturées créés avant ce délai et
+    ceux des mois clôturés non lus depuis REPORTS_CLOSED_ARTIFACTS_RETENTION_DAYS.
     Exécutée quotidiennement à 02:00.
 
     Returns:
@@ -205,13 +364,21 @@ def cleanup_old_reports():
     try:
         reports_dir = Path(settings.REPORTS_DIR)
 
-        if not reports_dir.exists():
-            logger.info("Reports directory does not exist, nothing to clean")
-            return {"files_deleted": 0}
-
         # Calculer date limite
         cutoff_date = datetime.now() - timedelta(days=settings.REPORTS_RETENTION_DAYS)
 
+        # Artefacts en cache (mois clôturés: selon leur dernier accès)
+        artifacts_deleted, artifacts_freed = ReportArtifactStore().prune(
+            cutoff_date,
+            immutable_unused_since=datetime.now() - timedelta(
+                days=settings.REPORTS_CLOSED_ARTIFACTS_RETENTION_DAYS
+            ),
+        )
+
+        if not reports_dir.exists():
+            logger.info("Reports directory does not exist, nothing to clean")
+            return {"files_deleted": 0, "artifacts_deleted": artifacts_deleted}
+
         files_deleted = 0
         total_size_freed = 0
 
@@ -232,8 +399,11 @@ def cleanup_old_reports():
                 logger.error(f"Failed to delete {filepath}: {str(e)}")
                 continue
 
+        total_size_freed += artifacts_freed
+
         result = {
             "files_deleted": files_deleted,
+            "artifacts_deleted": artifacts_deleted,
             "total_size_freed_mb": round(total_size_freed / (1024 * 1024), 2),
             "retention_days": settings.REPORTS_RETENTION_DAYS
         }
@@ -0,0 +1,62 @@
+"""
+Tâches sondes pour mesurer le débit des profils de workers.
+
+Reproduisent la charge type de chaque profil sans toucher aux données:
+- io_probe: envoi WhatsApp par le vrai client Twilio (worker pointé sur
+  le faux Twilio de scripts/fake_providers.py)
+- cpu_probe: agrégation pandas comparable à un import ou un rapport
+
+Envoyées explicitement sur une queue par scripts/benchmark_workers.py.
+"""
+import time
+from typing import Any, Dict
+
+from celery import shared_task
+
+
+@shared_task(name='app.tasks.worker_probes.io_probe')
+def io_probe(recipient: str = "+221770000000") -> Dict[str, Any]:
+    """
+    Sonde I/O: un message WhatsApp.
+
+    Args:
+        recipient: Numéro destinataire (le faux Twilio accepte tout)
+
+    Returns:
+        Dict avec statut d'envoi et durée (secondes)
+    """
+    from app.integrations.whatsapp import whatsapp_service
+
+    start = time.perf_counter()
+    sent = whatsapp_service.send_alert(recipient, "Sonde de débit Digiboost")
+    return {"sent": sent, "duration": time.perf_counter() - start}
+
+
+@shared_task(name='app.tasks.worker_probes.cpu_probe')
+def cpu_probe(rows: int = 200000) -> Dict[str, Any]:
+    """
+    Sonde CPU: agrégation de ventes synthétiques par produit.
+
+    Args:
+        rows: Nombre de lignes générées
+
+    Returns:
+        Dict avec nombre de groupes et durée (secondes)
+    """
+    import numpy as np
+    import pandas as pd
+
+    start = time.perf_counter()
+    rng = np.random.default_rng(rows)
+    sales = pd.DataFrame({
+        "product": rng.integers(0, 5000, rows),
+        "quantity": rng.random(rows) * 10,
+        "unit_price": rng.random(rows) * 1000,
+    })
+    sales["total_amount"] = sales["quantity"] * sales["unit_price"]
+    summary = (
+        sales.groupby("product")
+        .agg(quantity=("quantity", "sum"), revenue=("total_amount", "sum"))
+        .sort_values("revenue", ascending=False)
+    )
+    return {"groups": len(summary), "duration": time.perf_counter() - start}
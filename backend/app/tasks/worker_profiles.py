@@ -0,0 +1,114 @@
+"""
+Profils de workers Celery par famille de queues.
+
+Chaque famille de tâches a son propre worker, avec le modèle de
+concurrence adapté à sa charge:
+- io: alertes et notifications (Twilio, SMTP, Redis), surtout de
+  l'attente réseau -> pool gevent, centaines de greenlets
+- cpu: rapports (PDF, Excel, graphiques) et imports (pandas) ->
+  prefork, un processus par cœur, recyclé au-delà d'un plafond mémoire
+- maintenance: tâches périodiques dont le coût est côté PostgreSQL
+  (agrégats, partitions, archivage) -> prefork, faible concurrence
+
+Pool de connexions PostgreSQL: un moteur SQLAlchemy par processus.
+En prefork, un processus n'exécute qu'une tâche à la fois et le pool
+par défaut (DB_POOL_SIZE + DB_MAX_OVERFLOW) suffit. Le worker io fait
+tourner CELERY_IO_CONCURRENCY greenlets dans un seul processus: son pool
+est fixé par run_worker.py (DB_POOL_SIZE=CELERY_IO_DB_POOL_SIZE, sans
+débordement), au plus une connexion par greenlet. Les greenlets au-delà
+attendent une connexion (attente coopérative): les tâches io ne gardent
+pas de connexion pendant les appels réseau.
+
+Démarrage: python scripts/run_worker.py <profil>
+Débit mesurable par profil: python scripts/benchmark_workers.py <profil>
+"""
+import os
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    """Options de lancement d'un worker Celery"""
+    name: str
+    queues: Tuple[str, ...]
+    pool: str
+    concurrency: int
+    prefetch_multiplier: int = 1
+    max_memory_per_child_mb: Optional[int] = None
+    db_pool_size: Optional[int] = None  # None: DB_POOL_SIZE / DB_MAX_OVERFLOW de la configuration
+    db_max_overflow: int = 0
+
+    def worker_args(self) -> List[str]:
+        """
+        Arguments de `celery` pour démarrer ce worker.
+
+        Returns:
+            Liste d'arguments (sans l'exécutable)
+        """
+        args = [
+            "-A", "app.tasks.celery_app", "worker",
+            "--hostname", f"{self.name}@%h",
+            "--queues", ",".join(self.queues),
+            "--pool", self.pool,
+            "--concurrency", str(self.concurrency),
+            "--prefetch-multiplier", str(self.prefetch_multiplier),
+        ]
+        if self.max_memory_per_child_mb:
+            # En KiB pour Celery; vérifié après chaque tâche (pas d'interruption en cours)
+            args += ["--max-memory-per-child", str(self.max_memory_per_child_mb * 1024)]
+        return args
+
+    def environment(self) -> Dict[str, str]:
+        """
+        Variables d'environnement propres au worker (lues par app.config).
+
+        Returns:
+            Dict des variables à définir (vide: configuration par défaut)
+        """
+        if self.db_pool_size is None:
+            return {}
+        return {
+            "DB_POOL_SIZE": str(self.db_pool_size),
+            "DB_MAX_OVERFLOW": str(self.db_max_overflow),
+        }
+
+    def db_connections(self) -> int:
+        """Connexions PostgreSQL au plus, par processus du worker et par base."""
+        if self.db_pool_size is None:
+            return settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        return self.db_pool_size + self.db_max_overflow
+
+    def tasks_per_process(self) -> int:
+        """Tâches exécutées simultanément par un processus du worker."""
+        return self.concurrency if self.pool == "gevent" else 1
+
+
+def worker_profiles() -> Dict[str, WorkerProfile]:
+    """Profils disponibles (valeurs lues dans la configuration)."""
+    return {
+        "io": WorkerProfile(
+            name="io",
+            queues=("alerts", "notifications"),
+            pool="gevent",
+            concurrency=settings.CELERY_IO_CONCURRENCY,
+            prefetch_multiplier=settings.CELERY_IO_PREFETCH_MULTIPLIER,
+            # Au plus une connexion par greenlet
+            db_pool_size=max(1, min(settings.CELERY_IO_DB_POOL_SIZE, settings.CELERY_IO_CONCURRENCY)),
+        ),
+        "cpu": WorkerProfile(
+            name="cpu",
+            queues=("reports", "imports"),
+            pool="prefork",
+            concurrency=settings.CELERY_CPU_CONCURRENCY or os.cpu_count() or 1,
+            max_memory_per_child_mb=settings.CELERY_CPU_MAX_MEMORY_PER_CHILD_MB,
+        ),
+        "maintenance": WorkerProfile(
+            name="maintenance",
+            queues=("maintenance", "celery"),
+            pool="prefork",
+            concurrency=settings.CELERY_MAINTENANCE_CONCURRENCY,
+        ),
+    }
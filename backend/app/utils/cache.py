@@ -0,0 +1,69 @@
+"""
+Caches en mémoire partagés (par processus).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.core.metrics import record_cache_access
+
+V = TypeVar("V")
+
+
+class ExpiringLRUCache(Generic[V]):
+    """
+    Cache LRU borné dont chaque entrée porte sa propre date d'expiration.
+
+    Thread-safe: partagé par les threads du pool de FastAPI.
+    """
+
+    def __init__(self, max_size: int, name: Optional[str] = None):
+        """
+        Initialiser le cache.
+
+        Args:
+            max_size: Nombre maximum d'entrées (0 désactive le cache)
+            name: Nom du cache dans les métriques hit/miss (None = non mesuré)
+        """
+        self.max_size = max_size
+        self.name = name
+        self._items: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Récupérer une entrée non expirée (et la marquer comme récente)."""
+        with self._lock:
+            value = None
+            item = self._items.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at <= time.time():
+                    del self._items[key]
+                    value = None
+                else:
+                    self._items.move_to_end(key)
+
+        if self.name is not None:
+            record_cache_access(self.name, value is not None)
+        return value
+
+    def set(self, key: Hashable, value: V, expires_at: float) -> None:
+        """Enregistrer une entrée jusqu'à `expires_at` (timestamp epoch)."""
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+        with self._lock:
+            self._items[key] = (expires_at, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Retirer une entrée si présente."""
+        with self._lock:
+            self._items.pop(key, None)
+
+    def clear(self) -> None:
+        """Vider le cache."""
+        with self._lock:
+            self._items.clear()
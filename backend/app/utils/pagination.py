@@ -0,0 +1,107 @@
+"""
+Pagination par curseur (keyset) pour les listes volumineuses.
+
+Le curseur encode la clé de tri (date, id) du dernier élément renvoyé.
+La page suivante filtre directement sur cette clé au lieu de sauter
+`offset` lignes, ce qui garde un coût constant quelle que soit la profondeur.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from sqlalchemy import literal, tuple_
+from sqlalchemy.orm import Query
+
+
+class InvalidCursorError(ValueError):
+    """Exception levée quand un curseur de pagination est illisible."""
+    pass
+
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """
+    Encoder la clé (date, id) d'une ligne en curseur opaque.
+
+    Args:
+        sort_value: Valeur de la colonne de tri (datetime)
+        row_id: Identifiant de la ligne (UUID ou entier)
+
+    Returns:
+        Curseur base64 url-safe
+    """
+    payload = json.dumps([sort_value.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Décoder un curseur produit par encode_cursor.
+
+    Args:
+        cursor: Curseur opaque reçu du client
+
+    Returns:
+        Tuple (valeur de tri, id sous forme de chaîne)
+
+    Raises:
+        InvalidCursorError: Si le curseur est corrompu
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), row_id
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Curseur de pagination invalide") from e
+
+
+def paginate_keyset(
+    query: Query,
+    sort_column,
+    id_column,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Paginer une requête par ordre décroissant de (sort_column, id_column).
+
+    Nécessite un index composite se terminant par (sort_column, id_column)
+    pour que Postgres parcoure l'index sans tri ni offset.
+
+    Args:
+        query: Requête ORM déjà filtrée (tenant, filtres optionnels)
+        sort_column: Colonne de tri principale (ex: AlertHistory.triggered_at)
+        id_column: Colonne de départage unique (ex: AlertHistory.id)
+        limit: Nombre maximum de lignes de la page
+        cursor: Curseur de la page précédente (None pour la première page)
+
+    Returns:
+        Tuple (lignes de la page, curseur de la page suivante ou None)
+
+    Raises:
+        InvalidCursorError: Si le curseur est corrompu
+    """
+    if cursor:
+        sort_value, last_id = decode_cursor(cursor)
+        try:
+            last_id = id_column.type.python_type(last_id)
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError("Curseur de pagination invalide") from e
+
+        query = query.filter(
+            tuple_(sort_column, id_column) < tuple_(
+                literal(sort_value, type_=sort_column.type),
+                literal(last_id, type_=id_column.type),
+            )
+        )
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+    return rows, next_cursor
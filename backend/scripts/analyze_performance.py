@@ -1,210 +1,342 @@
 """
-Script d'analyse des performances SQL
-Mesure le temps d'exécution des requêtes critiques et affiche EXPLAIN ANALYZE
+Suite de non-régression des plans SQL
+Exécute les méthodes de service « chaudes » sur un jeu de données déterministe,
+capture chaque requête SQL émise, puis la rejoue sous EXPLAIN (ANALYZE, BUFFERS).
+
+Échec (code 1) si:
+- un plan fait un Seq Scan sur sales ou products
+- une requête dépasse le budget de latence enregistré dans le baseline
+
+Usage:
+    python scripts/analyze_performance.py                      # comparer au baseline
+    python scripts/analyze_performance.py --update-baseline    # enregistrer plans et budgets
+    python scripts/analyze_performance.py --reseed --verbose   # regénérer les données, afficher les plans
 """
-import sys
+import argparse
+import json
+import math
 import os
+import statistics
+import sys
 import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from uuid import UUID
 
 # Ajouter le répertoire parent au path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.db.partitioning import default_partition_name, parent_table
+from app.db.query_stats import fingerprint
+from app.db.session import SessionLocal, engine
+from app.db.slow_queries import fingerprint_hash
+from perf_dataset import DatasetSpec, ensure_dataset
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "perf_baselines.json"
+
+# Tables sur lesquelles un Seq Scan est toujours une régression
+GUARDED_TABLES = {"sales", "products"}
+
+# Budget enregistré = max(plancher, médiane mesurée x facteur)
+BUDGET_FACTOR = 3.0
+BUDGET_FLOOR_MS = 20.0
+
+# Écart estimation / réalité signalé (sans échec)
+MISESTIMATE_WARNING_RATIO = 100
+
+
+@dataclass
+class CapturedQuery:
+    """Requête SQL émise par un cas, avec ses paramètres réels"""
+    key: str
+    statement: str
+    parameters: Any
+    fingerprint: str
+
+
+@dataclass
+class QueryResult:
+    """Plan et latence mesurés pour une requête"""
+    key: str
+    fingerprint_hash: str
+    statement: str
+    median_ms: float
+    plan_nodes: List[str]
+    seq_scans: List[str]
+    max_misestimate: float
+    plan: Any = None
+    failures: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Context:
+    """Données de référence passées aux cas"""
+    tenant_id: UUID
+    product_id: UUID
+
 
-from app.db.session import SessionLocal
-from sqlalchemy import text
-from app.models.tenant import Tenant
+def _cases() -> List[Tuple[str, Callable[[Session, Context], Any]]]:
+    """Méthodes de service exercées (imports locaux: reportlab/openpyxl seulement ici)"""
+    from app.models.alert_history import AlertHistory
+    from app.services.alert_service import AlertService
+    from app.services.analytics_service import AnalyticsService
+    from app.services.dashboard_service import DashboardService
+    from app.services.prediction_service import PredictionService
+    from app.services.report_service import ReportService
+    from app.utils.pagination import paginate_keyset
 
-def analyze_performance():
-    """Analyser les performances des requêtes critiques"""
+    def alert_history_page(db: Session, ctx: Context):
+        query = db.query(AlertHistory).filter(AlertHistory.tenant_id == ctx.tenant_id)
+        return paginate_keyset(query, AlertHistory.triggered_at, AlertHistory.id, 50)
+
+    def inventory_report(db: Session, ctx: Context):
+        ReportService(db).generate_inventory_report(ctx.tenant_id).close()
+
+    def sales_analysis_report(db: Session, ctx: Context):
+        end = datetime.now()
+        ReportService(db).generate_sales_analysis_report(ctx.tenant_id, end - timedelta(days=30), end).close()
+
+    return [
+        ("dashboard.overview", lambda db, ctx: DashboardService(db).get_overview(ctx.tenant_id)),
+        ("analytics.product_analysis", lambda db, ctx: AnalyticsService(db).get_product_analysis(ctx.tenant_id, ctx.product_id)),
+        ("analytics.sales_evolution", lambda db, ctx: AnalyticsService(db).get_sales_evolution(ctx.tenant_id, 30)),
+        ("analytics.top_products", lambda db, ctx: AnalyticsService(db).get_top_products(ctx.tenant_id)),
+        ("analytics.category_performance", lambda db, ctx: AnalyticsService(db).get_category_performance(ctx.tenant_id)),
+        ("analytics.classify_abc", lambda db, ctx: AnalyticsService(db).classify_products_abc(ctx.tenant_id)),
+        ("predictions.ruptures_prevues", lambda db, ctx: PredictionService(db).get_ruptures_prevues(ctx.tenant_id)),
+        ("predictions.recommandations_achat", lambda db, ctx: PredictionService(db).get_recommandations_achat(ctx.tenant_id)),
+        ("alerts.evaluate_all", lambda db, ctx: AlertService(db).evaluate_all_alerts(ctx.tenant_id)),
+        ("alerts.history_page", alert_history_page),
+        ("reports.inventory", inventory_report),
+        ("reports.sales_analysis", sales_analysis_report),
+    ]
+
+
+@contextmanager
+def capture_statements(captured: List[Tuple[str, Any]]):
+    """Enregistrer les requêtes envoyées au driver pendant le bloc"""
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        yield captured
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+
+def run_case(name: str, case: Callable[[Session, Context], Any], ctx: Context) -> List[CapturedQuery]:
+    """Exécuter un cas et retourner ses requêtes de lecture distinctes"""
+    statements: List[Tuple[str, Any]] = []
     db = SessionLocal()
+    try:
+        with capture_statements(statements):
+            case(db, ctx)
+    finally:
+        db.rollback()
+        db.close()
+
+    queries: List[CapturedQuery] = []
+    seen = set()
+    for statement, parameters in statements:
+        if not statement.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+            continue
+        fp = fingerprint(statement)
+        if fp in seen:
+            continue
+        seen.add(fp)
+        queries.append(CapturedQuery(f"{name}#{len(queries) + 1}", statement, parameters, fp))
+    return queries
+
+
+def _walk_plan(node: Dict[str, Any], nodes: List[str], seq_scans: List[str], ratios: List[float]) -> None:
+    label = node["Node Type"]
+    if node.get("Relation Name"):
+        label += f" on {node['Relation Name']}"
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    nodes.append(label)
+
+    # Les partitions (sales_y2026m01) comptent pour leur table parente; la
+    # partition DEFAULT, normalement vide, est toujours parcourue séquentiellement
+    relation = node.get("Relation Name")
+    if node["Node Type"] == "Seq Scan" and relation:
+        parent = parent_table(relation)
+        if relation != default_partition_name(parent):
+            seq_scans.append(parent)
 
+    if "Actual Rows" in node and "Plan Rows" in node and node.get("Actual Loops", 1):
+        actual, planned = max(node["Actual Rows"], 1), max(node["Plan Rows"], 1)
+        ratios.append(max(actual / planned, planned / actual))
+
+    for child in node.get("Plans", []):
+        _walk_plan(child, nodes, seq_scans, ratios)
+
+
+def measure(query: CapturedQuery, runs: int) -> QueryResult:
+    """EXPLAIN (ANALYZE, BUFFERS) puis médiane de `runs` exécutions"""
+    with engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.statement}", query.parameters
+        ).scalar()
+
+        durations = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            conn.exec_driver_sql(query.statement, query.parameters).fetchall()
+            durations.append((time.perf_counter() - start) * 1000)
+        conn.rollback()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    nodes: List[str] = []
+    seq_scans: List[str] = []
+    ratios: List[float] = []
+    _walk_plan(plan[0]["Plan"], nodes, seq_scans, ratios)
+
+    return QueryResult(
+        key=query.key,
+        fingerprint_hash=fingerprint_hash(query.fingerprint),
+        statement=query.fingerprint,
+        median_ms=statistics.median(durations),
+        plan_nodes=nodes,
+        seq_scans=seq_scans,
+        max_misestimate=max(ratios) if ratios else 1.0,
+        plan=plan,
+    )
+
+
+def check(result: QueryResult, baseline: Optional[Dict[str, Any]]) -> None:
+    """Comparer un résultat au baseline et aux règles globales"""
+    allow_seq_scan = bool(baseline and baseline.get("allow_seq_scan"))
+    for table in sorted(set(result.seq_scans) & GUARDED_TABLES):
+        if not allow_seq_scan:
+            result.failures.append(f"Seq Scan sur {table}")
+
+    if result.max_misestimate >= MISESTIMATE_WARNING_RATIO:
+        result.warnings.append(f"estimation de lignes fausse d'un facteur {result.max_misestimate:.0f}")
+
+    if baseline is None:
+        result.warnings.append("pas de baseline (lancer avec --update-baseline)")
+        return
+
+    if baseline["fingerprint_hash"] != result.fingerprint_hash:
+        result.warnings.append("requête modifiée depuis le baseline")
+        return
+
+    if result.median_ms > baseline["budget_ms"]:
+        result.failures.append(f"{result.median_ms:.1f}ms > budget {baseline['budget_ms']:.0f}ms")
+
+    if result.plan_nodes != baseline["plan"]:
+        added = sorted(set(result.plan_nodes) - set(baseline["plan"]))
+        removed = sorted(set(baseline["plan"]) - set(result.plan_nodes))
+        result.warnings.append(f"plan modifié (+{added} -{removed})")
+
+
+def build_baseline(results: List[QueryResult], previous: Dict[str, Any]) -> Dict[str, Any]:
+    """Snapshot des plans et budgets (les allow_seq_scan manuels sont conservés)"""
+    queries = {}
+    for result in results:
+        entry = {
+            "fingerprint_hash": result.fingerprint_hash,
+            "statement": result.statement[:500],
+            "budget_ms": max(BUDGET_FLOOR_MS, math.ceil(result.median_ms * BUDGET_FACTOR)),
+            "plan": result.plan_nodes,
+        }
+        if previous.get(result.key, {}).get("allow_seq_scan"):
+            entry["allow_seq_scan"] = True
+        queries[result.key] = entry
+    return {"generated_at": datetime.now().isoformat(), "queries": queries}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Non-régression des plans SQL")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer plans et budgets actuels")
+    parser.add_argument("--reseed", action="store_true", help="Regénérer le jeu de données")
+    parser.add_argument("--runs", type=int, default=5, help="Exécutions par requête pour la médiane")
+    parser.add_argument("--case", action="append", help="Limiter à un ou plusieurs cas (préfixe)")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les plans")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("❌ La suite nécessite PostgreSQL (EXPLAIN ANALYZE, vues matérialisées)")
+        return 1
+
+    print("🚀 Préparation du jeu de données déterministe...\n")
+    db = SessionLocal()
     try:
-        # Récupérer premier tenant pour les tests
-        tenant = db.query(Tenant).filter(Tenant.is_active == True).first()
-
-        if not tenant:
-            print("❌ Aucun tenant actif trouvé")
-            return
-
-        tenant_id = tenant.id
-        print(f"📊 Analyse des performances pour tenant: {tenant.name} ({tenant_id})\n")
-        print("="*80)
-
-        # Liste des requêtes critiques à analyser
-        queries = [
-            ("Dashboard Stock Health (Materialized View)", """
-                SELECT * FROM mv_dashboard_stock_health
-                WHERE tenant_id = :tenant_id
-            """),
-
-            ("Top 10 Products by Revenue", """
-                SELECT
-                    p.id,
-                    p.name,
-                    SUM(s.total_amount) as revenue,
-                    COUNT(s.id) as total_sales
-                FROM products p
-                JOIN sales s ON p.id = s.product_id
-                WHERE p.tenant_id = :tenant_id
-                GROUP BY p.id, p.name
-                ORDER BY revenue DESC
-                LIMIT 10
-            """),
-
-            ("Products with Low Stock", """
-                SELECT
-                    p.id,
-                    p.name,
-                    p.current_stock,
-                    p.minimum_stock,
-                    p.unit_price
-                FROM products p
-                WHERE p.tenant_id = :tenant_id
-                AND p.is_active = TRUE
-                AND p.current_stock <= p.minimum_stock
-                AND p.current_stock > 0
-                ORDER BY (p.minimum_stock - p.current_stock) DESC
-                LIMIT 20
-            """),
-
-            ("Sales Last 30 Days", """
-                SELECT
-                    DATE(s.sale_date) as date,
-                    SUM(s.total_amount) as daily_revenue,
-                    COUNT(s.id) as transactions
-                FROM sales s
-                WHERE s.tenant_id = :tenant_id
-                AND s.sale_date >= CURRENT_DATE - INTERVAL '30 days'
-                GROUP BY DATE(s.sale_date)
-                ORDER BY date DESC
-            """),
-
-            ("Product Categories with Stock Value", """
-                SELECT
-                    c.id,
-                    c.name,
-                    COUNT(p.id) as product_count,
-                    SUM(p.current_stock * p.unit_price) as total_value
-                FROM categories c
-                LEFT JOIN products p ON c.id = p.category_id AND p.tenant_id = :tenant_id
-                WHERE c.tenant_id = :tenant_id
-                GROUP BY c.id, c.name
-                ORDER BY total_value DESC
-            """),
-        ]
-
-        results = []
-
-        for name, query in queries:
-            print(f"\n{'='*80}")
-            print(f"📌 {name}")
-            print(f"{'='*80}\n")
-
-            # EXPLAIN ANALYZE
-            try:
-                print("🔍 EXPLAIN ANALYZE:")
-                print("-" * 80)
-                explain_query = f"EXPLAIN ANALYZE {query}"
-                explain_result = db.execute(text(explain_query), {"tenant_id": tenant_id})
-
-                for row in explain_result:
-                    print(row[0])
-
-                print()
-            except Exception as e:
-                print(f"⚠️  Erreur EXPLAIN: {str(e)}\n")
-
-            # Mesure du temps d'exécution (moyenne sur 3 runs)
-            durations = []
-            for i in range(3):
-                start = time.time()
-                try:
-                    result = db.execute(text(query), {"tenant_id": tenant_id})
-                    rows = result.fetchall()
-                    duration = (time.time() - start) * 1000  # En millisecondes
-                    durations.append(duration)
-                except Exception as e:
-                    print(f"❌ Erreur exécution: {str(e)}")
-                    break
-
-            if durations:
-                avg_duration = sum(durations) / len(durations)
-                min_duration = min(durations)
-                max_duration = max(durations)
-
-                # Déterminer le statut de performance
-                if avg_duration < 100:
-                    status = "✅ EXCELLENT"
-                    color = "green"
-                elif avg_duration < 500:
-                    status = "🟡 BON"
-                    color = "yellow"
-                elif avg_duration < 1000:
-                    status = "🟠 ACCEPTABLE"
-                    color = "orange"
-                else:
-                    status = "🔴 LENT"
-                    color = "red"
-
-                print(f"⏱️  TEMPS D'EXÉCUTION:")
-                print(f"   - Moyenne: {avg_duration:.2f}ms")
-                print(f"   - Min: {min_duration:.2f}ms")
-                print(f"   - Max: {max_duration:.2f}ms")
-                print(f"   - Nombre de lignes: {len(rows)}")
-                print(f"   - Statut: {status}")
-
-                results.append({
-                    'name': name,
-                    'avg_duration': avg_duration,
-                    'status': status,
-                    'row_count': len(rows)
-                })
-
-        # Résumé final
-        print(f"\n\n{'='*80}")
-        print("📈 RÉSUMÉ DES PERFORMANCES")
-        print(f"{'='*80}\n")
-
-        print(f"{'Requête':<50} {'Temps moyen':<15} {'Statut':<15} {'Lignes':<10}")
-        print("-" * 90)
-
-        for result in results:
-            print(f"{result['name']:<50} {result['avg_duration']:>10.2f}ms {result['status']:<15} {result['row_count']:>8}")
-
-        # Recommendations
-        print(f"\n{'='*80}")
-        print("💡 RECOMMANDATIONS")
-        print(f"{'='*80}\n")
-
-        slow_queries = [r for r in results if r['avg_duration'] > 500]
-
-        if slow_queries:
-            print("⚠️  Requêtes lentes détectées (>500ms):")
-            for q in slow_queries:
-                print(f"   - {q['name']}: {q['avg_duration']:.2f}ms")
-            print("\n🔧 Actions recommandées:")
-            print("   1. Ajouter des index sur les colonnes filtrées/jointes")
-            print("   2. Vérifier EXPLAIN ANALYZE pour les scans séquentiels")
-            print("   3. Considérer mise en cache Redis")
-            print("   4. Analyser les statistiques: ANALYZE tables;")
-        else:
-            print("✅ Toutes les requêtes sont performantes (<500ms)")
-            print("   - Performances optimales")
-            print("   - Monitoring continu recommandé")
-
-        print("\n🗄️  Optimisations SQL suggérées:")
-        print("   - CREATE INDEX CONCURRENTLY si nécessaire")
-        print("   - VACUUM ANALYZE régulièrement")
-        print("   - Rafraîchir vues matérialisées")
-
-    except Exception as e:
-        print(f"❌ Erreur: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        from app.models.sale import Sale
+        from app.services.dashboard_service import DashboardService
+
+        tenant_ids = ensure_dataset(db, DatasetSpec(), reseed=args.reseed)
+        DashboardService(db).refresh_views()
+
+        # Produit de référence: le plus vendu du premier tenant
+        product_id = (
+            db.query(Sale.product_id)
+            .filter(Sale.tenant_id == tenant_ids[0])
+            .group_by(Sale.product_id)
+            .order_by(func.count().desc())
+            .limit(1)
+            .scalar()
+        )
     finally:
         db.close()
 
+    ctx = Context(tenant_id=tenant_ids[0], product_id=product_id)
+
+    previous = {}
+    if args.baseline.exists():
+        previous = json.loads(args.baseline.read_text()).get("queries", {})
+
+    results: List[QueryResult] = []
+    for name, case in _cases():
+        if args.case and not any(name.startswith(prefix) for prefix in args.case):
+            continue
+
+        print(f"{'='*80}")
+        print(f"📌 {name}")
+        print(f"{'='*80}")
+
+        for query in run_case(name, case, ctx):
+            result = measure(query, args.runs)
+            check(result, previous.get(result.key))
+            results.append(result)
+
+            status = "❌" if result.failures else ("⚠️ " if result.warnings else "✅")
+            print(f"  {status} {result.key:<40} {result.median_ms:8.1f}ms  {result.statement[:60]}")
+            for message in result.failures + result.warnings:
+                print(f"       - {message}")
+            if args.verbose:
+                for node in result.plan_nodes:
+                    print(f"         {node}")
+        print()
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(build_baseline(results, previous), indent=2, ensure_ascii=False))
+        print(f"💾 Baseline enregistré: {args.baseline} ({len(results)} requêtes)")
+        return 0
+
+    failures = [r for r in results if r.failures]
+    print(f"{'='*80}")
+    print(f"📈 {len(results)} requêtes, {len(failures)} régression(s)")
+    print(f"{'='*80}")
+    for result in failures:
+        print(f"❌ {result.key}: {'; '.join(result.failures)}")
+
+    return 1 if failures else 0
+
+
 if __name__ == "__main__":
-    print("🚀 Démarrage de l'analyse de performance SQL...\n")
-    analyze_performance()
-    print("\n✅ Analyse terminée!")
+    sys.exit(main())
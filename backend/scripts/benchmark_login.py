@@ -0,0 +1,118 @@
+"""
+Benchmark du débit de login (logins/seconde par worker)
+
+Deux modes:
+- hash (défaut): mesure le pool bcrypt seul, sans base ni serveur,
+  pour différentes tailles de pool (verify_password_async en parallèle).
+- http: envoie des POST /auth/login concurrents à une API démarrée.
+
+Usage:
+    python scripts/benchmark_login.py --logins 200 --workers 1,2,4
+    python scripts/benchmark_login.py --mode http --url http://localhost:8000 \\
+        --email gerant@example.com --password 'MotDePasse!1' --concurrency 20 --api-workers 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+async def _run_hash_benchmark(logins: int, workers: int) -> float:
+    """Vérifier `logins` mots de passe via le pool bcrypt et retourner le débit"""
+    from app.core import security
+
+    hashed = security.get_password_hash("benchmark-password")
+    security._hash_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            security.verify_password_async("benchmark-password", hashed)
+            for _ in range(logins)
+        ])
+        elapsed = time.perf_counter() - start
+    finally:
+        security._hash_executor.shutdown()
+        security._hash_executor = None
+
+    assert all(results), "Vérification bcrypt échouée"
+    return logins / elapsed
+
+
+async def _run_http_benchmark(url: str, email: str, password: str, logins: int, concurrency: int):
+    """Envoyer des logins concurrents à l'API et retourner (débit, latences)"""
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=url, timeout=30) as client:
+        async def one_login():
+            nonlocal errors
+            async with semaphore:
+                t0 = time.perf_counter()
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    json={"email": email, "password": password}
+                )
+                latencies.append(time.perf_counter() - t0)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one_login() for _ in range(logins)])
+        elapsed = time.perf_counter() - start
+
+    return logins / elapsed, sorted(latencies), errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark du débit de login")
+    parser.add_argument("--mode", choices=["hash", "http"], default="hash")
+    parser.add_argument("--logins", type=int, default=100, help="Nombre de logins")
+    parser.add_argument("--workers", default="1,2,4", help="Tailles de pool bcrypt testées (mode hash)")
+    parser.add_argument("--url", default="http://localhost:8000", help="URL de l'API (mode http)")
+    parser.add_argument("--email", help="Email d'un utilisateur existant (mode http)")
+    parser.add_argument("--password", help="Mot de passe de cet utilisateur (mode http)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requêtes simultanées (mode http)")
+    parser.add_argument("--api-workers", type=int, default=1,
+                        help="Nombre de workers uvicorn de l'API testée (mode http)")
+    args = parser.parse_args()
+
+    print(f"{'='*80}")
+    print(f"📊 Benchmark login ({args.mode}) - {args.logins} logins")
+    print(f"{'='*80}\n")
+
+    if args.mode == "hash":
+        for workers in [int(w) for w in args.workers.split(",")]:
+            rate = asyncio.run(_run_hash_benchmark(args.logins, workers))
+            print(f"  pool bcrypt {workers:2d} thread(s): {rate:8.1f} logins/s")
+        return 0
+
+    if not args.email or not args.password:
+        print("❌ --email et --password sont requis en mode http")
+        return 1
+
+    rate, latencies, errors = asyncio.run(_run_http_benchmark(
+        args.url, args.email, args.password, args.logins, args.concurrency
+    ))
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+
+    print(f"  Débit total:       {rate:8.1f} logins/s")
+    print(f"  Débit par worker:  {rate / args.api_workers:8.1f} logins/s ({args.api_workers} worker(s))")
+    print(f"  Latence p50 / p95: {p50 * 1000:.0f} ms / {p95 * 1000:.0f} ms")
+    if errors:
+        print(f"  ⚠️  {errors} réponse(s) non 200")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+"""
+Benchmarks de bout en bout à plusieurs échelles de données
+Exécute les services métier (dashboard, analytics, prédictions, alertes, rapports)
+sur des jeux de données déterministes de taille fixe et mesure, pour chaque cas:
+- latence p50 / p95 / max sur N exécutions (après échauffement)
+- pic mémoire Python (tracemalloc, exécution séparée)
+
+Les résultats sont comparés à un baseline par échelle; échec (code 1) si la p95
+ou le pic mémoire dépasse le baseline de plus de --tolerance.
+
+Échelles (ventes totales approximatives):
+    1k    1 tenant,   100 produits, 3 mois
+    100k  1 tenant,  1000 produits, 1 an
+    10m   4 tenants, 5000 produits, 2 ans (~2.5M ventes par tenant)
+
+Usage:
+    python scripts/benchmark_suite.py --scale 1k --scale 100k
+    python scripts/benchmark_suite.py --scale 100k --update-baseline
+    python scripts/benchmark_suite.py --scale 10m --case analytics --runs 5 --output results.json
+"""
+import argparse
+import gc
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal, engine
+from perf_dataset import DatasetSpec, ensure_dataset
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "benchmark_baselines.json"
+
+SCALES: Dict[str, DatasetSpec] = {
+    "1k": DatasetSpec(tenants=1, products=100, years=0.25, daily_sales=11, alert_history=200),
+    "100k": DatasetSpec(tenants=1, products=1000, years=1.0, daily_sales=275, alert_history=2000),
+    "10m": DatasetSpec(tenants=4, products=5000, years=2.0, daily_sales=3425, alert_history=20000),
+}
+
+# Écart toléré par rapport au baseline avant de signaler une régression
+DEFAULT_TOLERANCE = 0.25
+
+# En dessous de ces seuils, l'écart relatif n'est que du bruit de mesure
+LATENCY_NOISE_MS = 5.0
+MEMORY_NOISE_MB = 1.0
+
+
+@dataclass
+class Context:
+    """Données de référence passées aux cas"""
+    tenant_id: UUID
+    product_id: UUID
+
+
+@dataclass
+class CaseResult:
+    """Mesures d'un cas à une échelle donnée"""
+    case: str
+    runs: int
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+    peak_mb: float
+    failures: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+
+def _cases() -> List[Tuple[str, Callable[[Session, Context], Any]]]:
+    """Méthodes de service mesurées (imports locaux: reportlab/openpyxl seulement ici)"""
+    from app.services.alert_service import AlertService
+    from app.services.analytics_service import AnalyticsService
+    from app.services.dashboard_service import DashboardService
+    from app.services.prediction_service import PredictionService
+    from app.services.report_service import ReportService
+
+    def inventory_report(db: Session, ctx: Context):
+        ReportService(db).generate_inventory_report(ctx.tenant_id).close()
+
+    def sales_analysis_report(db: Session, ctx: Context):
+        end = datetime.now()
+        ReportService(db).generate_sales_analysis_report(ctx.tenant_id, end - timedelta(days=30), end).close()
+
+    def monthly_summary_pdf(db: Session, ctx: Context):
+        previous_month = datetime.now().replace(day=1) - timedelta(days=1)
+        ReportService(db).generate_monthly_summary_pdf(
+            ctx.tenant_id, previous_month.month, previous_month.year
+        ).close()
+
+    return [
+        ("dashboard.overview", lambda db, ctx: DashboardService(db).get_overview(ctx.tenant_id)),
+        ("analytics.product_analysis", lambda db, ctx: AnalyticsService(db).get_product_analysis(ctx.tenant_id, ctx.product_id)),
+        ("analytics.sales_evolution", lambda db, ctx: AnalyticsService(db).get_sales_evolution(ctx.tenant_id, 30)),
+        ("analytics.top_products", lambda db, ctx: AnalyticsService(db).get_top_products(ctx.tenant_id)),
+        ("analytics.category_performance", lambda db, ctx: AnalyticsService(db).get_category_performance(ctx.tenant_id)),
+        ("analytics.classify_abc", lambda db, ctx: AnalyticsService(db).classify_products_abc(ctx.tenant_id)),
+        ("predictions.recommandations_achat", lambda db, ctx: PredictionService(db).get_recommandations_achat(ctx.tenant_id)),
+        ("alerts.evaluate_all", lambda db, ctx: AlertService(db).evaluate_all_alerts(ctx.tenant_id)),
+        ("reports.inventory", inventory_report),
+        ("reports.sales_analysis", sales_analysis_report),
+        ("reports.monthly_summary_pdf", monthly_summary_pdf),
+    ]
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def _run_once(case: Callable[[Session, Context], Any], ctx: Context) -> None:
+    """Une exécution dans une session neuve (annulée: aucun effet de bord persistant)"""
+    db = SessionLocal()
+    try:
+        case(db, ctx)
+    finally:
+        db.rollback()
+        db.close()
+
+
+def measure(name: str, case: Callable[[Session, Context], Any], ctx: Context, runs: int, warmup: int) -> CaseResult:
+    """Latences sur `runs` exécutions, puis pic mémoire sur une exécution tracée à part"""
+    for _ in range(warmup):
+        _run_once(case, ctx)
+
+    durations = []
+    for _ in range(runs):
+        gc.collect()
+        start = time.perf_counter()
+        _run_once(case, ctx)
+        durations.append((time.perf_counter() - start) * 1000)
+
+    # tracemalloc ralentit l'exécution: mesuré séparément des latences
+    gc.collect()
+    tracemalloc.start()
+    try:
+        _run_once(case, ctx)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return CaseResult(
+        case=name,
+        runs=runs,
+        p50_ms=round(statistics.median(durations), 2),
+        p95_ms=round(_percentile(durations, 0.95), 2),
+        max_ms=round(max(durations), 2),
+        peak_mb=round(peak / (1024 * 1024), 2),
+    )
+
+
+def check(result: CaseResult, baseline: Optional[Dict[str, Any]], tolerance: float) -> None:
+    """Comparer p95 et pic mémoire au baseline de l'échelle"""
+    if baseline is None:
+        result.warnings.append("pas de baseline (lancer avec --update-baseline)")
+        return
+
+    limit_ms = baseline["p95_ms"] * (1 + tolerance)
+    if result.p95_ms > limit_ms and result.p95_ms - baseline["p95_ms"] > LATENCY_NOISE_MS:
+        result.failures.append(f"p95 {result.p95_ms:.1f}ms > {baseline['p95_ms']:.1f}ms +{tolerance:.0%}")
+
+    limit_mb = baseline["peak_mb"] * (1 + tolerance)
+    if result.peak_mb > limit_mb and result.peak_mb - baseline["peak_mb"] > MEMORY_NOISE_MB:
+        result.failures.append(f"mémoire {result.peak_mb:.1f}MB > {baseline['peak_mb']:.1f}MB +{tolerance:.0%}")
+
+    if result.p95_ms < baseline["p95_ms"] / (1 + tolerance) and baseline["p95_ms"] - result.p95_ms > LATENCY_NOISE_MS:
+        result.warnings.append(f"plus rapide que le baseline ({baseline['p95_ms']:.1f}ms): mettre à jour ?")
+
+
+def prepare_scale(scale: str, reseed: bool) -> Context:
+    """Garantir le jeu de données de l'échelle et choisir le tenant / produit de référence"""
+    from app.models.sale import Sale
+    from app.services.dashboard_service import DashboardService
+
+    db = SessionLocal()
+    try:
+        tenant_ids = ensure_dataset(db, SCALES[scale], reseed=reseed)
+        DashboardService(db).refresh_views()
+
+        # Produit de référence: le plus vendu du premier tenant
+        product_id = (
+            db.query(Sale.product_id)
+            .filter(Sale.tenant_id == tenant_ids[0])
+            .group_by(Sale.product_id)
+            .order_by(func.count().desc())
+            .limit(1)
+            .scalar()
+        )
+        sales_count = db.query(func.count(Sale.id)).scalar()
+    finally:
+        db.close()
+
+    print(f"   {sales_count:,} ventes en base, tenant de référence {tenant_ids[0]}\n")
+    return Context(tenant_id=tenant_ids[0], product_id=product_id)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de bout en bout par échelle de données")
+    parser.add_argument("--scale", action="append", choices=sorted(SCALES), help="Échelle(s) à mesurer (défaut: 1k et 100k)")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Enregistrer les mesures comme baseline")
+    parser.add_argument("--reseed", action="store_true", help="Regénérer le jeu de données")
+    parser.add_argument("--runs", type=int, default=10, help="Exécutions mesurées par cas")
+    parser.add_argument("--warmup", type=int, default=1, help="Exécutions d'échauffement par cas")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Écart toléré (0.25 = +25%%)")
+    parser.add_argument("--case", action="append", help="Limiter à un ou plusieurs cas (préfixe)")
+    parser.add_argument("--output", type=Path, help="Écrire les résultats en JSON")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        print("❌ Les benchmarks nécessitent PostgreSQL (COPY, vues matérialisées)")
+        return 1
+
+    scales = args.scale or ["1k", "100k"]
+
+    baseline: Dict[str, Any] = {"scales": {}}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    results: Dict[str, List[CaseResult]] = {}
+    for scale in scales:
+        print(f"{'='*80}")
+        print(f"🚀 Échelle {scale}")
+        print(f"{'='*80}")
+        ctx = prepare_scale(scale, args.reseed)
+
+        previous = baseline["scales"].get(scale, {})
+        results[scale] = []
+        for name, case in _cases():
+            if args.case and not any(name.startswith(prefix) for prefix in args.case):
+                continue
+
+            result = measure(name, case, ctx, args.runs, args.warmup)
+            check(result, previous.get(name), args.tolerance)
+            results[scale].append(result)
+
+            status = "❌" if result.failures else ("⚠️ " if result.warnings else "✅")
+            print(f"  {status} {name:<36} p50 {result.p50_ms:8.1f}ms  p95 {result.p95_ms:8.1f}ms  "
+                  f"max {result.max_ms:8.1f}ms  {result.peak_mb:7.1f}MB")
+            for message in result.failures + result.warnings:
+                print(f"       - {message}")
+        print()
+
+    if args.output:
+        args.output.write_text(json.dumps(
+            {scale: [asdict(r) for r in scale_results] for scale, scale_results in results.items()},
+            indent=2, ensure_ascii=False
+        ))
+        print(f"💾 Résultats écrits: {args.output}")
+
+    if args.update_baseline:
+        for scale, scale_results in results.items():
+            entries = baseline["scales"].setdefault(scale, {})
+            for result in scale_results:
+                entries[result.case] = {"p95_ms": result.p95_ms, "peak_mb": result.peak_mb, "p50_ms": result.p50_ms}
+        baseline["generated_at"] = datetime.now().isoformat()
+        args.baseline.write_text(json.dumps(baseline, indent=2, ensure_ascii=False))
+        print(f"💾 Baseline enregistré: {args.baseline} ({', '.join(results)})")
+        return 0
+
+    failures = [(scale, r) for scale, scale_results in results.items() for r in scale_results if r.failures]
+    print(f"{'='*80}")
+    print(f"📈 {sum(len(r) for r in results.values())} mesures, {len(failures)} régression(s)")
+    print(f"{'='*80}")
+    for scale, result in failures:
+        print(f"❌ [{scale}] {result.case}: {'; '.join(result.failures)}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
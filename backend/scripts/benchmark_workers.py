@@ -0,0 +1,110 @@
+"""
+Débit d'un profil de worker Celery (tâches sondes)
+Envoie N tâches sondes sur une queue du profil et mesure le débit de bout
+en bout (tâches/s) et la durée des tâches (p50 / p95), pour comparer les
+réglages de pool et de concurrence (voir app/tasks/worker_profiles.py).
+
+Sondes:
+    io           io_probe: un message WhatsApp par tâche, vers le faux Twilio
+    cpu          cpu_probe: agrégation pandas par tâche
+    maintenance  cpu_probe
+
+Prérequis: Redis, et le worker du profil démarré. Pour le profil io, le
+worker doit viser le faux Twilio (voir scripts/fake_providers.py):
+    TWILIO_ACCOUNT_SID=ACloadtest TWILIO_AUTH_TOKEN=loadtest \\
+    TWILIO_API_BASE_URL=http://127.0.0.1:8025 python scripts/run_worker.py io
+
+Usage:
+    python scripts/benchmark_workers.py io --tasks 1000 --start-fakes --twilio-latency-ms 300
+    python scripts/benchmark_workers.py cpu --tasks 100 --rows 500000
+    python scripts/benchmark_workers.py io --queue notifications --output io.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import List
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def main() -> int:
+    from app.tasks.worker_profiles import worker_profiles
+
+    profiles = worker_profiles()
+
+    parser = argparse.ArgumentParser(description="Débit d'un profil de worker Celery")
+    parser.add_argument("profile", choices=sorted(profiles))
+    parser.add_argument("--tasks", type=int, default=200, help="Nombre de tâches sondes")
+    parser.add_argument("--queue", help="Queue visée (défaut: première queue du profil)")
+    parser.add_argument("--rows", type=int, default=200000, help="Lignes par sonde CPU")
+    parser.add_argument("--start-fakes", action="store_true", help="Démarrer le faux Twilio dans ce processus")
+    parser.add_argument("--twilio-latency-ms", type=float, default=300, help="Latence simulée par message")
+    parser.add_argument("--timeout", type=float, default=600, help="Attente maximale des résultats (secondes)")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    args = parser.parse_args()
+
+    from celery import group
+    from app.tasks.worker_probes import cpu_probe, io_probe
+
+    profile = profiles[args.profile]
+    queue = args.queue or profile.queues[0]
+
+    stop_fakes = None
+    if args.start_fakes:
+        from fake_providers import start_fake_providers
+        _, stop_fakes = start_fake_providers(twilio_latency_ms=args.twilio_latency_ms)
+
+    if profile.name == "io":
+        probes = group(io_probe.s() for _ in range(args.tasks))
+    else:
+        probes = group(cpu_probe.s(args.rows) for _ in range(args.tasks))
+
+    print(f"🚀 {args.tasks} sonde(s) sur la queue {queue} (profil {profile.name}, "
+          f"pool {profile.pool}, concurrence {profile.concurrency})")
+
+    try:
+        start = time.perf_counter()
+        results = probes.apply_async(queue=queue).get(timeout=args.timeout, propagate=False)
+        elapsed = time.perf_counter() - start
+    finally:
+        if stop_fakes:
+            stop_fakes()
+
+    succeeded = [r for r in results if isinstance(r, dict)]
+    durations = [r["duration"] for r in succeeded]
+    summary = {
+        "profile": profile.name,
+        "queue": queue,
+        "pool": profile.pool,
+        "concurrency": profile.concurrency,
+        "tasks": args.tasks,
+        "failed": args.tasks - len(succeeded),
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_per_second": round(len(succeeded) / elapsed, 2) if elapsed else 0.0,
+        "task_p50_ms": round(_percentile(durations, 0.50) * 1000, 1) if durations else None,
+        "task_p95_ms": round(_percentile(durations, 0.95) * 1000, 1) if durations else None,
+    }
+
+    print(f"\n📊 {summary['throughput_per_second']} tâches/s sur {summary['elapsed_seconds']}s "
+          f"({summary['failed']} échec(s))")
+    print(f"   Durée par tâche: p50 {summary['task_p50_ms']} ms, p95 {summary['task_p95_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"\n💾 Résultats écrits dans {args.output}")
+
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
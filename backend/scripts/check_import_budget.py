@@ -0,0 +1,127 @@
+"""
+Script de contrôle du budget de démarrage (API et workers Celery)
+Mesure le temps d'import à froid et la mémoire d'un processus neuf,
+et vérifie qu'aucune dépendance lourde n'est chargée au démarrage.
+
+Usage:
+    python scripts/check_import_budget.py
+    python scripts/check_import_budget.py --max-seconds 1.5 --max-rss-mb 200
+
+Code de sortie 1 si un budget est dépassé (utilisable en CI).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Points d'entrée mesurés: un worker uvicorn et un worker Celery
+ENTRYPOINTS = {
+    "api": "app.main",
+    "worker": "app.tasks",
+}
+
+# Bibliothèques qui ne doivent être chargées qu'au premier usage
+HEAVY_MODULES = ["matplotlib", "reportlab", "openpyxl", "pandas", "twilio"]
+
+DEFAULT_MAX_SECONDS = 2.0
+DEFAULT_MAX_RSS_MB = 250
+
+# Exécuté dans un interpréteur neuf pour mesurer un démarrage à froid
+_PROBE = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+importlib.import_module({module!r})
+elapsed = time.perf_counter() - start
+# VmHWM: pic du seul interpréteur. ru_maxrss (Linux) garde celui du parent
+# au moment du fork/exec: faux quand l'appelant est un gros processus (pytest)
+try:
+    with open("/proc/self/status") as status:
+        rss_kb = next(int(line.split()[1]) for line in status if line.startswith("VmHWM:"))
+except (OSError, StopIteration):
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_kb / 1024, "heavy": heavy}}))
+"""
+
+
+def _parse_importtime(stderr: str, top: int):
+    """Extraire les modules les plus coûteux de la sortie -X importtime"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # Format: "import time: <self us> | <cumulative us> | <module>"
+        parts = line.split(":", 1)[1].split("|")
+        if len(parts) != 3:
+            continue
+        modules.append((int(parts[1]), parts[2].strip()))
+    modules.sort(reverse=True)
+    return modules[:top]
+
+
+def measure(module: str, top: int) -> dict:
+    """Importer un module dans un sous-processus et mesurer temps, RSS et modules chargés"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    probe = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=BACKEND_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Import de {module} impossible:\n{result.stderr[-2000:]}")
+
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    report["top"] = _parse_importtime(result.stderr, top)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Budget de démarrage API / workers")
+    parser.add_argument("--max-seconds", type=float, default=DEFAULT_MAX_SECONDS,
+                        help="Temps d'import maximum par point d'entrée (s)")
+    parser.add_argument("--max-rss-mb", type=float, default=DEFAULT_MAX_RSS_MB,
+                        help="Mémoire résidente maximum après import (Mo)")
+    parser.add_argument("--top", type=int, default=10,
+                        help="Nombre de modules les plus lents affichés")
+    args = parser.parse_args()
+
+    failures = []
+
+    for label, module in ENTRYPOINTS.items():
+        report = measure(module, args.top)
+
+        print(f"\n{'='*80}")
+        print(f"📌 {label} ({module})")
+        print(f"{'='*80}")
+        print(f"⏱️  Temps d'import: {report['seconds']:.3f}s (budget {args.max_seconds:.2f}s)")
+        print(f"💾 RSS max: {report['rss_mb']:.1f} Mo (budget {args.max_rss_mb:.0f} Mo)")
+        print("\n🔍 Modules les plus coûteux (cumulé):")
+        for cumulative_us, name in report["top"]:
+            print(f"  {cumulative_us / 1000:8.1f} ms  {name}")
+
+        if report["seconds"] > args.max_seconds:
+            failures.append(f"{label}: import en {report['seconds']:.3f}s > {args.max_seconds:.2f}s")
+        if report["rss_mb"] > args.max_rss_mb:
+            failures.append(f"{label}: RSS {report['rss_mb']:.1f} Mo > {args.max_rss_mb:.0f} Mo")
+        if report["heavy"]:
+            failures.append(f"{label}: dépendances lourdes chargées au démarrage: {', '.join(report['heavy'])}")
+
+    print()
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        return 1
+
+    print("✅ Budget de démarrage respecté")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
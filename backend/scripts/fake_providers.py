@@ -0,0 +1,227 @@
+"""
+Faux fournisseurs externes pour les tests de charge (Twilio et SMTP)
+Acceptent tout, n'envoient rien, comptent les messages et peuvent simuler
+la latence du fournisseur réel.
+
+Configurer l'API testée avec:
+    TWILIO_ACCOUNT_SID=ACloadtest TWILIO_AUTH_TOKEN=loadtest
+    TWILIO_API_BASE_URL=http://127.0.0.1:8025
+    SMTP_SERVER=127.0.0.1 SMTP_PORT=8026 SMTP_USER=loadtest SMTP_PASSWORD=loadtest SMTP_USE_TLS=false
+
+Usage:
+    python scripts/fake_providers.py --twilio-latency-ms 300 --smtp-latency-ms 150
+    curl http://127.0.0.1:8025/stats
+"""
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+from urllib.parse import parse_qs
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+DEFAULT_TWILIO_PORT = 8025
+DEFAULT_SMTP_PORT = 8026
+
+
+@dataclass
+class ProviderStats:
+    """Compteurs partagés entre les threads des faux serveurs"""
+    whatsapp_messages: int = 0
+    emails: int = 0
+    email_bytes: int = 0
+    rejected: int = 0
+
+    def __post_init__(self):
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + value)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return asdict(self)
+
+
+def _twilio_handler(stats: ProviderStats, latency: float):
+    class TwilioHandler(BaseHTTPRequestHandler):
+        """POST /2010-04-01/Accounts/<sid>/Messages.json => message "queued" """
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, code: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._reply(200, stats.snapshot())
+            else:
+                self._reply(404, {"code": 20404, "message": "Not found", "status": 404})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            form = parse_qs(self.rfile.read(length).decode())
+
+            if not self.path.endswith("/Messages.json") or "To" not in form:
+                stats.incr("rejected")
+                self._reply(400, {"code": 21604, "message": "'To' is required", "status": 400})
+                return
+
+            if latency:
+                time.sleep(latency)
+            stats.incr("whatsapp_messages")
+
+            account_sid = self.path.split("/Accounts/")[1].split("/")[0]
+            self._reply(201, {
+                "sid": f"SM{uuid.uuid4().hex}",
+                "account_sid": account_sid,
+                "to": form["To"][0],
+                "from": form.get("From", [""])[0],
+                "body": form.get("Body", [""])[0],
+                "status": "queued",
+                "num_segments": "1",
+                "direction": "outbound-api",
+                "api_version": "2010-04-01",
+            })
+
+    return TwilioHandler
+
+
+def _smtp_handler(stats: ProviderStats, latency: float):
+    class SMTPHandler(socketserver.StreamRequestHandler):
+        """Sous-ensemble SMTP utilisé par smtplib: EHLO, AUTH, MAIL, RCPT, DATA, QUIT"""
+
+        def _send(self, line: str) -> None:
+            self.wfile.write(f"{line}\r\n".encode())
+
+        def _read(self) -> Optional[str]:
+            raw = self.rfile.readline()
+            if not raw:
+                return None
+            return raw.decode(errors="replace").rstrip("\r\n")
+
+        def handle(self):
+            self._send("220 fake-smtp ESMTP")
+            while True:
+                line = self._read()
+                if line is None:
+                    return
+                command = line.split(" ", 1)[0].upper()
+
+                if command in ("EHLO", "HELO"):
+                    self._send("250-fake-smtp")
+                    self._send("250-SIZE 52428800")
+                    self._send("250 AUTH PLAIN LOGIN")
+                elif command == "AUTH":
+                    if line.upper().startswith("AUTH LOGIN"):
+                        self._send("334 VXNlcm5hbWU6")
+                        self._read()
+                        self._send("334 UGFzc3dvcmQ6")
+                        self._read()
+                    self._send("235 2.7.0 Authentication successful")
+                elif command in ("MAIL", "RCPT", "RSET", "NOOP"):
+                    self._send("250 OK")
+                elif command == "DATA":
+                    self._send("354 End data with <CR><LF>.<CR><LF>")
+                    size = 0
+                    while True:
+                        data = self.rfile.readline()
+                        if not data or data in (b".\r\n", b".\n"):
+                            break
+                        size += len(data)
+                    if latency:
+                        time.sleep(latency)
+                    stats.incr("emails")
+                    stats.incr("email_bytes", size)
+                    self._send("250 OK queued")
+                elif command == "QUIT":
+                    self._send("221 Bye")
+                    return
+                else:
+                    stats.incr("rejected")
+                    self._send("502 Command not implemented")
+
+    return SMTPHandler
+
+
+class _ThreadingSMTPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def start_fake_providers(
+    host: str = "127.0.0.1",
+    twilio_port: int = DEFAULT_TWILIO_PORT,
+    smtp_port: int = DEFAULT_SMTP_PORT,
+    twilio_latency_ms: float = 0,
+    smtp_latency_ms: float = 0,
+):
+    """
+    Démarrer les faux serveurs Twilio et SMTP dans des threads démons.
+
+    Returns:
+        (stats, arrêt): compteurs partagés et fonction d'arrêt des serveurs
+    """
+    stats = ProviderStats()
+
+    twilio = ThreadingHTTPServer((host, twilio_port), _twilio_handler(stats, twilio_latency_ms / 1000))
+    twilio.daemon_threads = True
+    smtp = _ThreadingSMTPServer((host, smtp_port), _smtp_handler(stats, smtp_latency_ms / 1000))
+
+    servers: List[socketserver.BaseServer] = [twilio, smtp]
+    for server in servers:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def stop() -> None:
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+    return stats, stop
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Faux Twilio et SMTP pour les tests de charge")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--twilio-port", type=int, default=DEFAULT_TWILIO_PORT)
+    parser.add_argument("--smtp-port", type=int, default=DEFAULT_SMTP_PORT)
+    parser.add_argument("--twilio-latency-ms", type=float, default=0, help="Latence simulée par message WhatsApp")
+    parser.add_argument("--smtp-latency-ms", type=float, default=0, help="Latence simulée par email")
+    args = parser.parse_args()
+
+    stats, stop = start_fake_providers(
+        args.host, args.twilio_port, args.smtp_port, args.twilio_latency_ms, args.smtp_latency_ms
+    )
+    print(f"🚀 Faux Twilio: http://{args.host}:{args.twilio_port}  Faux SMTP: {args.host}:{args.smtp_port}")
+    print("   Ctrl+C pour arrêter\n")
+
+    try:
+        while True:
+            time.sleep(10)
+            print(f"📊 {stats.snapshot()}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop()
+
+    print(f"\n✅ Arrêt: {stats.snapshot()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,396 @@
+"""
+Test de charge HTTP: parcours utilisateurs réalistes sur une API locale
+Chaque utilisateur virtuel se connecte puis enchaîne des parcours (dashboard,
+analytics, prédictions, téléchargement de rapports, test d'alerte) avec un
+temps de réflexion aléatoire. Rapport par endpoint: débit, p50/p95/p99,
+taux d'erreur.
+
+Pile locale: PostgreSQL + Redis réels, Twilio et SMTP remplacés par les faux
+de scripts/fake_providers.py (voir ce fichier pour la configuration de l'API).
+
+Usage:
+    python scripts/load_test.py prepare                                   # comptes de test par tenant
+    python scripts/load_test.py run --concurrency 50 --duration 120 --start-fakes
+    python scripts/load_test.py run --mix small=6,medium=3,large=1 --journeys dashboard=5,reports=0
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+DEFAULT_USERS_FILE = Path(__file__).resolve().parent / "loadtest_users.json"
+
+LOADTEST_EMAIL_DOMAIN = "loadtest.digiboost.test"
+LOADTEST_PASSWORD = "LoadTest!2024"
+
+DEFAULT_MIX = "small=6,medium=3,large=1"
+DEFAULT_JOURNEYS = "dashboard=5,analytics=3,predictions=2,reports=1,alerts=1"
+
+
+def _parse_weights(value: str) -> Dict[str, float]:
+    """"a=3,b=1" -> {"a": 3.0, "b": 1.0}"""
+    weights = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+# ============================================================================
+# Préparation des comptes
+# ============================================================================
+
+def prepare(users_file: Path, perf_only: bool) -> int:
+    """Créer (ou réactiver) un compte de test par tenant actif et décrire chaque tenant"""
+    from sqlalchemy import func
+
+    from app.core.security import get_password_hash
+    from app.core.tenant_size import classify
+    from app.db.session import SessionLocal
+    from app.models.alert import Alert
+    from app.models.product import Product
+    from app.models.sale import Sale
+    from app.models.tenant import Tenant
+    from app.models.user import User
+    from perf_dataset import PERF_EMAIL_DOMAIN
+
+    hashed = get_password_hash(LOADTEST_PASSWORD)
+    accounts = []
+
+    db = SessionLocal()
+    try:
+        query = db.query(Tenant).filter(Tenant.is_active == True)
+        if perf_only:
+            query = query.filter(Tenant.email.like(f"%@{PERF_EMAIL_DOMAIN}"))
+
+        for tenant in query.order_by(Tenant.created_at).all():
+            email = f"{tenant.id.hex[:12]}@{LOADTEST_EMAIL_DOMAIN}"
+            user = db.query(User).filter(User.email == email).first()
+            if user is None:
+                user = User(tenant_id=tenant.id, email=email, first_name="Load", last_name="Test", role="user")
+                db.add(user)
+            user.hashed_password = hashed
+            user.is_active = True
+            user.must_change_password = False
+
+            product_count = db.query(func.count(Product.id)).filter(Product.tenant_id == tenant.id).scalar()
+            # Produit le plus vendu (page analyse produit), première alerte active (test d'alerte)
+            product_id = (
+                db.query(Sale.product_id)
+                .filter(Sale.tenant_id == tenant.id)
+                .group_by(Sale.product_id)
+                .order_by(func.count().desc())
+                .limit(1)
+                .scalar()
+            ) or db.query(Product.id).filter(Product.tenant_id == tenant.id).limit(1).scalar()
+            alert_id = (
+                db.query(Alert.id)
+                .filter(Alert.tenant_id == tenant.id, Alert.is_active == True)
+                .limit(1)
+                .scalar()
+            )
+
+            accounts.append({
+                "email": email,
+                "tenant_id": str(tenant.id),
+                "tenant_name": tenant.name,
+                "size_class": classify(product_count or 0),
+                "product_id": str(product_id) if product_id else None,
+                "alert_id": str(alert_id) if alert_id else None,
+            })
+
+        db.commit()
+    finally:
+        db.close()
+
+    if not accounts:
+        print("❌ Aucun tenant actif")
+        return 1
+
+    users_file.write_text(json.dumps(accounts, indent=2, ensure_ascii=False))
+    sizes = Counter(account["size_class"] for account in accounts)
+    print(f"✅ {len(accounts)} compte(s) de test écrits dans {users_file}")
+    print(f"   Tenants par taille: {dict(sizes)}")
+    return 0
+
+
+# ============================================================================
+# Exécution
+# ============================================================================
+
+@dataclass
+class EndpointStats:
+    """Mesures agrégées d'un endpoint (clé = méthode + gabarit de route)"""
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+
+class VirtualUser:
+    """Utilisateur virtuel: une session HTTP authentifiée pour un tenant"""
+
+    def __init__(self, client, account: Dict[str, Any], stats: Dict[str, EndpointStats]):
+        self.client = client
+        self.account = account
+        self.stats = stats
+        self.token: Optional[str] = None
+
+    async def request(self, method: str, path: str, endpoint: str, **kwargs) -> Optional[Any]:
+        """Requête mesurée; re-login une fois sur 401 (token expiré)"""
+        for attempt in range(2):
+            headers = {"Authorization": f"Bearer {self.token}"} if self.token else {}
+            start = time.perf_counter()
+            try:
+                async with self.client.stream(method, path, headers=headers, **kwargs) as response:
+                    # Lire tout le corps: un rapport n'est servi qu'une fois téléchargé
+                    body = await response.aread()
+                    status = response.status_code
+            except Exception as e:
+                stats = self.stats[endpoint]
+                stats.latencies.append(time.perf_counter() - start)
+                stats.statuses[type(e).__name__] += 1
+                stats.errors += 1
+                return None
+
+            if status == 401 and attempt == 0 and endpoint != "POST /auth/login":
+                await self.login()
+                continue
+
+            stats = self.stats[endpoint]
+            stats.latencies.append(time.perf_counter() - start)
+            stats.statuses[status] += 1
+            if status >= 400:
+                stats.errors += 1
+                return None
+            return body
+        return None
+
+    async def login(self) -> bool:
+        self.token = None
+        body = await self.request(
+            "POST", "/api/v1/auth/login", "POST /auth/login",
+            json={"email": self.account["email"], "password": LOADTEST_PASSWORD}
+        )
+        if body is None:
+            return False
+        self.token = json.loads(body)["access_token"]
+        return True
+
+
+async def journey_dashboard(user: VirtualUser) -> None:
+    await user.request("GET", "/api/v1/dashboards/overview", "GET /dashboards/overview")
+    await user.request("GET", "/api/v1/analytics/sales/evolution", "GET /analytics/sales/evolution",
+                       params={"days": 30})
+    await user.request("GET", "/api/v1/predictions/ruptures", "GET /predictions/ruptures")
+
+
+async def journey_analytics(user: VirtualUser) -> None:
+    await user.request("GET", "/api/v1/analytics/products/top", "GET /analytics/products/top",
+                       params={"limit": 10, "order_by": random.choice(["revenue", "quantity"])})
+    await user.request("GET", "/api/v1/analytics/categories/performance", "GET /analytics/categories/performance")
+    await user.request("GET", "/api/v1/analytics/products/abc", "GET /analytics/products/abc")
+    if user.account.get("product_id"):
+        await user.request("GET", f"/api/v1/analytics/products/{user.account['product_id']}",
+                           "GET /analytics/products/{product_id}")
+
+
+async def journey_predictions(user: VirtualUser) -> None:
+    await user.request("GET", "/api/v1/predictions/ruptures", "GET /predictions/ruptures",
+                       params={"horizon_days": random.choice([7, 15, 30])})
+    await user.request("GET", "/api/v1/predictions/recommandations", "GET /predictions/recommandations")
+
+
+async def journey_reports(user: VirtualUser) -> None:
+    previous_month = datetime.now().replace(day=1) - timedelta(days=1)
+    await user.request("GET", "/api/v1/reports/inventory/excel", "GET /reports/inventory/excel")
+    await user.request("GET", "/api/v1/reports/monthly-summary/pdf", "GET /reports/monthly-summary/pdf",
+                       params={"year": previous_month.year, "month": previous_month.month})
+
+
+async def journey_alerts(user: VirtualUser) -> None:
+    await user.request("GET", "/api/v1/alerts/", "GET /alerts/")
+    if user.account.get("alert_id"):
+        # Envoi synchrone WhatsApp + email: passe par les faux fournisseurs
+        await user.request("POST", f"/api/v1/alerts/{user.account['alert_id']}/test",
+                           "POST /alerts/{alert_id}/test")
+
+
+JOURNEYS: Dict[str, Callable[[VirtualUser], Awaitable[None]]] = {
+    "dashboard": journey_dashboard,
+    "analytics": journey_analytics,
+    "predictions": journey_predictions,
+    "reports": journey_reports,
+    "alerts": journey_alerts,
+}
+
+
+def _pick_account(accounts: List[Dict[str, Any]], mix: Dict[str, float]) -> Dict[str, Any]:
+    """Tirer un tenant selon la répartition par taille (classes absentes ignorées)"""
+    by_size = defaultdict(list)
+    for account in accounts:
+        by_size[account["size_class"]].append(account)
+
+    sizes = [size for size in by_size if mix.get(size, 0) > 0] or list(by_size)
+    size = random.choices(sizes, weights=[mix.get(s, 1) for s in sizes])[0]
+    return random.choice(by_size[size])
+
+
+async def run_user(client, account, stats, journeys, deadline: float, start_delay: float, think_time: float) -> None:
+    await asyncio.sleep(start_delay)
+    user = VirtualUser(client, account, stats)
+    if not await user.login():
+        return
+
+    names, weights = list(journeys), list(journeys.values())
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights=weights)[0]
+        await JOURNEYS[name](user)
+        await asyncio.sleep(random.uniform(0, 2 * think_time))
+
+
+async def run(args, accounts: List[Dict[str, Any]]) -> Dict[str, EndpointStats]:
+    import httpx
+
+    mix = _parse_weights(args.mix)
+    journeys = {name: weight for name, weight in _parse_weights(args.journeys).items() if weight > 0}
+    unknown = set(journeys) - set(JOURNEYS)
+    if unknown:
+        raise SystemExit(f"❌ Parcours inconnus: {', '.join(sorted(unknown))} (disponibles: {', '.join(JOURNEYS)})")
+
+    stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        deadline = time.monotonic() + args.ramp_up + args.duration
+        await asyncio.gather(*[
+            run_user(
+                client, _pick_account(accounts, mix), stats, journeys, deadline,
+                start_delay=args.ramp_up * i / args.concurrency, think_time=args.think_time,
+            )
+            for i in range(args.concurrency)
+        ])
+
+    return stats
+
+
+def report(stats: Dict[str, EndpointStats], elapsed: float) -> Dict[str, Any]:
+    """Afficher et retourner le résumé par endpoint"""
+    summary = {}
+    print(f"\n{'='*110}")
+    print(f"{'Endpoint':<42} {'Requêtes':>9} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'Erreurs':>9}")
+    print(f"{'='*110}")
+
+    for endpoint in sorted(stats):
+        endpoint_stats = stats[endpoint]
+        latencies = [latency * 1000 for latency in endpoint_stats.latencies]
+        count = len(latencies)
+        entry = {
+            "requests": count,
+            "rps": round(count / elapsed, 2),
+            "p50_ms": round(_percentile(latencies, 0.50), 1),
+            "p95_ms": round(_percentile(latencies, 0.95), 1),
+            "p99_ms": round(_percentile(latencies, 0.99), 1),
+            "error_rate": round(endpoint_stats.errors / count, 4),
+            "statuses": {str(k): v for k, v in endpoint_stats.statuses.items()},
+        }
+        summary[endpoint] = entry
+
+        status = "❌" if entry["error_rate"] > 0.01 else "  "
+        print(f"{status}{endpoint:<40} {count:>9} {entry['rps']:>8.1f} {entry['p50_ms']:>9.0f} "
+              f"{entry['p95_ms']:>9.0f} {entry['p99_ms']:>9.0f} {entry['error_rate']:>8.1%}")
+
+    total = sum(len(s.latencies) for s in stats.values())
+    errors = sum(s.errors for s in stats.values())
+    print(f"{'='*110}")
+    print(f"📈 {total} requêtes en {elapsed:.0f}s: {total / elapsed:.1f} req/s, "
+          f"{errors} erreur(s) ({errors / max(total, 1):.1%})")
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Test de charge HTTP (parcours utilisateurs)")
+    parser.add_argument("--users-file", type=Path, default=DEFAULT_USERS_FILE)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prepare_parser = subparsers.add_parser("prepare", help="Créer les comptes de test (un par tenant)")
+    prepare_parser.add_argument("--perf-only", action="store_true", help="Seulement les tenants de perf_dataset")
+
+    run_parser = subparsers.add_parser("run", help="Lancer le test de charge")
+    run_parser.add_argument("--url", default="http://localhost:8000")
+    run_parser.add_argument("--concurrency", type=int, default=20, help="Utilisateurs virtuels simultanés")
+    run_parser.add_argument("--duration", type=int, default=60, help="Durée après montée en charge (s)")
+    run_parser.add_argument("--ramp-up", type=float, default=10, help="Montée en charge (s)")
+    run_parser.add_argument("--think-time", type=float, default=1.0, help="Temps de réflexion moyen (s)")
+    run_parser.add_argument("--timeout", type=float, default=60)
+    run_parser.add_argument("--mix", default=DEFAULT_MIX, help="Répartition des utilisateurs par taille de tenant")
+    run_parser.add_argument("--journeys", default=DEFAULT_JOURNEYS, help="Poids des parcours")
+    run_parser.add_argument("--start-fakes", action="store_true", help="Démarrer les faux Twilio / SMTP")
+    run_parser.add_argument("--seed", type=int, help="Graine aléatoire (parcours reproductibles)")
+    run_parser.add_argument("--output", type=Path, help="Écrire le résumé en JSON")
+
+    args = parser.parse_args()
+
+    if args.command == "prepare":
+        return prepare(args.users_file, args.perf_only)
+
+    if not args.users_file.exists():
+        print(f"❌ {args.users_file} introuvable: lancer d'abord la commande prepare")
+        return 1
+    accounts = json.loads(args.users_file.read_text())
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    stop_fakes = None
+    if args.start_fakes:
+        from fake_providers import start_fake_providers
+        provider_stats, stop_fakes = start_fake_providers()
+
+    print(f"🚀 {args.concurrency} utilisateurs virtuels, {len(accounts)} tenant(s), "
+          f"{args.ramp_up:.0f}s + {args.duration}s sur {args.url}")
+    print(f"   Mix: {args.mix}  Parcours: {args.journeys}")
+
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(run(args, accounts))
+    finally:
+        if stop_fakes:
+            stop_fakes()
+    elapsed = time.perf_counter() - start
+
+    summary = report(stats, elapsed)
+    if args.start_fakes:
+        print(f"📨 Faux fournisseurs: {provider_stats.snapshot()}")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "concurrency": args.concurrency,
+            "duration_s": round(elapsed, 1),
+            "mix": args.mix,
+            "journeys": args.journeys,
+            "endpoints": summary,
+        }, indent=2, ensure_ascii=False))
+        print(f"💾 Résumé écrit: {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,385 @@
+"""
+Générateur de données synthétiques pour les benchmarks et tests de performance
+Déterministe (même graine => mêmes IDs et mêmes ventes), chargé par COPY
+
+Modèle de demande par produit et par jour:
+- popularité en loi de Zipf (quelques produits font l'essentiel du CA)
+- demande intermittente: les produits lents ne se vendent pas tous les jours
+- saisonnalité hebdomadaire (samedi fort), mensuelle (début de mois, salaires)
+  et annuelle (creux de saison des pluies, pic de fin d'année)
+
+Les tenants générés sont reconnaissables à leur email perf-<n>@digiboost.test
+et peuvent être supprimés sans toucher aux autres données (cascade tenant_id).
+
+Usage:
+    python scripts/perf_dataset.py --tenants 5 --products 1000 --years 1 --daily-sales 150
+    python scripts/perf_dataset.py --tenants 20 --products 5000 --years 3 --daily-sales 500   # ~11M ventes
+    python scripts/perf_dataset.py --drop
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import List
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.models.alert import Alert
+from app.models.category import Category
+from app.models.supplier import Supplier
+from app.models.tenant import Tenant
+
+PERF_EMAIL_DOMAIN = "digiboost.test"
+
+# Produits traités ensemble lors de la génération des ventes (borne la mémoire)
+PRODUCT_CHUNK_SIZE = 200
+
+# Saisonnalité hebdomadaire (lundi -> dimanche)
+WEEKDAY_FACTORS = np.array([0.90, 0.90, 0.95, 1.00, 1.10, 1.30, 0.85])
+
+# Heures d'ouverture des boutiques (ventes réparties entre 8h et 20h)
+OPENING_SECONDS = (8 * 3600, 20 * 3600)
+
+
+@dataclass
+class DatasetSpec:
+    """Dimensions du jeu de données (par tenant)"""
+    tenants: int = 5
+    products: int = 1000
+    years: float = 1.0
+    daily_sales: int = 150  # Lignes de vente moyennes par jour et par tenant
+    alert_history: int = 2000
+    seed: int = 42
+
+    @property
+    def days(self) -> int:
+        return max(1, int(self.years * 365))
+
+
+def perf_tenant_email(index: int) -> str:
+    return f"perf-{index}@{PERF_EMAIL_DOMAIN}"
+
+
+def _uuids(rng: np.random.Generator, n: int) -> List[str]:
+    """UUID reproductibles (version 4) tirés du générateur, sous forme texte"""
+    raw = np.frombuffer(rng.bytes(16 * n), dtype=np.uint8).reshape(n, 16).copy()
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    return [str(uuid.UUID(bytes=row.tobytes())) for row in raw]
+
+
+def _epoch_seconds(values) -> np.ndarray:
+    """Secondes depuis l'epoch, quelle que soit la résolution interne de pandas"""
+    return np.asarray((values - pd.Timestamp(0, tz="UTC")) // pd.Timedelta(seconds=1), dtype=np.int64)
+
+
+def _copy(db: Session, table: str, frame: pd.DataFrame) -> int:
+    """Charger un DataFrame par COPY ... FROM STDIN (CSV)"""
+    if frame.empty:
+        return 0
+
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False, header=False)
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {table} ({', '.join(frame.columns)}) FROM STDIN WITH (FORMAT csv)",
+            buffer
+        )
+    finally:
+        cursor.close()
+    return len(frame)
+
+
+def drop_dataset(db: Session) -> int:
+    """Supprimer les tenants de performance (et toutes leurs données par cascade)"""
+    result = db.execute(
+        text("DELETE FROM tenants WHERE email LIKE :pattern"),
+        {"pattern": f"perf-%@{PERF_EMAIL_DOMAIN}"}
+    )
+    db.commit()
+    return result.rowcount
+
+
+def existing_tenant_ids(db: Session, spec: DatasetSpec) -> List[uuid.UUID]:
+    """IDs des tenants de performance déjà présents (dans l'ordre), vide si incomplet ou autre spec"""
+    emails = [perf_tenant_email(i) for i in range(spec.tenants)]
+    rows = db.query(Tenant.id, Tenant.email, Tenant.settings).filter(Tenant.email.in_(emails)).all()
+    by_email = {email: tenant_id for tenant_id, email, settings in rows
+                if (settings or {}).get("perf_spec") == asdict(spec)}
+    if len(by_email) != spec.tenants:
+        return []
+    return [by_email[email] for email in emails]
+
+
+def seasonality(days: pd.DatetimeIndex) -> np.ndarray:
+    """Facteur multiplicatif de la demande pour chaque jour"""
+    weekly = WEEKDAY_FACTORS[days.dayofweek.to_numpy()]
+    # Début de mois (salaires): +20% les 5 premiers jours
+    monthly = np.where(days.day.to_numpy() <= 5, 1.20, 1.0)
+    # Creux en saison des pluies (août), pic en décembre
+    yearly = 1.0 + 0.15 * np.cos(2 * np.pi * (days.dayofyear.to_numpy() - 350) / 365.0)
+    year_end = np.where((days.month.to_numpy() == 12) & (days.day.to_numpy() >= 15), 1.30, 1.0)
+    return weekly * monthly * yearly * year_end
+
+
+def _generate_products(rng, tenant_id, spec, categories, suppliers) -> pd.DataFrame:
+    n = spec.products
+    purchase = rng.integers(10, 1000, size=n) * 50
+    min_stock = rng.integers(5, 50, size=n)
+
+    # ~5% en rupture, ~15% sous le minimum, le reste entre min et 10x min
+    roll = rng.random(n)
+    stock = np.where(
+        roll < 0.05, 0,
+        np.where(roll < 0.20, rng.integers(1, min_stock + 1), rng.integers(min_stock + 1, min_stock * 10 + 2))
+    )
+
+    return pd.DataFrame({
+        "id": _uuids(rng, n),
+        "tenant_id": str(tenant_id),
+        "code": [f"P{i:06d}" for i in range(n)],
+        "name": [f"Produit {i}" for i in range(n)],
+        "category_id": rng.choice([c["id"] for c in categories], size=n).astype(str),
+        "supplier_id": rng.choice([s["id"] for s in suppliers], size=n).astype(str),
+        "purchase_price": purchase,
+        "sale_price": np.round(purchase * 1.3),
+        "unit": "unité",
+        "current_stock": stock,
+        "min_stock": min_stock,
+        "max_stock": min_stock * 10,
+        "is_active": rng.random(n) > 0.02,
+    })
+
+
+def _generate_sales(db, rng, tenant_id, spec, products: pd.DataFrame, start: pd.Timestamp) -> int:
+    """Générer et charger les ventes, par paquets de produits"""
+    days = pd.date_range(start, periods=spec.days, freq="D", tz="UTC")
+    season = seasonality(days)
+    season = season / season.mean()
+
+    n = len(products)
+    # Popularité Zipf (exposant ~1.1), normalisée sur le volume quotidien visé
+    popularity = 1.0 / np.power(np.arange(1, n + 1), 1.1)
+    rng.shuffle(popularity)
+    popularity = popularity / popularity.sum()
+
+    # Probabilité qu'un produit se vende un jour donné: faible pour les produits lents
+    expected = popularity * spec.daily_sales
+    p_active = np.clip(expected * 2.0, 0.03, 1.0)
+    # Intensité conditionnelle (jours actifs) pour conserver l'espérance
+    intensity = expected / p_active
+
+    product_ids = products["id"].to_numpy()
+    prices = products["sale_price"].to_numpy(dtype=float)
+    day_starts = _epoch_seconds(days)
+    loaded = 0
+
+    for offset in range(0, n, PRODUCT_CHUNK_SIZE):
+        block = slice(offset, offset + PRODUCT_CHUNK_SIZE)
+        lam = intensity[block, None] * season[None, :]
+        active = rng.random(lam.shape) < p_active[block, None]
+        counts = rng.poisson(lam) * active
+
+        product_idx, day_idx = np.nonzero(counts)
+        repeats = counts[product_idx, day_idx]
+        product_idx = np.repeat(product_idx + offset, repeats)
+        day_idx = np.repeat(day_idx, repeats)
+        total = len(product_idx)
+        if total == 0:
+            continue
+
+        seconds = day_starts[day_idx] + rng.integers(*OPENING_SECONDS, size=total)
+        quantity = rng.geometric(0.35, size=total)
+        unit_price = prices[product_idx]
+
+        frame = pd.DataFrame({
+            "id": _uuids(rng, total),
+            "tenant_id": str(tenant_id),
+            "product_id": product_ids[product_idx],
+            "sale_date": pd.to_datetime(seconds, unit="s", utc=True),
+            "quantity": quantity,
+            "unit_price": unit_price,
+            "total_amount": quantity * unit_price,
+            "status": "DELIVERED",
+        })
+        loaded += _copy(db, "sales", frame)
+
+    return loaded
+
+
+def _generate_stock_movements(db, rng, tenant_id, spec, products: pd.DataFrame, start: pd.Timestamp) -> int:
+    """Réapprovisionnements périodiques (~toutes les 2 semaines) et ajustements d'inventaire"""
+    n = len(products)
+    restocks = rng.poisson(spec.days / 14.0, size=n)
+    adjustments = rng.poisson(spec.days / 90.0, size=n)
+
+    product_idx = np.concatenate([np.repeat(np.arange(n), restocks), np.repeat(np.arange(n), adjustments)])
+    movement_type = np.array(["ENTRY"] * int(restocks.sum()) + ["ADJUSTMENT"] * int(adjustments.sum()))
+    total = len(product_idx)
+    if total == 0:
+        return 0
+
+    seconds = _epoch_seconds(start) + rng.integers(0, spec.days * 86400, size=total)
+    quantity = np.where(movement_type == "ENTRY", rng.integers(10, 200, size=total), rng.integers(1, 10, size=total))
+
+    frame = pd.DataFrame({
+        "id": _uuids(rng, total),
+        "tenant_id": str(tenant_id),
+        "product_id": products["id"].to_numpy()[product_idx],
+        "movement_date": pd.to_datetime(seconds, unit="s", utc=True),
+        "movement_type": movement_type,
+        "quantity": quantity,
+    })
+    return _copy(db, "stock_movements", frame)
+
+
+def _generate_alert_history(db, rng, tenant_id, spec, alerts, start: pd.Timestamp) -> int:
+    total = spec.alert_history
+    alert_idx = rng.integers(0, len(alerts), size=total)
+    seconds = _epoch_seconds(start) + rng.integers(0, spec.days * 86400, size=total)
+
+    frame = pd.DataFrame({
+        "id": _uuids(rng, total),
+        "tenant_id": str(tenant_id),
+        "alert_id": [alerts[i]["id"] for i in alert_idx],
+        "triggered_at": pd.to_datetime(seconds, unit="s", utc=True),
+        "alert_type": [alerts[i]["alert_type"] for i in alert_idx],
+        "severity": rng.choice(["LOW", "MEDIUM", "HIGH", "CRITICAL"], size=total),
+        "message": [f"{alerts[i]['name']} déclenchée" for i in alert_idx],
+        "details": "{}",
+        "sent_whatsapp": True,
+        "sent_email": False,
+    })
+    return _copy(db, "alert_history", frame)
+
+
+def seed_tenant(db: Session, index: int, spec: DatasetSpec, now: datetime) -> uuid.UUID:
+    """Générer un tenant complet (catalogue, ventes, mouvements, alertes)"""
+    rng = np.random.default_rng([spec.seed, index])
+    tenant_id = uuid.UUID(_uuids(rng, 1)[0])
+    start = pd.Timestamp(now).normalize() - pd.Timedelta(days=spec.days)
+
+    db.execute(insert(Tenant.__table__), [{
+        "id": tenant_id,
+        "name": f"Perf Tenant {index}",
+        "email": perf_tenant_email(index),
+        "country": "SN",
+        "settings": {"currency": "XOF", "perf_spec": asdict(spec)},
+        "is_active": True,
+        "created_by": "perf_dataset",
+    }])
+
+    categories = [{"id": uuid.UUID(u), "tenant_id": tenant_id, "name": f"Categorie {i}"}
+                  for i, u in enumerate(_uuids(rng, 12))]
+    suppliers = [{"id": uuid.UUID(u), "tenant_id": tenant_id, "code": f"F{i:03d}", "name": f"Fournisseur {i}",
+                  "lead_time_days": int(rng.choice([3, 7, 10, 14]))}
+                 for i, u in enumerate(_uuids(rng, 8))]
+    alerts = [{"id": uuid.UUID(u), "tenant_id": tenant_id, "name": name, "alert_type": alert_type,
+               "conditions": conditions, "channels": ["whatsapp"], "recipients": ["+221771234567"],
+               "is_active": True}
+              for u, (name, alert_type, conditions) in zip(_uuids(rng, 3), [
+                  ("Rupture", "RUPTURE_STOCK", {}),
+                  ("Stock faible", "LOW_STOCK", {}),
+                  ("Taux de service", "BAISSE_TAUX_SERVICE", {"threshold": 90}),
+              ])]
+    db.execute(insert(Category.__table__), categories)
+    db.execute(insert(Supplier.__table__), suppliers)
+    db.execute(insert(Alert.__table__), alerts)
+
+    products = _generate_products(rng, tenant_id, spec, categories, suppliers)
+    _copy(db, "products", products)
+
+    sales = _generate_sales(db, rng, tenant_id, spec, products, start)
+    movements = _generate_stock_movements(db, rng, tenant_id, spec, products, start)
+    history = _generate_alert_history(db, rng, tenant_id, spec, alerts, start)
+
+    print(f"  ✓ perf-{index}: {len(products)} produits, {sales} ventes, "
+          f"{movements} mouvements, {history} alertes historisées")
+    return tenant_id
+
+
+def ensure_dataset(db: Session, spec: DatasetSpec, reseed: bool = False) -> List[uuid.UUID]:
+    """
+    Garantir la présence du jeu de données et retourner les IDs des tenants.
+
+    Réutilise les tenants existants sauf si reseed=True. Termine par
+    ANALYZE pour que le planificateur travaille sur des statistiques à jour.
+    """
+    if not reseed:
+        tenant_ids = existing_tenant_ids(db, spec)
+        if tenant_ids:
+            return tenant_ids
+
+    drop_dataset(db)
+
+    now = datetime.now(timezone.utc)
+    tenant_ids = []
+    for index in range(spec.tenants):
+        tenant_ids.append(seed_tenant(db, index, spec, now))
+        db.commit()
+
+    analyze_tables(db)
+    return tenant_ids
+
+
+def analyze_tables(db: Session) -> None:
+    """Mettre à jour les statistiques du planificateur (hors transaction)"""
+    with db.get_bind().connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Jeu de données synthétique (COPY)")
+    parser.add_argument("--tenants", type=int, default=DatasetSpec.tenants)
+    parser.add_argument("--products", type=int, default=DatasetSpec.products, help="Produits par tenant")
+    parser.add_argument("--years", type=float, default=DatasetSpec.years, help="Historique de ventes (années)")
+    parser.add_argument("--daily-sales", type=int, default=DatasetSpec.daily_sales,
+                        help="Lignes de vente moyennes par jour et par tenant")
+    parser.add_argument("--alert-history", type=int, default=DatasetSpec.alert_history)
+    parser.add_argument("--seed", type=int, default=DatasetSpec.seed)
+    parser.add_argument("--drop", action="store_true", help="Supprimer le jeu de données")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.drop:
+            print(f"🗑️  {drop_dataset(db)} tenant(s) de performance supprimé(s)")
+            return 0
+
+        spec = DatasetSpec(
+            tenants=args.tenants,
+            products=args.products,
+            years=args.years,
+            daily_sales=args.daily_sales,
+            alert_history=args.alert_history,
+            seed=args.seed,
+        )
+        expected = spec.tenants * spec.days * spec.daily_sales
+        print(f"🚀 Génération de {spec.tenants} tenant(s), ~{expected:,} ventes\n")
+
+        start = time.perf_counter()
+        tenant_ids = ensure_dataset(db, spec, reseed=True)
+        elapsed = time.perf_counter() - start
+
+        print(f"\n✅ {len(tenant_ids)} tenant(s) générés en {elapsed:.0f}s")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
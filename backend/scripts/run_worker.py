@@ -0,0 +1,57 @@
+"""
+Démarrer un worker Celery selon un profil (queues, pool, concurrence)
+Voir app/tasks/worker_profiles.py pour le détail des profils.
+
+Usage:
+    python scripts/run_worker.py io                      # alerts, notifications (gevent)
+    python scripts/run_worker.py cpu                     # reports, imports (prefork)
+    python scripts/run_worker.py maintenance             # maintenance, celery (prefork)
+    python scripts/run_worker.py cpu --print             # afficher la commande sans lancer
+    python scripts/run_worker.py io -- --loglevel=debug  # options Celery supplémentaires
+"""
+import argparse
+import os
+import shlex
+import sys
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def main() -> int:
+    from app.tasks.worker_profiles import worker_profiles
+
+    profiles = worker_profiles()
+
+    parser = argparse.ArgumentParser(description="Worker Celery par profil de queues")
+    parser.add_argument("profile", choices=sorted(profiles))
+    parser.add_argument("--print", action="store_true", help="Afficher la commande sans la lancer")
+
+    # Options Celery supplémentaires après "--"
+    argv = sys.argv[1:]
+    split = argv.index("--") if "--" in argv else len(argv)
+    args = parser.parse_args(argv[:split])
+    extra = argv[split + 1:]
+
+    profile = profiles[args.profile]
+    command = ["celery", *profile.worker_args(), "--loglevel=info", *extra]
+    # Pool de connexions du profil (le worker io le fixe selon ses greenlets)
+    environment = profile.environment()
+    display = shlex.join([f"{name}={value}" for name, value in environment.items()] + command)
+
+    if args.print:
+        print(display)
+        return 0
+
+    print(f"🚀 Worker {args.profile}: {display}")
+    if profile.tasks_per_process() > profile.db_connections():
+        print(f"   {profile.tasks_per_process()} tâches simultanées pour {profile.db_connections()} "
+              f"connexion(s) PostgreSQL: les tâches au-delà attendent une connexion")
+
+    os.environ.update(environment)
+    os.chdir(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+    os.execvp(command[0], command)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
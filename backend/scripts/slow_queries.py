@@ -0,0 +1,127 @@
+"""
+Analyse des requêtes lentes capturées en production
+Agrège les fichiers de SLOW_QUERY_LOG_DIR et classe les empreintes par temps total
+
+Usage:
+    python scripts/slow_queries.py top --limit 20 --since 2025-01-01
+    python scripts/slow_queries.py show <fingerprint_hash>
+    python scripts/slow_queries.py --dir /var/log/digiboost/slow_queries top
+"""
+import argparse
+import json
+import os
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+# Ajouter le répertoire parent au path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+def iter_records(directory: Path, since: Optional[str] = None) -> Iterator[Dict]:
+    """Lire tous les enregistrements (fichiers courants et rotatifs)"""
+    for path in sorted(directory.glob("slow_queries-*.jsonl*")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if since and record.get("ts", "") < since:
+                    continue
+                yield record
+
+
+def _percentile(values: List[float], ratio: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+def top(directory: Path, limit: int, since: Optional[str]) -> int:
+    """Classer les empreintes par temps total passé en base"""
+    groups = defaultdict(list)
+    for record in iter_records(directory, since):
+        groups[record["fingerprint_hash"]].append(record)
+
+    if not groups:
+        print(f"❌ Aucune requête lente dans {directory}")
+        return 1
+
+    ranking = sorted(
+        groups.items(),
+        key=lambda item: sum(r["duration_ms"] for r in item[1]),
+        reverse=True
+    )
+
+    print(f"📊 {sum(len(r) for r in groups.values())} requêtes lentes, {len(groups)} empreintes\n")
+    print("="*80)
+
+    for fp_hash, records in ranking[:limit]:
+        durations = [r["duration_ms"] for r in records]
+        callers = Counter(r.get("caller") or "?" for r in records)
+        tenants = Counter(r.get("tenant_id") or "?" for r in records)
+
+        print(f"\n📌 {fp_hash}  total {sum(durations) / 1000:.1f}s  "
+              f"n={len(records)}  moy {sum(durations) / len(durations):.0f}ms  "
+              f"p95 {_percentile(durations, 0.95):.0f}ms  max {max(durations):.0f}ms")
+        print(f"   {records[-1]['fingerprint'][:200]}")
+        print(f"   Appelants: {', '.join(f'{c} ({n})' for c, n in callers.most_common(3))}")
+        print(f"   Tenants: {len(tenants)} (top: {', '.join(f'{t} ({n})' for t, n in tenants.most_common(3))})")
+        if any("plan" in r for r in records):
+            print("   🔍 Plan disponible (commande show)")
+
+    return 0
+
+
+def show(directory: Path, fp_hash: str) -> int:
+    """Afficher le dernier enregistrement d'une empreinte (avec plan si capturé)"""
+    records = [r for r in iter_records(directory) if r["fingerprint_hash"] == fp_hash]
+    if not records:
+        print(f"❌ Empreinte {fp_hash} introuvable")
+        return 1
+
+    with_plan = [r for r in records if r.get("plan")]
+    record = (with_plan or records)[-1]
+
+    print(f"📌 {fp_hash} ({len(records)} occurrences)\n")
+    print(record["fingerprint"])
+    print(f"\nParamètres: {json.dumps(record.get('params_shape'))}")
+    print(f"Appelant: {record.get('caller')}  Unité: {record.get('unit')}")
+    print(f"Tenant: {record.get('tenant_id')}  Durée: {record['duration_ms']}ms  ({record['ts']})")
+
+    if record.get("plan"):
+        print("\n🔍 EXPLAIN (ANALYZE, BUFFERS):")
+        print("-" * 80)
+        print(json.dumps(record["plan"], indent=2))
+
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Requêtes SQL lentes capturées")
+    parser.add_argument("--dir", help="Dossier des captures (défaut: SLOW_QUERY_LOG_DIR)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    top_parser = subparsers.add_parser("top", help="Classer les empreintes par temps total")
+    top_parser.add_argument("--limit", type=int, default=20)
+    top_parser.add_argument("--since", help="Date ISO minimale (ex: 2025-01-31)")
+
+    show_parser = subparsers.add_parser("show", help="Détail d'une empreinte")
+    show_parser.add_argument("fingerprint_hash")
+
+    args = parser.parse_args()
+
+    if args.dir:
+        directory = Path(args.dir)
+    else:
+        from app.config import settings
+        directory = Path(settings.SLOW_QUERY_LOG_DIR)
+
+    if args.command == "top":
+        return top(directory, args.limit, args.since)
+    return show(directory, args.fingerprint_hash)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
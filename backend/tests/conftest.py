@@ -0,0 +1,175 @@
+"""
+Configuration commune des tests.
+
+Les variables obligatoires de app.config sont fixées avant tout import de
+l'application; les tests qui demandent PostgreSQL sont ignorés sans
+TEST_DATABASE_URL (base jetable, jamais la base de production).
+"""
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+# Moteur créé à l'import de app.db.session (pool_size: pas de SQLite en mémoire)
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.gettempdir()}/digiboost-tests.db")
+os.environ.setdefault("REDIS_URL", "redis://localhost:6379/15")
+os.environ.setdefault("DEBUG", "false")
+
+from sqlalchemy import BigInteger  # noqa: E402
+from sqlalchemy.dialects.postgresql import JSONB, UUID  # noqa: E402
+from sqlalchemy.ext.compiler import compiles  # noqa: E402
+
+
+# Types PostgreSQL des modèles, rendus sous SQLite pour les tests sans base
+@compiles(UUID, "sqlite")
+def _uuid_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@compiles(JSONB, "sqlite")
+def _jsonb_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+
+@compiles(BigInteger, "sqlite")
+def _bigint_sqlite(type_, compiler, **kw):
+    # INTEGER PRIMARY KEY: seul type auto-incrémenté par SQLite
+    return "INTEGER"
+
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL", "")
+
+requires_postgres = pytest.mark.skipif(
+    not TEST_DATABASE_URL.startswith("postgresql"),
+    reason="TEST_DATABASE_URL (PostgreSQL) non défini",
+)
+
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@pytest.fixture
+def pg_engine():
+    """Moteur SQLAlchemy vers la base PostgreSQL de test."""
+    from sqlalchemy import create_engine
+
+    engine = create_engine(TEST_DATABASE_URL)
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+
+@pytest.fixture
+def alembic_config(monkeypatch, pg_engine):
+    """
+    Configuration Alembic visant la base de test, remise à vide.
+
+    Le schéma public est recréé: la base de TEST_DATABASE_URL doit être
+    jetable. alembic/env.py lit settings.DATABASE_URL à chaque commande.
+    """
+    from alembic.config import Config
+    from sqlalchemy import text
+
+    from app.config import settings
+
+    with pg_engine.begin() as conn:
+        conn.execute(text("DROP SCHEMA public CASCADE"))
+        conn.execute(text("CREATE SCHEMA public"))
+
+    monkeypatch.setattr(settings, "DATABASE_URL", TEST_DATABASE_URL)
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    return config
+
+
+def seed_tenant_product(conn):
+    """Insérer un tenant et un produit minimaux; retourne (tenant_id, product_id)."""
+    import uuid
+
+    from sqlalchemy import text
+
+    tenant_id, product_id = uuid.uuid4(), uuid.uuid4()
+    conn.execute(text("""
+        INSERT INTO tenants (id, name, email, is_active)
+        VALUES (:id, 'Boutique Test', :email, TRUE)
+    """), {"id": tenant_id, "email": f"{tenant_id.hex[:12]}@digiboost.sn"})
+    conn.execute(text("""
+        INSERT INTO products (id, tenant_id, code, name, purchase_price, sale_price, is_active)
+        VALUES (:id, :tenant_id, 'P-001', 'Riz 25kg', 10000, 12500, TRUE)
+    """), {"id": product_id, "tenant_id": tenant_id})
+    return tenant_id, product_id
+
+
+class FakeRedis:
+    """Client Redis en mémoire (sous-ensemble utilisé par l'application)."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.published = []
+
+    def _alive(self, key):
+        import time
+
+        deadline = self.expiry.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return key in self.data
+
+    def get(self, key):
+        return self.data.get(key) if self._alive(key) else None
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        import time
+
+        if nx and self._alive(key):
+            return None
+        self.data[key] = value if isinstance(value, bytes) else str(value).encode()
+        self.expiry.pop(key, None)
+        if ex is not None:
+            self.expiry[key] = time.monotonic() + ex
+        if px is not None:
+            self.expiry[key] = time.monotonic() + px / 1000
+        return True
+
+    def exists(self, key):
+        return int(self._alive(key))
+
+    def delete(self, *keys):
+        removed = 0
+        for key in keys:
+            removed += int(self._alive(key))
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+        return removed
+
+    def eval(self, script, numkeys, *args):
+        """Scripts Lua des baux (app/core/locks.py): compare-and-set sur le jeton."""
+        import time
+
+        key, token = args[0], args[1]
+        if self.get(key) != str(token).encode():
+            return 0
+        if "pexpire" in script:
+            self.expiry[key] = time.monotonic() + int(args[2]) / 1000
+            return 1
+        if "del" in script:
+            return self.delete(key)
+        raise NotImplementedError(script)
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+        return 0
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """Remplacer le client Redis du processus par FakeRedis."""
+    from app.core import redis_client
+
+    client = FakeRedis()
+    monkeypatch.setattr(redis_client, "get_redis", lambda: client)
+    return client
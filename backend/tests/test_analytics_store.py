@@ -0,0 +1,196 @@
+"""
+Tests de l'instantané analytique (app/db/analytics_store.py): choix entre
+l'instantané et PostgreSQL, lecture DuckDB et export depuis PostgreSQL.
+"""
+import os
+import uuid
+from contextlib import nullcontext
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.db import analytics_store
+from app.db.analytics_store import Snapshot, usable_snapshot
+from app.db.partitioning import add_months, month_start
+from app.services import analytics_service
+from app.services.analytics_service import AnalyticsService
+from tests.conftest import requires_postgres, seed_tenant_product
+
+
+@pytest.fixture
+def store(monkeypatch, tmp_path):
+    """Instantanés activés dans un dossier temporaire, cache des manifests vide."""
+    monkeypatch.setattr(settings, "ANALYTICS_STORE_ENABLED", True)
+    monkeypatch.setattr(settings, "ANALYTICS_STORE_DIR", str(tmp_path / "analytics_store"))
+    analytics_store._manifest_cache.clear()
+    yield tmp_path / "analytics_store"
+    analytics_store._manifest_cache.clear()
+
+
+def _save_snapshot(tenant_id, refreshed_at, coverage_start=date(2024, 1, 1), months=()):
+    snapshot = Snapshot(
+        tenant_id=str(tenant_id),
+        coverage_start=coverage_start,
+        refreshed_at=refreshed_at,
+        full_refreshed_at=refreshed_at,
+        months=list(months),
+    )
+    os.makedirs(snapshot.path, exist_ok=True)
+    analytics_store._write_manifest(snapshot)
+    return snapshot
+
+
+def test_fresh_covering_snapshot_is_used(store):
+    tenant_id = uuid.uuid4()
+    _save_snapshot(tenant_id, datetime.utcnow())
+
+    snapshot = usable_snapshot(tenant_id, datetime(2024, 3, 1))
+
+    assert snapshot is not None
+    assert snapshot.tenant_id == str(tenant_id)
+
+
+def test_stale_snapshot_falls_back(store):
+    tenant_id = uuid.uuid4()
+    stale = datetime.utcnow() - timedelta(seconds=settings.ANALYTICS_STORE_MAX_STALENESS_SECONDS + 60)
+    _save_snapshot(tenant_id, stale)
+
+    assert usable_snapshot(tenant_id, datetime(2024, 3, 1)) is None
+
+
+def test_period_before_coverage_falls_back(store):
+    tenant_id = uuid.uuid4()
+    _save_snapshot(tenant_id, datetime.utcnow(), coverage_start=date(2024, 1, 1))
+
+    assert usable_snapshot(tenant_id, datetime(2023, 12, 31, 23, 59)) is None
+    assert usable_snapshot(tenant_id, datetime(2024, 1, 1)) is not None
+
+
+def test_missing_or_disabled_snapshot_falls_back(store, monkeypatch):
+    tenant_id = uuid.uuid4()
+    assert usable_snapshot(tenant_id, datetime(2024, 3, 1)) is None
+
+    _save_snapshot(tenant_id, datetime.utcnow())
+    monkeypatch.setattr(settings, "ANALYTICS_STORE_ENABLED", False)
+    assert usable_snapshot(tenant_id, datetime(2024, 3, 1)) is None
+
+
+class _RecordingQuery:
+    """Requête préparée factice: enregistre l'exécution sur PostgreSQL."""
+
+    def __init__(self):
+        self.executed_on = None
+
+    def __str__(self):
+        return "SELECT 1"
+
+    def execute(self, db, params):
+        self.executed_on = db
+        return self
+
+    def fetchall(self):
+        return ["postgresql"]
+
+
+@pytest.mark.parametrize("staleness, start", [
+    (settings.ANALYTICS_STORE_MAX_STALENESS_SECONDS + 60, datetime(2024, 3, 1)),
+    (0, datetime(2023, 6, 1)),
+])
+def test_analysis_reads_postgresql_when_snapshot_unusable(store, monkeypatch, staleness, start):
+    tenant_id = uuid.uuid4()
+    _save_snapshot(tenant_id, datetime.utcnow() - timedelta(seconds=staleness))
+    monkeypatch.setattr(analytics_service, "include_archived_sales", lambda *args: nullcontext(False))
+    monkeypatch.setattr(Snapshot, "execute", lambda self, query, params: pytest.fail("instantané utilisé"))
+
+    db = object()
+    query = _RecordingQuery()
+    rows = AnalyticsService(db)._fetch_period(query, {"tenant_id": str(tenant_id)}, tenant_id, start)
+
+    assert rows == ["postgresql"]
+    assert query.executed_on is db
+
+
+def test_snapshot_execute_runs_sql_on_parquet(store):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    pytest.importorskip("duckdb")
+
+    tenant_id, product_id, category_id = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+    snapshot = _save_snapshot(tenant_id, datetime.utcnow(), months=["2024-03"])
+    os.makedirs(os.path.join(snapshot.path, "sales"), exist_ok=True)
+
+    def write(table, rows, path):
+        pq.write_table(pa.Table.from_pylist(rows, schema=analytics_store.snapshot_schema(table)), path)
+
+    write("sales", [{
+        "id": str(uuid.uuid4()), "product_id": str(product_id), "sale_date": datetime(2024, 3, day),
+        "quantity": Decimal("2.000"), "unit_price": Decimal("500.00"), "total_amount": Decimal("1000.00"),
+        "status": "DELIVERED", "tenant_id": str(tenant_id),
+    } for day in (1, 2, 3)], os.path.join(snapshot.path, "sales", "2024-03.parquet"))
+    write("products", [{
+        "id": str(product_id), "code": "P-001", "name": "Riz 25kg", "unit": "sac",
+        "current_stock": Decimal("10.000"), "min_stock": Decimal("2.000"), "max_stock": None,
+        "category_id": str(category_id), "is_active": True, "tenant_id": str(tenant_id),
+    }], os.path.join(snapshot.path, "products.parquet"))
+    write("categories", [{"id": str(category_id), "name": "Céréales", "tenant_id": str(tenant_id)}],
+          os.path.join(snapshot.path, "categories.parquet"))
+
+    rows = snapshot.execute(text("""
+        SELECT c.name AS category, SUM(s.quantity) AS quantity, SUM(s.total_amount) AS revenue
+        FROM sales s
+        JOIN products p ON p.id = s.product_id
+        JOIN categories c ON c.id = p.category_id
+        WHERE s.tenant_id = :tenant_id AND s.sale_date >= :start
+        GROUP BY c.name
+    """), {"tenant_id": str(tenant_id), "start": datetime(2024, 3, 2), "unused": 1})
+
+    assert [(row.category, row.quantity, row.revenue) for row in rows] == [
+        ("Céréales", Decimal("4.000"), Decimal("2000.00"))
+    ]
+
+
+@requires_postgres
+def test_refresh_snapshot_exports_postgresql(alembic_config, pg_engine, store):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("duckdb")
+    from alembic import command
+    from sqlalchemy.orm import Session
+
+    command.upgrade(alembic_config, "head")
+    this_month = month_start(date.today())
+
+    with pg_engine.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        for month, quantity in ((this_month, 3), (add_months(this_month, -1), 5)):
+            conn.execute(text("""
+                INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount)
+                VALUES (gen_random_uuid(), :tenant_id, :product_id, :sale_date, :quantity, 12500, :quantity * 12500)
+            """), {"tenant_id": tenant_id, "product_id": product_id, "quantity": quantity,
+                   "sale_date": datetime.combine(month, datetime.min.time())})
+
+    with Session(pg_engine) as db:
+        result = analytics_store.refresh_snapshot(db, tenant_id)
+        assert result["full"] is True
+        assert result["sales_rows_written"] == 2
+
+        start = datetime.combine(add_months(this_month, -1), datetime.min.time())
+        snapshot = usable_snapshot(tenant_id, start)
+        assert snapshot is not None
+
+        query = text("""
+            SELECT COUNT(*) AS sales, SUM(quantity) AS quantity, SUM(total_amount) AS revenue
+            FROM sales WHERE tenant_id = :tenant_id AND sale_date >= :start
+        """)
+        params = {"tenant_id": str(tenant_id), "start": start}
+        expected = tuple(db.execute(query, params).one())
+        assert tuple(snapshot.execute(query, params)[0]) == expected
+
+        # Passage incrémental: seuls les mois des ventes récemment modifiées
+        result = analytics_store.refresh_snapshot(db, tenant_id)
+        assert result["full"] is False
+        assert sorted(result["months_rewritten"]) == sorted(
+            f"{month:%Y-%m}" for month in (add_months(this_month, -1), this_month)
+        )
@@ -0,0 +1,115 @@
+"""
+Tests du cache d'authentification (app/core/auth_cache.py).
+"""
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (configuration des relations)
+from app.core import auth_cache
+from app.models.user import User
+
+
+@pytest.fixture
+def db(monkeypatch, fake_redis):
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+
+    monkeypatch.setattr(auth_cache, "_ensure_subscriber", lambda: None)
+    auth_cache.user_cache.clear()
+
+    with Session(engine) as session:
+        yield session
+
+    auth_cache.user_cache.clear()
+    engine.dispose()
+
+
+def _user(db, tenant_id, role="user"):
+    user = User(
+        id=uuid.uuid4(),
+        tenant_id=tenant_id,
+        email=f"{uuid.uuid4().hex[:8]}@digiboost.sn",
+        hashed_password="$2b$12$hash",
+        role=role,
+        is_active=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+def _read_user(db, user_id, attr):
+    """Lire un attribut de l'utilisateur comme une requête API suivante (nouvelle session)."""
+    with Session(db.get_bind()) as request_db:
+        return getattr(auth_cache.get_user(request_db, user_id), attr)
+
+
+def test_snapshot_excludes_password_hash(db):
+    user = _user(db, uuid.uuid4())
+
+    auth_cache.get_user(db, user.id)
+
+    snapshot = auth_cache.user_cache.get(user.id)
+    assert snapshot is not None
+    assert "hashed_password" not in snapshot
+    assert snapshot["email"] == user.email
+
+
+def test_cache_hit_loads_password_hash_from_database(db):
+    user = _user(db, uuid.uuid4())
+    auth_cache.get_user(db, user.id)
+
+    assert _read_user(db, user.id, "hashed_password") == "$2b$12$hash"
+
+
+def test_invalidate_user_evicts_everywhere(db, fake_redis):
+    user = _user(db, uuid.uuid4())
+    assert _read_user(db, user.id, "role") == "user"
+
+    user.role = "viewer"
+    db.commit()
+    # Sans invalidation, le cache sert encore l'ancien rôle
+    assert _read_user(db, user.id, "role") == "user"
+
+    auth_cache.invalidate_user(user.id)
+
+    assert auth_cache.user_cache.get(user.id) is None
+    assert (auth_cache.INVALIDATION_CHANNEL, str(user.id)) in fake_redis.published
+    assert _read_user(db, user.id, "role") == "viewer"
+
+
+def test_first_login_password_change_invalidates_cached_user(db, fake_redis, monkeypatch):
+    from app.api.v1 import auth
+    from app.core.security import create_temp_token
+    from app.schemas.auth import ChangePasswordFirstLoginRequest
+
+    # Hachage bcrypt hors sujet ici: seule l'invalidation est vérifiée
+    async def verify(password, hashed):
+        return hashed == f"hash:{password}"
+
+    async def hash_password(password):
+        return f"hash:{password}"
+
+    monkeypatch.setattr(auth, "verify_password_async", verify)
+    monkeypatch.setattr(auth, "get_password_hash_async", hash_password)
+
+    user = _user(db, uuid.uuid4())
+    user.hashed_password = "hash:Digiboost2025"
+    user.must_change_password = True
+    db.commit()
+    assert _read_user(db, user.id, "must_change_password") is True
+
+    asyncio.run(auth.change_password_first_login(
+        ChangePasswordFirstLoginRequest(old_password="Digiboost2025", new_password="N0uveau-Mot2Passe!"),
+        create_temp_token(str(user.id), user.tenant_id),
+        db,
+    ))
+
+    assert auth_cache.user_cache.get(user.id) is None
+    assert (auth_cache.INVALIDATION_CHANNEL, str(user.id)) in fake_redis.published
+    assert _read_user(db, user.id, "must_change_password") is False
+    assert _read_user(db, user.id, "hashed_password") == "hash:N0uveau-Mot2Passe!"
@@ -0,0 +1,81 @@
+"""
+Tests de la vue d'ensemble du dashboard (app/services/dashboard_service.py):
+mode une requête et mode cinq requêtes doivent répondre à l'identique.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import text
+
+from app.config import settings
+from app.services.dashboard_service import DashboardService
+from tests.conftest import requires_postgres, seed_tenant_product
+
+
+def _overview(pg_engine, monkeypatch, tenant_id, single_query):
+    from sqlalchemy.orm import Session
+
+    monkeypatch.setattr(settings, "DASHBOARD_OVERVIEW_SINGLE_QUERY", single_query)
+    with Session(pg_engine) as db:
+        overview = DashboardService(db).get_overview(tenant_id)
+    overview.pop("generated_at")
+    return overview
+
+
+@pytest.fixture
+def dashboard_db(alembic_config, pg_engine):
+    from alembic import command
+
+    command.upgrade(alembic_config, "head")
+    return pg_engine
+
+
+@requires_postgres
+def test_single_query_overview_matches_separate_queries(dashboard_db, monkeypatch):
+    now = datetime.now(timezone.utc)
+
+    with dashboard_db.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        conn.execute(text("UPDATE products SET current_stock = 12, min_stock = 20 WHERE id = :id"),
+                     {"id": product_id})
+        for code, name, stock in (("P-002", "Huile 5L", 0), ("P-003", "Sucre 1kg", 35), ("P-004", "Lait", 8)):
+            conn.execute(text("""
+                INSERT INTO products (id, tenant_id, code, name, purchase_price, sale_price, current_stock,
+                                      is_active)
+                VALUES (:id, :tenant_id, :code, :name, 1500.50, 2000, :stock, TRUE)
+            """), {"id": uuid.uuid4(), "tenant_id": tenant_id, "code": code, "name": name, "stock": stock})
+
+        # Ventes des 7 derniers jours et de la semaine précédente
+        for days, quantity in ((1, 2), (3, 5), (10, 4)):
+            conn.execute(text("""
+                INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount, status)
+                VALUES (gen_random_uuid(), :tenant_id, :product_id, :sale_date, :quantity, 12500.25,
+                        :quantity * 12500.25, 'DELIVERED')
+            """), {"tenant_id": tenant_id, "product_id": product_id, "quantity": quantity,
+                   "sale_date": now - timedelta(days=days)})
+        conn.execute(text("SELECT fn_refresh_dashboard_aggregates(:tenant_id)"), {"tenant_id": tenant_id})
+
+    single = _overview(dashboard_db, monkeypatch, tenant_id, True)
+    separate = _overview(dashboard_db, monkeypatch, tenant_id, False)
+
+    assert single == separate
+    # Réponse JSON identique (types compris: int / float / str)
+    assert jsonable_encoder(single) == jsonable_encoder(separate)
+    assert separate["top_products"] and separate["dormant_products"]
+    assert separate["stock_health"]["total_products"] == 4
+
+
+@requires_postgres
+def test_single_query_overview_matches_for_empty_tenant(dashboard_db, monkeypatch):
+    with dashboard_db.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        conn.execute(text("DELETE FROM products WHERE id = :id"), {"id": product_id})
+
+    single = _overview(dashboard_db, monkeypatch, tenant_id, True)
+    separate = _overview(dashboard_db, monkeypatch, tenant_id, False)
+
+    assert single == separate
+    assert jsonable_encoder(single) == jsonable_encoder(separate)
+    assert separate["top_products"] == [] and separate["dormant_products"] == []
@@ -0,0 +1,165 @@
+"""
+Tests du recalcul incrémental des agrégats du dashboard: journal
+dashboard_dirty_tenants tenu par les triggers, fonction
+fn_refresh_dashboard_aggregates et tâche refresh_dashboard_views.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from tests.conftest import requires_postgres, seed_tenant_product
+
+MARKS = text("SELECT tenant_id, COUNT(*) FROM dashboard_dirty_tenants GROUP BY tenant_id")
+
+
+def _marks(engine):
+    """Nombre de marques par tenant dans le journal."""
+    with engine.connect() as conn:
+        return dict(conn.execute(MARKS).all())
+
+
+def _clear_marks(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM dashboard_dirty_tenants"))
+
+
+def _insert_sale(conn, tenant_id, product_id, quantity=2, days=1):
+    sale_id = uuid.uuid4()
+    conn.execute(text("""
+        INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount)
+        VALUES (:id, :tenant_id, :product_id, :sale_date, :quantity, 12500, :quantity * 12500)
+    """), {"id": sale_id, "tenant_id": tenant_id, "product_id": product_id, "quantity": quantity,
+           "sale_date": datetime.now(timezone.utc) - timedelta(days=days)})
+    return sale_id
+
+
+@pytest.fixture
+def dashboard_db(alembic_config, pg_engine, monkeypatch):
+    """Base migrée; la tâche ouvre ses sessions sur la base de test, sans verrou Redis."""
+    from alembic import command
+    from sqlalchemy.orm import sessionmaker
+
+    from app.tasks import dashboard_tasks
+
+    command.upgrade(alembic_config, "head")
+    monkeypatch.setattr(dashboard_tasks, "SessionLocal", sessionmaker(bind=pg_engine))
+    monkeypatch.setattr(settings, "PERIODIC_TASK_LOCKS_ENABLED", False)
+    return pg_engine
+
+
+@requires_postgres
+def test_writes_on_products_and_sales_mark_tenant(dashboard_db):
+    with dashboard_db.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+    assert set(_marks(dashboard_db)) == {tenant_id}
+
+    def execute(statement):
+        return lambda conn: conn.execute(text(statement), {"product_id": product_id})
+
+    # (écriture, marque attendue)
+    writes = [
+        (execute("UPDATE products SET current_stock = 5 WHERE id = :product_id"), True),
+        # Colonne sans effet sur les agrégats
+        (execute("UPDATE products SET name = 'Riz 50kg' WHERE id = :product_id"), False),
+        (lambda conn: _insert_sale(conn, tenant_id, product_id), True),
+        (execute("UPDATE sales SET quantity = 3, total_amount = 37500 WHERE product_id = :product_id"), True),
+        (execute("DELETE FROM sales WHERE product_id = :product_id"), True),
+        (execute("DELETE FROM products WHERE id = :product_id"), True),
+    ]
+    for step, (write, marked) in enumerate(writes):
+        _clear_marks(dashboard_db)
+        with dashboard_db.begin() as conn:
+            write(conn)
+
+        assert set(_marks(dashboard_db)) == ({tenant_id} if marked else set()), step
+
+
+@requires_postgres
+def test_task_skips_when_journal_empty(dashboard_db):
+    from app.tasks.dashboard_tasks import refresh_dashboard_views
+
+    with dashboard_db.begin() as conn:
+        seed_tenant_product(conn)
+    _clear_marks(dashboard_db)
+
+    assert refresh_dashboard_views() == {
+        "tenants_dirty": 0,
+        "tenants_refreshed": 0,
+        "tenants_failed": 0,
+    }
+
+
+@requires_postgres
+def test_task_consumes_marks_and_rebuilds_aggregates(dashboard_db):
+    from app.tasks.dashboard_tasks import refresh_dashboard_views
+
+    with dashboard_db.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        conn.execute(text("UPDATE products SET current_stock = 4, min_stock = 10 WHERE id = :id"),
+                     {"id": product_id})
+        conn.execute(text("""
+            INSERT INTO products (id, tenant_id, code, name, purchase_price, sale_price, current_stock,
+                                  is_active)
+            VALUES (:id, :tenant_id, 'P-002', 'Huile 5L', 4000, 5000, 0, TRUE)
+        """), {"id": uuid.uuid4(), "tenant_id": tenant_id})
+        _insert_sale(conn, tenant_id, product_id, quantity=2, days=1)
+        _insert_sale(conn, tenant_id, product_id, quantity=3, days=1)
+        _insert_sale(conn, tenant_id, product_id, quantity=5, days=3)
+    assert _marks(dashboard_db)[tenant_id] > 1
+
+    result = refresh_dashboard_views()
+
+    assert result == {"tenants_dirty": 1, "tenants_refreshed": 1, "tenants_failed": 0}
+    assert _marks(dashboard_db) == {}
+    with dashboard_db.connect() as conn:
+        health = conn.execute(text("""
+            SELECT total_products, rupture_count, low_stock_count, total_stock_value
+            FROM dashboard_stock_health WHERE tenant_id = :tenant_id
+        """), {"tenant_id": tenant_id}).one()
+        performance = conn.execute(text("""
+            SELECT transactions_count, total_units_sold
+            FROM dashboard_sales_performance WHERE tenant_id = :tenant_id ORDER BY sale_day
+        """), {"tenant_id": tenant_id}).all()
+
+    assert tuple(health) == (2, 1, 1, 40000)
+    assert [tuple(row) for row in performance] == [(1, 5), (2, 5)]
+
+    # Écriture suivante: nouvelle marque, agrégats recalculés au passage suivant
+    with dashboard_db.begin() as conn:
+        conn.execute(text("UPDATE products SET current_stock = 0 WHERE id = :id"), {"id": product_id})
+    assert refresh_dashboard_views()["tenants_refreshed"] == 1
+    with dashboard_db.connect() as conn:
+        assert conn.execute(text("""
+            SELECT rupture_count, total_stock_value FROM dashboard_stock_health WHERE tenant_id = :tenant_id
+        """), {"tenant_id": tenant_id}).one() == (2, 0)
+
+
+@requires_postgres
+def test_failing_tenant_keeps_its_marks(dashboard_db, monkeypatch):
+    from app.services.dashboard_service import DashboardService
+    from app.tasks.dashboard_tasks import refresh_dashboard_views
+
+    with dashboard_db.begin() as conn:
+        failing_id, _ = seed_tenant_product(conn)
+        healthy_id, _ = seed_tenant_product(conn)
+
+    refresh = DashboardService.refresh_tenant_aggregates
+
+    def refresh_or_fail(self, tenant_id):
+        # Marques consommées dans la transaction annulée ensuite
+        refresh(self, tenant_id)
+        if tenant_id == failing_id:
+            raise RuntimeError("échec simulé")
+
+    monkeypatch.setattr(DashboardService, "refresh_tenant_aggregates", refresh_or_fail)
+
+    result = refresh_dashboard_views()
+
+    assert result == {"tenants_dirty": 2, "tenants_refreshed": 1, "tenants_failed": 1}
+    assert set(_marks(dashboard_db)) == {failing_id}
+    with dashboard_db.connect() as conn:
+        refreshed = {tenant_id for (tenant_id,) in conn.execute(text("SELECT tenant_id FROM dashboard_stock_health"))}
+    assert healthy_id in refreshed and failing_id not in refreshed
@@ -0,0 +1,43 @@
+"""
+Budget de démarrage de l'API et des workers (voir scripts/check_import_budget.py).
+
+Chaque point d'entrée est importé dans un interpréteur neuf: le test échoue
+si le temps d'import ou la mémoire dépassent le budget, ou si une
+dépendance lourde est chargée dès le démarrage.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "scripts")))
+
+from check_import_budget import (  # noqa: E402
+    DEFAULT_MAX_RSS_MB,
+    DEFAULT_MAX_SECONDS,
+    ENTRYPOINTS,
+    measure,
+)
+
+# Nouvelles mesures avant d'échouer sur le temps (cache disque froid au premier import)
+TIME_ATTEMPTS = 3
+
+
+@pytest.mark.parametrize("label", sorted(ENTRYPOINTS))
+def test_import_budget(label):
+    module = ENTRYPOINTS[label]
+
+    report = measure(module, top=10)
+    for _ in range(TIME_ATTEMPTS - 1):
+        if report["seconds"] <= DEFAULT_MAX_SECONDS:
+            break
+        retry = measure(module, top=10)
+        if retry["seconds"] < report["seconds"]:
+            report = retry
+
+    slowest = ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in report["top"][:5])
+    assert report["heavy"] == [], f"{label}: dépendances lourdes chargées au démarrage"
+    assert report["rss_mb"] <= DEFAULT_MAX_RSS_MB, f"{label}: RSS {report['rss_mb']:.1f} Mo"
+    assert report["seconds"] <= DEFAULT_MAX_SECONDS, (
+        f"{label}: import en {report['seconds']:.3f}s ({slowest})"
+    )
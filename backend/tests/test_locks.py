@@ -0,0 +1,154 @@
+"""
+Tests du verrou à bail des tâches périodiques (app/core/locks.py).
+"""
+import pytest
+
+from app.core import locks
+from app.core.locks import LeaseLost, RedisLease, check_lease, current_lease, single_instance
+from app.tasks import dashboard_tasks
+
+
+@pytest.fixture
+def redis(monkeypatch, fake_redis):
+    # locks importe get_redis au chargement du module
+    monkeypatch.setattr(locks, "get_redis", lambda: fake_redis)
+    return fake_redis
+
+
+def test_acquire_and_skip(redis):
+    first = RedisLease("test", ttl=60)
+    second = RedisLease("test", ttl=60)
+
+    assert first.acquire()
+    try:
+        assert redis.get("lease:test") == first.token.encode()
+        assert not second.acquire()
+        assert second.token is None
+    finally:
+        first.release()
+
+    assert redis.get("lease:test") is None
+    assert second.acquire()
+    second.release()
+
+
+def test_release_does_not_delete_a_lease_taken_over(redis):
+    lease = RedisLease("test", ttl=60)
+    assert lease.acquire()
+
+    # Bail expiré puis repris par un autre worker
+    redis.set("lease:test", "other-token")
+    lease.release()
+
+    assert redis.get("lease:test") == b"other-token"
+
+
+def test_check_renews_an_overdue_lease(redis):
+    lease = RedisLease("test", ttl=60)
+    assert lease.acquire()
+    try:
+        # Heartbeat affamé (greenlet sous gevent): le bail est presque expiré
+        lease._renewed_at -= lease.heartbeat_interval
+        redis.expiry["lease:test"] -= 55
+
+        lease.check()
+
+        assert not lease.lost
+        assert redis.expiry["lease:test"] - lease._renewed_at > 59
+    finally:
+        lease.release()
+
+
+def test_check_raises_when_lease_was_taken_over(redis):
+    lease = RedisLease("test", ttl=60)
+    assert lease.acquire()
+    try:
+        redis.set("lease:test", "other-token")
+        lease._renewed_at -= lease.heartbeat_interval
+
+        with pytest.raises(LeaseLost):
+            lease.check()
+        assert lease.lost
+    finally:
+        lease.release()
+
+
+def test_single_instance_runs_skips_and_exposes_lease(redis):
+    seen = []
+
+    @single_instance("unit")
+    def task():
+        lease = current_lease()
+        seen.append(lease.key)
+        # Exécution concurrente pendant que le verrou est tenu: abandonnée
+        seen.append(task_again())
+        return "done"
+
+    @single_instance("unit")
+    def task_again():
+        return "ran"
+
+    assert task() == "done"
+    assert seen == ["lease:task:unit", {"skipped": True, "reason": "already_running"}]
+    assert current_lease() is None
+    assert redis.get("lease:task:unit") is None
+    # Hors tâche verrouillée: sans effet
+    check_lease()
+
+
+def test_single_instance_stops_when_lease_lost(redis):
+    done = []
+
+    @single_instance("unit")
+    def task():
+        for unit in range(3):
+            check_lease()
+            done.append(unit)
+            redis.set("lease:task:unit", "other-token")
+            current_lease()._renewed_at = 0.0
+        return "done"
+
+    assert task() == {"aborted": True, "reason": "lease_lost"}
+    assert done == [0]
+    # Le bail repris par l'autre exécution n'est pas supprimé
+    assert redis.get("lease:task:unit") == b"other-token"
+
+
+class _Result:
+    def __init__(self, rows=(), scalar=None):
+        self.rows = rows
+        self._scalar = scalar
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def scalar(self):
+        return self._scalar
+
+
+def test_product_metrics_refresh_stops_between_tenants(redis, monkeypatch):
+    refreshed = []
+
+    class _Session:
+        def execute(self, statement, params=None):
+            if params is None:
+                return _Result(rows=[("t1",), ("t2",), ("t3",)])
+            refreshed.append(params["tenant_id"])
+            # Bail perdu pendant le premier tenant
+            redis.set("lease:task:refresh_product_sales_metrics", "other-token")
+            current_lease()._renewed_at = 0.0
+            return _Result(scalar=1)
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(dashboard_tasks, "SessionLocal", _Session)
+
+    assert dashboard_tasks.refresh_product_sales_metrics() == {"aborted": True, "reason": "lease_lost"}
+    assert refreshed == ["t1"]
@@ -0,0 +1,99 @@
+"""
+Tests des métriques HTTP: accès à /metrics et classe de taille des tenants.
+"""
+import asyncio
+import os
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.core import tenant_size
+from app.main import _metrics_allowed, app
+
+
+def _request(host, authorization=None):
+    headers = {"authorization": authorization} if authorization else {}
+    return SimpleNamespace(headers=headers, client=SimpleNamespace(host=host))
+
+
+@pytest.mark.parametrize("host, allowed", [
+    ("127.0.0.1", True),
+    ("10.4.2.17", True),
+    ("192.168.1.20", True),
+    ("::1", True),
+    ("41.82.10.3", False),
+    ("testclient", False),
+])
+def test_metrics_allowed_by_network(monkeypatch, host, allowed):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "")
+
+    assert _metrics_allowed(_request(host)) is allowed
+
+
+def test_metrics_allowed_with_token(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+
+    assert _metrics_allowed(_request("41.82.10.3", "Bearer s3cret"))
+    assert not _metrics_allowed(_request("41.82.10.3", "Bearer wrong"))
+
+
+def test_metrics_endpoint_hidden_from_external_clients(monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_TOKEN", "s3cret")
+    client = TestClient(app)
+
+    assert client.get("/metrics").status_code == 404
+    response = client.get("/metrics", headers={"Authorization": "Bearer s3cret"})
+    assert response.status_code == 200
+    assert "http_request_duration_seconds" in response.text
+
+
+def test_tenant_size_computed_once_while_in_flight(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def _slow_size_class(tenant_id):
+        calls.append(tenant_id)
+        release.wait(5)
+        return "small"
+
+    monkeypatch.setattr(tenant_size, "get_tenant_size_class", _slow_size_class)
+    tenant_id = uuid.uuid4()
+
+    async def _burst():
+        for _ in range(20):
+            tenant_size.refresh_tenant_size_class(tenant_id)
+        pending = tenant_size._pending[tenant_id]
+        release.set()
+        await pending
+        await asyncio.sleep(0)
+
+    asyncio.run(_burst())
+
+    assert calls == [tenant_id]
+    assert tenant_id not in tenant_size._pending
+
+
+def test_pool_gauges_cover_primary_and_replicas():
+    from prometheus_client import CollectorRegistry
+    from sqlalchemy import create_engine
+
+    from app.core.metrics import DatabasePoolCollector
+    from app.db.replicas import EngineRegistry
+
+    # Engines jamais connectés: seuls les pools sont lus
+    primary = create_engine("postgresql://digiboost@primary:5432/digiboost", pool_size=20)
+    replica = create_engine("postgresql://digiboost@replica-1:5433/digiboost", pool_size=10)
+    engines = EngineRegistry(primary=primary, replicas=[replica], max_lag_seconds=5, check_interval=60)
+    registry = CollectorRegistry()
+    registry.register(DatabasePoolCollector(engines))
+
+    def sample(state, database):
+        return registry.get_sample_value(f"digiboost_db_pool_{state}", {"pid": str(os.getpid()), "database": database})
+
+    assert sample("size", "primary") == 20
+    assert sample("size", "replica-1:5433/digiboost") == 10
+    assert sample("checked_out", "replica-1:5433/digiboost") == 0
@@ -0,0 +1,128 @@
+"""
+Tests de la pagination par curseur (app/utils/pagination.py).
+"""
+import base64
+import json
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, DateTime, Uuid, create_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    paginate_keyset,
+)
+
+_Base = declarative_base()
+
+
+class _Event(_Base):
+    __tablename__ = "events"
+
+    id = Column(Uuid, primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+
+
+def _raw_cursor(payload) -> str:
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        yield db
+    engine.dispose()
+
+
+def test_cursor_round_trip():
+    when = datetime(2024, 3, 15, 10, 30, 45, 123456)
+    row_id = uuid.uuid4()
+
+    cursor = encode_cursor(when, row_id)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (when, str(row_id))
+
+
+@pytest.mark.parametrize("cursor", [
+    "%%%not-base64%%%",
+    "bm90IGpzb24",  # "not json"
+    _raw_cursor(["2024-03-15T10:30:45"]),
+    _raw_cursor(["pas une date", str(uuid.uuid4())]),
+    _raw_cursor([12, str(uuid.uuid4())]),
+    _raw_cursor(42),
+])
+def test_garbage_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_tampered_cursor_id_is_rejected(session):
+    cursor = _raw_cursor([datetime(2024, 3, 15).isoformat(), "pas-un-uuid"])
+
+    with pytest.raises(InvalidCursorError):
+        paginate_keyset(session.query(_Event), _Event.created_at, _Event.id, limit=10, cursor=cursor)
+
+
+def test_ties_on_sort_key_are_neither_skipped_nor_repeated(session):
+    base = datetime(2024, 3, 15, 12, 0, 0)
+    # Trois horodatages seulement pour 25 lignes: nombreuses égalités
+    events = [_Event(id=uuid.uuid4(), created_at=base - timedelta(minutes=i % 3)) for i in range(25)]
+    session.add_all(events)
+    session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        rows, cursor = paginate_keyset(
+            session.query(_Event), _Event.created_at, _Event.id, limit=4, cursor=cursor
+        )
+        assert len(rows) <= 4
+        seen.extend(rows)
+        if cursor is None:
+            break
+
+    assert len(seen) == len(events)
+    assert {e.id for e in seen} == {e.id for e in events}
+    expected = sorted(events, key=lambda e: (e.created_at, e.id), reverse=True)
+    assert [e.id for e in seen] == [e.id for e in expected]
+
+
+def test_last_page_has_no_cursor(session):
+    session.add_all([_Event(id=uuid.uuid4(), created_at=datetime(2024, 1, 1)) for _ in range(4)])
+    session.commit()
+
+    rows, cursor = paginate_keyset(session.query(_Event), _Event.created_at, _Event.id, limit=4)
+
+    assert len(rows) == 4
+    assert cursor is None
+
+
+def test_alert_history_rejects_invalid_cursor_with_400():
+    from app.api.deps import get_current_tenant_id, get_db
+    from app.api.v1 import alerts
+
+    engine = create_engine("sqlite://")
+
+    def _db():
+        with Session(engine) as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(alerts.router)
+    app.dependency_overrides[get_current_tenant_id] = lambda: uuid.uuid4()
+    app.dependency_overrides[get_db] = _db
+
+    response = TestClient(app).get("/alerts/history/", params={"cursor": "garbage!!"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Curseur de pagination invalide"
+    engine.dispose()
@@ -0,0 +1,163 @@
+"""
+Tests du partitionnement mensuel (app/db/partitioning.py) et de sa migration.
+"""
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import text
+
+from app.db.partitioning import (
+    Partition,
+    add_months,
+    list_partitions,
+    month_start,
+    parent_table,
+    partition_name,
+)
+from tests.conftest import requires_postgres, seed_tenant_product
+
+PARTITION_REVISION = "b8e2d4f6a1c3"
+PRE_PARTITION_REVISION = "a3f1c9d2e8b4"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (date(2026, 1, 1), date(2026, 1, 1)),
+    (date(2026, 1, 31), date(2026, 1, 1)),
+    (date(2024, 2, 29), date(2024, 2, 1)),
+    (datetime(2025, 12, 31, 23, 59), date(2025, 12, 1)),
+])
+def test_month_start(value, expected):
+    assert month_start(value) == expected
+
+
+@pytest.mark.parametrize("value, months, expected", [
+    (date(2026, 1, 15), 0, date(2026, 1, 1)),
+    (date(2026, 1, 31), 1, date(2026, 2, 1)),
+    (date(2025, 11, 1), 3, date(2026, 2, 1)),
+    (date(2026, 1, 1), -1, date(2025, 12, 1)),
+    (date(2026, 3, 1), -15, date(2024, 12, 1)),
+    (date(2025, 12, 1), 24, date(2027, 12, 1)),
+])
+def test_add_months(value, months, expected):
+    assert add_months(value, months) == expected
+
+
+def test_partition_name():
+    assert partition_name("sales", date(2026, 1, 1)) == "sales_y2026m01"
+    assert partition_name("stock_movements", date(2025, 11, 1)) == "stock_movements_y2025m11"
+
+
+@pytest.mark.parametrize("relation, expected", [
+    ("sales_y2026m01", "sales"),
+    ("sales_default", "sales"),
+    ("stock_movements_y2025m11", "stock_movements"),
+    ("products", "products"),
+    ("sales_archive_files", "sales_archive_files"),
+])
+def test_parent_table(relation, expected):
+    assert parent_table(relation) == expected
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class _Conn:
+    def __init__(self, rows):
+        self.rows = rows
+        self.params = None
+
+    def execute(self, statement, params):
+        self.params = params
+        return _Rows(self.rows)
+
+
+def test_list_partitions_sorted_with_default_last():
+    conn = _Conn([
+        ("sales_default", 12),
+        ("sales_y2026m02", 300),
+        ("sales_y2025m12", -1),  # jamais analysée
+        ("sales_y2026m01", 250),
+    ])
+
+    partitions = list_partitions(conn, "sales")
+
+    assert conn.params == {"table": "sales"}
+    assert partitions == [
+        Partition("sales_y2025m12", date(2025, 12, 1), 0),
+        Partition("sales_y2026m01", date(2026, 1, 1), 250),
+        Partition("sales_y2026m02", date(2026, 2, 1), 300),
+        Partition("sales_default", None, 12),
+    ]
+
+
+def _table_summary(conn, table, column):
+    return conn.execute(text(f"""
+        SELECT COUNT(*), COALESCE(SUM(quantity), 0), MIN({column}), MAX({column})
+        FROM {table}
+    """)).one()
+
+
+def _relkind(conn, table):
+    return conn.execute(text("SELECT relkind FROM pg_class WHERE oid = CAST(:t AS regclass)"), {"t": table}).scalar()
+
+
+@requires_postgres
+def test_partition_migration_upgrade_and_downgrade(alembic_config, pg_engine):
+    from alembic import command
+
+    command.upgrade(alembic_config, PRE_PARTITION_REVISION)
+
+    sale_dates = [
+        datetime(2024, 1, 10, 9, 0, tzinfo=timezone.utc),
+        datetime(2024, 1, 31, 23, 59, tzinfo=timezone.utc),
+        datetime(2024, 2, 1, 0, 0, tzinfo=timezone.utc),
+        datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc),
+    ]
+    with pg_engine.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        for index, sale_date in enumerate(sale_dates):
+            conn.execute(text("""
+                INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount)
+                VALUES (gen_random_uuid(), :tenant_id, :product_id, :sale_date, :quantity, 12500, 12500 * :quantity)
+            """), {"tenant_id": tenant_id, "product_id": product_id, "sale_date": sale_date, "quantity": index + 1})
+            conn.execute(text("""
+                INSERT INTO stock_movements (id, tenant_id, product_id, movement_date, movement_type, quantity)
+                VALUES (gen_random_uuid(), :tenant_id, :product_id, :movement_date, 'ENTRY', :quantity)
+            """), {"tenant_id": tenant_id, "product_id": product_id, "movement_date": sale_date, "quantity": index + 1})
+
+        before = {
+            "sales": _table_summary(conn, "sales", "sale_date"),
+            "stock_movements": _table_summary(conn, "stock_movements", "movement_date"),
+        }
+
+    command.upgrade(alembic_config, PARTITION_REVISION)
+
+    with pg_engine.connect() as conn:
+        assert _relkind(conn, "sales") == "p"
+        assert _relkind(conn, "stock_movements") == "p"
+        assert _table_summary(conn, "sales", "sale_date") == before["sales"]
+        assert _table_summary(conn, "stock_movements", "movement_date") == before["stock_movements"]
+
+        names = [p.name for p in list_partitions(conn, "sales")]
+        assert names[0] == "sales_y2024m01"
+        assert names[-1] == "sales_default"
+        assert conn.execute(text("SELECT COUNT(*) FROM sales_y2024m01")).scalar() == 2
+        assert conn.execute(text("SELECT COUNT(*) FROM sales_y2024m02")).scalar() == 1
+        assert conn.execute(text("SELECT COUNT(*) FROM sales_default")).scalar() == 0
+
+    command.downgrade(alembic_config, PRE_PARTITION_REVISION)
+
+    with pg_engine.connect() as conn:
+        assert _relkind(conn, "sales") == "r"
+        assert _relkind(conn, "stock_movements") == "r"
+        assert _table_summary(conn, "sales", "sale_date") == before["sales"]
+        assert _table_summary(conn, "stock_movements", "movement_date") == before["stock_movements"]
+        assert conn.execute(text("SELECT to_regclass('sales_y2024m01')")).scalar() is None
+        assert conn.execute(text(
+            "SELECT COUNT(*) FROM mv_dashboard_sales_performance"
+        )).scalar() is not None
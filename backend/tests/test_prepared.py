@@ -0,0 +1,169 @@
+"""
+Tests des requêtes préparées (app/db/prepared.py): réécriture du SQL,
+suivi des PREPARE par connexion et exécution des requêtes des services.
+"""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import text
+
+from app.config import settings
+from app.db.prepared import PREPARED_INFO_KEY, UNPREPARED_INFO_KEY, PreparedQuery, prepared_query
+from tests.conftest import requires_postgres, seed_tenant_product
+
+
+def test_named_params_become_positions():
+    query = PreparedQuery("test_rewrite", """
+        SELECT id::text FROM sales
+        WHERE tenant_id = CAST(:tenant_id AS uuid) AND sale_date >= :start
+            AND product_id IN (SELECT id FROM products WHERE tenant_id = CAST(:tenant_id AS uuid))
+        LIMIT CAST(:limit AS integer)
+    """)
+
+    assert query.params == ["tenant_id", "start", "limit"]
+    prepare = str(query.prepare_text)
+    assert prepare.startswith("PREPARE test_rewrite AS")
+    # Un paramètre répété garde sa position; les casts ::type sont intacts
+    assert prepare.count("CAST($1 AS uuid)") == 2
+    assert "sale_date >= $2" in prepare
+    assert "LIMIT CAST($3 AS integer)" in prepare
+    assert "id::text" in prepare
+    assert ":" not in prepare.replace("::", "")
+    assert str(query.execute_text) == "EXECUTE test_rewrite(:tenant_id, :start, :limit)"
+
+
+def test_query_without_params():
+    query = PreparedQuery("test_no_params", "SELECT 1")
+
+    assert query.params == []
+    assert str(query.prepare_text) == "PREPARE test_no_params AS SELECT 1"
+    assert str(query.execute_text) == "EXECUTE test_no_params"
+
+
+def test_declaration_is_idempotent_per_sql():
+    query = prepared_query("test_declared", "SELECT :a")
+
+    assert prepared_query("test_declared", "SELECT :a") is query
+    with pytest.raises(ValueError):
+        prepared_query("test_declared", "SELECT :b")
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.info = {}
+        self.statements = []
+
+    def execute(self, statement, params=None):
+        self.statements.append((str(statement), params))
+        return "result"
+
+
+class _FakeSession:
+    """Session PostgreSQL factice: une connexion, sans base."""
+
+    def __init__(self, connection):
+        self._connection = connection
+        self.info = {}
+        self.plain = []
+
+    def get_bind(self):
+        return SimpleNamespace(dialect=SimpleNamespace(name="postgresql"))
+
+    def connection(self):
+        return self._connection
+
+    def execute(self, statement, params=None):
+        self.plain.append((str(statement), params))
+        return "plain"
+
+
+def test_prepare_once_per_connection(monkeypatch):
+    monkeypatch.setattr(settings, "PREPARED_STATEMENTS_ENABLED", True)
+    query = PreparedQuery("test_once", "SELECT :a, :b")
+    connection = _FakeConnection()
+    db = _FakeSession(connection)
+
+    assert query.execute(db, {"a": 1, "b": 2, "ignored": 3}) == "result"
+    assert query.execute(db, {"a": 4, "b": 5}) == "result"
+
+    assert connection.statements == [
+        ("PREPARE test_once AS SELECT $1, $2", None),
+        ("EXECUTE test_once(:a, :b)", {"a": 1, "b": 2}),
+        ("EXECUTE test_once(:a, :b)", {"a": 4, "b": 5}),
+    ]
+    assert connection.info[PREPARED_INFO_KEY] == {"test_once"}
+
+    # Nouvelle connexion physique: nouvelle préparation
+    other = _FakeConnection()
+    query.execute(_FakeSession(other), {"a": 1, "b": 2})
+    assert other.statements[0][0].startswith("PREPARE test_once")
+
+
+@pytest.mark.parametrize("enabled, unprepared", [(False, False), (True, True)])
+def test_plain_execution_fallback(monkeypatch, enabled, unprepared):
+    monkeypatch.setattr(settings, "PREPARED_STATEMENTS_ENABLED", enabled)
+    query = PreparedQuery("test_plain", "SELECT :a")
+    connection = _FakeConnection()
+    db = _FakeSession(connection)
+    db.info[UNPREPARED_INFO_KEY] = unprepared
+
+    assert query.execute(db, {"a": 1}) == "plain"
+    assert db.plain == [("SELECT :a", {"a": 1})]
+    assert connection.statements == []
+
+
+@requires_postgres
+def test_service_queries_prepare_on_postgresql(alembic_config, pg_engine, monkeypatch):
+    from alembic import command
+    from sqlalchemy.orm import Session
+
+    from app.services.alert_service import AlertService
+    from app.services.analytics_service import AnalyticsService
+    from app.services.dashboard_service import DashboardService
+
+    command.upgrade(alembic_config, "head")
+    with pg_engine.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        conn.execute(text("""
+            INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount, status)
+            VALUES (gen_random_uuid(), :tenant_id, :product_id, :sale_date, 2, 12500, 25000, 'DELIVERED')
+        """), {"tenant_id": tenant_id, "product_id": product_id,
+               "sale_date": datetime.utcnow() - timedelta(days=1)})
+        conn.execute(text("UPDATE products SET current_stock = 4 WHERE id = :id"), {"id": product_id})
+        conn.execute(text("SELECT fn_refresh_dashboard_aggregates(:tenant_id)"), {"tenant_id": tenant_id})
+
+    alert = SimpleNamespace(tenant_id=tenant_id, conditions={"threshold": 90})
+    calls = {
+        "dashboard_overview": lambda db: DashboardService(db)._get_overview_single_query(tenant_id),
+        "dashboard_stock_health": lambda db: DashboardService(db)._get_stock_health(tenant_id),
+        "dashboard_sales_performance": lambda db: DashboardService(db)._get_sales_performance(tenant_id),
+        "dashboard_top_products": lambda db: DashboardService(db)._get_top_products(tenant_id),
+        "dashboard_dormant_products": lambda db: DashboardService(db)._get_dormant_products(tenant_id),
+        "dashboard_taux_service": lambda db: DashboardService(db)._get_taux_service(tenant_id),
+        "analytics_sales_evolution": lambda db: AnalyticsService(db).get_sales_evolution(tenant_id),
+        "analytics_top_products_revenue": lambda db: AnalyticsService(db).get_top_products(tenant_id),
+        "analytics_top_products_quantity": lambda db: AnalyticsService(db).get_top_products(
+            tenant_id, order_by="quantity"),
+        "analytics_top_products_transactions": lambda db: AnalyticsService(db).get_top_products(
+            tenant_id, order_by="transactions"),
+        "analytics_category_performance": lambda db: AnalyticsService(db).get_category_performance(tenant_id),
+        "analytics_abc_classification": lambda db: AnalyticsService(db).classify_products_abc(tenant_id),
+        "alert_taux_service": lambda db: AlertService(db)._evaluate_taux_service(alert),
+    }
+
+    def drop_generated_at(value):
+        return {k: v for k, v in value.items() if k != "generated_at"} if isinstance(value, dict) else value
+
+    for name, call in calls.items():
+        monkeypatch.setattr(settings, "PREPARED_STATEMENTS_ENABLED", False)
+        with Session(pg_engine) as db:
+            expected = call(db)
+
+        monkeypatch.setattr(settings, "PREPARED_STATEMENTS_ENABLED", True)
+        with Session(pg_engine) as db:
+            first, second = call(db), call(db)
+            assert name in db.connection().info[PREPARED_INFO_KEY], name
+
+        assert drop_generated_at(first) == drop_generated_at(expected), name
+        assert drop_generated_at(second) == drop_generated_at(expected), name
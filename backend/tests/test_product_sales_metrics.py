@@ -0,0 +1,109 @@
+"""
+Tests des métriques de ventes par produit (last_sale_at, qty_30d, qty_90d,
+revenue_30d) tenues par les triggers sur sales.
+"""
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from tests.conftest import BACKEND_DIR, requires_postgres, seed_tenant_product
+
+METRICS = text("""
+    SELECT id, last_sale_at, qty_30d, qty_90d, revenue_30d
+    FROM products WHERE tenant_id = :tenant_id ORDER BY id
+""")
+
+
+def test_single_migration_head():
+    from alembic.config import Config
+    from alembic.script import ScriptDirectory
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+
+    assert ScriptDirectory.from_config(config).get_heads() == ["c1f5a8d3e7b2"]
+
+
+def _assert_matches_refresh(conn, tenant_id):
+    """Les valeurs des triggers sont celles du recalcul exact (aucune ligne corrigée)."""
+    before = conn.execute(METRICS, {"tenant_id": tenant_id}).all()
+    corrected = conn.execute(
+        text("SELECT fn_refresh_product_sales_metrics(:tenant_id)"), {"tenant_id": tenant_id}
+    ).scalar()
+    assert conn.execute(METRICS, {"tenant_id": tenant_id}).all() == before
+    assert corrected == 0
+
+
+@requires_postgres
+def test_triggers_match_refresh_on_insert_update_delete(alembic_config, pg_engine):
+    from alembic import command
+
+    command.upgrade(alembic_config, "head")
+    now = datetime.now(timezone.utc)
+
+    with pg_engine.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        other_id = uuid.uuid4()
+        conn.execute(text("""
+            INSERT INTO products (id, tenant_id, code, name, purchase_price, sale_price, is_active)
+            VALUES (:id, :tenant_id, 'P-002', 'Huile 5L', 4000, 5000, TRUE)
+        """), {"id": other_id, "tenant_id": tenant_id})
+
+        # Ventes dans et hors des fenêtres 30 / 90 jours, en une instruction
+        sales = [(uuid.uuid4(), now - timedelta(days=days), quantity)
+                 for days, quantity in ((1, 2), (10, 3), (45, 5), (120, 7))]
+        conn.execute(text("""
+            INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount)
+            VALUES (:id, :tenant_id, :product_id, :sale_date, :quantity, 12500, :quantity * 12500)
+        """), [{"id": sale_id, "tenant_id": tenant_id, "product_id": product_id,
+                "sale_date": sale_date, "quantity": quantity} for sale_id, sale_date, quantity in sales])
+    with pg_engine.begin() as conn:
+        _assert_matches_refresh(conn, tenant_id)
+
+    latest, recent, older, oldest = (sale_id for sale_id, _, _ in sales)
+    steps = [
+        # Quantité modifiée
+        ("UPDATE sales SET quantity = 4, total_amount = 50000 WHERE id = :id", {"id": recent}),
+        # Statut modifié (annulation): les compteurs restent identiques
+        ("UPDATE sales SET status = 'CANCELLED' WHERE id = :id", {"id": older}),
+        # Vente sortie de la fenêtre 30 jours
+        ("UPDATE sales SET sale_date = sale_date - INTERVAL '40 days' WHERE id = :id", {"id": recent}),
+        # Vente déplacée vers un autre produit
+        ("UPDATE sales SET product_id = :other_id WHERE id = :id", {"id": older, "other_id": other_id}),
+        # Dernière vente supprimée: last_sale_at relue
+        ("DELETE FROM sales WHERE id = :id", {"id": latest}),
+        # Suppression multi-lignes
+        ("DELETE FROM sales WHERE id IN (:a, :b)", {"a": oldest, "b": older}),
+    ]
+    for statement, params in steps:
+        with pg_engine.begin() as conn:
+            conn.execute(text(statement), params)
+        with pg_engine.begin() as conn:
+            _assert_matches_refresh(conn, tenant_id)
+
+    with pg_engine.begin() as conn:
+        row = conn.execute(text("SELECT last_sale_at, qty_90d FROM products WHERE id = :id"),
+                           {"id": product_id}).one()
+        assert row.qty_90d == 4
+        assert row.last_sale_at == conn.execute(
+            text("SELECT MAX(sale_date) FROM sales WHERE product_id = :id"), {"id": product_id}
+        ).scalar()
+
+
+@requires_postgres
+def test_update_delete_triggers_downgrade(alembic_config, pg_engine):
+    from alembic import command
+
+    command.upgrade(alembic_config, "head")
+    command.downgrade(alembic_config, "a4c8e2f7b9d5")
+
+    with pg_engine.connect() as conn:
+        triggers = set(conn.execute(text("""
+            SELECT tgname FROM pg_trigger
+            WHERE tgrelid = 'sales'::regclass AND tgname LIKE 'trg_sales_product_metrics%'
+        """)).scalars())
+    assert triggers == {"trg_sales_product_metrics"}
+
+    command.upgrade(alembic_config, "head")
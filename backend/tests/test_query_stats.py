@@ -0,0 +1,104 @@
+"""
+Tests du comptage SQL par requête HTTP (app/db/query_stats.py et
+QueryStatsMiddleware): hooks d'engine sur une base SQLite, empreintes
+des requêtes et remise à zéro de la ContextVar entre deux requêtes.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.db import query_stats
+from app.db.query_stats import current_stats, fingerprint, install_query_instrumentation
+from app.main import QueryStatsMiddleware
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    assert fingerprint("SELECT * FROM products WHERE id = 12") == fingerprint(
+        "SELECT *  FROM products\n  WHERE id = 13"
+    ) == "SELECT * FROM products WHERE id = ?"
+    assert fingerprint("SELECT 1 FROM sales WHERE id IN (1, 2, 3) AND code = 'l''huile'") == (
+        "SELECT ? FROM sales WHERE id IN (?) AND code = ?"
+    )
+    assert fingerprint("SELECT 1 FROM sales WHERE id IN (4)") == fingerprint(
+        "SELECT 1 FROM sales WHERE id IN ('a', 'b')"
+    )
+
+
+@pytest.fixture
+def stats_app(tmp_path, monkeypatch):
+    """Application minimale: QueryStatsMiddleware et un engine SQLite instrumenté."""
+    monkeypatch.setattr(settings, "DEBUG", True)
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    monkeypatch.setattr(settings, "N_PLUS_ONE_THRESHOLD", 5)
+
+    engine = create_engine(f"sqlite:///{tmp_path}/stats.db")
+    install_query_instrumentation(engine)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO products (id, name) VALUES (1, 'Riz'), (2, 'Huile'), (3, 'Sucre')"))
+
+    finished = []
+    finish_tracking = query_stats.finish_tracking
+
+    def _finish_tracking(token, name=None):
+        stats = finish_tracking(token, name)
+        finished.append(stats)
+        return stats
+
+    monkeypatch.setattr(query_stats, "finish_tracking", _finish_tracking)
+
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+    seen = []
+
+    @app.get("/products/{n}")
+    def read_products(n: int):
+        seen.append(current_stats())
+        with engine.connect() as conn:
+            # Boucle N+1: même requête, littéral différent
+            for product_id in range(n):
+                conn.execute(text(f"SELECT name FROM products WHERE id = {product_id}"))
+            conn.execute(text("SELECT name FROM products WHERE id IN (1, 2)"))
+            conn.execute(text("SELECT name FROM products WHERE id IN (1, 2, 3) AND name <> 'x'"))
+        return {"n": n}
+
+    yield TestClient(app), engine, finished, seen
+    engine.dispose()
+
+
+def test_request_counts_its_statements(stats_app):
+    client, _, finished, _ = stats_app
+
+    response = client.get("/products/6")
+
+    assert response.headers["X-DB-Query-Count"] == "8"
+    assert response.headers["X-DB-Repeated-Statements"] == "1"
+    stats = finished[0]
+    assert (stats.kind, stats.name, stats.count) == ("request", "GET /products/{n}", 8)
+    assert stats.fingerprints == {
+        "SELECT name FROM products WHERE id = ?": 6,
+        "SELECT name FROM products WHERE id IN (?)": 1,
+        "SELECT name FROM products WHERE id IN (?) AND name <> ?": 1,
+    }
+    assert stats.repeated(settings.N_PLUS_ONE_THRESHOLD) == [("SELECT name FROM products WHERE id = ?", 6)]
+
+
+def test_stats_reset_between_requests(stats_app):
+    client, engine, finished, seen = stats_app
+
+    client.get("/products/6")
+    client.get("/products/1")
+
+    # Une unité de travail par requête, compteurs repartis de zéro
+    assert seen[0] is finished[0] and seen[1] is finished[1]
+    assert seen[0] is not seen[1]
+    assert [stats.count for stats in finished] == [8, 3]
+    assert finished[1].repeated(settings.N_PLUS_ONE_THRESHOLD) == []
+
+    # Hors requête: rien n'est compté
+    assert current_stats() is None
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert [stats.count for stats in finished] == [8, 3]
@@ -0,0 +1,127 @@
+"""
+Tests du routage des lectures (app/db/replicas.py, app/db/session.py):
+tourniquet entre réplicas, garde de retard, repli sur la primaire et
+bascule primary_session. Engines et mesure du retard simulés.
+"""
+from prometheus_client import REGISTRY
+from sqlalchemy.engine import make_url
+
+from app.db import session as db_session
+from app.db.replicas import EngineRegistry
+
+
+class FakeEngine:
+    """Engine dont la requête de retard renvoie `lag` (exception: injoignable)."""
+
+    def __init__(self, name, lag=0.0):
+        self.url = make_url(f"postgresql://digiboost@{name}:5432/digiboost")
+        self.lag = lag
+        self.measures = 0
+
+    def connect(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, statement):
+        self.measures += 1
+        if isinstance(self.lag, Exception):
+            raise self.lag
+        return self
+
+    def scalar(self):
+        return self.lag
+
+
+def _registry(*replicas, max_lag=5.0, check_interval=60.0):
+    return EngineRegistry(
+        primary=FakeEngine("primary"),
+        replicas=list(replicas),
+        max_lag_seconds=max_lag,
+        check_interval=check_interval
+    )
+
+
+def _routed(target):
+    return REGISTRY.get_sample_value("digiboost_db_read_routing_total", {"target": target}) or 0
+
+
+def test_round_robin_between_replicas():
+    first, second = FakeEngine("replica-1"), FakeEngine("replica-2")
+    engines = _registry(first, second)
+
+    assert [engines.read_engine() for _ in range(4)] == [first, second, first, second]
+    # Une mesure par réplica et par intervalle
+    assert (first.measures, second.measures) == (1, 1)
+
+
+def test_lagging_or_unreachable_replica_excluded():
+    lagging = FakeEngine("replica-1", lag=30.0)
+    unreachable = FakeEngine("replica-2", lag=OSError("connection refused"))
+    healthy = FakeEngine("replica-3", lag=2.0)
+    engines = _registry(lagging, unreachable, healthy)
+
+    assert {engines.read_engine() for _ in range(6)} == {healthy}
+
+
+def test_primary_without_usable_replica():
+    no_replica = _registry()
+    assert no_replica.read_engine() is no_replica.primary
+
+    lagging = _registry(FakeEngine("replica-1", lag=30.0), FakeEngine("replica-2", lag=OSError("down")))
+    routed = _routed("primary")
+    assert lagging.read_engine() is lagging.primary
+    assert _routed("primary") == routed + 1
+
+
+def test_replica_back_after_next_measure():
+    replica = FakeEngine("replica-1", lag=30.0)
+    engines = _registry(replica, check_interval=0)
+    assert engines.read_engine() is engines.primary
+
+    replica.lag = 1.0
+    assert engines.read_engine() is replica
+
+
+def test_read_session_bound_to_read_engine(monkeypatch):
+    replica = FakeEngine("replica-1")
+    engines = _registry(replica)
+    monkeypatch.setattr(db_session, "engines", engines)
+
+    db = db_session.read_session()
+    assert db.bind is replica and db.info["replica"] is True
+    db.close()
+
+    replica.lag = 30.0
+    monkeypatch.setattr(engines, "check_interval", 0)
+    dependency = db_session.get_read_db()
+    db = next(dependency)
+    assert db.bind is engines.primary and db.info["replica"] is False
+    dependency.close()
+
+
+def test_primary_session_switches_bind(monkeypatch):
+    replica = FakeEngine("replica-1")
+    monkeypatch.setattr(db_session, "engines", _registry(replica))
+    db = db_session.read_session()
+
+    with db_session.primary_session(db) as primary_db:
+        assert primary_db is db
+        assert db.bind is db_session.engine and db.info["replica"] is False
+
+    assert db.bind is replica and db.info["replica"] is True
+    db.close()
+
+
+def test_primary_session_noop_on_primary():
+    db = db_session.SessionLocal()
+
+    with db_session.primary_session(db) as primary_db:
+        assert primary_db is db and db.bind is db_session.engine
+
+    assert db.bind is db_session.engine
+    db.close()
@@ -0,0 +1,140 @@
+"""
+Tests des rapports Excel write-only (app/services/report_service.py) et de
+leur envoi par blocs (report_artifact_service.iter_report_file).
+"""
+import io
+import uuid
+from collections import namedtuple
+from datetime import date, datetime
+from decimal import Decimal
+
+import openpyxl
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401  (configuration des relations)
+from app.models.category import Category
+from app.models.product import Product
+from app.services.report_artifact_service import iter_report_file
+from app.services.report_service import ReportService
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Category.__table__.create(engine)
+    Product.__table__.create(engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def _product(db, tenant_id, code, name, stock, min_stock, purchase_price, category=None, is_active=True):
+    db.add(Product(
+        id=uuid.uuid4(), tenant_id=tenant_id, code=code, name=name, unit="sac",
+        current_stock=Decimal(stock), min_stock=Decimal(min_stock), max_stock=Decimal("100"),
+        purchase_price=Decimal(purchase_price), sale_price=Decimal(purchase_price) * 2,
+        category_id=category.id if category else None, is_active=is_active,
+    ))
+
+
+def _load(fileobj):
+    return openpyxl.load_workbook(io.BytesIO(fileobj.read()))
+
+
+def test_inventory_report_rows_styles_and_total(db):
+    tenant_id = uuid.uuid4()
+    cereals = Category(id=uuid.uuid4(), tenant_id=tenant_id, name="Céréales")
+    db.add(cereals)
+    _product(db, tenant_id, "P-001", "Huile 5L", "0", "5", "4000")
+    _product(db, tenant_id, "P-002", "Mil 50kg", "4", "5", "15000", cereals)
+    _product(db, tenant_id, "P-003", "Riz 25kg", "40", "5", "10000", cereals)
+    _product(db, tenant_id, "P-004", "Inactif", "10", "5", "1000", is_active=False)
+    _product(db, uuid.uuid4(), "X-001", "Autre tenant", "10", "5", "1000")
+    db.commit()
+
+    report = ReportService(db).generate_inventory_report(tenant_id)
+    wb = _load(report)
+    ws = wb["Inventaire Stock"]
+
+    assert {"report_title", "report_header_bordered", "report_status_rupture"} <= set(wb.named_styles)
+    assert ws["A1"].value == "RAPPORT INVENTAIRE STOCK"
+    assert ws["A1"].style == "report_title"
+    assert [cell.value for cell in ws[4]][:3] == ["Code", "Nom Produit", "Catégorie"]
+    assert all(cell.style == "report_header_bordered" for cell in ws[4])
+
+    # Produits actifs du tenant, par nom; statut stylé selon sa valeur
+    rows = [[cell.value for cell in ws[row]] for row in range(5, 8)]
+    assert [row[0] for row in rows] == ["P-001", "P-002", "P-003"]
+    assert [row[2] for row in rows] == ["-", "Céréales", "Céréales"]
+    assert [row[7] for row in rows] == ["RUPTURE", "FAIBLE", "NORMAL"]
+    assert [row[9] for row in rows] == [0, 60000, 400000]
+    assert ws["H5"].style == "report_status_rupture"
+    assert ws["H6"].style == "report_status_faible"
+    assert ws["H7"].style == "report_cell_bordered"
+    assert ws["B6"].style == "report_cell_bordered"
+
+    # Ligne vide bordée puis total sur les lignes de données
+    assert all(cell.value is None for cell in ws[8])
+    assert ws["I9"].value == "TOTAL:"
+    assert ws["J9"].value == "=SUM(J5:J7)"
+    assert ws["J9"].style == "report_total_amount_bordered"
+    assert ws.max_row == 9
+
+
+def test_sales_analysis_report_from_rows():
+    Kpis = namedtuple("Kpis", "transactions units revenue")
+    ByProduct = namedtuple("ByProduct", "code name category quantity revenue transactions")
+    ByCategory = namedtuple("ByCategory", "category product_count quantity revenue transactions")
+    Daily = namedtuple("Daily", "date transactions revenue")
+
+    def fetch(query, params):
+        sql = str(query)
+        if "as units" in sql:
+            return iter([Kpis(3, Decimal("7"), Decimal("70000"))])
+        if "GROUP BY p.id" in sql:
+            return iter([ByProduct("P-001", "Riz 25kg", None, Decimal("7"), Decimal("70000"), 3)])
+        if "product_count" in sql:
+            return iter([ByCategory("Sans catégorie", 1, Decimal("7"), Decimal("70000"), 3)])
+        return iter([Daily(date(2025, 9, day), 1, Decimal("10000") * day) for day in (1, 2)])
+
+    report = ReportService(None)._build_sales_analysis_report(
+        uuid.uuid4(), datetime(2025, 9, 1), datetime(2025, 9, 30, 23, 59, 59), fetch
+    )
+    wb = _load(report)
+
+    assert wb.sheetnames == ["Synthèse", "Ventes par Produit", "Ventes par Catégorie", "Évolution Quotidienne"]
+    summary = wb["Synthèse"]
+    assert summary["B6"].value == 3
+    assert summary["B8"].value == 70000
+    assert summary["B8"].style == "report_bold_fcfa"
+    assert summary["B9"].value == pytest.approx(70000 / 3)
+
+    products = wb["Ventes par Produit"]
+    assert [cell.value for cell in products[2]] == ["P-001", "Riz 25kg", "-", 7, 70000, 3]
+    assert products["E2"].style == "report_amount"
+    assert products["A1"].style == "report_header"
+    assert [cell.value for cell in wb["Évolution Quotidienne"]["A"]] == ["Date", "01/09/2025", "02/09/2025"]
+
+
+def test_iter_report_file_yields_fixed_chunks_then_closes():
+    payload = bytes(range(256)) * 41
+    fileobj = io.BytesIO(payload)
+
+    chunks = list(iter_report_file(fileobj, chunk_size=1024))
+
+    assert b"".join(chunks) == payload
+    assert [len(chunk) for chunk in chunks[:-1]] == [1024] * (len(chunks) - 1)
+    assert 0 < len(chunks[-1]) <= 1024
+    assert fileobj.closed
+
+
+def test_iter_report_file_closes_on_interrupted_download():
+    fileobj = io.BytesIO(b"x" * 4096)
+    chunks = iter_report_file(fileobj, chunk_size=1024)
+
+    next(chunks)
+    chunks.close()  # Client déconnecté en cours de transfert
+
+    assert fileobj.closed
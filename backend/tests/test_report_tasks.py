@@ -0,0 +1,76 @@
+"""
+Tests de l'envoi unique du rapport mensuel par tenant et par mois.
+"""
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.tasks import report_tasks
+
+
+class _Query:
+    def __init__(self, tenant):
+        self.tenant = tenant
+
+    def filter(self, *args):
+        return self
+
+    def first(self):
+        return self.tenant
+
+
+class _Session:
+    def __init__(self, tenant):
+        self.tenant = tenant
+
+    def query(self, *args):
+        return _Query(self.tenant)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def monthly_report(monkeypatch, fake_redis, tmp_path):
+    tenant = SimpleNamespace(id=uuid.uuid4(), name="Boutique Test")
+    report = tmp_path / "synthese.pdf"
+    report.write_bytes(b"%PDF")
+    sent = []
+
+    class _ArtifactService:
+        def __init__(self, db):
+            pass
+
+        def get_or_build(self, *args):
+            return {"path": str(report), "size_bytes": 4}
+
+    monkeypatch.setattr(report_tasks, "get_redis", lambda: fake_redis)
+    monkeypatch.setattr(report_tasks, "read_session", lambda: _Session(tenant))
+    monkeypatch.setattr(report_tasks, "ReportArtifactService", _ArtifactService)
+    monkeypatch.setattr(report_tasks, "_send_report_email", lambda db, t, path, m, y: sent.append((t.id, m, y)))
+    monkeypatch.setattr(report_tasks._monthly_report_slots, "acquire", lambda: "slot")
+    monkeypatch.setattr(report_tasks._monthly_report_slots, "release", lambda slot: None)
+
+    return SimpleNamespace(tenant_id=str(tenant.id), sent=sent, redis=fake_redis)
+
+
+def test_monthly_report_email_is_sent_once(monthly_report):
+    first = report_tasks.generate_tenant_monthly_report(monthly_report.tenant_id, 9, 2025)
+    # Redistribution du même message (retry, worker perdu après l'envoi)
+    second = report_tasks.generate_tenant_monthly_report(monthly_report.tenant_id, 9, 2025)
+
+    assert first["status"] == "success"
+    assert second == {"tenant_id": monthly_report.tenant_id, "status": "success",
+                      "attempts": 1, "already_sent": True}
+    assert len(monthly_report.sent) == 1
+
+
+def test_delivery_is_recorded_per_month(monthly_report):
+    report_tasks.generate_tenant_monthly_report(monthly_report.tenant_id, 9, 2025)
+    report_tasks.generate_tenant_monthly_report(monthly_report.tenant_id, 10, 2025)
+
+    assert [(m, y) for _, m, y in monthly_report.sent] == [(9, 2025), (10, 2025)]
+    assert monthly_report.redis.exists(
+        report_tasks._monthly_report_delivery_key(monthly_report.tenant_id, 10, 2025)
+    )
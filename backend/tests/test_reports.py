@@ -0,0 +1,147 @@
+"""
+Tests des jobs de rapport (propriété par tenant) et du nettoyage des artefacts.
+"""
+import io
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.services.report_artifact_service import ReportArtifactStore
+
+
+@pytest.fixture
+def client(fake_redis):
+    from app.api.deps import get_current_user
+    from app.api.v1 import reports
+
+    tenant_id = uuid.uuid4()
+    app = FastAPI()
+    app.include_router(reports.router)
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(tenant_id=tenant_id)
+
+    return SimpleNamespace(http=TestClient(app), tenant_id=tenant_id, redis=fake_redis)
+
+
+@pytest.fixture
+def job_results(monkeypatch):
+    """Résultats Celery simulés, par job_id."""
+    import celery.result
+
+    results = {}
+
+    class _FakeAsyncResult:
+        def __init__(self, job_id, app=None):
+            self.state, self.result = results.get(job_id, ("PENDING", None))
+            self.info = self.result
+
+    monkeypatch.setattr(celery.result, "AsyncResult", _FakeAsyncResult)
+    return results
+
+
+def test_job_of_another_tenant_is_not_found(client, job_results):
+    from app.api.v1.reports import _job_owner_key
+
+    job_id = str(uuid.uuid4())
+    client.redis.set(_job_owner_key(job_id), str(uuid.uuid4()))
+    job_results[job_id] = ("FAILURE", RuntimeError("connexion à 10.0.0.5 refusée"))
+
+    response = client.http.get(f"/reports/jobs/{job_id}")
+
+    assert response.status_code == 404
+
+
+def test_unknown_job_is_not_found(client, job_results):
+    response = client.http.get(f"/reports/jobs/{uuid.uuid4()}")
+
+    assert response.status_code == 404
+
+
+def test_failed_job_hides_exception_text(client, job_results):
+    from app.api.v1.reports import REPORT_JOB_FAILED_MESSAGE, _job_owner_key
+
+    job_id = str(uuid.uuid4())
+    client.redis.set(_job_owner_key(job_id), str(client.tenant_id))
+    job_results[job_id] = ("FAILURE", RuntimeError("connexion à 10.0.0.5 refusée"))
+
+    response = client.http.get(f"/reports/jobs/{job_id}")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "failed"
+    assert response.json()["error"] == REPORT_JOB_FAILED_MESSAGE
+
+
+def test_own_successful_job_is_ready(client, job_results):
+    from app.api.v1.reports import _job_owner_key
+
+    job_id = str(uuid.uuid4())
+    client.redis.set(_job_owner_key(job_id), str(client.tenant_id))
+    job_results[job_id] = ("SUCCESS", {"tenant_id": str(client.tenant_id), "artifact_key": "a" * 64})
+
+    response = client.http.get(f"/reports/jobs/{job_id}")
+
+    assert response.json()["status"] == "ready"
+    assert response.json()["artifact_key"] == "a" * 64
+
+
+def _put(store, key, immutable, created_at):
+    return store.put(key, io.BytesIO(b"%PDF"), {
+        "tenant_id": str(uuid.uuid4()),
+        "immutable": immutable,
+        "extension": "pdf",
+        "created_at": created_at.isoformat(),
+    })
+
+
+def _age_last_access(store, key, days):
+    past = time.time() - days * 86400
+    os.utime(store.root / f"{key}.json", (past, past))
+
+
+def test_prune_closed_period_artifacts_by_last_access(tmp_path):
+    store = ReportArtifactStore(str(tmp_path))
+    now = datetime.now()
+    stale, recent = "1" * 64, "2" * 64
+    _put(store, stale, True, now - timedelta(days=800))
+    _put(store, recent, True, now - timedelta(days=800))
+    _age_last_access(store, stale, 400)
+    _age_last_access(store, recent, 400)
+
+    # Lecture récente: date de dernier accès remise à maintenant
+    assert store.get(recent) is not None
+
+    deleted, freed = store.prune(now - timedelta(days=90), immutable_unused_since=now - timedelta(days=365))
+
+    assert (deleted, freed) == (1, 4)
+    assert store.get(stale) is None
+    assert store.get(recent) is not None
+
+
+def test_prune_keeps_closed_period_artifacts_without_limit(tmp_path):
+    store = ReportArtifactStore(str(tmp_path))
+    key = "3" * 64
+    _put(store, key, True, datetime.now() - timedelta(days=800))
+    _age_last_access(store, key, 800)
+
+    assert store.prune(datetime.now()) == (0, 0)
+    assert store.get(key) is not None
+
+
+def test_prune_open_period_artifacts_by_creation_date(tmp_path):
+    store = ReportArtifactStore(str(tmp_path))
+    now = datetime.now()
+    old, new = "4" * 64, "5" * 64
+    _put(store, old, False, now - timedelta(days=100))
+    _put(store, new, False, now - timedelta(days=10))
+
+    deleted, _ = store.prune(now - timedelta(days=90), immutable_unused_since=now - timedelta(days=365))
+
+    assert deleted == 1
+    assert store.get(old) is None
+    assert json.loads((tmp_path / f"{new}.json").read_text())["key"] == new
@@ -0,0 +1,178 @@
+"""
+Tests de la lecture des ventes archivées (app/db/sales_archive.py)
+et du basculement d'une session de lecture sur la primaire.
+"""
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, text
+from sqlalchemy.orm import Session, declarative_base
+
+from app.db import sales_archive, session as db_session
+from app.db.partitioning import add_months, month_start
+from tests.conftest import requires_postgres, seed_tenant_product
+
+_Base = declarative_base()
+
+
+class _Item(_Base):
+    __tablename__ = "items"
+
+    id = Column(Integer, primary_key=True)
+    source = Column(String(20), nullable=False)
+
+
+def _sqlite_engine(path, source):
+    engine = create_engine(f"sqlite:///{path}")
+    _Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        db.add(_Item(id=1, source=source))
+        db.commit()
+    return engine
+
+
+def test_primary_session_keeps_loaded_objects_attached(monkeypatch, tmp_path):
+    replica = _sqlite_engine(tmp_path / "replica.db", "replica")
+    primary = _sqlite_engine(tmp_path / "primary.db", "primary")
+    monkeypatch.setattr(db_session, "engine", primary)
+
+    db = Session(bind=replica, info={"replica": True})
+    item = db.get(_Item, 1)
+    assert item.source == "replica"
+
+    with db_session.primary_session(db) as switched:
+        assert switched is db
+        assert db.bind is primary
+        assert db.info["replica"] is False
+        assert item in db
+        # Objet expiré au basculement: rechargé depuis la primaire
+        assert item.source == "primary"
+
+    assert db.bind is replica
+    assert db.info["replica"] is True
+    assert item in db
+    assert item.source == "replica"
+    db.close()
+
+
+def test_primary_session_is_noop_on_primary(tmp_path):
+    primary = _sqlite_engine(tmp_path / "primary.db", "primary")
+    db = Session(bind=primary)
+
+    with db_session.primary_session(db):
+        assert db.bind is primary
+
+    assert db.bind is primary
+    db.close()
+
+
+class _CatalogSession:
+    """Session factice: MAX(month) du catalogue des archives."""
+
+    def __init__(self, last_month):
+        self.last_month = last_month
+        self.queries = 0
+
+    def execute(self, statement, params=None):
+        self.queries += 1
+        return self
+
+    def scalar(self):
+        return self.last_month
+
+
+@pytest.fixture
+def boundary_cache():
+    sales_archive.invalidate_archive_boundary()
+    yield
+    sales_archive.invalidate_archive_boundary()
+
+
+def test_fresh_boundary_ignores_process_cache(boundary_cache):
+    db = _CatalogSession(None)
+    assert sales_archive.archive_boundary(db) is None
+
+    # Archivage fait par un autre processus: le cache local l'ignore encore
+    db.last_month = date(2023, 5, 1)
+    assert sales_archive.archive_boundary(db) is None
+    assert sales_archive.archive_boundary(db, fresh=True) == date(2023, 6, 1)
+    assert db.queries == 2
+
+
+@pytest.mark.parametrize("months_before_cutoff, fresh", [(1, True), (0, False), (-3, False)])
+def test_catalog_reread_for_periods_before_retention_cutoff(monkeypatch, months_before_cutoff, fresh):
+    calls = []
+    monkeypatch.setattr(sales_archive, "archive_boundary", lambda db, fresh=False: calls.append(fresh))
+
+    start = add_months(sales_archive.archive_cutoff(), -months_before_cutoff)
+    with sales_archive.include_archived_sales(object(), uuid.uuid4(), datetime.combine(start, datetime.min.time()),
+                                              datetime.utcnow()) as archived:
+        assert archived is False
+
+    assert calls == [fresh]
+
+
+@requires_postgres
+def test_include_archived_sales_on_read_session(alembic_config, pg_engine, monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("duckdb")
+    from alembic import command
+
+    from app.config import settings
+
+    command.upgrade(alembic_config, "head")
+    monkeypatch.setattr(settings, "SALES_ARCHIVE_URI", str(tmp_path / "archives"))
+    monkeypatch.setattr(db_session, "engine", pg_engine)
+    sales_archive.invalidate_archive_boundary()
+
+    archived_month = add_months(month_start(date.today()), -36)
+    hot_month = add_months(archived_month, 1)
+
+    with pg_engine.begin() as conn:
+        tenant_id, product_id = seed_tenant_product(conn)
+        conn.execute(text("""
+            INSERT INTO sales (id, tenant_id, product_id, sale_date, quantity, unit_price, total_amount)
+            VALUES (gen_random_uuid(), :tenant_id, :product_id, :sale_date, 3, 12500, 37500)
+        """), {"tenant_id": tenant_id, "product_id": product_id,
+               "sale_date": datetime.combine(hot_month, datetime.min.time(), timezone.utc)})
+
+    sale_date = datetime.combine(archived_month, datetime.min.time(), timezone.utc)
+    rows = [{
+        "id": str(uuid.uuid4()), "product_id": str(product_id), "sale_date": sale_date,
+        "quantity": Decimal("2.000"), "unit_price": Decimal("12500.00"), "total_amount": Decimal("25000.00"),
+        "order_number": None, "customer_name": None, "status": "DELIVERED",
+        "tenant_id": str(tenant_id), "created_at": sale_date, "updated_at": sale_date,
+    } for _ in range(2)]
+    uri, row_count, size_bytes = sales_archive.write_archive(iter([rows]), tenant_id, archived_month)
+
+    with pg_engine.begin() as conn:
+        conn.execute(text("""
+            INSERT INTO sales_archive_files (id, tenant_id, month, uri, row_count, size_bytes)
+            VALUES (gen_random_uuid(), :tenant_id, :month, :uri, :row_count, :size_bytes)
+        """), {"tenant_id": tenant_id, "month": archived_month, "uri": uri,
+               "row_count": row_count, "size_bytes": size_bytes})
+
+    # Session de lecture "réplica" (même base): le bloc bascule sur la primaire
+    db = Session(bind=pg_engine, info={"replica": True})
+    count_sales = text("SELECT COUNT(*), SUM(quantity) FROM sales WHERE tenant_id = :tenant_id")
+    try:
+        start = datetime.combine(archived_month, datetime.min.time())
+        end = datetime.combine(add_months(hot_month, 1), datetime.min.time())
+
+        with sales_archive.include_archived_sales(db, tenant_id, start, end) as archived:
+            assert archived is True
+            assert db.info["replica"] is False
+            assert tuple(db.execute(count_sales, {"tenant_id": tenant_id}).one()) == (3, Decimal("7.000"))
+
+            with pytest.raises(RuntimeError):
+                db.commit()
+            # Toujours la table temporaire après le commit refusé
+            assert db.execute(count_sales, {"tenant_id": tenant_id}).one()[0] == 3
+
+        assert db.info["replica"] is True
+        assert db.execute(text("SELECT to_regclass('pg_temp.sales')")).scalar() is None
+        assert db.execute(count_sales, {"tenant_id": tenant_id}).one()[0] == 1
+    finally:
+        db.close()
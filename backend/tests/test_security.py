@@ -0,0 +1,104 @@
+"""
+Tests du hashing des mots de passe hors de l'event loop
+(app/core/security.py): mêmes résultats que les fonctions synchrones,
+concurrence bornée par PASSWORD_HASH_WORKERS.
+"""
+import asyncio
+import threading
+import time
+
+import pytest
+from passlib.context import CryptContext
+
+from app.config import settings
+from app.core import security
+
+
+@pytest.fixture
+def hash_executor(monkeypatch):
+    """Pool bcrypt neuf (taille relue dans les settings), arrêté en fin de test."""
+    monkeypatch.setattr(security, "_hash_executor", None)
+    yield
+    if security._hash_executor is not None:
+        security._hash_executor.shutdown(wait=True)
+
+
+@pytest.fixture
+def fast_pwd_context(monkeypatch, hash_executor):
+    """
+    Contexte bcrypt à coût minimal.
+
+    passlib 1.7.4 ne détecte pas bcrypt >= 4.1 (hash refusé à l'import du
+    backend): les wrappers ne dépendant pas du schéma, sha256_crypt le
+    remplace alors.
+    """
+    context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    try:
+        context.hash("probe")
+    except (ValueError, AttributeError):
+        context = CryptContext(schemes=["sha256_crypt"], sha256_crypt__rounds=1000)
+    monkeypatch.setattr(security, "pwd_context", context)
+    return context
+
+
+def test_async_hash_and_verify_match_sync(fast_pwd_context):
+    async def _run():
+        hashed = await security.get_password_hash_async("Dakar#2024")
+        return hashed, [
+            await security.verify_password_async("Dakar#2024", hashed),
+            await security.verify_password_async("dakar#2024", hashed),
+        ]
+
+    hashed, verified = asyncio.run(_run())
+
+    assert fast_pwd_context.identify(hashed) == fast_pwd_context.identify(security.get_password_hash("x"))
+    assert verified == [
+        security.verify_password("Dakar#2024", hashed),
+        security.verify_password("dakar#2024", hashed),
+    ] == [True, False]
+
+
+def test_hash_passwords_keeps_order(fast_pwd_context):
+    passwords = [f"motdepasse-{i}" for i in range(6)]
+
+    hashes = security.hash_passwords(passwords)
+
+    assert len(hashes) == len(passwords)
+    for i, hashed in enumerate(hashes):
+        assert security.verify_password(passwords[i], hashed)
+        assert not security.verify_password(passwords[(i + 1) % len(passwords)], hashed)
+    assert security.hash_passwords([]) == []
+    assert security.verify_password("seul", security.hash_passwords(["seul"])[0])
+
+
+def test_pool_size_bounds_concurrent_hashes(monkeypatch, hash_executor):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 2)
+    lock = threading.Lock()
+    running, peak = 0, 0
+
+    def _slow(*args):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return "hash"
+
+    monkeypatch.setattr(security, "get_password_hash", _slow)
+    monkeypatch.setattr(security, "verify_password", _slow)
+
+    async def _burst():
+        await asyncio.gather(
+            *[security.verify_password_async("secret", "hash") for _ in range(4)],
+            *[security.get_password_hash_async("secret") for _ in range(4)],
+        )
+
+    asyncio.run(_burst())
+    assert peak == 2
+
+    peak = 0
+    assert security.hash_passwords(["a", "b", "c", "d", "e"]) == ["hash"] * 5
+    assert peak == 2
+    assert security.get_hash_executor()._max_workers == 2
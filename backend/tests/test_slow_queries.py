@@ -0,0 +1,87 @@
+"""
+Tests de la capture des requêtes lentes (app/db/slow_queries.py).
+"""
+import json
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects.postgresql import psycopg2
+
+from app.config import settings
+from app.db import slow_queries
+from app.db.prepared import prepared_query
+from app.db.query_stats import fingerprint
+
+_SQL = """
+    SELECT p.id, p.name
+    FROM products p
+    WHERE p.tenant_id = :tenant_id AND p.name LIKE '%kit%'
+    LIMIT :limit
+"""
+_QUERY = prepared_query("test_slow_products", _SQL)
+_EXECUTE = "EXECUTE test_slow_products(%(tenant_id)s, %(limit)s)"
+_PARAMS = {"tenant_id": "9f1c0d7e-2a55-4b0e-9a57-6a3f1f8c2d10", "limit": 10}
+
+
+@pytest.fixture
+def conn():
+    return SimpleNamespace(dialect=psycopg2.dialect())
+
+
+@pytest.fixture
+def records(monkeypatch):
+    written = []
+    monkeypatch.setattr(slow_queries, "_get_writer", lambda: SimpleNamespace(info=written.append))
+    return written
+
+
+def test_resolve_prepared_returns_original_sql(conn):
+    name, statement = slow_queries.resolve_prepared(conn, _EXECUTE)
+
+    assert name == "test_slow_products"
+    assert "p.tenant_id = %(tenant_id)s" in statement
+    assert "LIMIT %(limit)s" in statement
+    # % littéral échappé pour le driver (pyformat)
+    assert "LIKE '%%kit%%'" in statement
+
+
+def test_resolve_prepared_ignores_other_statements(conn):
+    assert slow_queries.resolve_prepared(conn, "SELECT 1") is None
+    assert slow_queries.resolve_prepared(conn, "EXECUTE unknown_statement(%(a)s)") is None
+
+
+def test_slow_execute_is_recorded_under_original_fingerprint(conn, records, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+
+    slow_queries.record_slow_query(conn, _EXECUTE, _PARAMS, False, fingerprint(_EXECUTE), 0.9)
+
+    record = json.loads(records[0])
+    expected = fingerprint(str(_QUERY.text.compile(dialect=conn.dialect)))
+    assert record["prepared"] == "test_slow_products"
+    assert record["fingerprint"] == expected
+    assert record["fingerprint_hash"] == slow_queries.fingerprint_hash(expected)
+
+
+def test_slow_execute_is_explained_with_original_sql(conn, records, monkeypatch):
+    explained = []
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+    monkeypatch.setattr(slow_queries, "_last_explained", {})
+    monkeypatch.setattr(
+        slow_queries, "_explain",
+        lambda c, statement, parameters: explained.append((statement, parameters)) or {"Plan": {}}
+    )
+
+    slow_queries.record_slow_query(conn, _EXECUTE, _PARAMS, False, fingerprint(_EXECUTE), 0.9)
+
+    statement, parameters = explained[0]
+    assert statement.lstrip().startswith("SELECT")
+    assert parameters == _PARAMS
+    assert json.loads(records[0])["plan"] == {"Plan": {}}
+
+
+def test_plain_statement_has_no_prepared_name(conn, records, monkeypatch):
+    monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", False)
+
+    slow_queries.record_slow_query(conn, "SELECT 1", {}, False, "SELECT ?", 0.9)
+
+    assert json.loads(records[0])["prepared"] is None
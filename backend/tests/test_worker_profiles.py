@@ -0,0 +1,41 @@
+"""
+Tests des profils de workers Celery et du pool de connexions associé.
+"""
+import pytest
+
+from app.config import settings
+from app.db import session as db_session
+from app.tasks.worker_profiles import worker_profiles
+
+
+@pytest.mark.parametrize("concurrency, pool_size, expected", [(200, 50, 50), (20, 50, 20)])
+def test_io_worker_pool_sized_for_its_greenlets(monkeypatch, concurrency, pool_size, expected):
+    monkeypatch.setattr(settings, "CELERY_IO_CONCURRENCY", concurrency)
+    monkeypatch.setattr(settings, "CELERY_IO_DB_POOL_SIZE", pool_size)
+
+    io = worker_profiles()["io"]
+
+    assert io.environment() == {"DB_POOL_SIZE": str(expected), "DB_MAX_OVERFLOW": "0"}
+    assert io.db_connections() == expected
+    assert io.tasks_per_process() == concurrency
+
+
+@pytest.mark.parametrize("name", ["cpu", "maintenance"])
+def test_prefork_workers_keep_default_pool(name):
+    profile = worker_profiles()[name]
+
+    assert profile.environment() == {}
+    assert profile.tasks_per_process() == 1
+    assert profile.db_connections() >= profile.tasks_per_process()
+
+
+def test_engine_pool_follows_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 7)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+
+    engine = db_session._create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+    try:
+        assert engine.pool.size() == 7
+        assert engine.pool._max_overflow == 0
+    finally:
+        engine.dispose()
@@ -151,6 +151,7 @@ export const alertsApi = {
     alert_type?: string;
     severity?: string;
     limit?: number;
+    cursor?: string;
     offset?: number;
   }): Promise<AlertHistory[]> => {
     const { data } = await apiClient.get('/alerts/history/', { params });